@@ -0,0 +1,55 @@
+"""Add product_popularity table.
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-04-20 00:01:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "b8c9d0e1f2a3"
+down_revision = "a7b8c9d0e1f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_popularity",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("interaction_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "last_interaction_at", sa.DateTime(timezone=True), nullable=False
+        ),
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("product_id"),
+    )
+    op.create_index(
+        "ix_product_popularity_score",
+        "product_popularity",
+        ["score"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_popularity_score", table_name="product_popularity")
+    op.drop_table("product_popularity")
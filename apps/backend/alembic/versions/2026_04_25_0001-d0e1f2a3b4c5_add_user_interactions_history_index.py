@@ -0,0 +1,27 @@
+"""Add a (user_id, created_at, id) index to user_interactions.
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-04-25 00:01:00
+"""
+
+from alembic import op
+
+
+revision = "d0e1f2a3b4c5"
+down_revision = "c9d0e1f2a3b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_interactions_user_history",
+        "user_interactions",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_interactions_user_history", table_name="user_interactions")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Diversity mode benchmark.
+
+Compares the two ``feed_diversity_mode`` settings on the personalized feed
+stage (retrieval, ranking and diversity):
+
+- ``clusters``: a second query against the 4th-5th nearest style clusters,
+  whose top items are interleaved into reserved slots
+- ``mmr``: one query that also returns vectors, re-ranked by Maximal Marginal
+  Relevance (``feed_mmr_lambda``)
+
+Uses the synthetic catalog of ``benchmarks.feed_pipeline`` in local-mode
+Qdrant and reports, per mode, stage latency percentiles, the time spent in the
+diversity step alone, and two diversity measures of the served page: mean
+pairwise cosine similarity (lower is more diverse) and distinct style
+clusters. Local-mode Qdrant searches by brute force, so compare the modes
+with each other rather than with production numbers.
+
+Usage:
+    cd apps/backend
+    python -m benchmarks.diversity
+    python -m benchmarks.diversity --products 20000 --dim 768 \\
+        --lambdas 0.5 0.7 0.9 --output diversity-bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+
+from benchmarks.feed_pipeline import SyntheticData, _git_commit, load_qdrant
+from src.core.config import get_settings
+from src.features.clustering.service.cluster_cache import ClusterCache
+from src.features.feed.service.feed_service import FEED_STAGE_SECONDS, FeedService
+from src.features.feed.service.seen_set import SeenSetCache
+from src.features.feed.service.trending_cache import TrendingCache
+
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark cluster-slot diversity against MMR re-ranking."
+    )
+    parser.add_argument(
+        "--products",
+        type=int,
+        default=10000,
+        help="Catalog size (default: 10000)",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=100,
+        help="Number of synthetic users with a vector (default: 100)",
+    )
+    parser.add_argument(
+        "--dim",
+        type=int,
+        default=768,
+        help="Vector dimension (default: 768)",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=30,
+        help="Number of style clusters (default: 30)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=20,
+        help="Feed page size (default: 20)",
+    )
+    parser.add_argument(
+        "--lambdas",
+        type=float,
+        nargs="+",
+        default=[0.7],
+        help="MMR lambdas to benchmark (default: 0.7)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed (default: 42)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write the JSON report here (default: stdout)",
+    )
+    return parser.parse_args()
+
+
+def page_diversity(
+    data: SyntheticData, index_by_id: dict[str, int], product_ids: list[str]
+) -> tuple[float, int]:
+    """Mean pairwise cosine similarity and distinct clusters of a page."""
+    rows = [index_by_id[product_id] for product_id in product_ids]
+    if len(rows) < 2:
+        return 0.0, len(rows)
+    vectors = data.product_vectors[rows]
+    similarity = vectors @ vectors.T
+    pairs = len(rows) * (len(rows) - 1)
+    mean_similarity = float((similarity.sum() - np.trace(similarity)) / pairs)
+    return mean_similarity, len(set(data.product_clusters[rows].tolist()))
+
+
+async def run_mode(
+    name: str,
+    service: FeedService,
+    data: SyntheticData,
+    index_by_id: dict[str, int],
+    page_size: int,
+) -> dict:
+    """Generate every user's personalized page once and summarize."""
+    FEED_STAGE_SECONDS.reset()
+    latencies: list[float] = []
+    similarities: list[float] = []
+    cluster_counts: list[int] = []
+    for user in data.users:
+        if user["id"] not in data.user_vectors:
+            continue
+        start = time.perf_counter()
+        feed = await service._generate_personalized_feed(
+            user_vector=data.user_vectors[user["id"]],
+            price_profile=user["price_profile"],
+            seen=service._seen_sets.empty(),
+            category=None,
+            page_size=page_size,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        similarity, clusters = page_diversity(
+            data, index_by_id, [candidate.product_id for candidate in feed]
+        )
+        similarities.append(similarity)
+        cluster_counts.append(clusters)
+
+    diversity_calls = FEED_STAGE_SECONDS.count(stage="diversity")
+    percentiles = np.percentile(latencies, [50, 90, 99])
+    result = {
+        "name": name,
+        "calls": len(latencies),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(float(percentiles[0]), 3),
+            "p90": round(float(percentiles[1]), 3),
+            "p99": round(float(percentiles[2]), 3),
+        },
+        "diversity_step_ms_mean": (
+            round(FEED_STAGE_SECONDS.sum(stage="diversity") / diversity_calls * 1000, 3)
+            if diversity_calls
+            else None
+        ),
+        "page_mean_pairwise_similarity": round(statistics.fmean(similarities), 4),
+        "page_distinct_clusters": round(statistics.fmean(cluster_counts), 2),
+    }
+    logger.info(
+        "%-12s p50=%.2fms p99=%.2fms  similarity=%.3f clusters=%.1f",
+        name,
+        result["latency_ms"]["p50"],
+        result["latency_ms"]["p99"],
+        result["page_mean_pairwise_similarity"],
+        result["page_distinct_clusters"],
+    )
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Load the synthetic catalog and benchmark every diversity mode."""
+    settings = get_settings()
+    data = SyntheticData(
+        argparse.Namespace(
+            products=args.products,
+            users=args.users,
+            history=0,
+            no_vector_share=0.0,
+            dim=args.dim,
+            clusters=args.clusters,
+            seed=args.seed,
+        )
+    )
+    index_by_id = {
+        str(product["id"]): index for index, product in enumerate(data.products)
+    }
+    qdrant = AsyncQdrantClient(location=":memory:")
+    await load_qdrant(qdrant, settings, data)
+
+    modes = [("clusters", {"feed_diversity_mode": "clusters"})] + [
+        (
+            f"mmr@{lambda_:g}",
+            {"feed_diversity_mode": "mmr", "feed_mmr_lambda": lambda_},
+        )
+        for lambda_ in args.lambdas
+    ]
+    results = []
+    for name, update in modes:
+        service = FeedService(
+            qdrant_client=qdrant,
+            settings=settings.model_copy(update=update),
+            cluster_cache=ClusterCache(),
+            seen_set_cache=SeenSetCache(),
+            trending_cache=TrendingCache(),
+        )
+        results.append(await run_mode(name, service, data, index_by_id, args.page_size))
+    await qdrant.close()
+
+    return {
+        "benchmark": "diversity",
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+            if key != "output"
+        },
+        "results": results,
+    }
+
+
+async def main() -> None:
+    """Run the benchmark and emit the JSON report."""
+    args = parse_args()
+    logging.getLogger("src").setLevel(logging.ERROR)
+    report = await run(args)
+
+    output = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n")
+        logger.info("Wrote report to %s", args.output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
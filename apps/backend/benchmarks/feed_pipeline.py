@@ -0,0 +1,719 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end feed benchmark.
+
+Builds a synthetic catalog, users and interaction histories without the
+production stack:
+- vectors live in ``qdrant_client``'s local mode (``:memory:`` or on disk)
+- relational data lives in a temporary SQLite database created from the app's
+  models (Postgres-only DDL details are mapped to SQLite equivalents)
+
+It then drives ``FeedService.generate_feed``,
+``ColdStartService.get_cold_start_feed`` and
+``ProfileUpdateService.process_pending_updates`` end to end and reports
+throughput, latency percentiles and per-call allocation peaks as JSON, so
+runs can be diffed across commits.
+
+Local-mode Qdrant searches by brute force, so absolute latencies are not
+production numbers; compare runs of the same configuration. Catalogs beyond
+~100k products should use ``--qdrant-path`` to keep vectors on disk.
+
+Usage:
+    cd apps/backend
+    python -m benchmarks.feed_pipeline
+    python -m benchmarks.feed_pipeline --products 100000 --requests 500 \\
+        --concurrency 8 --output feed-bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+from sqlalchemy import MetaData, insert
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from src.core.config import Settings, get_settings
+from src.core.popularity import INTERACTION_WEIGHTS, forward_decay_factor
+from src.core.product_payload import build_product_payload
+from src.core.profile_state import compute_profile_confidence
+from src.features.clustering.service.cluster_cache import ClusterCache
+from src.features.clustering.service.cold_start_service import ColdStartService
+from src.features.feed.service.feed_service import FeedService
+from src.features.feed.service.seen_set import SeenSetCache
+from src.features.feed.service.trending_cache import TrendingCache
+from src.features.feedback.service.profile_update_service import (
+    ProfileUpdateService,
+)
+from src.features.products.utils import ProductCategory
+from src.models import (
+    Base,
+    Product,
+    ProductPopularity,
+    User,
+    UserInteraction,
+)
+
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+_UPSERT_BATCH_SIZE = 1000
+_INSERT_BATCH_SIZE = 5000
+_ACTIONS = ("like", "save", "dislike")
+_ACTION_WEIGHTS = (0.55, 0.15, 0.30)
+_CATEGORIES = [category.value for category in ProductCategory]
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(type_, compiler, **kw) -> str:
+    return "JSON"
+
+
+def _rng_uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class SyntheticData:
+    """Catalog, users and interaction histories drawn from one seed.
+
+    Products are sampled around ``clusters`` random centroids; each user
+    prefers one or two clusters and has interacted mostly with products from
+    them.
+    """
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        rng = random.Random(args.seed)
+        np_rng = np.random.default_rng(args.seed)
+        now = datetime.now(UTC)
+
+        self.centroids = _normalize_rows(
+            np_rng.standard_normal((args.clusters, args.dim)).astype(np.float32)
+        )
+        self.product_clusters = np_rng.integers(0, args.clusters, args.products)
+        # Noise with norm ~0.8 around unit centroids keeps clusters separable
+        noise_scale = 0.8 / np.sqrt(args.dim)
+        self.product_vectors = _normalize_rows(
+            self.centroids[self.product_clusters]
+            + noise_scale
+            * np_rng.standard_normal((args.products, args.dim)).astype(np.float32)
+        )
+        self.products = [
+            {
+                "id": _rng_uuid(rng),
+                "external_id": f"bench-{index}",
+                "store_id": "benchmark",
+                "title": f"Benchmark product {index}",
+                "price": round(min(rng.lognormvariate(4.0, 0.6), 9999.0), 2),
+                "currency": "USD",
+                "image_url": f"https://example.com/{index}.jpg",
+                "product_url": f"https://example.com/p/{index}",
+                "category": rng.choice(_CATEGORIES),
+                "raw_categories": [],
+                "created_at": now - timedelta(days=rng.uniform(0, 180)),
+            }
+            for index in range(args.products)
+        ]
+        products_by_cluster: dict[int, list[int]] = {}
+        for index, cluster in enumerate(self.product_clusters.tolist()):
+            products_by_cluster.setdefault(cluster, []).append(index)
+        self.products_by_cluster = products_by_cluster
+
+        self.users: list[dict] = []
+        self.user_vectors: dict[UUID, list[float]] = {}
+        self.interactions: list[dict] = []
+        history_start = now - timedelta(days=30)
+        for index in range(args.users):
+            user_id = _rng_uuid(rng)
+            clusters = rng.sample(range(args.clusters), k=min(2, args.clusters))
+            history = self.sample_interactions(
+                rng,
+                user_id,
+                clusters,
+                count=rng.randint(0, args.history),
+                start=history_start,
+            )
+            prices = [
+                self.products[row["product_index"]]["price"] for row in history
+            ] or [50.0]
+            self.users.append(
+                {
+                    "id": user_id,
+                    "email": f"bench-{index}@example.com",
+                    "password_hash": "benchmark",
+                    "onboarding_completed": True,
+                    "interaction_count": len(history),
+                    "profile_version": 1,
+                    "last_profile_update_at": now,
+                    "profile_confidence": compute_profile_confidence(len(history)),
+                    "profile_source": "onboarding",
+                    "price_profile": {
+                        "price_min": min(prices),
+                        "price_max": max(prices),
+                        "price_median": statistics.median(prices),
+                        "price_std": statistics.pstdev(prices),
+                    },
+                    "preferred_clusters": clusters,
+                }
+            )
+            self.interactions.extend(history)
+            # Users who skipped onboarding have no vector and get TRENDING
+            if rng.random() >= args.no_vector_share:
+                vector = self.centroids[clusters].mean(axis=0)
+                self.user_vectors[user_id] = (vector / np.linalg.norm(vector)).tolist()
+
+    def sample_interactions(
+        self,
+        rng: random.Random,
+        user_id: UUID,
+        clusters: list[int],
+        *,
+        count: int,
+        start: datetime,
+    ) -> list[dict]:
+        """Sample interactions, 80% from the user's preferred clusters."""
+        rows = []
+        for offset in range(count):
+            if rng.random() < 0.8:
+                pool = self.products_by_cluster.get(rng.choice(clusters))
+            else:
+                pool = None
+            index = rng.choice(pool) if pool else rng.randrange(len(self.products))
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "product_id": self.products[index]["id"],
+                    "product_index": index,
+                    "action": rng.choices(_ACTIONS, _ACTION_WEIGHTS)[0],
+                    "created_at": start + timedelta(seconds=offset),
+                }
+            )
+        return rows
+
+    def popularity_rows(self) -> list[dict]:
+        """Aggregate the histories the way ``record_popularity`` would."""
+        rows: dict[UUID, dict] = {}
+        for interaction in self.interactions:
+            row = rows.setdefault(
+                interaction["product_id"],
+                {
+                    "product_id": interaction["product_id"],
+                    "score": 0.0,
+                    "interaction_count": 0,
+                    "last_interaction_at": interaction["created_at"],
+                },
+            )
+            row["score"] += INTERACTION_WEIGHTS.get(
+                interaction["action"], 0.0
+            ) * forward_decay_factor(interaction["created_at"])
+            row["interaction_count"] += 1
+            row["last_interaction_at"] = max(
+                row["last_interaction_at"], interaction["created_at"]
+            )
+        return list(rows.values())
+
+
+async def create_sqlite_schema(engine) -> None:
+    """Create the app's tables in SQLite.
+
+    Postgres casts in server defaults (e.g. ``'[]'::jsonb``) have no SQLite
+    equivalent; those defaults are dropped because every row is inserted with
+    explicit values.
+    """
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for column in copy.columns:
+            default = getattr(column.server_default, "arg", None)
+            if default is not None and "::" in str(default):
+                column.server_default = None
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+
+async def load_sql(
+    session_factory: async_sessionmaker[AsyncSession], data: SyntheticData
+) -> None:
+    """Bulk insert products, users, interactions and popularity."""
+    user_columns = {column.key for column in User.__table__.columns}
+    interaction_columns = {"user_id", "product_id", "action", "created_at"}
+    batches = [
+        (Product, data.products),
+        (User, [{k: v for k, v in u.items() if k in user_columns} for u in data.users]),
+        (
+            UserInteraction,
+            [
+                {k: v for k, v in row.items() if k in interaction_columns}
+                for row in data.interactions
+            ],
+        ),
+        (ProductPopularity, data.popularity_rows()),
+    ]
+    async with session_factory() as session:
+        for model, rows in batches:
+            for start in range(0, len(rows), _INSERT_BATCH_SIZE):
+                await session.execute(
+                    insert(model), rows[start : start + _INSERT_BATCH_SIZE]
+                )
+        await session.commit()
+
+
+async def load_qdrant(
+    client: AsyncQdrantClient, settings: Settings, data: SyntheticData
+) -> None:
+    """Create the three collections and upsert products, clusters and users."""
+    dim = data.centroids.shape[1]
+    for name in (
+        settings.qdrant_collection,
+        settings.cluster_collection,
+        settings.user_profiles_collection,
+    ):
+        await client.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+        )
+
+    cluster_sizes = np.bincount(data.product_clusters, minlength=len(data.centroids))
+    await client.upsert(
+        collection_name=settings.cluster_collection,
+        points=[
+            PointStruct(
+                id=index,
+                vector=centroid.tolist(),
+                payload={
+                    "cluster_index": index,
+                    "cluster_version": "benchmark",
+                    "product_count": int(cluster_sizes[index]),
+                    "prior_probability": float(cluster_sizes[index])
+                    / len(data.products),
+                },
+            )
+            for index, centroid in enumerate(data.centroids)
+        ],
+    )
+
+    for start in range(0, len(data.products), _UPSERT_BATCH_SIZE):
+        stop = start + _UPSERT_BATCH_SIZE
+        await client.upsert(
+            collection_name=settings.qdrant_collection,
+            points=[
+                PointStruct(
+                    id=str(product["id"]),
+                    vector=vector.tolist(),
+                    payload={
+                        **build_product_payload(
+                            product_id=product["id"],
+                            store_id=product["store_id"],
+                            category=product["category"],
+                            price=product["price"],
+                            created_at=product["created_at"],
+                        ),
+                        "cluster_id": int(cluster),
+                        "archived": False,
+                    },
+                )
+                for product, vector, cluster in zip(
+                    data.products[start:stop],
+                    data.product_vectors[start:stop],
+                    data.product_clusters[start:stop],
+                )
+            ],
+        )
+
+    if data.user_vectors:
+        await client.upsert(
+            collection_name=settings.user_profiles_collection,
+            points=[
+                PointStruct(
+                    id=str(user_id),
+                    vector=vector,
+                    payload={"user_id": str(user_id), "profile_version": 1},
+                )
+                for user_id, vector in data.user_vectors.items()
+            ],
+        )
+
+
+async def run_workload(
+    name: str,
+    call: Callable[[int], Awaitable[object]],
+    *,
+    requests: int,
+    concurrency: int,
+    alloc_samples: int,
+    prepare: Callable[[int], Awaitable[None]] | None = None,
+) -> dict:
+    """Time ``call(i)`` for ``requests`` calls across ``concurrency`` workers.
+
+    ``prepare(i)`` runs untimed before each call. Allocation peaks are
+    measured in a separate sequential pass under ``tracemalloc`` so tracing
+    overhead does not distort the latencies.
+    """
+    latencies: list[float] = []
+    next_index = iter(range(requests))
+
+    async def worker() -> None:
+        for index in next_index:
+            if prepare is not None:
+                await prepare(index)
+            start = time.perf_counter()
+            await call(index)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall_seconds = time.perf_counter() - wall_start
+
+    peaks: list[float] = []
+    tracemalloc.start()
+    try:
+        for index in range(requests, requests + alloc_samples):
+            if prepare is not None:
+                await prepare(index)
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await call(index)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - baseline) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    percentiles = np.percentile(latencies, [50, 90, 95, 99]) if latencies else [0] * 4
+    result = {
+        "name": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 4),
+        "throughput_per_second": (
+            round(requests / wall_seconds, 2) if wall_seconds else None
+        ),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3) if latencies else None,
+            "p50": round(float(percentiles[0]), 3),
+            "p90": round(float(percentiles[1]), 3),
+            "p95": round(float(percentiles[2]), 3),
+            "p99": round(float(percentiles[3]), 3),
+            "max": round(max(latencies), 3) if latencies else None,
+        },
+        "alloc_peak_kib": {
+            "mean": round(statistics.fmean(peaks), 1) if peaks else None,
+            "max": round(max(peaks), 1) if peaks else None,
+        },
+    }
+    logger.info(
+        "%-14s %8.1f req/s  p50=%.2fms p99=%.2fms  alloc peak=%s KiB",
+        name,
+        result["throughput_per_second"] or 0.0,
+        result["latency_ms"]["p50"],
+        result["latency_ms"]["p99"],
+        result["alloc_peak_kib"]["mean"],
+    )
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the feed pipeline against local Qdrant and SQLite."
+    )
+    parser.add_argument(
+        "--products",
+        type=int,
+        default=10000,
+        help="Catalog size (default: 10000)",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=200,
+        help="Number of synthetic users (default: 200)",
+    )
+    parser.add_argument(
+        "--history",
+        type=int,
+        default=60,
+        help="Maximum interactions per user history (default: 60)",
+    )
+    parser.add_argument(
+        "--no-vector-share",
+        type=float,
+        default=0.1,
+        help="Share of users without a profile vector (default: 0.1)",
+    )
+    parser.add_argument(
+        "--dim",
+        type=int,
+        default=768,
+        help="Vector dimension (default: 768)",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=30,
+        help="Number of style clusters (default: 30)",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="Timed calls per workload (default: 200)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Concurrent callers per workload (default: 4)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=None,
+        help="Feed page size (default: settings.feed_batch_size)",
+    )
+    parser.add_argument(
+        "--pending",
+        type=int,
+        default=5,
+        help="New interactions per profile update call (default: 5)",
+    )
+    parser.add_argument(
+        "--alloc-samples",
+        type=int,
+        default=20,
+        help="Sequential calls traced for allocations (default: 20)",
+    )
+    parser.add_argument(
+        "--qdrant-path",
+        type=Path,
+        default=None,
+        help="Directory for on-disk local Qdrant (default: in memory)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed (default: 42)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write the JSON report here (default: stdout)",
+    )
+    return parser.parse_args()
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> dict:
+    """Build the synthetic stack and run every workload."""
+    # SQLite has no advisory locks
+    settings = get_settings().model_copy(
+        update={"feed_warm_enabled": False, "profile_update_lock_backend": "local"}
+    )
+    page_size = args.page_size or settings.feed_batch_size
+
+    setup_start = time.perf_counter()
+    data = SyntheticData(args)
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{workdir / 'benchmark.db'}",
+        connect_args={"timeout": 30},
+    )
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    await create_sqlite_schema(engine)
+    await load_sql(session_factory, data)
+
+    if args.qdrant_path is not None:
+        qdrant = AsyncQdrantClient(path=str(args.qdrant_path))
+    else:
+        qdrant = AsyncQdrantClient(location=":memory:")
+    await load_qdrant(qdrant, settings, data)
+    setup_seconds = time.perf_counter() - setup_start
+    logger.info(
+        "Loaded %d products, %d users, %d interactions in %.1fs",
+        len(data.products),
+        len(data.users),
+        len(data.interactions),
+        setup_seconds,
+    )
+
+    feed_service = FeedService(
+        qdrant_client=qdrant,
+        settings=settings,
+        cluster_cache=ClusterCache(),
+        seen_set_cache=SeenSetCache(
+            max_users=settings.feed_seen_cache_max_users,
+            ttl_seconds=settings.feed_seen_cache_ttl_seconds,
+        ),
+        trending_cache=TrendingCache(
+            size=settings.trending_cache_size,
+            ttl_seconds=settings.trending_cache_ttl_seconds,
+        ),
+    )
+    cold_start_service = ColdStartService(qdrant_client=qdrant, settings=settings)
+    profile_update_service = ProfileUpdateService(
+        settings, session_factory=session_factory, qdrant_client=qdrant
+    )
+    users = data.users
+    vector_users = [user for user in users if user["id"] in data.user_vectors]
+    rng = random.Random(args.seed + 1)
+    feed_modes: dict[str, int] = {}
+    stage_ms: dict[str, list[float]] = {}
+
+    async def generate_feed(index: int) -> None:
+        user = users[index % len(users)]
+        async with session_factory() as session:
+            result = await feed_service.generate_feed(
+                user_id=str(user["id"]),
+                seen_ids=[],
+                session=session,
+                page_size=page_size,
+            )
+        feed_modes[result.feed_mode.value] = (
+            feed_modes.get(result.feed_mode.value, 0) + 1
+        )
+        for stage, duration in result.stage_timings.items():
+            stage_ms.setdefault(stage, []).append(duration)
+
+    async def cold_start_feed(index: int) -> None:
+        clusters = rng.sample(range(len(data.centroids)), k=2)
+        embeddings = [
+            data.product_vectors[rng.choice(data.products_by_cluster[c])].tolist()
+            for c in clusters
+            if c in data.products_by_cluster
+        ] or [data.centroids[0].tolist()]
+        await cold_start_service.get_cold_start_feed(embeddings, feed_size=20)
+
+    clock = {"now": datetime.now(UTC) + timedelta(minutes=1)}
+
+    async def add_pending_interactions(index: int) -> None:
+        user = vector_users[index % len(vector_users)]
+        rows = data.sample_interactions(
+            rng,
+            user["id"],
+            user["preferred_clusters"],
+            count=args.pending,
+            start=clock["now"],
+        )
+        clock["now"] += timedelta(seconds=args.pending + 1)
+        async with session_factory() as session:
+            await session.execute(
+                insert(UserInteraction),
+                [
+                    {
+                        k: row[k]
+                        for k in ("user_id", "product_id", "action", "created_at")
+                    }
+                    for row in rows
+                ],
+            )
+            await session.commit()
+
+    async def update_profile(index: int) -> None:
+        user = vector_users[index % len(vector_users)]
+        await profile_update_service.process_pending_updates(user["id"])
+
+    workload_args = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "alloc_samples": args.alloc_samples,
+    }
+    results = [
+        await run_workload("feed", generate_feed, **workload_args),
+        await run_workload("cold_start", cold_start_feed, **workload_args),
+    ]
+    results[0]["feed_modes"] = feed_modes
+    results[0]["stage_ms_mean"] = {
+        stage: round(statistics.fmean(values), 3)
+        for stage, values in sorted(stage_ms.items())
+    }
+    if vector_users:
+        results.append(
+            await run_workload(
+                "profile_update",
+                update_profile,
+                prepare=add_pending_interactions,
+                **workload_args,
+            )
+        )
+
+    await qdrant.close()
+    await engine.dispose()
+
+    return {
+        "benchmark": "feed_pipeline",
+        "commit": _git_commit(),
+        "created_at": datetime.now(UTC).isoformat(),
+        "python": sys.version.split()[0],
+        "config": {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+            if key != "output"
+        },
+        "page_size": page_size,
+        "setup_seconds": round(setup_seconds, 3),
+        "dataset": {
+            "products": len(data.products),
+            "users": len(data.users),
+            "users_with_vector": len(data.user_vectors),
+            "interactions": len(data.interactions),
+        },
+        "results": results,
+    }
+
+
+async def main() -> None:
+    """Run the benchmark and emit the JSON report."""
+    args = parse_args()
+    # The Numeric price column round-trips through float on SQLite
+    warnings.filterwarnings("ignore", message="Dialect sqlite")
+    # Feed generation logs per-request shortfalls; keep the report readable
+    logging.getLogger("src").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory(prefix="feed-bench-") as workdir:
+        report = await run(args, Path(workdir))
+
+    output = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n")
+        logger.info("Wrote report to %s", args.output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Profile update kernel micro-benchmark.
+
+Applies the pending interactions of a batch of synthetic users twice: once
+with the per-interaction ``ProfileUpdateService._apply_interaction_update``
+(the per-user path) and once with the vectorized ``apply_interactions``
+kernel used by ``process_pending_updates_batch``. Reports both timings and
+the largest difference between their vectors.
+
+Usage:
+    cd apps/backend
+    python -m benchmarks.profile_update_kernel
+    python -m benchmarks.profile_update_kernel --users 1000 10000 \\
+        --interactions 8 --dim 768 --repeat 3
+"""
+
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.features.feedback.service.profile_update_kernel import (
+    apply_interactions,
+    normalize_rows,
+)
+from src.features.feedback.service.profile_update_service import (
+    ProfileUpdateService,
+)
+
+_ACTIONS = np.array(["like", "save", "dislike"], dtype=object)
+_ACTION_PROBABILITIES = (0.5, 0.15, 0.35)
+
+
+def build_batch(
+    users: int, products: int, interactions: int, dim: int, seed: int = 42
+) -> SimpleNamespace:
+    """Random user vectors and up to ``interactions`` pending swipes per user."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, interactions + 1, size=users)
+    product_index = np.full((users, interactions), -1, dtype=np.intp)
+    actions = np.full((users, interactions), "", dtype=object)
+    for row, length in enumerate(lengths):
+        product_index[row, :length] = rng.integers(0, products, size=length)
+        actions[row, :length] = rng.choice(
+            _ACTIONS, size=length, p=_ACTION_PROBABILITIES
+        )
+    return SimpleNamespace(
+        user_vectors=normalize_rows(rng.normal(size=(users, dim))),
+        product_vectors=rng.normal(size=(products, dim)),
+        product_index=product_index,
+        actions=actions,
+        lengths=lengths,
+        confidences=rng.uniform(0.0, 1.0, size=users),
+        bursts=rng.random(users) < 0.05,
+    )
+
+
+def run_per_user(service: ProfileUpdateService, batch: SimpleNamespace) -> np.ndarray:
+    """Per-user reference: one ``_apply_interaction_update`` per swipe."""
+    results = np.empty_like(batch.user_vectors)
+    for row, length in enumerate(batch.lengths):
+        vector = batch.user_vectors[row]
+        for step in range(length):
+            vector = service._apply_interaction_update(
+                user_vector=vector,
+                product_vector=batch.product_vectors[batch.product_index[row, step]],
+                action=batch.actions[row, step],
+                profile_confidence=batch.confidences[row],
+                burst_active=bool(batch.bursts[row]),
+            )
+        results[row] = vector
+    return results
+
+
+def run_kernel(service: ProfileUpdateService, batch: SimpleNamespace) -> np.ndarray:
+    """Vectorized kernel over the whole batch (inputs built as the service does)."""
+    settings = service._settings
+    gamma = settings.profile_update_dislike_gamma
+    signal_weights = np.zeros(batch.actions.shape, dtype=np.float64)
+    for action in _ACTIONS:
+        signal_weights[batch.actions == action] = service._get_signal_weight(action)
+    return apply_interactions(
+        batch.user_vectors,
+        batch.product_vectors,
+        batch.product_index,
+        signal_weights,
+        np.array([service._get_learning_rate(c) for c in batch.confidences]),
+        np.where(
+            batch.bursts,
+            gamma * settings.profile_update_dislike_burst_gamma_scale,
+            gamma,
+        ),
+        settings.profile_update_max_delta,
+    )
+
+
+def time_call(func, repeat: int) -> tuple[list[float], np.ndarray]:
+    """Return per-call wall times in milliseconds and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the vectorized profile update kernel."
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="Users per batch (default: 100 1000 10000)",
+    )
+    parser.add_argument(
+        "--interactions",
+        type=int,
+        default=10,
+        help="Maximum pending interactions per user (default: 10)",
+    )
+    parser.add_argument(
+        "--products",
+        type=int,
+        default=20000,
+        help="Distinct products swiped in a batch (default: 20000)",
+    )
+    parser.add_argument(
+        "--dim",
+        type=int,
+        default=768,
+        help="Vector dimension (default: 768)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed repetitions per size (default: 3)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the kernel benchmark and print a summary table."""
+    args = parse_args()
+    service = ProfileUpdateService()
+
+    print(
+        f"{'users':>7} {'swipes':>8} {'per-user ms':>12} {'kernel ms':>10} "
+        f"{'speedup':>8} {'max |diff|':>11}"
+    )
+    for users in args.users:
+        batch = build_batch(users, args.products, args.interactions, args.dim)
+        per_user, expected = time_call(
+            lambda: run_per_user(service, batch), args.repeat
+        )
+        kernel, result = time_call(lambda: run_kernel(service, batch), args.repeat)
+        per_user_ms = statistics.median(per_user)
+        kernel_ms = statistics.median(kernel)
+        print(
+            f"{users:>7} {int(batch.lengths.sum()):>8} {per_user_ms:>12.1f} "
+            f"{kernel_ms:>10.1f} {per_user_ms / kernel_ms:>7.1f}x "
+            f"{float(np.abs(result - expected).max()):>11.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
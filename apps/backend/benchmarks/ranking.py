@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Ranking micro-benchmark.
+
+Compares the vectorized ``rank_candidates`` against a scalar reference built
+from the per-item functions in ``scoring.py`` at several candidate counts.
+
+Usage:
+    cd apps/backend
+    python -m benchmarks.ranking
+    python -m benchmarks.ranking --sizes 100 1000 10000 --repeat 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from src.features.feed.service.ranking_service import (
+    W_CLUSTER_PRIOR,
+    W_COSINE,
+    W_FRESHNESS,
+    W_PRICE,
+    rank_candidates,
+)
+from src.features.feed.utils.scoring import (
+    compute_freshness_score,
+    compute_price_affinity,
+    normalize_scores,
+)
+
+_PRICE_PROFILE = {"median": 60.0, "std": 20.0}
+
+
+def build_candidates(count: int, seed: int = 42) -> list[SimpleNamespace]:
+    """Build ScoredPoint-like candidates with realistic payloads."""
+    rng = random.Random(seed)
+    now = datetime.now(UTC)
+    return [
+        SimpleNamespace(
+            score=rng.uniform(0.2, 0.99),
+            payload={
+                "product_id": f"product-{index}",
+                "price": rng.uniform(5, 400),
+                "created_at": (now - timedelta(days=rng.uniform(0, 180))).isoformat(),
+                "cluster_id": rng.randrange(50),
+            },
+        )
+        for index in range(count)
+    ]
+
+
+def rank_candidates_scalar(
+    candidates: list, user_price_profile: dict, cluster_priors: dict
+) -> list[tuple[str, float]]:
+    """Per-item reference ranking (the pre-vectorization algorithm)."""
+    raw_cosine, raw_cluster, raw_price, raw_freshness = [], [], [], []
+    for candidate in candidates:
+        payload = candidate.payload
+        raw_cosine.append(candidate.score)
+        raw_cluster.append(cluster_priors.get(payload["cluster_id"], 0.0))
+        raw_price.append(
+            compute_price_affinity(
+                payload["price"],
+                user_price_profile["median"],
+                user_price_profile["std"],
+            )
+        )
+        created_at = datetime.fromisoformat(payload["created_at"])
+        raw_freshness.append(compute_freshness_score(created_at))
+
+    cosine = normalize_scores(raw_cosine)
+    cluster = normalize_scores(raw_cluster)
+    price = normalize_scores(raw_price)
+    freshness = normalize_scores(raw_freshness)
+    results = [
+        (
+            candidate.payload["product_id"],
+            W_COSINE * cosine[i]
+            + W_CLUSTER_PRIOR * cluster[i]
+            + W_PRICE * price[i]
+            + W_FRESHNESS * freshness[i],
+        )
+        for i, candidate in enumerate(candidates)
+    ]
+    results.sort(key=lambda item: item[1], reverse=True)
+    return results
+
+
+def time_call(func, repeat: int) -> list[float]:
+    """Return per-call wall times in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark feed candidate ranking.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="Candidate counts to benchmark (default: 100 1000 10000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="Timed repetitions per size (default: 10)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the ranking benchmark and print a summary table."""
+    args = parse_args()
+    cluster_priors = {index: 1.0 / (index + 2) for index in range(50)}
+
+    print(f"{'candidates':>10} {'scalar ms':>12} {'vectorized ms':>14} {'speedup':>8}")
+    for size in args.sizes:
+        candidates = build_candidates(size)
+        scalar = time_call(
+            lambda: rank_candidates_scalar(candidates, _PRICE_PROFILE, cluster_priors),
+            args.repeat,
+        )
+        vectorized = time_call(
+            lambda: rank_candidates(candidates, _PRICE_PROFILE, cluster_priors),
+            args.repeat,
+        )
+        scalar_ms = statistics.median(scalar)
+        vectorized_ms = statistics.median(vectorized)
+        print(
+            f"{size:>10} {scalar_ms:>12.3f} {vectorized_ms:>14.3f} "
+            f"{scalar_ms / vectorized_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Seen-set exclusion benchmark.
+
+Compares the two ways of excluding a user's seen products from a search:
+- server-side: a ``HasIdCondition`` with every seen id, serialized into the
+  Qdrant request (payload size and build/serialize time)
+- local: post-filtering an oversampled result against a cached ``SeenSet``
+  (storage size and filter time)
+
+Usage:
+    cd apps/backend
+    python -m benchmarks.seen_set
+    python -m benchmarks.seen_set --sizes 10 1000 50000 --catalog 200000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+from functools import partial
+from types import SimpleNamespace
+from uuid import UUID
+
+from qdrant_client.models import Filter, HasIdCondition
+
+from benchmarks.ranking import time_call
+from src.features.feed.service.seen_set import ProductOrdinals, SeenSet
+
+# Primary limit plus the maximum seen-set oversample in FeedService
+_RESULT_SIZE = 300
+
+
+def build_catalog(size: int, seed: int = 42) -> list[str]:
+    """Build product id strings shaped like the catalog's UUID point ids."""
+    rng = random.Random(seed)
+    return [str(UUID(int=rng.getrandbits(128), version=4)) for _ in range(size)]
+
+
+def python_set_bytes(product_ids: set[str]) -> int:
+    """Approximate memory of a set of id strings (container plus strings)."""
+    return sys.getsizeof(product_ids) + sum(sys.getsizeof(pid) for pid in product_ids)
+
+
+def serialize_server_filter(seen_ids: list[str]) -> str:
+    """Build and serialize the server-side exclusion filter."""
+    return Filter(must_not=[HasIdCondition(has_id=seen_ids)]).model_dump_json()
+
+
+def post_filter_locally(hits: list, seen: SeenSet) -> list:
+    """Drop seen hits using the cached seen-set."""
+    mask = seen.contains_many(str(hit.id) for hit in hits)
+    return [hit for hit, was_seen in zip(hits, mask) if not was_seen]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark seen-set exclusion.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000, 50000],
+        help="Seen-set sizes to benchmark (default: 10 100 1000 10000 50000)",
+    )
+    parser.add_argument(
+        "--catalog",
+        type=int,
+        default=100000,
+        help="Number of products in the synthetic catalog (default: 100000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="Timed repetitions per size (default: 10)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the seen-set benchmark and print a summary table."""
+    args = parse_args()
+    catalog = build_catalog(args.catalog)
+    ordinals = ProductOrdinals()
+    for product_id in catalog:
+        ordinals.ordinal(product_id)
+
+    rng = random.Random(7)
+    hits = [SimpleNamespace(id=pid) for pid in rng.sample(catalog, _RESULT_SIZE)]
+
+    print(
+        f"{'seen':>7} {'filter KB':>10} {'serialize ms':>13} "
+        f"{'set KB':>8} {'SeenSet KB':>11} {'kind':>7} {'post-filter ms':>15}"
+    )
+    for size in args.sizes:
+        seen_ids = rng.sample(catalog, min(size, len(catalog)))
+        seen = SeenSet(ordinals, seen_ids)
+
+        server_side = partial(serialize_server_filter, seen_ids)
+        local = partial(post_filter_locally, hits, seen)
+
+        filter_kb = len(server_side()) / 1024
+        serialize_ms = statistics.median(time_call(server_side, args.repeat))
+        local_ms = statistics.median(time_call(local, args.repeat))
+        print(
+            f"{size:>7} {filter_kb:>10.1f} {serialize_ms:>13.3f} "
+            f"{python_set_bytes(set(seen_ids)) / 1024:>8.1f} "
+            f"{seen.nbytes / 1024:>11.1f} "
+            f"{'bitmap' if seen.is_bitmap else 'array':>7} {local_ms:>15.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Product popularity backfill script.
+
+Rebuilds the time-decayed ``product_popularity`` aggregate from the full
+``user_interactions`` history. Run it once after deploying the table, and
+whenever the aggregate needs repairing. Feedback keeps it up to date
+incrementally afterwards.
+
+Usage:
+    cd apps/backend
+    python -m scripts.backfill_popularity
+    python -m scripts.backfill_popularity --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import get_settings
+from src.core.popularity import rebuild_popularity
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Rebuild product_popularity from user_interactions."
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Compute the aggregate but roll back instead of committing",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    """Run the popularity backfill."""
+    args = parse_args()
+    settings = get_settings()
+
+    engine = create_async_engine(settings.database_url)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        async with async_session() as session:
+            count = await rebuild_popularity(session)
+            if args.dry_run:
+                await session.rollback()
+                logger.info("DRY RUN: would write %d popularity rows", count)
+            else:
+                await session.commit()
+                logger.info("Wrote %d popularity rows", count)
+    except Exception:
+        logger.exception("Popularity backfill failed")
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
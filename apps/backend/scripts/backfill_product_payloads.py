@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Product payload migration script.
+
+Rewrites every point of the Qdrant products collection to the typed payload
+schema (``src.core.product_payload``): adds ``created_at_ts`` epoch seconds,
+coerces price to float and cluster_id to integer, and stores store_id and
+category as keywords. Updates are sent in one batched request per scrolled
+page and only for points that change, so the script is safe to re-run.
+
+Afterwards it creates the payload indexes for every filtered field.
+
+Usage:
+    cd apps/backend
+    python -m scripts.backfill_product_payloads
+    python -m scripts.backfill_product_payloads --dry-run
+    python -m scripts.backfill_product_payloads --batch-size 1000 --skip-indexes
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from src.core.config import get_settings
+from src.core.product_payload import PRODUCTS_PAYLOAD_SCHEMA, backfill_product_payloads
+from src.core.qdrant import (
+    close_client,
+    ensure_products_payload_indexes,
+    get_qdrant_client,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Migrate product payloads to the typed schema and index them."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Points scrolled and updated per request (default: 500)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Count the points that would change without writing anything",
+    )
+    parser.add_argument(
+        "--skip-indexes",
+        action="store_true",
+        help="Do not create payload indexes after the backfill",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    """Run the payload migration."""
+    args = parse_args()
+    settings = get_settings()
+    client = await get_qdrant_client()
+
+    try:
+        result = await backfill_product_payloads(
+            client,
+            settings.qdrant_collection,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+        if args.dry_run:
+            logger.info(
+                "DRY RUN: %d of %d points would be rewritten",
+                result.updated,
+                result.scanned,
+            )
+            return
+        logger.info("Rewrote %d of %d points", result.updated, result.scanned)
+
+        if not args.skip_indexes:
+            await ensure_products_payload_indexes()
+            logger.info(
+                "Ensured payload indexes on %s", ", ".join(PRODUCTS_PAYLOAD_SCHEMA)
+            )
+    except Exception:
+        logger.exception("Product payload migration failed")
+        sys.exit(1)
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Local product index export script.
+
+Scrolls the Qdrant products collection (vectors and payloads) and writes a
+``LocalVectorIndex`` snapshot that ``retrieval_backend="local"`` loads at
+startup. Catalogs of at least ``IVF_MIN_ROWS`` products get an IVF partition
+(``--ivf-lists`` lists, sqrt(n) by default); smaller ones are searched
+exactly.
+
+Usage:
+    cd apps/backend
+    python -m scripts.export_local_index
+    python -m scripts.export_local_index --output data/local_index --ivf-lists 0
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+
+from src.core.config import get_settings
+from src.core.local_index import IVF_MIN_ROWS, LocalVectorIndex
+from src.core.qdrant import close_client, get_qdrant_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Export the Qdrant products collection to a local index."
+    )
+    parser.add_argument(
+        "--output",
+        default=settings.local_index_path,
+        help=f"Snapshot directory (default: {settings.local_index_path})",
+    )
+    parser.add_argument(
+        "--ivf-lists",
+        type=int,
+        default=None,
+        help="IVF list count; 0 disables IVF (default: sqrt(n) above "
+        f"{IVF_MIN_ROWS} products)",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    """Run the local index export."""
+    args = parse_args()
+    settings = get_settings()
+    qdrant_client = await get_qdrant_client()
+
+    try:
+        index = await LocalVectorIndex.from_qdrant(
+            qdrant_client,
+            settings.qdrant_collection,
+            dim=settings.local_index_dim,
+            nprobe=settings.local_index_nprobe,
+        )
+    finally:
+        await close_client()
+    logger.info("Loaded %d products from Qdrant", len(index))
+
+    n_lists = args.ivf_lists
+    if n_lists is None:
+        n_lists = int(math.sqrt(len(index))) if len(index) >= IVF_MIN_ROWS else 0
+    if n_lists > 1:
+        logger.info("Training IVF partition with %d lists", n_lists)
+        await asyncio.to_thread(index.build_ivf, n_lists)
+
+    await asyncio.to_thread(index.save, args.output)
+    logger.info("Wrote local index snapshot to %s", args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Batch feed generation.
+
+Precomputes the first feed page of many users with ``BatchFeedService``:
+users are processed in chunks with one user-vector retrieve, two SQL queries,
+one ``search_batch`` and one vectorized ranking pass per chunk, and up to
+``--concurrency`` chunks in flight. Feeds are written as JSON lines
+(``{"user_id", "feed_mode", "candidates": [{"product_id", "score",
+"source"}]}``) as each chunk completes, so memory stays bounded for any
+number of users.
+
+Without ``--users-file`` every user is processed, read in id order with
+keyset pagination.
+
+Usage:
+    cd apps/backend
+    python -m scripts.generate_feeds --output feeds.jsonl
+    python -m scripts.generate_feeds --users-file users.txt --output -
+    python -m scripts.generate_feeds --output feeds.jsonl --chunk-size 512 \\
+        --concurrency 8 --page-size 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from collections.abc import AsyncIterator, Iterable
+from contextlib import ExitStack
+from typing import TextIO
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import get_settings
+from src.core.qdrant import close_client, get_qdrant_client
+from src.features.feed.service.batch_feed_service import (
+    BatchFeedResult,
+    BatchFeedService,
+)
+from src.models.user import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Generate feeds for many users and write them as JSON lines."
+    )
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="Output file, or - for stdout",
+    )
+    parser.add_argument(
+        "--users-file",
+        help="File with one user id per line (default: all users)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.feed_batch_generation_chunk_size,
+        help="Users per batched lookup and ranking pass "
+        f"(default: {settings.feed_batch_generation_chunk_size})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.feed_batch_generation_concurrency,
+        help="Chunks processed at once "
+        f"(default: {settings.feed_batch_generation_concurrency})",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=20,
+        help="Feed items per user (default: 20)",
+    )
+    parser.add_argument(
+        "--category",
+        help="Only generate feeds for this category",
+    )
+    return parser.parse_args()
+
+
+async def user_id_chunks(
+    lines: Iterable[str], chunk_size: int
+) -> AsyncIterator[list[str]]:
+    """Yield chunks of the valid user ids in ``lines`` (one id per line)."""
+    chunk: list[str] = []
+    for line in lines:
+        user_id = line.strip()
+        if not user_id:
+            continue
+        try:
+            UUID(user_id)
+        except ValueError:
+            logger.warning("Skipping invalid user id %r", user_id)
+            continue
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def all_user_id_chunks(
+    session_factory, chunk_size: int
+) -> AsyncIterator[list[str]]:
+    """Yield chunks of every user id, in id order (keyset pagination)."""
+    last_id = None
+    while True:
+        stmt = select(User.id).order_by(User.id).limit(chunk_size)
+        if last_id is not None:
+            stmt = stmt.where(User.id > last_id)
+        async with session_factory() as session:
+            user_ids = (await session.scalars(stmt)).all()
+        if not user_ids:
+            return
+        last_id = user_ids[-1]
+        yield [str(user_id) for user_id in user_ids]
+
+
+async def generate(
+    args: argparse.Namespace, output: TextIO, users_file: TextIO | None
+) -> None:
+    """Run batch feed generation."""
+    settings = get_settings()
+
+    engine = create_async_engine(settings.database_url)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def write(results: list[BatchFeedResult]) -> None:
+        output.writelines(json.dumps(result.to_record()) + "\n" for result in results)
+        output.flush()
+
+    try:
+        service = BatchFeedService(
+            qdrant_client=await get_qdrant_client(), settings=settings
+        )
+        chunks = (
+            user_id_chunks(users_file, args.chunk_size)
+            if users_file is not None
+            else all_user_id_chunks(async_session, args.chunk_size)
+        )
+        stats = await service.run(
+            chunks,
+            async_session,
+            write,
+            concurrency=args.concurrency,
+            category=args.category,
+            page_size=args.page_size,
+        )
+        logger.info(
+            "Generated %d feeds (%d users failed)", stats.users, stats.failed_users
+        )
+        if stats.failed_users:
+            sys.exit(1)
+    except Exception:
+        logger.exception("Batch feed generation failed")
+        sys.exit(1)
+    finally:
+        await close_client()
+        await engine.dispose()
+
+
+def main() -> None:
+    """Open the input and output files and run the generation."""
+    args = parse_args()
+    with ExitStack() as stack:
+        output = (
+            sys.stdout
+            if args.output == "-"
+            else stack.enter_context(open(args.output, "w"))
+        )
+        users_file = (
+            stack.enter_context(open(args.users_file)) if args.users_file else None
+        )
+        asyncio.run(generate(args, output, users_file))
+
+
+if __name__ == "__main__":
+    main()
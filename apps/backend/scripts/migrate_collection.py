@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Blue/green Qdrant collection migration.
+
+Rebuilds a collection with a new storage profile (int8 quantization, on-disk
+vectors, HNSW parameters) by copying its points into a fresh collection and
+pointing the configured collection name, as an alias, at the copy. See
+``src.core.collection_migration`` for the steps.
+
+Pause product ingestion and profile updates while a migration runs: points
+written to the old collection during the copy are not carried over.
+
+The first migration of a collection replaces it with an alias, which
+requires ``--delete-source``. Later migrations swap the alias atomically and
+keep the previous collection unless ``--delete-source`` is given.
+
+Usage:
+    cd apps/backend
+    python -m scripts.migrate_collection products --profile int8_on_disk \\
+        --delete-source
+    python -m scripts.migrate_collection user_profiles --profile int8 \\
+        --hnsw-m 32 --hnsw-ef-construct 200
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from src.core.collection_migration import migrate_collection
+from src.core.config import get_settings
+from src.core.qdrant import COLLECTION_PROFILES, close_client, get_qdrant_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# CLI name -> (settings field with the collection name, settings field with
+# its configured profile)
+_COLLECTIONS = {
+    "products": ("qdrant_collection", "qdrant_products_profile"),
+    "user_profiles": ("user_profiles_collection", "qdrant_user_profiles_profile"),
+    "clusters": ("cluster_collection", "qdrant_clusters_profile"),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Copy a Qdrant collection into a new storage config and "
+        "swap its alias."
+    )
+    parser.add_argument(
+        "collection",
+        choices=sorted(_COLLECTIONS),
+        help="Collection to migrate",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(COLLECTION_PROFILES),
+        help="Storage profile of the new collection (default: the configured one)",
+    )
+    parser.add_argument(
+        "--hnsw-m",
+        type=int,
+        help="HNSW m of the new collection (default: qdrant_hnsw_m)",
+    )
+    parser.add_argument(
+        "--hnsw-ef-construct",
+        type=int,
+        help="HNSW ef_construct of the new collection "
+        "(default: qdrant_hnsw_ef_construct)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=256,
+        help="Points per copy batch (default: 256)",
+    )
+    parser.add_argument(
+        "--target",
+        help="Name of the new collection (default: <name>_<UTC timestamp>)",
+    )
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="Delete the old collection after the swap "
+        "(required for the first migration)",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    """Run the migration."""
+    args = parse_args()
+    settings = get_settings()
+    name_field, profile_field = _COLLECTIONS[args.collection]
+
+    overrides = {}
+    if args.hnsw_m is not None:
+        overrides["qdrant_hnsw_m"] = args.hnsw_m
+    if args.hnsw_ef_construct is not None:
+        overrides["qdrant_hnsw_ef_construct"] = args.hnsw_ef_construct
+    if overrides:
+        settings = settings.model_copy(update=overrides)
+    profile = args.profile or getattr(settings, profile_field)
+
+    try:
+        client = await get_qdrant_client()
+        result = await migrate_collection(
+            client,
+            getattr(settings, name_field),
+            profile,
+            settings,
+            target=args.target,
+            batch_size=args.batch_size,
+            delete_source=args.delete_source,
+        )
+        logger.info(
+            "Migrated %d points: %s -> %s (alias %s, old collection %s)",
+            result.points,
+            result.source,
+            result.target,
+            result.name,
+            "deleted" if result.source_deleted else "kept",
+        )
+        if profile != getattr(get_settings(), profile_field):
+            logger.info(
+                "Set %s=%s so newly created collections match.",
+                profile_field.upper(),
+                profile,
+            )
+    except Exception:
+        logger.exception("Collection migration failed")
+        sys.exit(1)
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
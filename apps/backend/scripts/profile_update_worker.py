@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Profile update worker pool.
+
+Drains the durable profile update queue (``profile_update_jobs``, used when
+``PROFILE_UPDATE_QUEUE_BACKEND=postgres``). Starts ``--processes`` worker
+processes; each claims up to ``--concurrency`` jobs at a time with
+``FOR UPDATE SKIP LOCKED`` and applies them with ``ProfileUpdateService``, so
+any number of processes and hosts can share the queue. Failed jobs retry with
+exponential backoff (``PROFILE_UPDATE_MAX_ATTEMPTS``,
+``PROFILE_UPDATE_RETRY_BASE_SECONDS``).
+
+SIGINT/SIGTERM stop claiming new jobs and let the jobs in flight finish.
+
+With ``--metrics-port`` each process serves its metrics (jobs processed,
+update duration, queue depth and lag) in the Prometheus text format on
+``port + process index``. The API's ``/metrics`` also reports queue depth and
+lag.
+
+Feed warming (``FEED_WARM_ENABLED``) only applies to background-task updates:
+warmed batches are local to the process that computed them.
+
+Usage:
+    cd apps/backend
+    python -m scripts.profile_update_worker
+    python -m scripts.profile_update_worker --processes 4 --concurrency 8 \\
+        --metrics-port 9400
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+import sys
+
+from src.core.config import get_settings
+from src.core.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+from src.core.qdrant import close_client
+from src.features.feedback.service.profile_update_queue import (
+    get_profile_update_queue,
+)
+from src.features.feedback.service.profile_update_worker import ProfileUpdateWorker
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run profile update worker processes.")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.profile_update_worker_processes,
+        help="Worker processes "
+        f"(default: {settings.profile_update_worker_processes})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.profile_update_worker_concurrency,
+        help="Jobs in flight per process "
+        f"(default: {settings.profile_update_worker_concurrency})",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on this port (+ process index)",
+    )
+    return parser.parse_args()
+
+
+async def _serve_metrics(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = render_prometheus().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            + f"Content-Type: {PROMETHEUS_CONTENT_TYPE}\r\n".encode()
+            + f"Content-Length: {len(body)}\r\n".encode()
+            + b"Connection: close\r\n\r\n"
+            + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_worker(concurrency: int, metrics_port: int | None) -> None:
+    """Run one worker until SIGINT/SIGTERM."""
+    queue = get_profile_update_queue()
+    if queue is None:
+        raise RuntimeError(
+            "PROFILE_UPDATE_QUEUE_BACKEND is not 'postgres'; "
+            "profile updates run as API background tasks"
+        )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = None
+    if metrics_port is not None:
+        server = await asyncio.start_server(_serve_metrics, port=metrics_port)
+        logger.info("Serving metrics on port %d", metrics_port)
+
+    try:
+        await ProfileUpdateWorker(queue, concurrency=concurrency).run(stop)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        await close_client()
+
+
+def _worker_process(index: int, concurrency: int, metrics_port: int | None) -> None:
+    try:
+        asyncio.run(
+            run_worker(
+                concurrency, metrics_port + index if metrics_port is not None else None
+            )
+        )
+    except Exception:
+        logger.exception("Profile update worker %d failed", index)
+        sys.exit(1)
+
+
+def main() -> None:
+    """Start the worker processes and wait for them."""
+    args = parse_args()
+    if args.processes <= 1:
+        _worker_process(0, args.concurrency, args.metrics_port)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_worker_process,
+            args=(index, args.concurrency, args.metrics_port),
+            name=f"profile-update-worker-{index}",
+        )
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(
+        "Started %d profile update workers (concurrency %d each)",
+        len(processes),
+        args.concurrency,
+    )
+
+    def _forward(signum: int, _frame) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # children get it from the tty
+
+    for process in processes:
+        process.join()
+    if any(process.exitcode != 0 for process in processes):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
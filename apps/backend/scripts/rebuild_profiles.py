@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Periodic full profile rebuild.
+
+Recomputes user profile vectors from their full, time-decayed interaction
+history (``ProfileRebuildService``) to correct the drift of incremental
+updates. Users are processed in chunks; a user whose profile was updated
+while their chunk was being rebuilt is skipped.
+
+With ``--checkpoint`` progress is saved to a JSON file after every chunk,
+and an interrupted run resumes from it. With ``--loop`` the script is its own
+scheduler: it starts a run every ``--interval-hours`` (default
+``PROFILE_REBUILD_INTERVAL_HOURS``, weekly), counted from the start of the
+last completed run recorded in the checkpoint. Without ``--loop`` it runs
+once, e.g. from cron.
+
+Usage:
+    cd apps/backend
+    python -m scripts.rebuild_profiles
+    python -m scripts.rebuild_profiles --checkpoint /var/lib/stylipp/rebuild.json
+    python -m scripts.rebuild_profiles --checkpoint rebuild.json --loop \\
+        --interval-hours 24
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from src.core.config import get_settings
+from src.core.qdrant import close_client
+from src.features.feedback.service.profile_rebuild import (
+    ProfileRebuildService,
+    RebuildCheckpoint,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Rebuild user profile vectors from interaction history."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="JSON file to save progress to and resume from",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore an unfinished run in the checkpoint and start over",
+    )
+    parser.add_argument(
+        "--loop",
+        action="store_true",
+        help="Keep running, starting a rebuild every --interval-hours",
+    )
+    parser.add_argument(
+        "--interval-hours",
+        type=float,
+        default=settings.profile_rebuild_interval_hours,
+        help="Hours between run starts with --loop "
+        f"(default: {settings.profile_rebuild_interval_hours})",
+    )
+    return parser.parse_args()
+
+
+def load_checkpoint(path: Path | None) -> RebuildCheckpoint | None:
+    """Return the checkpoint saved at ``path``, if any."""
+    if path is None or not path.exists():
+        return None
+    return RebuildCheckpoint.from_json(path.read_text())
+
+
+def save_checkpoint(path: Path | None, checkpoint: RebuildCheckpoint) -> None:
+    """Atomically replace the checkpoint file."""
+    if path is None:
+        return
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(checkpoint.to_json())
+    os.replace(tmp_path, path)
+
+
+async def run_once(path: Path | None, restart: bool) -> RebuildCheckpoint:
+    """Run or resume one rebuild."""
+    checkpoint = load_checkpoint(path)
+    if checkpoint is None or checkpoint.completed_at is not None or restart:
+        checkpoint = RebuildCheckpoint.start()
+    elif checkpoint.after_user_id is not None:
+        logger.info(
+            "Resuming the rebuild started at %s after user %s",
+            checkpoint.started_at.isoformat(),
+            checkpoint.after_user_id,
+        )
+
+    checkpoint = await ProfileRebuildService().rebuild_profiles(
+        checkpoint, on_checkpoint=lambda state: save_checkpoint(path, state)
+    )
+    logger.info(
+        "Rebuilt %d profiles (%d skipped)",
+        checkpoint.users_rebuilt,
+        checkpoint.users_skipped,
+    )
+    return checkpoint
+
+
+async def main() -> None:
+    """Run the profile rebuild, once or on a schedule."""
+    args = parse_args()
+    interval = timedelta(hours=args.interval_hours)
+    restart = args.restart
+
+    try:
+        while True:
+            previous = load_checkpoint(args.checkpoint)
+            if args.loop and previous is not None and previous.completed_at:
+                wait = previous.started_at + interval - datetime.now(UTC)
+                if wait > timedelta(0):
+                    logger.info("Next rebuild in %s", wait)
+                    await asyncio.sleep(wait.total_seconds())
+
+            await run_once(args.checkpoint, restart)
+            restart = False
+            if not args.loop:
+                break
+            if args.checkpoint is None:
+                await asyncio.sleep(interval.total_seconds())
+    except Exception:
+        logger.exception("Profile rebuild failed")
+        sys.exit(1)
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
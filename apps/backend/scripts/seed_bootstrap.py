@@ -22,6 +22,7 @@ from src.core.qdrant import ensure_collection, get_qdrant_client
 from src.features.ai.service.embedding_service import EmbeddingService
 from src.features.ai.service.quality_gate import QualityGateService
 from src.features.products.service.ingestion_service import IngestionService
+from src.features.products.service.product_card_cache import get_product_card_cache
 from src.features.products.service.product_repository import ProductRepository
 from src.features.products.service.transformer import ProductTransformer
 from src.features.products.service.woocommerce_client import WooCommerceClient
@@ -88,6 +89,8 @@ async def seed_from_woocommerce() -> None:
             embedding_service=embedding_service,
             quality_gate=quality_gate,
             qdrant_client=qdrant_client,
+            display_payload=settings.product_payload_display_fields,
+            card_cache=get_product_card_cache(settings),
         )
 
         async for woo_product in woo_client.get_all_products(per_page=100):
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Product display payload consistency check.
+
+With ``product_payload_display_fields`` enabled the feed renders items from
+the display fields stored in the Qdrant payload. This script compares those
+fields with PostgreSQL (the source of truth) for every active product and
+rewrites the payload of each drifted point. Run it after enabling the
+setting to populate existing points, and periodically to repair drift.
+
+Usage:
+    cd apps/backend
+    python -m scripts.sync_product_payloads
+    python -m scripts.sync_product_payloads --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import get_settings
+from src.core.product_payload import sync_display_payloads
+from src.core.qdrant import close_client, get_qdrant_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Repair product display payload drift from PostgreSQL."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Products compared and repaired per chunk (default: 500)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report drifted points without rewriting them",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    """Run the display payload consistency check."""
+    args = parse_args()
+    settings = get_settings()
+
+    engine = create_async_engine(settings.database_url)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    client = await get_qdrant_client()
+
+    try:
+        async with async_session() as session:
+            result = await sync_display_payloads(
+                session,
+                client,
+                settings.qdrant_collection,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+            )
+        prefix = "DRY RUN: " if args.dry_run else ""
+        logger.info(
+            "%sChecked %d products: %d drifted%s, %d without a Qdrant point",
+            prefix,
+            result.checked,
+            result.drifted,
+            "" if args.dry_run else " (repaired)",
+            result.missing,
+        )
+    except Exception:
+        logger.exception("Product payload sync failed")
+        sys.exit(1)
+    finally:
+        await close_client()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+"""Blue/green migration of a Qdrant collection to a new storage config.
+
+Vector storage (quantization, on-disk vectors, HNSW graph parameters) is
+fixed when a collection is created, so changing the storage profile of a
+populated collection means building a new one. ``migrate_collection``:
+
+1. creates ``<name>_<timestamp>`` with the requested profile, keeping the
+   source's vector size and distance
+2. recreates the source's payload indexes
+3. copies every point (payload and vector) in scroll batches
+4. checks that both collections hold the same number of points
+5. points the alias ``<name>`` at the new collection
+
+The application only ever addresses collections by their configured name.
+Once that name is an alias, later migrations swap it in one atomic alias
+update. The first migration must delete the physical collection that owns
+the name before the alias can take it over (``delete_source=True``), so the
+name does not resolve for a moment in between.
+
+Writes to the source while points are copied are not carried over: pause
+ingestion and profile updates for the duration of a migration.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    PointStruct,
+)
+
+from src.core.config import Settings
+from src.core.qdrant import collection_config, collection_names
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MigrationResult:
+    name: str
+    source: str
+    target: str
+    points: int
+    source_deleted: bool
+
+
+async def resolve_alias(client: AsyncQdrantClient, name: str) -> str | None:
+    """Return the collection the alias ``name`` points at, or None."""
+    aliases = await client.get_aliases()
+    for alias in aliases.aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return None
+
+
+async def copy_points(
+    client: AsyncQdrantClient, source: str, target: str, batch_size: int
+) -> int:
+    """Copy every point of ``source`` into ``target``; return the count."""
+    copied = 0
+    offset = None
+    while True:
+        records, offset = await client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            await client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(
+                        id=record.id, vector=record.vector, payload=record.payload
+                    )
+                    for record in records
+                ],
+                wait=True,
+            )
+            copied += len(records)
+            logger.info("Copied %d points into %s", copied, target)
+        if offset is None:
+            return copied
+
+
+async def migrate_collection(
+    client: AsyncQdrantClient,
+    name: str,
+    profile: str,
+    settings: Settings,
+    *,
+    target: str | None = None,
+    batch_size: int = 256,
+    delete_source: bool = False,
+) -> MigrationResult:
+    """Rebuild collection ``name`` with storage ``profile`` and swap it in.
+
+    Args:
+        client: Async Qdrant client instance.
+        name: Configured collection name (a collection or an alias).
+        profile: Storage profile for the new collection.
+        settings: Application settings (HNSW parameters).
+        target: Name of the new collection. Defaults to
+            ``<name>_<UTC timestamp>``.
+        batch_size: Points per scroll/upsert batch.
+        delete_source: Delete the old collection after the swap. Required
+            when ``name`` is still a physical collection.
+
+    Raises:
+        ValueError: If the source uses named vectors, the target name is
+            taken, or ``name`` is a collection and ``delete_source`` is off.
+        RuntimeError: If the copy lost points. The alias is left untouched
+            and the new collection kept for inspection.
+    """
+    aliased_source = await resolve_alias(client, name)
+    source = aliased_source or name
+    if aliased_source is None and not delete_source:
+        raise ValueError(
+            f"{name!r} is a collection, not an alias; the first migration "
+            "must delete it to hand its name to the alias (delete_source=True)"
+        )
+
+    info = await client.get_collection(source)
+    vectors = info.config.params.vectors
+    if getattr(vectors, "size", None) is None:
+        raise ValueError(f"{source!r} uses named vectors, which are not supported")
+
+    target = target or f"{name}_{datetime.now(UTC):%Y%m%d%H%M%S}"
+    if target in await collection_names(client):
+        raise ValueError(f"Target collection {target!r} already exists")
+
+    logger.info("Creating %s (profile=%s) from %s", target, profile, source)
+    await client.create_collection(
+        collection_name=target,
+        **collection_config(
+            profile, settings, size=vectors.size, distance=vectors.distance
+        ),
+    )
+    for field_name, index_info in (info.payload_schema or {}).items():
+        await client.create_payload_index(
+            collection_name=target,
+            field_name=field_name,
+            field_schema=index_info.data_type,
+        )
+
+    points = await copy_points(client, source, target, batch_size)
+    source_count = (await client.count(source, exact=True)).count
+    target_count = (await client.count(target, exact=True)).count
+    if source_count != target_count:
+        raise RuntimeError(
+            f"Copied {target_count} points into {target!r} but {source!r} "
+            f"holds {source_count}; alias {name!r} left unchanged"
+        )
+
+    create_alias = CreateAliasOperation(
+        create_alias=CreateAlias(collection_name=target, alias_name=name)
+    )
+    if aliased_source is None:
+        logger.info("Replacing collection %s with alias to %s", name, target)
+        await client.delete_collection(collection_name=source)
+        await client.update_collection_aliases(change_aliases_operations=[create_alias])
+    else:
+        logger.info("Swapping alias %s: %s -> %s", name, source, target)
+        await client.update_collection_aliases(
+            change_aliases_operations=[
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name)),
+                create_alias,
+            ]
+        )
+        if delete_source:
+            await client.delete_collection(collection_name=source)
+
+    return MigrationResult(
+        name=name,
+        source=source,
+        target=target,
+        points=points,
+        source_deleted=delete_source,
+    )
@@ -16,6 +16,24 @@ class Settings(BaseSettings):
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
     qdrant_collection: str = "products"
+    # Collection storage profiles, applied when a collection is created
+    # (existing ones move with scripts/migrate_collection.py):
+    # "float32" keeps full vectors in RAM, "int8" adds int8 scalar
+    # quantization (searched in RAM, rescored), "int8_on_disk" keeps only the
+    # int8 copy in RAM and the originals on disk (~4x less vector RAM)
+    qdrant_products_profile: str = "float32"
+    qdrant_user_profiles_profile: str = "float32"
+    qdrant_clusters_profile: str = "float32"
+    qdrant_hnsw_m: int | None = None  # None = Qdrant default (16)
+    qdrant_hnsw_ef_construct: int | None = None  # None = Qdrant default (100)
+    # Product search parameters (None = Qdrant default)
+    qdrant_search_hnsw_ef: int | None = None
+    qdrant_search_quantization_rescore: bool = True
+    qdrant_search_quantization_oversampling: float | None = None
+    # Product searches use the Query API (query_points, Qdrant 1.10+) when the
+    # server supports it, detected from its version; older servers get
+    # search/search_batch
+    qdrant_query_api: str = "auto"  # "auto" | "always" | "never"
 
     # Hetzner Object Storage (S3-compatible)
     s3_endpoint_url: str = "https://hel1.your-objectstorage.com"
@@ -28,12 +46,18 @@ class Settings(BaseSettings):
     cluster_collection: str = "style_clusters"
     min_clusters: int = 10
     max_clusters: int = 200
+    cluster_cache_ttl_seconds: int = 600
+    cluster_cache_version_check_seconds: int = 30
 
     # User profiles
     user_profiles_collection: str = "user_profiles"
     feed_hybrid_confidence_threshold: float = 0.6
     feed_hybrid_personalized_ratio: float = 0.6
     feed_personalized_discovery_count: int = 2
+    # Diversity: "clusters" reserves slots for the 4th-5th nearest clusters
+    # (extra query); "mmr" re-ranks the retrieved candidates by MMR
+    feed_diversity_mode: str = "clusters"  # "clusters" | "mmr"
+    feed_mmr_lambda: float = 0.7
     profile_update_lr_new: float = 0.15
     profile_update_lr_mid: float = 0.08
     profile_update_lr_mature: float = 0.03
@@ -45,6 +69,83 @@ class Settings(BaseSettings):
     profile_update_save_price_alpha: float = 0.15
     profile_update_dislike_burst_count: int = 10
     profile_update_dislike_burst_gamma_scale: float = 0.5
+    # Multi-interest profiles: up to N interest vectors per user, stored as
+    # sub-points of user_profiles (1 = single averaged vector only)
+    profile_interest_count: int = 1
+    profile_interest_spawn_similarity: float = 0.5
+    # Cross-process exclusion of a user's profile update passes: "postgres"
+    # takes an advisory lock per user (any number of API/queue workers),
+    # "local" only serializes passes within one process
+    profile_update_lock_backend: str = "postgres"  # "local" | "postgres"
+    # Users per bulk pass of process_pending_updates_batch (bounded by the
+    # size of the bulk Qdrant upsert and the UPDATE's bind parameters)
+    profile_update_batch_size: int = 500
+    # Where swipes schedule profile updates: "background" runs them as FastAPI
+    # background tasks in the API process; "postgres" enqueues a durable,
+    # per-user coalesced job for scripts/profile_update_worker.py
+    profile_update_queue_backend: str = "background"  # "background" | "postgres"
+    profile_update_worker_processes: int = 2
+    profile_update_worker_concurrency: int = 4
+    # Jobs per bulk pass (1 = one process_pending_updates pass per job)
+    profile_update_worker_batch_size: int = 1
+    profile_update_max_attempts: int = 5
+    profile_update_retry_base_seconds: float = 5.0
+    profile_update_lease_seconds: int = 300
+    profile_update_poll_seconds: float = 1.0
+    # Periodic full rebuild of profile vectors from interaction history
+    # (scripts/rebuild_profiles.py); users below the minimum keep their
+    # onboarding-anchored vector
+    profile_rebuild_interval_hours: float = 168.0
+    profile_rebuild_half_life_days: float = 30.0
+    profile_rebuild_dislike_weight: float = 0.25
+    profile_rebuild_min_interactions: int = 20
+    profile_rebuild_user_chunk_size: int = 500
+    profile_rebuild_interaction_page_size: int = 5000
+
+    # Redis (optional shared cache backend)
+    redis_url: str | None = None
+
+    # Feed batch snapshots (cursor pagination)
+    feed_batch_size: int = 100
+    feed_batch_cache_backend: str = "memory"  # "memory" | "redis"
+    feed_batch_cache_ttl_seconds: int = 1800
+    feed_batch_cache_max_entries: int = 2048
+
+    # Per-user seen-sets (local post-filtering of retrieved candidates).
+    # "memory" assumes one API worker: other workers' swipes are only seen
+    # after the TTL. "redis" shares invalidations, so the TTL can be raised.
+    feed_seen_cache_backend: str = "memory"  # "memory" | "redis"
+    feed_seen_cache_max_users: int = 10000
+    feed_seen_cache_ttl_seconds: int = 5
+    feed_seen_cache_max_products: int = 500000
+
+    # Trending top-N cache (read from the product_popularity aggregate)
+    trending_cache_size: int = 500
+    trending_cache_ttl_seconds: int = 60
+
+    # Background feed warming after profile updates (optional)
+    feed_warm_enabled: bool = False
+    feed_warm_max_concurrency: int = 2
+    feed_warm_max_entries: int = 1000
+    feed_warm_ttl_seconds: int = 600
+
+    # Offline batch feed generation (scripts/generate_feeds.py)
+    feed_batch_generation_chunk_size: int = 256
+    feed_batch_generation_concurrency: int = 4
+
+    # Product retrieval backend: remote Qdrant or the in-process local index
+    retrieval_backend: str = "qdrant"  # "qdrant" | "local"
+    local_index_path: str = "data/local_index"
+    local_index_dim: int = 768
+    local_index_nprobe: int = 8
+
+    # Denormalized display fields in product payloads (feed skips Postgres)
+    product_payload_display_fields: bool = False
+
+    # Product card cache (display fields for feed and calibration items)
+    product_card_cache_backend: str = "memory"  # "memory" | "redis"
+    product_card_cache_max_entries: int = 20000
+    product_card_cache_ttl_seconds: int = 300
 
     # WooCommerce partner store (optional - for future partner integration)
     woo_store_url: str | None = None
@@ -0,0 +1,658 @@
+"""In-process vector index for the products collection.
+
+A ``RetrievalBackend`` (see ``src.core.retrieval``) that serves product
+searches without a network hop, for small deployments and tests.
+
+Layout:
+- vectors are L2-normalized float32 rows, so a dot product is the cosine
+  score Qdrant would return
+- payload fields the feed filters on are stored as columns: numeric columns
+  as float64 (NaN = missing), categorical columns as int32 codes into a
+  per-column vocabulary (-1 = missing)
+- a snapshot is loaded as a read-only *base* segment whose vector matrix is
+  memory-mapped; ingestion writes go to an in-memory *delta* segment, and
+  replaced base rows are tombstoned
+- the base segment may carry an IVF partition (spherical k-means lists);
+  searches probe the ``nprobe`` nearest lists and fall back to an exact scan
+  when the probed lists cannot fill the request
+- searches over at least ``OFFLOAD_MIN_ROWS`` rows are scored in a worker
+  thread (``asyncio.to_thread``) so they do not block the event loop; an
+  internal lock keeps writes from mutating segments mid-search
+
+Filters are qdrant ``Filter`` objects restricted to what the services build:
+``must``/``should``/``must_not`` over ``FieldCondition`` (``MatchValue``,
+``MatchAny``, ``MatchExcept``, ``Range``), ``HasIdCondition`` and nested
+filters. Anything else raises ``ValueError``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import threading
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    HasIdCondition,
+    MatchAny,
+    MatchExcept,
+    MatchValue,
+    Record,
+    ScoredPoint,
+    SearchRequest,
+)
+
+from src.core.config import Settings, get_settings
+from src.core.retrieval import RetrievalBackend
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_COLUMNS = ("price", "cluster_id", "created_at_ts")
+CATEGORICAL_COLUMNS = ("category", "store_id", "archived")
+
+_SNAPSHOT_FORMAT_VERSION = 2
+_INITIAL_DELTA_CAPACITY = 64
+_SCROLL_BATCH_SIZE = 1000
+# IVF is only worth its probing overhead on larger catalogs
+IVF_MIN_ROWS = 50_000
+# Below this many scored rows a search is cheaper than a thread hand-off
+OFFLOAD_MIN_ROWS = 20_000
+_IVF_TRAIN_SAMPLE = 50_000
+_IVF_TRAIN_ITERATIONS = 10
+_ASSIGN_CHUNK_ROWS = 65_536
+
+
+def _normalize(vector: Sequence[float] | np.ndarray) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm > 0 else array
+
+
+def _parse_timestamp(value) -> float:
+    if value is None:
+        return math.nan
+    if isinstance(value, int | float):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value.timestamp()
+    return math.nan
+
+
+def _as_list(conditions) -> list:
+    if conditions is None:
+        return []
+    if isinstance(conditions, list):
+        return conditions
+    return [conditions]
+
+
+class _Segment:
+    """Rows of vectors plus their payload columns and liveness."""
+
+    def __init__(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        numeric: dict[str, np.ndarray],
+        codes: dict[str, np.ndarray],
+        *,
+        size: int | None = None,
+    ) -> None:
+        self.ids = ids
+        self.vectors = vectors
+        self.numeric = numeric
+        self.codes = codes
+        self.size = len(ids) if size is None else size
+        self.alive = np.ones(len(vectors), dtype=bool)
+        self.ivf_centroids: np.ndarray | None = None
+        self.ivf_assignments: np.ndarray | None = None
+
+    @classmethod
+    def empty(cls, dim: int, capacity: int = _INITIAL_DELTA_CAPACITY) -> _Segment:
+        return cls(
+            [],
+            np.zeros((capacity, dim), dtype=np.float32),
+            {name: np.full(capacity, np.nan) for name in NUMERIC_COLUMNS},
+            {
+                name: np.full(capacity, -1, dtype=np.int32)
+                for name in CATEGORICAL_COLUMNS
+            },
+            size=0,
+        )
+
+    def append_row(self) -> int:
+        """Reserve one row, growing the arrays geometrically."""
+        if self.size == len(self.vectors):
+            capacity = max(_INITIAL_DELTA_CAPACITY, len(self.vectors) * 2)
+            grown = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown[: self.size] = self.vectors[: self.size]
+            self.vectors = grown
+            for name, column in self.numeric.items():
+                self.numeric[name] = np.concatenate(
+                    [column, np.full(capacity - len(column), np.nan)]
+                )
+            for name, column in self.codes.items():
+                self.codes[name] = np.concatenate(
+                    [column, np.full(capacity - len(column), -1, dtype=np.int32)]
+                )
+            self.alive = np.concatenate(
+                [self.alive, np.ones(capacity - len(self.alive), dtype=bool)]
+            )
+        row = self.size
+        self.size += 1
+        return row
+
+
+class LocalVectorIndex(RetrievalBackend):
+    """Exact/IVF cosine search over an in-process products index.
+
+    Args:
+        dim: Vector dimension.
+        nprobe: IVF lists probed per query (ignored without an IVF partition).
+    """
+
+    def __init__(self, dim: int, nprobe: int = 8) -> None:
+        self.dim = dim
+        self.nprobe = max(1, nprobe)
+        self._base = _Segment.empty(dim, capacity=0)
+        self._delta = _Segment.empty(dim)
+        self._locations: dict[str, tuple[_Segment, int]] = {}
+        self._vocab: dict[str, list] = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._vocab_codes: dict[str, dict] = {name: {} for name in CATEGORICAL_COLUMNS}
+        # Serializes writes with searches running in worker threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def _code(self, column: str, value) -> int:
+        codes = self._vocab_codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = len(self._vocab[column])
+            self._vocab[column].append(value)
+            codes[value] = code
+        return code
+
+    def _write_payload(self, segment: _Segment, row: int, payload: dict) -> None:
+        if "created_at_ts" not in payload and "created_at" in payload:
+            # Legacy payloads only carry the ISO string
+            segment.numeric["created_at_ts"][row] = _parse_timestamp(
+                payload["created_at"]
+            )
+        for name in NUMERIC_COLUMNS:
+            if name not in payload:
+                continue
+            value = payload[name]
+            segment.numeric[name][row] = math.nan if value is None else float(value)
+        for name in CATEGORICAL_COLUMNS:
+            if name in payload:
+                value = payload[name]
+                segment.codes[name][row] = (
+                    -1 if value is None else self._code(name, value)
+                )
+
+    def upsert(self, points: Iterable) -> None:
+        """Insert or replace points (objects with ``id``, ``vector``, ``payload``).
+
+        Replaced base rows are tombstoned and the new version is written to
+        the delta segment.
+        """
+        with self._lock:
+            for point in points:
+                point_id = str(point.id)
+                location = self._locations.get(point_id)
+                if location is not None and location[0] is self._delta:
+                    row = location[1]
+                else:
+                    if location is not None:
+                        location[0].alive[location[1]] = False
+                    row = self._delta.append_row()
+                    self._delta.ids.append(point_id)
+                    self._locations[point_id] = (self._delta, row)
+
+                for name in NUMERIC_COLUMNS:
+                    self._delta.numeric[name][row] = np.nan
+                for name in CATEGORICAL_COLUMNS:
+                    self._delta.codes[name][row] = -1
+                self._delta.vectors[row] = _normalize(point.vector)
+                self._delta.alive[row] = True
+                self._write_payload(self._delta, row, dict(point.payload or {}))
+
+    def set_payload(self, payload: dict, points: Iterable) -> None:
+        """Overwrite the given payload fields of existing points."""
+        with self._lock:
+            for point_id in points:
+                location = self._locations.get(str(point_id))
+                if location is not None:
+                    self._write_payload(location[0], location[1], payload)
+
+    def delete(self, points: Iterable) -> None:
+        with self._lock:
+            for point_id in points:
+                location = self._locations.pop(str(point_id), None)
+                if location is not None:
+                    location[0].alive[location[1]] = False
+
+    def _field_mask(self, condition: FieldCondition, segment: _Segment) -> np.ndarray:
+        key = condition.key
+        size = segment.size
+        if key in NUMERIC_COLUMNS:
+            column = segment.numeric[key][:size]
+            mask = np.ones(size, dtype=bool)
+            match = condition.match
+            if isinstance(match, MatchValue):
+                mask &= column == float(match.value)
+            elif isinstance(match, MatchAny):
+                mask &= np.isin(column, [float(v) for v in match.any])
+            elif isinstance(match, MatchExcept):
+                values = [float(v) for v in match.except_]
+                mask &= ~np.isnan(column) & ~np.isin(column, values)
+            elif match is not None:
+                raise ValueError(f"Unsupported match on {key}: {type(match).__name__}")
+            bounds = condition.range
+            if bounds is not None:
+                with np.errstate(invalid="ignore"):
+                    if bounds.gt is not None:
+                        mask &= column > bounds.gt
+                    if bounds.gte is not None:
+                        mask &= column >= bounds.gte
+                    if bounds.lt is not None:
+                        mask &= column < bounds.lt
+                    if bounds.lte is not None:
+                        mask &= column <= bounds.lte
+            return mask
+
+        if key in CATEGORICAL_COLUMNS:
+            if condition.range is not None:
+                raise ValueError(f"Range filter on categorical field {key}")
+            column = segment.codes[key][:size]
+            codes = self._vocab_codes[key]
+            match = condition.match
+            if isinstance(match, MatchValue):
+                return column == codes.get(match.value, -2)
+            if isinstance(match, MatchAny):
+                return np.isin(column, [codes.get(v, -2) for v in match.any])
+            if isinstance(match, MatchExcept):
+                excluded = [codes.get(v, -2) for v in match.except_]
+                return (column >= 0) & ~np.isin(column, excluded)
+            raise ValueError(f"Unsupported match on {key}: {type(match).__name__}")
+
+        raise ValueError(f"Field {key!r} is not indexed by the local index")
+
+    def _condition_mask(self, condition, segment: _Segment) -> np.ndarray:
+        if isinstance(condition, Filter):
+            return self._filter_mask(condition, segment)
+        if isinstance(condition, FieldCondition):
+            return self._field_mask(condition, segment)
+        if isinstance(condition, HasIdCondition):
+            mask = np.zeros(segment.size, dtype=bool)
+            for point_id in condition.has_id:
+                location = self._locations.get(str(point_id))
+                if location is not None and location[0] is segment:
+                    mask[location[1]] = True
+            return mask
+        raise ValueError(f"Unsupported filter condition: {type(condition).__name__}")
+
+    def _filter_mask(
+        self, query_filter: Filter | None, segment: _Segment
+    ) -> np.ndarray:
+        mask = segment.alive[: segment.size].copy()
+        if query_filter is None:
+            return mask
+        for condition in _as_list(query_filter.must):
+            mask &= self._condition_mask(condition, segment)
+        should = _as_list(query_filter.should)
+        if should:
+            any_match = np.zeros(segment.size, dtype=bool)
+            for condition in should:
+                any_match |= self._condition_mask(condition, segment)
+            mask &= any_match
+        for condition in _as_list(query_filter.must_not):
+            mask &= ~self._condition_mask(condition, segment)
+        return mask
+
+    def _candidate_rows(
+        self, segment: _Segment, query: np.ndarray, mask: np.ndarray, limit: int
+    ) -> np.ndarray:
+        rows = np.flatnonzero(mask)
+        if segment.ivf_centroids is None or len(rows) <= limit:
+            return rows
+        lists = len(segment.ivf_centroids)
+        if self.nprobe >= lists:
+            return rows
+        probed = np.argpartition(-(segment.ivf_centroids @ query), self.nprobe)[
+            : self.nprobe
+        ]
+        in_probed = np.isin(segment.ivf_assignments[rows], probed)
+        if np.count_nonzero(in_probed) < limit:
+            return rows
+        return rows[in_probed]
+
+    def _payload(self, segment: _Segment, row: int) -> dict:
+        payload: dict = {"product_id": segment.ids[row]}
+        for name in NUMERIC_COLUMNS:
+            value = segment.numeric[name][row]
+            if math.isnan(value):
+                continue
+            if name == "created_at_ts":
+                payload["created_at"] = datetime.fromtimestamp(value, UTC).isoformat()
+                payload[name] = float(value)
+            elif name == "cluster_id":
+                payload[name] = int(value)
+            else:
+                payload[name] = float(value)
+        for name in CATEGORICAL_COLUMNS:
+            code = segment.codes[name][row]
+            if code >= 0:
+                payload[name] = self._vocab[name][code]
+        return payload
+
+    def _search_many(self, requests: list[SearchRequest]) -> list[list[ScoredPoint]]:
+        with self._lock:
+            return [self._search_one(request) for request in requests]
+
+    async def _run_searches(
+        self, requests: list[SearchRequest]
+    ) -> list[list[ScoredPoint]]:
+        """Score ``requests``, in a worker thread when they are large enough."""
+        if len(self) * len(requests) < OFFLOAD_MIN_ROWS:
+            return self._search_many(requests)
+        return await asyncio.to_thread(self._search_many, requests)
+
+    def _search_one(self, request: SearchRequest) -> list[ScoredPoint]:
+        query = _normalize(request.vector)
+        limit = request.limit
+        scored: list[tuple[float, _Segment, int]] = []
+        for segment in (self._base, self._delta):
+            if segment.size == 0:
+                continue
+            mask = self._filter_mask(request.filter, segment)
+            rows = self._candidate_rows(segment, query, mask, limit)
+            if len(rows) == 0:
+                continue
+            scores = segment.vectors[rows] @ query
+            if request.score_threshold is not None:
+                keep = scores >= request.score_threshold
+                rows, scores = rows[keep], scores[keep]
+            if len(rows) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                rows, scores = rows[top], scores[top]
+            scored.extend(
+                (score, segment, row)
+                for score, row in zip(scores.tolist(), rows.tolist())
+            )
+
+        scored.sort(key=lambda item: -item[0])
+        with_payload = request.with_payload is not False
+        with_vector = bool(request.with_vector)
+        return [
+            ScoredPoint(
+                id=segment.ids[row],
+                version=0,
+                score=score,
+                payload=self._payload(segment, row) if with_payload else None,
+                vector=segment.vectors[row].tolist() if with_vector else None,
+            )
+            for score, segment, row in scored[:limit]
+        ]
+
+    async def search(
+        self,
+        query_vector: list[float],
+        *,
+        query_filter: Filter | None = None,
+        limit: int = 10,
+        score_threshold: float | None = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+    ) -> list[ScoredPoint]:
+        request = SearchRequest(
+            vector=query_vector,
+            filter=query_filter,
+            limit=limit,
+            score_threshold=score_threshold,
+            with_payload=with_payload,
+            with_vector=with_vectors,
+        )
+        return (await self._run_searches([request]))[0]
+
+    async def search_batch(
+        self, requests: list[SearchRequest]
+    ) -> list[list[ScoredPoint]]:
+        return await self._run_searches(requests)
+
+    async def retrieve(
+        self,
+        ids: Iterable,
+        *,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+    ) -> list[Record]:
+        records = []
+        for point_id in ids:
+            location = self._locations.get(str(point_id))
+            if location is None:
+                continue
+            segment, row = location
+            records.append(
+                Record(
+                    id=segment.ids[row],
+                    payload=self._payload(segment, row) if with_payload else None,
+                    vector=segment.vectors[row].tolist() if with_vectors else None,
+                )
+            )
+        return records
+
+    def build_ivf(self, n_lists: int, seed: int = 0) -> None:
+        """Merge all live rows into the base segment and partition it (IVF).
+
+        Runs spherical k-means on a sample of rows, then assigns every row to
+        its nearest list.
+        """
+        self._compact()
+        segment = self._base
+        if n_lists <= 1 or segment.size < n_lists:
+            with self._lock:
+                segment.ivf_centroids = segment.ivf_assignments = None
+            return
+
+        rng = np.random.default_rng(seed)
+        vectors = segment.vectors[: segment.size]
+        sample_rows = rng.choice(
+            segment.size, size=min(segment.size, _IVF_TRAIN_SAMPLE), replace=False
+        )
+        sample = np.asarray(vectors[np.sort(sample_rows)])
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(_IVF_TRAIN_ITERATIONS):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            centroids = np.where(
+                empty[:, None], centroids, sums / np.where(norms > 0, norms, 1.0)
+            )
+
+        assignments = np.concatenate(
+            [
+                np.argmax(
+                    vectors[start : start + _ASSIGN_CHUNK_ROWS] @ centroids.T, axis=1
+                )
+                for start in range(0, segment.size, _ASSIGN_CHUNK_ROWS)
+            ]
+        ).astype(np.int32)
+        with self._lock:
+            segment.ivf_centroids = centroids.astype(np.float32)
+            segment.ivf_assignments = assignments
+
+    def _compact(self) -> None:
+        """Fold live delta rows into a fresh in-memory base segment."""
+        parts = [
+            (segment, np.flatnonzero(segment.alive[: segment.size]))
+            for segment in (self._base, self._delta)
+        ]
+        ids = [segment.ids[row] for segment, rows in parts for row in rows.tolist()]
+        base = _Segment(
+            ids,
+            np.concatenate(
+                [np.asarray(segment.vectors[rows]) for segment, rows in parts]
+            ).reshape(-1, self.dim),
+            {
+                name: np.concatenate(
+                    [segment.numeric[name][rows] for segment, rows in parts]
+                )
+                for name in NUMERIC_COLUMNS
+            },
+            {
+                name: np.concatenate(
+                    [segment.codes[name][rows] for segment, rows in parts]
+                )
+                for name in CATEGORICAL_COLUMNS
+            },
+        )
+        with self._lock:
+            self._base = base
+            self._delta = _Segment.empty(self.dim)
+            self._locations = {
+                point_id: (base, row) for row, point_id in enumerate(ids)
+            }
+
+    def save(self, path: str | Path) -> None:
+        """Write the index (compacted, with its IVF partition) to ``path``."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        if self._delta.size or not self._base.alive[: self._base.size].all():
+            # Compaction drops the IVF partition; rebuild it with build_ivf()
+            self._compact()
+        segment = self._base
+        ivf = segment.ivf_centroids is not None
+
+        np.save(path / "vectors.npy", np.asarray(segment.vectors[: segment.size]))
+        np.savez(
+            path / "columns.npz",
+            **{
+                f"numeric_{name}": segment.numeric[name][: segment.size]
+                for name in NUMERIC_COLUMNS
+            },
+            **{
+                f"codes_{name}": segment.codes[name][: segment.size]
+                for name in CATEGORICAL_COLUMNS
+            },
+        )
+        if ivf:
+            np.save(path / "ivf_centroids.npy", segment.ivf_centroids)
+            np.save(path / "ivf_assignments.npy", segment.ivf_assignments)
+        else:
+            for name in ("ivf_centroids.npy", "ivf_assignments.npy"):
+                (path / name).unlink(missing_ok=True)
+        (path / "meta.json").write_text(
+            json.dumps(
+                {
+                    "format_version": _SNAPSHOT_FORMAT_VERSION,
+                    "dim": self.dim,
+                    "ids": segment.ids,
+                    "vocab": self._vocab,
+                }
+            )
+        )
+
+    @classmethod
+    def load(
+        cls, path: str | Path, *, nprobe: int = 8, mmap: bool = True
+    ) -> LocalVectorIndex:
+        """Load a snapshot; the vector matrix is memory-mapped by default."""
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        if meta.get("format_version") != _SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported local index format {meta.get('format_version')}"
+            )
+
+        index = cls(dim=meta["dim"], nprobe=nprobe)
+        vectors = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+        with np.load(path / "columns.npz") as columns:
+            numeric = {
+                name: columns[f"numeric_{name}"].copy() for name in NUMERIC_COLUMNS
+            }
+            codes = {
+                name: columns[f"codes_{name}"].copy() for name in CATEGORICAL_COLUMNS
+            }
+        ids = list(meta["ids"])
+        index._base = _Segment(ids, vectors, numeric, codes)
+        if (path / "ivf_centroids.npy").exists():
+            index._base.ivf_centroids = np.load(path / "ivf_centroids.npy")
+            index._base.ivf_assignments = np.load(path / "ivf_assignments.npy")
+        index._locations = {
+            point_id: (index._base, row) for row, point_id in enumerate(ids)
+        }
+        index._vocab = {name: list(meta["vocab"][name]) for name in CATEGORICAL_COLUMNS}
+        index._vocab_codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in index._vocab.items()
+        }
+        logger.info("Loaded local index with %d points from %s", len(ids), path)
+        return index
+
+    @classmethod
+    async def from_qdrant(
+        cls,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        *,
+        dim: int,
+        nprobe: int = 8,
+    ) -> LocalVectorIndex:
+        """Build an index by scrolling every point (with vectors) of a collection."""
+        index = cls(dim=dim, nprobe=nprobe)
+        offset = None
+        while True:
+            points, offset = await client.scroll(
+                collection_name=collection_name,
+                limit=_SCROLL_BATCH_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            index.upsert(point for point in points if point.vector is not None)
+            if not points or offset is None:
+                break
+        index._compact()
+        return index
+
+
+_index: LocalVectorIndex | None = None
+
+
+def get_local_index(settings: Settings | None = None) -> LocalVectorIndex | None:
+    """Return the process-wide local index, or None when it is not enabled.
+
+    The snapshot at ``local_index_path`` is loaded on first use; without one
+    the index starts empty and fills from ingestion.
+    """
+    global _index
+    settings = settings or get_settings()
+    if settings.retrieval_backend != "local":
+        return None
+    if _index is None:
+        path = Path(settings.local_index_path)
+        if (path / "meta.json").exists():
+            _index = LocalVectorIndex.load(path, nprobe=settings.local_index_nprobe)
+        else:
+            logger.warning("No local index snapshot at %s; starting empty", path)
+            _index = LocalVectorIndex(
+                dim=settings.local_index_dim, nprobe=settings.local_index_nprobe
+            )
+    return _index
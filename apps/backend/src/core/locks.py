@@ -0,0 +1,154 @@
+"""Per-key mutual exclusion within and across processes.
+
+``KeyedLocks`` hands out one ``asyncio.Lock`` per key and reference-counts
+it: the entry exists only while some task holds or waits for the lock, so
+memory is bounded by the number of keys in use, not by every key ever seen.
+``KeyedLocks.hold_many`` takes several keys in sorted order, so batches with
+overlapping keys cannot deadlock each other or single-key holders.
+
+``advisory_xact_lock`` (``advisory_xact_lock_many`` for batches) takes a
+Postgres transaction-scoped advisory lock on the same key, which serializes
+work across API workers, replicas and queue workers. It is released when the
+transaction commits or rolls back. Taking the local lock first keeps tasks of
+one process from each holding a database connection just to wait on the
+advisory lock.
+
+Both report contention (``lock_acquisitions_total``) and wait time
+(``lock_wait_seconds``) per lock name and scope (``local``, ``postgres``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import BigInteger, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.metrics import counter, histogram
+
+LOCK_ACQUISITIONS = counter(
+    "lock_acquisitions_total",
+    "Lock acquisitions by lock, scope and whether they had to wait.",
+    labelnames=("lock", "scope", "result"),
+)
+LOCK_WAIT_SECONDS = histogram(
+    "lock_wait_seconds",
+    "Time spent waiting to acquire a lock.",
+    labelnames=("lock", "scope"),
+)
+
+
+def _record_acquisition(name: str, scope: str, contended: bool, start: float) -> None:
+    LOCK_ACQUISITIONS.inc(
+        lock=name, scope=scope, result="contended" if contended else "uncontended"
+    )
+    LOCK_WAIT_SECONDS.observe(time.perf_counter() - start, lock=name, scope=scope)
+
+
+@dataclass
+class _LockEntry:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    refs: int = 0
+
+
+class KeyedLocks:
+    """Process-local locks keyed by string, evicted when unused.
+
+    Args:
+        name: Lock name used in metrics labels.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._entries: dict[str, _LockEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        """Hold the lock for ``key`` for the duration of the block."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _LockEntry()
+        entry.refs += 1
+        try:
+            contended = entry.refs > 1
+            start = time.perf_counter()
+            async with entry.lock:
+                _record_acquisition(self.name, "local", contended, start)
+                yield
+        finally:
+            entry.refs -= 1
+            if entry.refs == 0:
+                del self._entries[key]
+
+    @asynccontextmanager
+    async def hold_many(self, keys: Iterable[str]) -> AsyncIterator[None]:
+        """Hold the locks of all ``keys`` (taken in sorted order) for the block."""
+        async with AsyncExitStack() as stack:
+            for key in sorted(set(keys)):
+                await stack.enter_async_context(self.hold(key))
+            yield
+
+
+def advisory_lock_key(name: str, key: str) -> int:
+    """Map ``name``/``key`` to the signed 64-bit id of a Postgres advisory lock."""
+    digest = hashlib.blake2b(f"{name}:{key}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+async def advisory_xact_lock(session: AsyncSession, name: str, key: str) -> None:
+    """Block until the session's transaction holds the advisory lock for ``key``.
+
+    Tries ``pg_try_advisory_xact_lock`` first so uncontended acquisitions are
+    told apart from ones that waited.
+    """
+    lock_id = advisory_lock_key(name, key)
+    start = time.perf_counter()
+    acquired = await session.scalar(select(func.pg_try_advisory_xact_lock(lock_id)))
+    if not acquired:
+        await session.execute(select(func.pg_advisory_xact_lock(lock_id)))
+    _record_acquisition(name, "postgres", not acquired, start)
+
+
+async def advisory_xact_lock_many(
+    session: AsyncSession, name: str, keys: Iterable[str]
+) -> None:
+    """Block until the session's transaction holds the advisory lock of every key.
+
+    Every lock is tried without waiting first. If any is taken, the
+    transaction is rolled back, releasing the locks it did get, and all locks
+    are then taken in lock id order, so callers with overlapping keys cannot
+    deadlock. Call it before any other work in the transaction.
+    """
+    lock_ids = sorted({advisory_lock_key(name, key) for key in keys})
+    if not lock_ids:
+        return
+    # unnest() yields the sorted ids in order, and the locks are taken row by row
+    ids = func.unnest(
+        bindparam("lock_ids", lock_ids, type_=ARRAY(BigInteger))
+    ).table_valued("lock_id")
+    start = time.perf_counter()
+    acquired = (
+        await session.scalars(select(func.pg_try_advisory_xact_lock(ids.c.lock_id)))
+    ).all()
+    contended = len(acquired) - sum(bool(value) for value in acquired)
+    if contended:
+        await session.rollback()
+        await session.execute(select(func.pg_advisory_xact_lock(ids.c.lock_id)))
+
+    LOCK_WAIT_SECONDS.observe(time.perf_counter() - start, lock=name, scope="postgres")
+    LOCK_ACQUISITIONS.inc(
+        len(lock_ids) - contended, lock=name, scope="postgres", result="uncontended"
+    )
+    if contended:
+        LOCK_ACQUISITIONS.inc(
+            contended, lock=name, scope="postgres", result="contended"
+        )
@@ -0,0 +1,289 @@
+"""Lightweight in-process metrics registry.
+
+Counters, gauges and histograms are process-local and cheap enough to update on the
+request hot path. Instruments are registered once at import time of the module
+that owns them and looked up by name. ``render_prometheus`` exposes the whole
+registry in the Prometheus text format (served at ``/metrics``).
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+_LabelKey = tuple[str, ...]
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds (1 ms .. 10 s)
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _label_key(name: str, labelnames: tuple[str, ...], labels: dict) -> _LabelKey:
+    if set(labels) != set(labelnames):
+        raise ValueError(
+            f"Metric {name} expects labels {labelnames}, got {tuple(labels)}"
+        )
+    return tuple(str(labels[label]) for label in labelnames)
+
+
+class Counter:
+    """Monotonically increasing counter with optional label dimensions."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[_LabelKey, float] = {}
+
+    def _key(self, labels: dict[str, str]) -> _LabelKey:
+        return _label_key(self.name, self.labelnames, labels)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increment the counter for the given label values."""
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for the given label values."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[dict[str, str], float]]:
+        """Return ``(labels, value)`` pairs for every observed label set."""
+        return [
+            (dict(zip(self.labelnames, key)), value)
+            for key, value in self._values.items()
+        ]
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Gauge:
+    """Point-in-time value (queue depth, lag) with optional label dimensions."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[_LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge for the given label values."""
+        self._values[_label_key(self.name, self.labelnames, labels)] = float(value)
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for the given label values."""
+        return self._values.get(_label_key(self.name, self.labelnames, labels), 0.0)
+
+    def samples(self) -> list[tuple[dict[str, str], float]]:
+        """Return ``(labels, value)`` pairs for every set label set."""
+        return [
+            (dict(zip(self.labelnames, key)), value)
+            for key, value in self._values.items()
+        ]
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional label dimensions."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self._values: dict[_LabelKey, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = _label_key(self.name, self.labelnames, labels)
+        state = self._values.get(key)
+        if state is None:
+            state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._values[key] = state
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(_label_key(self.name, self.labelnames, labels))
+        return state[2] if state is not None else 0
+
+    def sum(self, **labels: str) -> float:
+        state = self._values.get(_label_key(self.name, self.labelnames, labels))
+        return state[1] if state is not None else 0.0
+
+    def samples(self) -> list[tuple[dict[str, str], list[int], float, int]]:
+        """Return ``(labels, cumulative bucket counts, sum, count)`` tuples."""
+        samples = []
+        for key, (bucket_counts, total, count) in self._values.items():
+            cumulative = []
+            running = 0
+            for bucket_count in bucket_counts:
+                running += bucket_count
+                cumulative.append(running)
+            samples.append((dict(zip(self.labelnames, key)), cumulative, total, count))
+        return samples
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+_REGISTRY: dict[str, Counter | Gauge | Histogram] = {}
+
+
+def _registered(name: str, kind: type, labelnames: tuple[str, ...]):
+    """Return the instrument registered as ``name``, checking it matches.
+
+    Raises ``ValueError`` when the name is taken by an instrument of another
+    type or with other label names.
+    """
+    existing = _REGISTRY.get(name)
+    if existing is None:
+        return None
+    if not isinstance(existing, kind) or existing.labelnames != labelnames:
+        raise ValueError(
+            f"Metric {name} is registered as a {type(existing).__name__} with "
+            f"labels {existing.labelnames}, not a {kind.__name__} with "
+            f"labels {labelnames}"
+        )
+    return existing
+
+
+def counter(
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+) -> Counter:
+    """Get or create a registered counter."""
+    labelnames = tuple(labelnames)
+    existing = _registered(name, Counter, labelnames)
+    if existing is not None:
+        return existing
+    instrument = Counter(name, documentation, labelnames)
+    _REGISTRY[name] = instrument
+    return instrument
+
+
+def gauge(
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+) -> Gauge:
+    """Get or create a registered gauge."""
+    labelnames = tuple(labelnames)
+    existing = _registered(name, Gauge, labelnames)
+    if existing is not None:
+        return existing
+    instrument = Gauge(name, documentation, labelnames)
+    _REGISTRY[name] = instrument
+    return instrument
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    """Get or create a registered histogram."""
+    labelnames = tuple(labelnames)
+    existing = _registered(name, Histogram, labelnames)
+    if existing is not None:
+        return existing
+    instrument = Histogram(name, documentation, labelnames, buckets)
+    _REGISTRY[name] = instrument
+    return instrument
+
+
+def get_registry() -> dict[str, Counter | Gauge | Histogram]:
+    """Return all registered instruments keyed by name."""
+    return dict(_REGISTRY)
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Render every registered instrument in the Prometheus text format."""
+    lines: list[str] = []
+    for name, instrument in sorted(_REGISTRY.items()):
+        lines.append(f"# HELP {name} {instrument.documentation}")
+        if isinstance(instrument, (Counter, Gauge)):
+            kind = "counter" if isinstance(instrument, Counter) else "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in instrument.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+
+        lines.append(f"# TYPE {name} histogram")
+        for labels, cumulative, total, count in instrument.samples():
+            for bound, bucket_count in zip((*instrument.buckets, math.inf), cumulative):
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                lines.append(
+                    f"{name}_bucket{_format_labels(bucket_labels)} {bucket_count}"
+                )
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,169 @@
+"""Shared helpers for the time-decayed product popularity aggregate.
+
+Popularity follows THE_BRAIN.md (B2): engagement weighted by action and
+decayed with a 14-day half-life. Scores are stored with *forward decay*:
+each interaction adds ``weight * 2 ** ((t - POPULARITY_EPOCH) / half_life)``.
+
+All rows share the same reference timestamp (``POPULARITY_EPOCH``), so:
+- an interaction is a single atomic ``score = score + increment`` upsert,
+  with no rescan of older interactions
+- ordering by the stored score equals ordering by the decayed score at any
+  moment, so an index on the score serves the trending order
+- the decayed value "as of now" is ``stored * 2 ** -((now - epoch) / half_life)``
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.product_popularity import ProductPopularity
+from src.models.user_interaction import UserInteraction
+
+POPULARITY_HALF_LIFE_DAYS = 14
+POPULARITY_EPOCH = datetime(2026, 1, 1, tzinfo=UTC)
+INTERACTION_WEIGHTS = {"save": 3.0, "like": 2.0, "dislike": -1.0}
+
+_HALF_LIFE_SECONDS = POPULARITY_HALF_LIFE_DAYS * 86400
+_REBUILD_INSERT_BATCH_SIZE = 1000
+
+
+def forward_decay_factor(at: datetime) -> float:
+    """Growth factor of an event at ``at`` relative to ``POPULARITY_EPOCH``."""
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=UTC)
+    elapsed = (at - POPULARITY_EPOCH).total_seconds()
+    return 2.0 ** (elapsed / _HALF_LIFE_SECONDS)
+
+
+def decayed_score(stored_score: float, now: datetime | None = None) -> float:
+    """Convert a stored forward-decayed score to its value at ``now``."""
+    now = now or datetime.now(UTC)
+    return stored_score / forward_decay_factor(now)
+
+
+async def record_popularity(
+    session: AsyncSession,
+    product_id: UUID,
+    action: str,
+    at: datetime | None = None,
+) -> None:
+    """Add one interaction to the product's popularity row (atomic upsert).
+
+    Runs in the caller's transaction so the aggregate commits together with
+    the interaction row.
+    """
+    at = at or datetime.now(UTC)
+    increment = INTERACTION_WEIGHTS.get(action, 0.0) * forward_decay_factor(at)
+
+    stmt = insert(ProductPopularity).values(
+        product_id=product_id,
+        score=increment,
+        interaction_count=1,
+        last_interaction_at=at,
+    )
+    await session.execute(_increment_on_conflict(stmt))
+
+
+async def record_popularity_many(
+    session: AsyncSession,
+    interactions: Sequence[tuple[UUID, str]],
+    at: datetime | None = None,
+) -> None:
+    """Add a batch of ``(product_id, action)`` interactions in one upsert.
+
+    Interactions are summed per product first (an upsert cannot touch a row
+    twice), and rows are written in product id order so concurrent batches
+    lock them in the same order.
+    """
+    at = at or datetime.now(UTC)
+    factor = forward_decay_factor(at)
+    totals: dict[UUID, list[float]] = {}
+    for product_id, action in interactions:
+        total = totals.setdefault(product_id, [0.0, 0])
+        total[0] += INTERACTION_WEIGHTS.get(action, 0.0) * factor
+        total[1] += 1
+    if not totals:
+        return
+
+    stmt = insert(ProductPopularity).values(
+        [
+            {
+                "product_id": product_id,
+                "score": score,
+                "interaction_count": count,
+                "last_interaction_at": at,
+            }
+            for product_id, (score, count) in sorted(totals.items())
+        ]
+    )
+    await session.execute(_increment_on_conflict(stmt))
+
+
+def _increment_on_conflict(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=[ProductPopularity.product_id],
+        set_={
+            "score": ProductPopularity.score + stmt.excluded.score,
+            "interaction_count": ProductPopularity.interaction_count
+            + stmt.excluded.interaction_count,
+            "last_interaction_at": func.greatest(
+                ProductPopularity.last_interaction_at,
+                stmt.excluded.last_interaction_at,
+            ),
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def rebuild_popularity(session: AsyncSession) -> int:
+    """Recompute every popularity row from ``user_interactions``.
+
+    Used to backfill the aggregate (or repair drift). Replaces the table
+    contents inside the caller's transaction and returns the number of rows
+    written. This is the only place that scans the full interaction history.
+    """
+    weight = case(
+        *(
+            (UserInteraction.action == action, value)
+            for action, value in INTERACTION_WEIGHTS.items()
+        ),
+        else_=0.0,
+    )
+    growth = func.power(
+        2.0,
+        (
+            func.extract("epoch", UserInteraction.created_at)
+            - POPULARITY_EPOCH.timestamp()
+        )
+        / _HALF_LIFE_SECONDS,
+    )
+    stmt = select(
+        UserInteraction.product_id,
+        func.sum(weight * growth).label("score"),
+        func.count().label("interaction_count"),
+        func.max(UserInteraction.created_at).label("last_interaction_at"),
+    ).group_by(UserInteraction.product_id)
+    rows = (await session.execute(stmt)).all()
+
+    await session.execute(delete(ProductPopularity))
+    for start in range(0, len(rows), _REBUILD_INSERT_BATCH_SIZE):
+        batch = rows[start : start + _REBUILD_INSERT_BATCH_SIZE]
+        await session.execute(
+            insert(ProductPopularity),
+            [
+                {
+                    "product_id": row.product_id,
+                    "score": float(row.score or 0.0),
+                    "interaction_count": int(row.interaction_count),
+                    "last_interaction_at": row.last_interaction_at,
+                }
+                for row in batch
+            ],
+        )
+    return len(rows)
@@ -0,0 +1,303 @@
+"""Typed payload schema for the products collection.
+
+Every product point carries the same payload shape:
+
+- ``product_id``: keyword (the Postgres UUID as a string)
+- ``store_id``: keyword
+- ``category``: keyword
+- ``price``: float
+- ``cluster_id``: integer (set by clustering, absent until then)
+- ``created_at``: ISO-8601 string, kept for readers of the raw payload
+- ``created_at_ts``: float epoch seconds (UTC), what ranking and range
+  filters use, so no pass re-parses the ISO string
+
+``PRODUCTS_PAYLOAD_SCHEMA`` lists the indexed fields. Without an index Qdrant
+answers a filtered search by scanning every payload.
+
+Points written before the schema existed are migrated in bulk with
+``backfill_product_payloads`` (see ``scripts/backfill_product_payloads.py``).
+
+With ``product_payload_display_fields`` enabled, ingestion also writes the
+feed's display fields (``DISPLAY_FIELDS``) so a feed page can be rendered
+from the search results without a Postgres lookup. Postgres stays the source
+of truth: ``sync_display_payloads`` finds and repairs payload drift (see
+``scripts/sync_product_payloads.py``).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import PayloadSchemaType, SetPayload, SetPayloadOperation
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.product import Product
+
+PRODUCTS_PAYLOAD_SCHEMA: dict[str, PayloadSchemaType] = {
+    "archived": PayloadSchemaType.BOOL,
+    "store_id": PayloadSchemaType.KEYWORD,
+    "category": PayloadSchemaType.KEYWORD,
+    "price": PayloadSchemaType.FLOAT,
+    "cluster_id": PayloadSchemaType.INTEGER,
+    "created_at_ts": PayloadSchemaType.FLOAT,
+}
+
+# Fields a feed item needs, in FeedItem order
+DISPLAY_FIELDS = ("title", "price", "currency", "image_url", "product_url", "category")
+
+_BACKFILL_BATCH_SIZE = 500
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value
+
+
+def build_product_payload(
+    *,
+    product_id: object,
+    store_id: str,
+    category: str,
+    price: Decimal | float,
+    created_at: datetime,
+) -> dict:
+    """Build the typed payload for a product point (without ``cluster_id``)."""
+    created_at = _as_datetime(created_at)
+    return {
+        "product_id": str(product_id),
+        "store_id": str(store_id),
+        "price": float(price),
+        "category": str(category),
+        "created_at": created_at.isoformat(),
+        "created_at_ts": created_at.timestamp(),
+    }
+
+
+def build_display_fields(
+    *,
+    title: str,
+    price: Decimal | float,
+    currency: str,
+    image_url: str,
+    product_url: str,
+    category: object,
+) -> dict:
+    """Build the denormalized display fields of a product payload."""
+    return {
+        "title": title,
+        "price": float(price),
+        "currency": currency,
+        "image_url": image_url,
+        "product_url": product_url,
+        "category": str(getattr(category, "value", category)),
+    }
+
+
+def display_fields(payload: dict | None) -> dict | None:
+    """Return the payload's display fields, or None if any is missing."""
+    if not payload:
+        return None
+    try:
+        return {field: payload[field] for field in DISPLAY_FIELDS}
+    except KeyError:
+        return None
+
+
+def typed_payload_fields(payload: dict) -> dict:
+    """Return the schema fields of an existing payload coerced to their types.
+
+    Derives ``created_at_ts`` from ``created_at`` when it is missing. Fields
+    that are absent (or hold an unparseable value) are left out.
+    """
+    typed: dict = {}
+    for key in ("product_id", "store_id", "category"):
+        value = payload.get(key)
+        if value is not None:
+            typed[key] = str(value)
+
+    price = payload.get("price")
+    if price is not None:
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            price = math.nan
+        if math.isfinite(price):
+            typed["price"] = price
+
+    cluster_id = payload.get("cluster_id")
+    if cluster_id is not None:
+        try:
+            typed["cluster_id"] = int(cluster_id)
+        except (TypeError, ValueError):
+            pass
+
+    created_at_ts = payload.get("created_at_ts")
+    if isinstance(created_at_ts, (int, float)) and not isinstance(created_at_ts, bool):
+        typed["created_at_ts"] = float(created_at_ts)
+    elif payload.get("created_at") is not None:
+        try:
+            typed["created_at_ts"] = _as_datetime(payload["created_at"]).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return typed
+
+
+def _stored_as(stored: object, value: object) -> bool:
+    """Whether ``stored`` already holds ``value`` with a compatible type."""
+    if isinstance(stored, bool):
+        return False
+    if isinstance(value, float):
+        # JSON round-trips may turn 10.0 into 10; both index as float.
+        return isinstance(stored, (int, float)) and stored == value
+    return type(stored) is type(value) and stored == value
+
+
+def payload_changes(payload: dict) -> dict:
+    """Return the typed fields that differ from the stored payload."""
+    return {
+        key: value
+        for key, value in typed_payload_fields(payload).items()
+        if not _stored_as(payload.get(key), value)
+    }
+
+
+@dataclass
+class PayloadBackfillResult:
+    scanned: int = 0
+    updated: int = 0
+
+
+async def backfill_product_payloads(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    *,
+    batch_size: int = _BACKFILL_BATCH_SIZE,
+    dry_run: bool = False,
+) -> PayloadBackfillResult:
+    """Rewrite every product point's payload to the typed schema.
+
+    Scrolls the collection page by page and sends one batched update per
+    page, touching only points whose payload actually changes, so the
+    command is idempotent and cheap to re-run.
+    """
+    result = PayloadBackfillResult()
+    offset = None
+    while True:
+        records, offset = await client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        operations = []
+        for record in records:
+            changes = payload_changes(record.payload or {})
+            if changes:
+                operations.append(
+                    SetPayloadOperation(
+                        set_payload=SetPayload(payload=changes, points=[record.id])
+                    )
+                )
+        result.scanned += len(records)
+        result.updated += len(operations)
+
+        if operations and not dry_run:
+            await client.batch_update_points(
+                collection_name=collection_name,
+                update_operations=operations,
+            )
+        if offset is None:
+            return result
+
+
+@dataclass
+class PayloadSyncResult:
+    checked: int = 0
+    drifted: int = 0
+    missing: int = 0
+
+
+async def sync_display_payloads(
+    session: AsyncSession,
+    client: AsyncQdrantClient,
+    collection_name: str,
+    *,
+    batch_size: int = _BACKFILL_BATCH_SIZE,
+    dry_run: bool = False,
+) -> PayloadSyncResult:
+    """Compare display payloads against Postgres and repair any drift.
+
+    Walks active products in id order (keyset pagination over the display
+    columns only), fetches the matching points' payloads and rewrites the
+    display fields of every point that differs, in one batched update per
+    chunk. Products without a Qdrant point are only counted.
+    """
+    result = PayloadSyncResult()
+    last_id = None
+    while True:
+        stmt = (
+            select(
+                Product.id,
+                Product.title,
+                Product.price,
+                Product.currency,
+                Product.image_url,
+                Product.product_url,
+                Product.category,
+            )
+            .where(Product.archived_at.is_(None))
+            .order_by(Product.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(Product.id > last_id)
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            return result
+        last_id = rows[-1].id
+
+        records = await client.retrieve(
+            collection_name=collection_name,
+            ids=[str(row.id) for row in rows],
+            with_payload=True,
+            with_vectors=False,
+        )
+        payloads = {str(record.id): record.payload or {} for record in records}
+
+        operations = []
+        for row in rows:
+            point_id = str(row.id)
+            result.checked += 1
+            if point_id not in payloads:
+                result.missing += 1
+                continue
+            expected = build_display_fields(
+                title=row.title,
+                price=row.price,
+                currency=row.currency,
+                image_url=row.image_url,
+                product_url=row.product_url,
+                category=row.category,
+            )
+            if display_fields(payloads[point_id]) != expected:
+                operations.append(
+                    SetPayloadOperation(
+                        set_payload=SetPayload(payload=expected, points=[point_id])
+                    )
+                )
+        result.drifted += len(operations)
+
+        if operations and not dry_run:
+            await client.batch_update_points(
+                collection_name=collection_name,
+                update_operations=operations,
+            )
@@ -8,6 +8,9 @@ from __future__ import annotations
 
 import math
 
+from sqlalchemy import Float, case, cast, func
+from sqlalchemy.sql.elements import ColumnElement
+
 _PROFILE_CONFIDENCE_TARGET = 200
 
 
@@ -31,3 +34,19 @@ def compute_profile_confidence(interaction_count: int) -> float:
 
     confidence = math.log1p(safe_count) / math.log1p(_PROFILE_CONFIDENCE_TARGET)
     return min(1.0, confidence)
+
+
+def profile_confidence_expression(
+    interaction_count: ColumnElement[int],
+) -> ColumnElement[float]:
+    """SQL form of ``compute_profile_confidence``.
+
+    Lets one ``UPDATE`` set the confidence from the counter value it writes,
+    e.g. ``profile_confidence_expression(User.interaction_count + n)``.
+    """
+    count = cast(interaction_count, Float)
+    return case(
+        (count <= 0, 0.0),
+        (count >= _PROFILE_CONFIDENCE_TARGET, 1.0),
+        else_=func.ln(count + 1.0) / math.log1p(_PROFILE_CONFIDENCE_TARGET),
+    )
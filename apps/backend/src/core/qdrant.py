@@ -1,10 +1,40 @@
+import logging
+import time
+from weakref import WeakKeyDictionary
+
 from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import Distance, PayloadSchemaType, VectorParams
+from qdrant_client.models import (
+    Distance,
+    HnswConfigDiff,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from src.core.config import Settings, get_settings
+from src.core.product_payload import PRODUCTS_PAYLOAD_SCHEMA
 
-from src.core.config import get_settings
+logger = logging.getLogger(__name__)
 
 _client: AsyncQdrantClient | None = None
 
+# Storage profile -> (original vectors on disk, int8 scalar quantization)
+COLLECTION_PROFILES: dict[str, tuple[bool, bool]] = {
+    "float32": (False, False),
+    "int8": (False, True),
+    "int8_on_disk": (True, True),
+}
+_QUANTIZATION_QUANTILE = 0.99
+
+QUERY_API_MIN_VERSION = (1, 10)
+# Seconds to fall back to the search endpoints after a failed version lookup
+_QUERY_API_RETRY_SECONDS = 60.0
+_query_api_support: WeakKeyDictionary = WeakKeyDictionary()
+_query_api_retry_at: WeakKeyDictionary = WeakKeyDictionary()
+
 
 async def get_qdrant_client() -> AsyncQdrantClient:
     """Get or create the async Qdrant client singleton."""
@@ -18,6 +48,153 @@ async def get_qdrant_client() -> AsyncQdrantClient:
     return _client
 
 
+def collection_config(
+    profile: str,
+    settings: Settings,
+    *,
+    size: int = 768,  # FashionSigLIP embedding dimension
+    distance: Distance = Distance.COSINE,
+) -> dict:
+    """Return the ``create_collection`` arguments for a storage profile.
+
+    Everything here is supported by Qdrant 1.7. The int8 copy is kept in RAM
+    (``always_ram``) so quantized searches never touch disk; only rescoring
+    reads the original vectors. HNSW ``m``/``ef_construct`` come from
+    ``qdrant_hnsw_m``/``qdrant_hnsw_ef_construct`` (Qdrant defaults if unset).
+
+    Raises:
+        ValueError: If ``profile`` is not in ``COLLECTION_PROFILES``.
+    """
+    if profile not in COLLECTION_PROFILES:
+        raise ValueError(
+            f"Unknown collection profile {profile!r}; "
+            f"expected one of {sorted(COLLECTION_PROFILES)}"
+        )
+    on_disk, quantized = COLLECTION_PROFILES[profile]
+
+    hnsw_config = None
+    if (
+        settings.qdrant_hnsw_m is not None
+        or settings.qdrant_hnsw_ef_construct is not None
+    ):
+        hnsw_config = HnswConfigDiff(
+            m=settings.qdrant_hnsw_m,
+            ef_construct=settings.qdrant_hnsw_ef_construct,
+        )
+
+    quantization_config = None
+    if quantized:
+        quantization_config = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=_QUANTIZATION_QUANTILE,
+                always_ram=True,
+            )
+        )
+
+    return {
+        "vectors_config": VectorParams(size=size, distance=distance, on_disk=on_disk),
+        "hnsw_config": hnsw_config,
+        "quantization_config": quantization_config,
+        "on_disk_payload": True,
+    }
+
+
+def product_search_params(settings: Settings) -> SearchParams | None:
+    """Search-time parameters for product searches, or None for defaults.
+
+    Quantization parameters are only sent when the products collection is
+    quantized: the int8 index finds ``oversampling`` times more candidates,
+    which are rescored with the original vectors.
+    """
+    _, quantized = COLLECTION_PROFILES.get(
+        settings.qdrant_products_profile, (False, False)
+    )
+    quantization = None
+    if quantized:
+        quantization = QuantizationSearchParams(
+            rescore=settings.qdrant_search_quantization_rescore,
+            oversampling=settings.qdrant_search_quantization_oversampling,
+        )
+    if settings.qdrant_search_hnsw_ef is None and quantization is None:
+        return None
+    return SearchParams(
+        hnsw_ef=settings.qdrant_search_hnsw_ef,
+        quantization=quantization,
+    )
+
+
+def parse_server_version(version: str) -> tuple[int, ...]:
+    """Parse a Qdrant version string such as ``"1.7.4"`` or ``"v1.10.0-dev"``."""
+    parts = []
+    for part in version.lstrip("v").split("-")[0].split("."):
+        if not part.isdigit():
+            break
+        parts.append(int(part))
+    return tuple(parts)
+
+
+async def query_api_supported(client: AsyncQdrantClient) -> bool:
+    """Whether the server behind ``client`` serves the Query API (1.10+).
+
+    The server version is looked up once per client. A failed lookup counts
+    as unsupported, since the search endpoints work on every server, and is
+    retried after ``_QUERY_API_RETRY_SECONDS``.
+    """
+    try:
+        return _query_api_support[client]
+    except KeyError:
+        pass
+    retry_at = _query_api_retry_at.get(client)
+    if retry_at is not None and time.monotonic() < retry_at:
+        return False
+
+    try:
+        version = (await client.info()).version
+    except Exception:
+        logger.warning(
+            "Could not read the Qdrant server version; using search endpoints.",
+            exc_info=True,
+        )
+        _query_api_retry_at[client] = time.monotonic() + _QUERY_API_RETRY_SECONDS
+        return False
+
+    supported = parse_server_version(version) >= QUERY_API_MIN_VERSION
+    logger.info(
+        "Qdrant server %s: %s",
+        version,
+        "using the Query API" if supported else "using search endpoints",
+    )
+    _query_api_support[client] = supported
+    _query_api_retry_at.pop(client, None)
+    return supported
+
+
+async def collection_names(client: AsyncQdrantClient) -> set[str]:
+    """Names in use by collections and by collection aliases."""
+    collections = await client.get_collections()
+    aliases = await client.get_aliases()
+    return {c.name for c in collections.collections} | {
+        alias.alias_name for alias in aliases.aliases
+    }
+
+
+async def _ensure_collection(collection_name: str, profile: str) -> None:
+    """Create ``collection_name`` with ``profile`` unless the name is taken.
+
+    The name may be an alias of a migrated collection, which counts as
+    existing.
+    """
+    settings = get_settings()
+    client = await get_qdrant_client()
+
+    if collection_name not in await collection_names(client):
+        await client.create_collection(
+            collection_name=collection_name,
+            **collection_config(profile, settings),
+        )
+
+
 async def ensure_collection() -> None:
     """Create the products collection if it doesn't exist.
 
@@ -25,22 +202,12 @@ async def ensure_collection() -> None:
     - 768-dimensional vectors (FashionSigLIP embeddings)
     - Cosine similarity for distance metric
     - On-disk payload storage for large payloads
+    - Vector storage per ``qdrant_products_profile``
     """
     settings = get_settings()
-    client = await get_qdrant_client()
-
-    collections = await client.get_collections()
-    collection_names = [c.name for c in collections.collections]
-
-    if settings.qdrant_collection not in collection_names:
-        await client.create_collection(
-            collection_name=settings.qdrant_collection,
-            vectors_config=VectorParams(
-                size=768,  # FashionSigLIP embedding dimension
-                distance=Distance.COSINE,
-            ),
-            on_disk_payload=True,
-        )
+    await _ensure_collection(
+        settings.qdrant_collection, settings.qdrant_products_profile
+    )
 
 
 async def ensure_cluster_collection() -> None:
@@ -50,22 +217,12 @@ async def ensure_cluster_collection() -> None:
     - 768-dimensional vectors (cluster centroid embeddings)
     - Cosine similarity for distance metric
     - On-disk payload storage for large payloads
+    - Vector storage per ``qdrant_clusters_profile``
     """
     settings = get_settings()
-    client = await get_qdrant_client()
-
-    collections = await client.get_collections()
-    collection_names = [c.name for c in collections.collections]
-
-    if settings.cluster_collection not in collection_names:
-        await client.create_collection(
-            collection_name=settings.cluster_collection,
-            vectors_config=VectorParams(
-                size=768,  # FashionSigLIP embedding dimension
-                distance=Distance.COSINE,
-            ),
-            on_disk_payload=True,
-        )
+    await _ensure_collection(
+        settings.cluster_collection, settings.qdrant_clusters_profile
+    )
 
 
 async def ensure_user_profiles_collection() -> None:
@@ -77,37 +234,30 @@ async def ensure_user_profiles_collection() -> None:
     - 768-dimensional vectors (user style vectors from Modified Rocchio)
     - Cosine similarity for distance metric
     - On-disk payload storage for user metadata
+    - Vector storage per ``qdrant_user_profiles_profile``
     """
     settings = get_settings()
-    client = await get_qdrant_client()
-
-    collections = await client.get_collections()
-    collection_names = [c.name for c in collections.collections]
-
-    if settings.user_profiles_collection not in collection_names:
-        await client.create_collection(
-            collection_name=settings.user_profiles_collection,
-            vectors_config=VectorParams(
-                size=768,  # FashionSigLIP embedding dimension
-                distance=Distance.COSINE,
-            ),
-            on_disk_payload=True,
-        )
+    await _ensure_collection(
+        settings.user_profiles_collection, settings.qdrant_user_profiles_profile
+    )
 
 
 async def ensure_products_payload_indexes() -> None:
     """Create payload indexes on the products collection for filter performance.
 
-    Idempotent — Qdrant ignores if the index already exists.
+    One index per field of ``PRODUCTS_PAYLOAD_SCHEMA`` (every field the feed
+    filters or range-scans on). Idempotent — Qdrant ignores if the index
+    already exists.
     """
     settings = get_settings()
     client = await get_qdrant_client()
 
-    await client.create_payload_index(
-        collection_name=settings.qdrant_collection,
-        field_name="archived",
-        field_schema=PayloadSchemaType.BOOL,
-    )
+    for field_name, field_schema in PRODUCTS_PAYLOAD_SCHEMA.items():
+        await client.create_payload_index(
+            collection_name=settings.qdrant_collection,
+            field_name=field_name,
+            field_schema=field_schema,
+        )
 
 
 async def health_check() -> bool:
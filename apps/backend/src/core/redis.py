@@ -0,0 +1,41 @@
+"""Optional Redis client for shared caches.
+
+Redis is only used when ``REDIS_URL`` is configured. The ``redis`` package is
+imported lazily so deployments without Redis never need it installed.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.core.config import get_settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+_client: Redis | None = None
+
+
+def get_redis_client() -> Redis | None:
+    """Get or create the async Redis client singleton.
+
+    Returns None when no Redis URL is configured.
+    """
+    global _client
+    if _client is None:
+        settings = get_settings()
+        if not settings.redis_url:
+            return None
+
+        from redis.asyncio import Redis
+
+        _client = Redis.from_url(settings.redis_url)
+    return _client
+
+
+async def close_client() -> None:
+    """Close the Redis client connection."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,197 @@
+"""Product retrieval backends.
+
+Product candidate searches go through a ``RetrievalBackend`` instead of
+calling ``AsyncQdrantClient`` directly, so the products collection can be
+served either by the remote Qdrant server or by the in-process
+``LocalVectorIndex`` (``retrieval_backend="local"``).
+
+Only the products collection is pluggable. User profiles and style clusters
+always live in Qdrant.
+
+``QdrantRetrievalBackend`` speaks whichever API the server has: the Query API
+(``query_points``/``query_batch_points``) on Qdrant 1.10+, and the search
+endpoints on older servers such as the deployed 1.7.4. Each batch stays one
+round trip either way.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Filter,
+    NamedVector,
+    QueryRequest,
+    Record,
+    ScoredPoint,
+    SearchRequest,
+)
+
+from src.core.config import Settings
+from src.core.qdrant import query_api_supported
+
+
+class RetrievalBackend:
+    """Base class for filtered vector search and id lookup over products."""
+
+    async def search(
+        self,
+        query_vector: list[float],
+        *,
+        query_filter: Filter | None = None,
+        limit: int = 10,
+        score_threshold: float | None = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+    ) -> list[ScoredPoint]:
+        raise NotImplementedError
+
+    async def search_batch(
+        self, requests: list[SearchRequest]
+    ) -> list[list[ScoredPoint]]:
+        """Run several searches, in one round trip where the backend can."""
+        raise NotImplementedError
+
+    async def retrieve(
+        self,
+        ids: Iterable,
+        *,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+    ) -> list[Record]:
+        raise NotImplementedError
+
+
+class QdrantRetrievalBackend(RetrievalBackend):
+    """``RetrievalBackend`` over one collection of a Qdrant server.
+
+    Args:
+        client: Async Qdrant client instance.
+        collection_name: Collection to search.
+        query_api: ``"auto"`` uses the Query API when the server version
+            supports it; ``"always"``/``"never"`` skip the detection.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        query_api: str = "auto",
+    ) -> None:
+        self._client = client
+        self._collection_name = collection_name
+        self._query_api = query_api
+
+    async def _use_query_api(self) -> bool:
+        if self._query_api == "auto":
+            return await query_api_supported(self._client)
+        return self._query_api == "always"
+
+    @staticmethod
+    def _to_query_request(request: SearchRequest) -> QueryRequest:
+        """Translate a ``search_batch`` request into its Query API form."""
+        vector = request.vector
+        using = None
+        if isinstance(vector, NamedVector):
+            vector, using = vector.vector, vector.name
+        return QueryRequest(
+            query=vector,
+            using=using,
+            filter=request.filter,
+            params=request.params,
+            limit=request.limit,
+            offset=request.offset,
+            score_threshold=request.score_threshold,
+            with_payload=request.with_payload,
+            with_vector=request.with_vector,
+        )
+
+    async def search(
+        self,
+        query_vector: list[float],
+        *,
+        query_filter: Filter | None = None,
+        limit: int = 10,
+        score_threshold: float | None = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+    ) -> list[ScoredPoint]:
+        """Run a vector search compatible with the current client/server mix.
+
+        Servers with the Query API get `query_points()`. On older servers
+        (the deployed stack pairs a newer client with Qdrant 1.7, where
+        `query_points()` returns 404) prefer public `search` if available,
+        then fall back to the underlying client's `search`, and only use
+        `query_points` when search is unavailable.
+        """
+        kwargs = {
+            "collection_name": self._collection_name,
+            "query_filter": query_filter,
+            "limit": limit,
+            "with_payload": with_payload,
+            "with_vectors": with_vectors,
+        }
+        if score_threshold is not None:
+            kwargs["score_threshold"] = score_threshold
+
+        if await self._use_query_api():
+            response = await self._client.query_points(query=query_vector, **kwargs)
+            return response.points
+
+        public_search = getattr(self._client, "search", None)
+        if callable(public_search):
+            return await public_search(query_vector=query_vector, **kwargs)
+
+        internal_client = getattr(self._client, "_client", None)
+        internal_search = getattr(internal_client, "search", None)
+        if callable(internal_search):
+            return await internal_search(query_vector=query_vector, **kwargs)
+
+        response = await self._client.query_points(query=query_vector, **kwargs)
+        return response.points
+
+    async def search_batch(
+        self, requests: list[SearchRequest]
+    ) -> list[list[ScoredPoint]]:
+        """Run all searches in one round trip (``query_batch_points`` on
+        servers with the Query API, ``search_batch`` otherwise)."""
+        if await self._use_query_api():
+            responses = await self._client.query_batch_points(
+                collection_name=self._collection_name,
+                requests=[self._to_query_request(request) for request in requests],
+            )
+            return [response.points for response in responses]
+        return await self._client.search_batch(
+            collection_name=self._collection_name,
+            requests=requests,
+        )
+
+    async def retrieve(
+        self,
+        ids: Iterable,
+        *,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+    ) -> list[Record]:
+        return await self._client.retrieve(
+            collection_name=self._collection_name,
+            ids=list(ids),
+            with_payload=with_payload,
+            with_vectors=with_vectors,
+        )
+
+
+def get_retrieval_backend(
+    qdrant_client: AsyncQdrantClient, settings: Settings
+) -> RetrievalBackend:
+    """Return the configured backend for the products collection."""
+    # Imported here: the local index module subclasses RetrievalBackend
+    from src.core.local_index import get_local_index
+
+    local_index = get_local_index(settings)
+    if local_index is not None:
+        return local_index
+    return QdrantRetrievalBackend(
+        qdrant_client, settings.qdrant_collection, settings.qdrant_query_api
+    )
@@ -0,0 +1,130 @@
+"""Multi-interest user profiles stored as sub-points of ``user_profiles``.
+
+A single averaged style vector under-serves users with several distinct
+tastes (THE_BRAIN.md, Phase C). With ``profile_interest_count`` > 1 each user
+additionally gets up to that many interest vectors:
+
+- the main point (id = user id) keeps the averaged vector, so every
+  single-vector reader (cold start, cluster lookups, batch feeds) is
+  unaffected
+- interest ``k`` is a sub-point with the deterministic id
+  ``interest_point_id(user_id, k)`` and payload ``{"user_id", "kind":
+  "interest", "interest_index", "weight"}``
+
+Deterministic ids let readers fetch all interests with one ``retrieve``
+instead of a filtered scroll. ``ProfileUpdateService`` seeds the first
+interest from the main vector, moves the interest nearest to each
+interaction, and spawns a new interest for a liked item unlike every
+existing one. ``FeedService`` searches all interests in one
+``search_batch`` and merges the results by weight-proportional quotas.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from uuid import UUID, uuid5
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import PointStruct
+
+INTEREST_KIND = "interest"
+
+# Fixed namespace so interest point ids are reproducible across processes
+_INTEREST_NAMESPACE = UUID("6f1e4d2a-93a8-4c55-9a51-3d0f8e7b2c41")
+
+
+@dataclass
+class UserInterest:
+    vector: list[float]
+    weight: float = 1.0
+
+
+def interest_point_id(user_id: object, index: int) -> str:
+    """Qdrant point id of the user's ``index``-th interest."""
+    return str(uuid5(_INTEREST_NAMESPACE, f"{user_id}:{index}"))
+
+
+def interest_point_ids(user_id: object, count: int) -> list[str]:
+    return [interest_point_id(user_id, index) for index in range(count)]
+
+
+def build_interest_points(
+    user_id: object, interests: Sequence[UserInterest]
+) -> list[PointStruct]:
+    """Build the sub-points for ``interests``, in interest order."""
+    return [
+        PointStruct(
+            id=interest_point_id(user_id, index),
+            vector=list(interest.vector),
+            payload={
+                "user_id": str(user_id),
+                "kind": INTEREST_KIND,
+                "interest_index": index,
+                "weight": float(interest.weight),
+            },
+        )
+        for index, interest in enumerate(interests)
+    ]
+
+
+async def load_user_interests(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    user_id: object,
+    count: int,
+) -> list[UserInterest]:
+    """Load the user's interests with a single ``retrieve``, in interest order."""
+    if count <= 1:
+        return []
+    points = await client.retrieve(
+        collection_name=collection_name,
+        ids=interest_point_ids(user_id, count),
+        with_vectors=True,
+        with_payload=True,
+    )
+    ordered = sorted(
+        (
+            point
+            for point in points
+            if point.vector is not None
+            and (point.payload or {}).get("kind") == INTEREST_KIND
+        ),
+        key=lambda point: point.payload.get("interest_index", 0),
+    )
+    return [
+        UserInterest(
+            vector=list(point.vector),
+            weight=float(point.payload.get("weight", 1.0)),
+        )
+        for point in ordered
+    ]
+
+
+def interest_quotas(weights: Sequence[float], page_size: int) -> list[int]:
+    """Split ``page_size`` slots across interests in proportion to weight.
+
+    Uses largest remainders, and gives every interest at least one slot
+    when the page has room for all of them.
+    """
+    if not weights:
+        return []
+    positive = [max(weight, 0.0) for weight in weights]
+    if sum(positive) <= 0:
+        positive = [1.0] * len(positive)
+    total = sum(positive)
+
+    shares = [page_size * weight / total for weight in positive]
+    quotas = [math.floor(share) for share in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda i: (quotas[i] - shares[i], i))
+    for index in by_remainder[: page_size - sum(quotas)]:
+        quotas[index] += 1
+
+    if page_size >= len(quotas):
+        for index in range(len(quotas)):
+            if quotas[index] == 0:
+                donor = max(range(len(quotas)), key=lambda i: (quotas[i], -i))
+                quotas[donor] -= 1
+                quotas[index] = 1
+    return quotas
@@ -0,0 +1,216 @@
+"""Process-wide cache of style cluster priors and centroids.
+
+The style_clusters collection is small (10-200 centroids) and only changes when
+clustering is rebuilt, so feed requests read it from memory instead of
+scrolling Qdrant every time.
+
+Freshness is tracked through a ``cluster_version`` marker that
+``ClusteringService.store_results`` writes into every centroid payload:
+- A rebuild in this process invalidates the cache directly.
+- Other processes compare the marker on point 0 every
+  ``cluster_cache_version_check_seconds`` and reload when it changed.
+- Independently, a full reload happens after ``cluster_cache_ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+
+from src.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Scroll batch size for loading centroids (the collection holds <= 200 points)
+_SCROLL_BATCH_SIZE = 256
+# Point id that carries the version marker (clusters are stored as 0..k-1)
+_VERSION_MARKER_POINT_ID = 0
+
+
+@dataclass
+class ClusterSnapshot:
+    """Immutable view of the current clustering run.
+
+    Attributes:
+        version: ``cluster_version`` marker of the run, or None for legacy data.
+        priors: Mapping cluster_index -> prior_probability.
+        cluster_indices: Cluster index for each centroid row, shape (k,).
+        centroids: L2-normalized centroid matrix, shape (k, dim), float32.
+    """
+
+    version: str | None
+    priors: dict[int, float] = field(default_factory=dict)
+    cluster_indices: np.ndarray = field(
+        default_factory=lambda: np.empty(0, dtype=np.int64)
+    )
+    centroids: np.ndarray = field(
+        default_factory=lambda: np.empty((0, 0), dtype=np.float32)
+    )
+
+    def nearest_clusters(self, vector: list[float], limit: int) -> list[int]:
+        """Return cluster indices ordered by cosine similarity to ``vector``."""
+        if len(self.cluster_indices) == 0 or limit <= 0:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        similarities = self.centroids @ query
+        order = np.argsort(-similarities, kind="stable")[:limit]
+        return [int(self.cluster_indices[i]) for i in order]
+
+
+class ClusterCache:
+    """Lazily loaded, versioned cache of the style_clusters collection.
+
+    Args:
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._snapshot: ClusterSnapshot | None = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot so the next read reloads from Qdrant."""
+        self._snapshot = None
+
+    async def get(
+        self, qdrant: AsyncQdrantClient, settings: Settings
+    ) -> ClusterSnapshot:
+        """Return the current snapshot, reloading it when stale."""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._needs_check(settings):
+            return snapshot
+
+        async with self._lock:
+            if self._snapshot is not None and not self._needs_check(settings):
+                return self._snapshot
+
+            now = self._clock()
+            if (
+                self._snapshot is not None
+                and now - self._loaded_at < settings.cluster_cache_ttl_seconds
+            ):
+                marker = await self._load_version_marker(qdrant, settings)
+                self._checked_at = now
+                if marker == self._snapshot.version:
+                    return self._snapshot
+                logger.info(
+                    "Cluster version changed %s -> %s; reloading cluster cache",
+                    self._snapshot.version,
+                    marker,
+                )
+
+            self._snapshot = await self._load_snapshot(qdrant, settings)
+            self._loaded_at = self._checked_at = self._clock()
+            return self._snapshot
+
+    def _needs_check(self, settings: Settings) -> bool:
+        now = self._clock()
+        return (
+            now - self._checked_at >= settings.cluster_cache_version_check_seconds
+            or now - self._loaded_at >= settings.cluster_cache_ttl_seconds
+        )
+
+    @staticmethod
+    async def _load_version_marker(
+        qdrant: AsyncQdrantClient, settings: Settings
+    ) -> str | None:
+        points = await qdrant.retrieve(
+            collection_name=settings.cluster_collection,
+            ids=[_VERSION_MARKER_POINT_ID],
+            with_payload=True,
+            with_vectors=False,
+        )
+        if not points:
+            return None
+        return (points[0].payload or {}).get("cluster_version")
+
+    @staticmethod
+    async def _load_snapshot(
+        qdrant: AsyncQdrantClient, settings: Settings
+    ) -> ClusterSnapshot:
+        """Scroll every centroid (with vectors) and build a snapshot.
+
+        Only points carrying the same ``cluster_version`` as point 0 are kept,
+        so centroids left over from an earlier run with a larger k are ignored.
+        """
+        points = []
+        offset = None
+        while True:
+            results, next_offset = await qdrant.scroll(
+                collection_name=settings.cluster_collection,
+                limit=_SCROLL_BATCH_SIZE,
+                offset=offset,
+                with_vectors=True,
+                with_payload=True,
+            )
+            points.extend(results)
+            if not results or next_offset is None:
+                break
+            offset = next_offset
+
+        version = None
+        for point in points:
+            if point.id == _VERSION_MARKER_POINT_ID:
+                version = (point.payload or {}).get("cluster_version")
+                break
+
+        priors: dict[int, float] = {}
+        indices: list[int] = []
+        vectors: list[list[float]] = []
+        for point in points:
+            payload = point.payload or {}
+            cluster_index = payload.get("cluster_index")
+            if cluster_index is None:
+                continue
+            if version is not None and payload.get("cluster_version") != version:
+                continue
+
+            priors[int(cluster_index)] = float(payload.get("prior_probability", 0.0))
+            if point.vector is not None:
+                indices.append(int(cluster_index))
+                vectors.append(point.vector)
+
+        centroids = np.asarray(vectors, dtype=np.float32)
+        if len(vectors):
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids = centroids / np.where(norms > 0, norms, 1.0)
+        else:
+            centroids = np.empty((0, 0), dtype=np.float32)
+
+        logger.info(
+            "Loaded %d cluster priors and %d centroids (version=%s)",
+            len(priors),
+            len(indices),
+            version,
+        )
+        return ClusterSnapshot(
+            version=version,
+            priors=priors,
+            cluster_indices=np.asarray(indices, dtype=np.int64),
+            centroids=centroids,
+        )
+
+
+_cache: ClusterCache | None = None
+
+
+def get_cluster_cache() -> ClusterCache:
+    """Get or create the process-wide cluster cache."""
+    global _cache
+    if _cache is None:
+        _cache = ClusterCache()
+    return _cache
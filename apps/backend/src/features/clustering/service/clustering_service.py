@@ -12,6 +12,7 @@ from __future__ import annotations
 import asyncio
 import logging
 from typing import Any
+from uuid import uuid4
 
 import numpy as np
 from qdrant_client import AsyncQdrantClient
@@ -19,6 +20,7 @@ from qdrant_client.models import PointStruct
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import Settings
+from src.features.clustering.service.cluster_cache import get_cluster_cache
 from src.features.clustering.service.cluster_repository import ClusterRepository
 
 logger = logging.getLogger(__name__)
@@ -178,6 +180,10 @@ class ClusteringService:
         b) Upsert centroid vectors to Qdrant "style_clusters" collection.
         c) Update product points in Qdrant "products" collection with
            cluster_id in payload.
+        d) Invalidate the in-process cluster cache.
+
+        Every centroid payload carries the same ``cluster_version`` marker so
+        cluster caches in other processes can detect the new run.
 
         Args:
             point_ids: List of Qdrant point IDs for products.
@@ -187,6 +193,7 @@ class ClusteringService:
         """
         n_samples = len(point_ids)
         k = len(centroids)
+        cluster_version = uuid4().hex
 
         # --- (a) Upsert cluster metadata to PostgreSQL ---
         cluster_data: list[dict[str, Any]] = []
@@ -211,6 +218,7 @@ class ClusteringService:
                 vector=centroids[cluster_idx].tolist(),
                 payload={
                     "cluster_index": cluster_idx,
+                    "cluster_version": cluster_version,
                     "product_count": int(np.sum(labels == cluster_idx)),
                     "prior_probability": (
                         float(np.sum(labels == cluster_idx) / n_samples)
@@ -247,6 +255,10 @@ class ClusteringService:
 
         logger.info("Updated cluster_id payload for %d products in Qdrant", n_samples)
 
+        # --- (d) Refresh cached priors/centroids in this process ---
+        get_cluster_cache().invalidate()
+        logger.info("Cluster cache invalidated (version=%s)", cluster_version)
+
     async def rebuild_clusters(self, session: AsyncSession) -> dict[str, Any]:
         """Orchestrate full clustering pipeline.
 
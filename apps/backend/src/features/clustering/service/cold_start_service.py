@@ -21,6 +21,11 @@ from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import FieldCondition, Filter, MatchValue
 
 from src.core.config import Settings
+from src.core.retrieval import (
+    QdrantRetrievalBackend,
+    RetrievalBackend,
+    get_retrieval_backend,
+)
 from src.features.clustering.schemas.schemas import ColdStartMatch, ColdStartResponse
 
 logger = logging.getLogger(__name__)
@@ -39,11 +44,25 @@ class ColdStartService:
     Args:
         qdrant_client: Async Qdrant client instance.
         settings: Application settings with clustering config.
+        retrieval: Backend for product searches. Defaults to the configured
+            one (``retrieval_backend``).
     """
 
-    def __init__(self, qdrant_client: AsyncQdrantClient, settings: Settings) -> None:
+    def __init__(
+        self,
+        qdrant_client: AsyncQdrantClient,
+        settings: Settings,
+        retrieval: RetrievalBackend | None = None,
+    ) -> None:
         self._qdrant = qdrant_client
         self._settings = settings
+        self._retrieval = retrieval
+
+    def _products(self) -> RetrievalBackend:
+        """Return the backend serving product searches."""
+        if self._retrieval is not None:
+            return self._retrieval
+        return get_retrieval_backend(self._qdrant, self._settings)
 
     @staticmethod
     def _average_embeddings(embeddings: list[list[float]]) -> list[float]:
@@ -59,46 +78,18 @@ class ColdStartService:
         with_payload: bool = True,
         with_vectors: bool = False,
     ) -> list:
-        """Run a Qdrant vector search compatible with the current client/server mix.
-
-        The deployed stack uses a newer client against an older Qdrant server.
-        `query_points()` maps to an endpoint that returns 404 on Qdrant 1.7,
-        while the older `search` path is still supported. Prefer public
-        `search` if available, then fall back to the underlying client's
-        `search`, and only use `query_points` when search is unavailable.
-        """
-        public_search = getattr(self._qdrant, "search", None)
-        if callable(public_search):
-            return await public_search(
-                collection_name=collection_name,
-                query_vector=query_vector,
-                query_filter=query_filter,
-                limit=limit,
-                with_payload=with_payload,
-                with_vectors=with_vectors,
-            )
-
-        internal_client = getattr(self._qdrant, "_client", None)
-        internal_search = getattr(internal_client, "search", None)
-        if callable(internal_search):
-            return await internal_search(
-                collection_name=collection_name,
-                query_vector=query_vector,
-                query_filter=query_filter,
-                limit=limit,
-                with_payload=with_payload,
-                with_vectors=with_vectors,
-            )
-
-        response = await self._qdrant.query_points(
-            collection_name=collection_name,
-            query=query_vector,
+        """Run a vector search against a Qdrant collection (see
+        ``QdrantRetrievalBackend.search`` for the client/server compatibility
+        handling)."""
+        return await QdrantRetrievalBackend(
+            self._qdrant, collection_name, self._settings.qdrant_query_api
+        ).search(
+            query_vector,
             query_filter=query_filter,
             limit=limit,
             with_payload=with_payload,
             with_vectors=with_vectors,
         )
-        return response.points
 
     async def find_nearest_clusters(
         self, embeddings: list[list[float]], top_k: int = 5
@@ -169,9 +160,8 @@ class ColdStartService:
         cluster_indices: list[int] | None = None,
     ) -> list[dict]:
         """Search products by vector similarity, optionally constrained to clusters."""
-        results = await self._search_scored_points(
-            collection_name=self._settings.qdrant_collection,
-            query_vector=query_vector,
+        results = await self._products().search(
+            query_vector,
             query_filter=self._build_cluster_filter(cluster_indices or []),
             limit=max(1, limit),
             with_payload=True,
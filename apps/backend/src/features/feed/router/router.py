@@ -2,36 +2,67 @@
 
 Provides GET /feed endpoint that returns a ranked, diversity-injected
 personalized feed for authenticated users. Uses opaque cursor pagination
-for infinite scroll support.
+for infinite scroll support. GET /feed/stream serves the same pages as an
+NDJSON/SSE stream of items followed by the page metadata.
 
 Cursor format: base64-encoded JSON {"o": offset, "b": batch_id}
+
+The first page ranks a deep batch (``feed_batch_size`` items) and stores it
+under its batch_id. Later pages slice the stored snapshot; the batch is only
+regenerated when the snapshot expired, was evicted, or belongs to another
+user or category.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import logging
+from collections.abc import AsyncIterator
+from typing import Annotated
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.config import get_settings
+from src.core.config import Settings, get_settings
 from src.core.database import get_db
 from src.core.dependencies import get_current_user
+from src.core.metrics import counter
 from src.core.qdrant import get_qdrant_client
-from src.features.feed.schemas.schemas import FeedItem, FeedResponse
-from src.features.feed.service.feed_service import FeedService
+from src.features.feed.schemas.schemas import FeedItem, FeedPageInfo, FeedResponse
+from src.features.feed.service.batch_store import (
+    FeedBatchSnapshot,
+    get_feed_batch_store,
+)
+from src.features.feed.service.feed_service import (
+    FEED_STAGE_SECONDS,
+    FeedService,
+    PrefixCallback,
+)
+from src.features.feed.service.feed_warmer import get_feed_warmer
 from src.features.feed.service.ranking_service import RankedCandidate
+from src.features.products.service.product_card_cache import (
+    get_product_card_cache,
+)
 from src.features.products.utils import ProductCategory
-from src.models.product import Product
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/feed", tags=["Feed"])
 
+FEED_ENRICHMENT_ITEMS = counter(
+    "feed_enrichment_items_total",
+    "Feed items by where their display fields came from (payload, card_cache).",
+    labelnames=("source",),
+)
+FEED_STREAM_EARLY_ITEMS = counter(
+    "feed_stream_early_items_total",
+    "Streamed feed items sent before the whole batch was generated.",
+)
+
 # Explanation templates (exactly 3 per PROJECT.md)
 _EXPLANATION_SIMILAR = "Similar to your recent likes"
 _EXPLANATION_STYLE = "Matches your style"
@@ -39,6 +70,12 @@ _EXPLANATION_PRICE = "Within your usual price range"
 _EXPLANATION_TRENDING = "Trending with other shoppers"
 
 
+def _get_session_factory():
+    from src.core.database import SessionLocal
+
+    return SessionLocal
+
+
 def _encode_cursor(offset: int, batch_id: str) -> str:
     """Encode pagination state into an opaque cursor string.
 
@@ -77,6 +114,13 @@ def _decode_cursor(cursor: str) -> tuple[int, str]:
         raise ValueError(f"Invalid cursor format: {exc}") from exc
 
 
+def _format_server_timing(stage_timings: dict[str, float]) -> str:
+    """Format per-stage timings (ms) as a ``Server-Timing`` header value."""
+    return ", ".join(
+        f"{name};dur={duration:.1f}" for name, duration in stage_timings.items()
+    )
+
+
 def _select_explanation(candidate: RankedCandidate) -> str:
     """Select an explanation template based on the dominant scoring factor.
 
@@ -108,8 +152,172 @@ def _select_explanation(candidate: RankedCandidate) -> str:
     return _EXPLANATION_SIMILAR
 
 
+def _parse_cursor(cursor: str | None) -> tuple[int, str]:
+    """Return (offset, batch_id) for a request; a fresh batch for no cursor.
+
+    Raises:
+        HTTPException 400: Invalid cursor format.
+    """
+    if cursor is None:
+        return 0, str(uuid4())
+    try:
+        return _decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+async def _load_snapshot(
+    *,
+    settings: Settings,
+    cursor: str | None,
+    batch_id: str,
+    user_id: str,
+    category: str | None,
+    session: AsyncSession,
+    page_size: int,
+) -> FeedBatchSnapshot | None:
+    """Return a stored or warmed batch for this request, if one is usable."""
+    batch_store = get_feed_batch_store(settings)
+
+    # Reuse the ranked batch snapshot for follow-up pages
+    snapshot = await batch_store.get(batch_id) if cursor is not None else None
+    if snapshot is not None and (
+        snapshot.user_id != user_id or snapshot.category != category
+    ):
+        logger.warning("Ignoring feed batch %s owned by another request", batch_id)
+        snapshot = None
+
+    # Serve a warmed batch for a fresh first page, if one is valid
+    if snapshot is None and cursor is None:
+        snapshot = await get_feed_warmer(settings).take(
+            user_id, category, session, page_size
+        )
+        if snapshot is not None:
+            await batch_store.put(batch_id, snapshot)
+    return snapshot
+
+
+async def _generate_snapshot(
+    *,
+    settings: Settings,
+    batch_id: str,
+    user_id: str,
+    category: str | None,
+    session: AsyncSession,
+    page_size: int,
+    batch_size: int,
+    on_prefix: PrefixCallback | None = None,
+) -> tuple[FeedBatchSnapshot, dict[str, float]]:
+    """Generate (retrieve, rank, inject diversity) and store a new batch.
+
+    The batch is ranked ``batch_size`` deep, but filters are only widened
+    (and revisits only allowed) when fewer than ``page_size`` unseen
+    candidates match, so a deep batch never pulls seen items into the page.
+    """
+    qdrant_client = await get_qdrant_client()
+    feed_service = FeedService(qdrant_client=qdrant_client, settings=settings)
+    feed_result = await feed_service.generate_feed(
+        user_id=user_id,
+        seen_ids=[],
+        session=session,
+        category=category,
+        page_size=page_size,
+        batch_size=batch_size,
+        on_prefix=on_prefix,
+    )
+    snapshot = FeedBatchSnapshot(
+        user_id=user_id,
+        category=category,
+        feed_mode=feed_result.feed_mode,
+        candidates=feed_result.candidates,
+    )
+    await get_feed_batch_store(settings).put(batch_id, snapshot)
+    return snapshot, feed_result.stage_timings
+
+
+async def _build_items(
+    candidates: list[RankedCandidate],
+    *,
+    settings: Settings,
+    session: AsyncSession,
+) -> list[FeedItem]:
+    """Turn ranked candidates into feed items with display fields.
+
+    Display fields come from the payload when enabled, and from the product
+    card cache for the rest. Candidates without metadata are skipped.
+    """
+    if not candidates:
+        return []
+
+    use_payload = settings.product_payload_display_fields
+    display_map: dict[str, dict] = {
+        c.product_id: c.display
+        for c in candidates
+        if use_payload and c.display is not None
+    }
+    product_ids = [c.product_id for c in candidates if c.product_id not in display_map]
+
+    if display_map:
+        FEED_ENRICHMENT_ITEMS.inc(len(display_map), source="payload")
+    if product_ids:
+        FEED_ENRICHMENT_ITEMS.inc(len(product_ids), source="card_cache")
+        with FEED_STAGE_SECONDS.time(stage="enrichment"):
+            cards = await get_product_card_cache(settings).get_many(
+                session, product_ids
+            )
+        display_map.update(
+            (product_id, card.display()) for product_id, card in cards.items()
+        )
+
+    # Build FeedItem list with explanation templates
+    items: list[FeedItem] = []
+    for candidate in candidates:
+        display = display_map.get(candidate.product_id)
+        if display is None:
+            # Skip candidates without matching product metadata
+            logger.warning(
+                "Product metadata not found for product_id=%s, skipping",
+                candidate.product_id,
+            )
+            continue
+
+        items.append(
+            FeedItem(
+                product_id=candidate.product_id,
+                **display,
+                score=candidate.score,
+                explanation=_select_explanation(candidate),
+            )
+        )
+    return items
+
+
+def _page_info(
+    snapshot: FeedBatchSnapshot,
+    *,
+    offset: int,
+    page_size: int,
+    batch_id: str,
+) -> FeedPageInfo:
+    """Pagination metadata; encodes the next cursor if more items remain."""
+    total_in_batch = len(snapshot.candidates)
+    new_offset = offset + page_size
+    has_more = new_offset < total_in_batch
+    return FeedPageInfo(
+        next_cursor=_encode_cursor(new_offset, batch_id) if has_more else None,
+        has_more=has_more,
+        total_in_batch=total_in_batch,
+        active_category=snapshot.category,
+        feed_mode=snapshot.feed_mode,
+    )
+
+
 @router.get("/", response_model=FeedResponse)
 async def get_feed(
+    response: Response,
     cursor: str | None = None,
     page_size: int = Query(default=20, ge=1, le=50),
     category: ProductCategory | None = Query(default=None),
@@ -124,6 +332,7 @@ async def get_feed(
     Args:
         cursor: Opaque pagination cursor (base64 JSON). None for first page.
         page_size: Number of items per page (1-50, default 20).
+        response: Outgoing response (used for the Server-Timing header).
         user_id: Authenticated user ID from JWT token.
         session: Async SQLAlchemy database session.
 
@@ -134,98 +343,172 @@ async def get_feed(
         HTTPException 400: Invalid cursor format.
     """
     # Step 1: Decode cursor if provided
-    offset = 0
-    batch_id = str(uuid4())
-
-    if cursor is not None:
-        try:
-            offset, batch_id = _decode_cursor(cursor)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid pagination cursor",
-            )
-
-    # Step 2: Instantiate FeedService
-    qdrant_client = await get_qdrant_client()
+    offset, batch_id = _parse_cursor(cursor)
+    category_value = category.value if category is not None else None
     settings = get_settings()
-    feed_service = FeedService(qdrant_client=qdrant_client, settings=settings)
 
-    # Step 3: Generate feed (retrieve, rank, inject diversity)
-    feed_result = await feed_service.generate_feed(
+    # Step 2: Reuse a stored or warmed batch
+    snapshot = await _load_snapshot(
+        settings=settings,
+        cursor=cursor,
+        batch_id=batch_id,
         user_id=str(user_id),
-        seen_ids=[],
+        category=category_value,
         session=session,
-        category=category.value if category is not None else None,
-        page_size=page_size + offset,  # Fetch enough to skip offset items
+        page_size=page_size,
     )
 
-    # Apply offset for cursor pagination
-    total_in_batch = len(feed_result.candidates)
-    paged_candidates = feed_result.candidates[offset : offset + page_size]
-
-    if not paged_candidates:
-        return FeedResponse(
-            items=[],
-            next_cursor=None,
-            has_more=False,
-            total_in_batch=total_in_batch,
-            active_category=category.value if category is not None else None,
-            feed_mode=feed_result.feed_mode,
+    # Step 3: Generate feed (retrieve, rank, inject diversity) on a miss
+    if snapshot is None:
+        snapshot, stage_timings = await _generate_snapshot(
+            settings=settings,
+            batch_id=batch_id,
+            user_id=str(user_id),
+            category=category_value,
+            session=session,
+            page_size=page_size,
+            batch_size=max(settings.feed_batch_size, offset + page_size),
         )
+        if stage_timings:
+            response.headers["Server-Timing"] = _format_server_timing(stage_timings)
 
-    # Step 4: Enrich with product metadata from PostgreSQL
-    product_ids = []
-    for product_id in (c.product_id for c in paged_candidates):
-        try:
-            product_ids.append(UUID(product_id))
-        except ValueError:
-            logger.warning("Skipping invalid feed product_id=%s", product_id)
-
-    stmt = select(Product).where(Product.id.in_(product_ids))
-    result = await session.execute(stmt)
-    products = result.scalars().all()
-
-    # Build lookup by PostgreSQL UUID string (matches Qdrant point ID payload).
-    product_map: dict[str, Product] = {str(p.id): p for p in products}
+    # Step 4: Enrich the requested page
+    items = await _build_items(
+        snapshot.candidates[offset : offset + page_size],
+        settings=settings,
+        session=session,
+    )
 
-    # Step 5: Build FeedItem list with explanation templates
-    items: list[FeedItem] = []
-    for candidate in paged_candidates:
-        product = product_map.get(candidate.product_id)
-        if product is None:
-            # Skip candidates without matching product metadata
-            logger.warning(
-                "Product metadata not found for product_id=%s, skipping",
-                candidate.product_id,
+    # Step 5: Return the page with its cursor
+    page = _page_info(snapshot, offset=offset, page_size=page_size, batch_id=batch_id)
+    return FeedResponse(items=items, **page.model_dump())
+
+
+def _format_event(event: str, data: str, *, sse: bool) -> str:
+    """Frame one stream event as an SSE message or an NDJSON line."""
+    if sse:
+        return f"event: {event}\ndata: {data}\n\n"
+    return f'{{"type": "{event}", "data": {data}}}\n'
+
+
+async def _stream_feed_events(
+    *,
+    settings: Settings,
+    cursor: str | None,
+    offset: int,
+    batch_id: str,
+    page_size: int,
+    user_id: str,
+    category: str | None,
+    sse: bool,
+) -> AsyncIterator[str]:
+    """Yield the page's items as they become ready, then its page info.
+
+    Generation and enrichment use separate sessions, so the items whose
+    position is already fixed can be enriched and sent while the rest of
+    the batch (e.g. the trending blend) is still being computed.
+    """
+    session_factory = _get_session_factory()
+    async with session_factory() as session, session_factory() as enrich_session:
+        sent = 0
+        try:
+            snapshot = await _load_snapshot(
+                settings=settings,
+                cursor=cursor,
+                batch_id=batch_id,
+                user_id=user_id,
+                category=category,
+                session=session,
+                page_size=page_size,
             )
-            continue
-
-        items.append(
-            FeedItem(
-                product_id=candidate.product_id,
-                title=product.title,
-                price=float(product.price),
-                currency=product.currency,
-                image_url=product.image_url,
-                product_url=product.product_url,
-                category=product.category,
-                score=candidate.score,
-                explanation=_select_explanation(candidate),
+            if snapshot is None:
+                prefixes: asyncio.Queue[list[RankedCandidate]] = asyncio.Queue()
+                generation = asyncio.ensure_future(
+                    _generate_snapshot(
+                        settings=settings,
+                        batch_id=batch_id,
+                        user_id=user_id,
+                        category=category,
+                        session=session,
+                        page_size=page_size,
+                        batch_size=max(settings.feed_batch_size, offset + page_size),
+                        on_prefix=prefixes.put,
+                    )
+                )
+                prefix = asyncio.ensure_future(prefixes.get())
+                try:
+                    await asyncio.wait(
+                        {generation, prefix}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if prefix.done():
+                        early = prefix.result()[offset : offset + page_size]
+                        for item in await _build_items(
+                            early, settings=settings, session=enrich_session
+                        ):
+                            yield _format_event("item", item.model_dump_json(), sse=sse)
+                        sent = len(early)
+                        FEED_STREAM_EARLY_ITEMS.inc(sent)
+                    snapshot, _ = await generation
+                finally:
+                    # Stop generation if the client went away mid-stream
+                    for task in (generation, prefix):
+                        task.cancel()
+                    await asyncio.gather(generation, prefix, return_exceptions=True)
+
+            remaining = snapshot.candidates[offset + sent : offset + page_size]
+            for item in await _build_items(
+                remaining, settings=settings, session=enrich_session
+            ):
+                yield _format_event("item", item.model_dump_json(), sse=sse)
+
+            page = _page_info(
+                snapshot, offset=offset, page_size=page_size, batch_id=batch_id
+            )
+            yield _format_event("page", page.model_dump_json(), sse=sse)
+        except Exception:
+            logger.exception("Streaming feed failed for user=%s", user_id)
+            yield _format_event(
+                "error", json.dumps({"detail": "Feed generation failed"}), sse=sse
             )
-        )
 
-    # Step 6: Encode next cursor if more items available
-    new_offset = offset + page_size
-    has_more = new_offset < total_in_batch
-    next_cursor = _encode_cursor(new_offset, batch_id) if has_more else None
 
-    # Step 7: Return response
-    return FeedResponse(
-        items=items,
-        next_cursor=next_cursor,
-        has_more=has_more,
-        total_in_batch=total_in_batch,
-        active_category=category.value if category is not None else None,
-        feed_mode=feed_result.feed_mode,
+@router.get("/stream")
+async def stream_feed(
+    request: Request,
+    user_id: Annotated[UUID, Depends(get_current_user)],
+    cursor: str | None = None,
+    page_size: Annotated[int, Query(ge=1, le=50)] = 20,
+    category: Annotated[ProductCategory | None, Query()] = None,
+) -> StreamingResponse:
+    """Stream the personalized feed page item by item.
+
+    Same cursor semantics as ``GET /feed``. Emits one ``item`` event per
+    ``FeedItem`` as soon as it is ranked and enriched, then a final ``page``
+    event with the ``FeedPageInfo`` (next cursor, feed mode, ...). Items
+    whose position is already fixed are sent before slower stages (such as
+    the trending blend) finish. A failure after the stream started is
+    reported as an ``error`` event.
+
+    The response is newline-delimited JSON (``{"type": ..., "data": ...}``
+    per line), or Server-Sent Events when the client accepts
+    ``text/event-stream``.
+
+    Raises:
+        HTTPException 400: Invalid cursor format.
+    """
+    offset, batch_id = _parse_cursor(cursor)
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    return StreamingResponse(
+        _stream_feed_events(
+            settings=get_settings(),
+            cursor=cursor,
+            offset=offset,
+            batch_id=batch_id,
+            page_size=page_size,
+            user_id=str(user_id),
+            category=category.value if category is not None else None,
+            sse=sse,
+        ),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
     )
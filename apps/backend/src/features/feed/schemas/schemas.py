@@ -62,3 +62,19 @@ class FeedResponse(BaseModel):
     total_in_batch: int
     active_category: str | None = None
     feed_mode: FeedMode
+
+
+class FeedPageInfo(BaseModel):
+    """Pagination metadata of a feed page (the final event of a feed stream).
+
+    Attributes:
+        next_cursor: Opaque cursor for fetching the next page, or None if no more.
+        has_more: Whether there are more items available.
+        total_in_batch: Total number of ranked items in the current batch.
+    """
+
+    next_cursor: str | None
+    has_more: bool
+    total_in_batch: int
+    active_category: str | None = None
+    feed_mode: FeedMode
@@ -0,0 +1,447 @@
+"""Offline feed generation for many users at once.
+
+``FeedService.generate_feed`` serves one user per request and pays a Qdrant
+retrieve, two SQL lookups, a ``search_batch`` and a ranking pass each time.
+Precomputing feeds for a whole user base that way costs several round trips
+per user. ``BatchFeedService`` processes users in chunks instead; per chunk it
+issues:
+
+- one Qdrant ``retrieve`` for all user vectors
+- one SQL query for profile confidence and price profiles
+- one SQL query for the seen products of every user
+- one ``search_batch`` holding every user's widening variants and diversity
+  query
+- one vectorized ranking pass over all users' candidates
+  (``rank_candidate_groups``)
+
+The trending top list is loaded and ranked once per chunk and filtered per
+user. Feeds match ``generate_feed`` except that seen-set crowding is not
+retried with a server-side id filter, and trending scores are normalized over
+the shared top list rather than each user's unseen part of it.
+
+``run`` streams chunks through ``generate_feeds`` with a bounded number of
+chunks in flight, each on its own session, so memory stays proportional to
+``chunk_size * concurrency`` however many users are processed
+(see ``scripts/generate_feeds.py``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+from qdrant_client.models import SearchRequest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.metrics import counter
+from src.features.clustering.service.cluster_cache import ClusterSnapshot
+from src.features.feed.schemas.schemas import FeedMode
+from src.features.feed.service.feed_service import (
+    _DIVERSITY_CANDIDATE_LIMIT,
+    _DIVERSITY_CLUSTER_COUNT,
+    _DIVERSITY_COUNT,
+    _OVERRETRIEVE_LIMIT,
+    _PRIMARY_CLUSTER_COUNT,
+    _SEEN_OVERSAMPLE_LIMIT,
+    FEED_STAGE_SECONDS,
+    FeedService,
+)
+from src.features.feed.service.ranking_service import (
+    RankedCandidate,
+    rank_candidate_groups,
+)
+from src.features.feed.service.seen_set import ProductOrdinals, SeenSet
+from src.models.user import User
+from src.models.user_interaction import UserInteraction
+
+logger = logging.getLogger(__name__)
+
+FEED_BATCH_GENERATIONS = counter(
+    "feed_batch_generations_total",
+    "Feeds generated by the offline batch job, by feed mode.",
+    labelnames=("feed_mode",),
+)
+
+
+@dataclass
+class BatchFeedResult:
+    user_id: str
+    feed_mode: FeedMode
+    candidates: list[RankedCandidate]
+
+    def to_record(self) -> dict:
+        """JSON-serializable form written by the batch job."""
+        return {
+            "user_id": self.user_id,
+            "feed_mode": self.feed_mode.value,
+            "candidates": [
+                {
+                    "product_id": candidate.product_id,
+                    "score": candidate.score,
+                    "source": candidate.source,
+                }
+                for candidate in self.candidates
+            ],
+        }
+
+
+@dataclass
+class BatchFeedStats:
+    users: int = 0
+    failed_users: int = 0
+
+
+@dataclass
+class _RetrievalPlan:
+    """Where one user's searches sit in the chunk's ``search_batch``."""
+
+    user_id: str
+    start: int
+    variant_count: int
+    has_diversity: bool
+    price_profile: dict
+
+
+class BatchFeedService(FeedService):
+    """Generates feeds for chunks of users with batched lookups and ranking.
+
+    Takes the same arguments as ``FeedService``. The per-user seen-set cache
+    is bypassed: seen-sets are loaded in bulk per chunk, on a private ordinal
+    registry, so a batch run does not evict live users from the cache.
+    """
+
+    async def run(
+        self,
+        user_id_chunks: AsyncIterable[list[str]],
+        session_factory: Callable[[], AsyncSession],
+        write: Callable[[list[BatchFeedResult]], Awaitable[None]],
+        *,
+        concurrency: int = 4,
+        category: str | None = None,
+        page_size: int = 20,
+    ) -> BatchFeedStats:
+        """Generate feeds for every chunk, at most ``concurrency`` at a time.
+
+        ``write`` receives each chunk's results as soon as the chunk is done
+        (so in completion order, not input order). A failing chunk is logged
+        and counted in ``BatchFeedStats.failed_users``; the run continues.
+        """
+        stats = BatchFeedStats()
+        pending: dict[asyncio.Task, int] = {}
+
+        async def generate(user_ids: list[str]) -> list[BatchFeedResult]:
+            async with session_factory() as session:
+                return await self.generate_feeds(
+                    user_ids, session, category=category, page_size=page_size
+                )
+
+        async def drain(return_when: str) -> None:
+            done, _ = await asyncio.wait(pending, return_when=return_when)
+            for task in done:
+                chunk_size = pending.pop(task)
+                try:
+                    results = task.result()
+                except Exception:
+                    stats.failed_users += chunk_size
+                    logger.exception("Batch feed chunk of %d users failed", chunk_size)
+                    continue
+                await write(results)
+                stats.users += len(results)
+
+        try:
+            async for user_ids in user_id_chunks:
+                if len(pending) >= max(1, concurrency):
+                    await drain(asyncio.FIRST_COMPLETED)
+                pending[asyncio.ensure_future(generate(user_ids))] = len(user_ids)
+            if pending:
+                await drain(asyncio.ALL_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return stats
+
+    async def generate_feeds(
+        self,
+        user_ids: Iterable[str],
+        session: AsyncSession,
+        *,
+        category: str | None = None,
+        page_size: int = 20,
+    ) -> list[BatchFeedResult]:
+        """Generate one ranked, diversity-injected feed per user, in input order."""
+        user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        if not user_ids:
+            return []
+
+        vectors = await self._load_user_vectors(user_ids)
+        users = await self._load_user_rows(user_ids, session)
+        seen_sets = await self._load_seen_sets(user_ids, session)
+        modes = {
+            user_id: self._select_feed_mode(
+                user_vector=vectors.get(user_id),
+                profile_confidence=(
+                    users[user_id].profile_confidence if user_id in users else 0.0
+                ),
+            )
+            for user_id in user_ids
+        }
+
+        with FEED_STAGE_SECONDS.time(stage="batch_trending"):
+            trending = self._rank_trending_candidates(
+                await self._trending_cache.top(session, category)
+            )
+        personalized = await self._generate_personalized_feeds(
+            [
+                user_id
+                for user_id in user_ids
+                if modes[user_id] is not FeedMode.TRENDING
+            ],
+            vectors=vectors,
+            users=users,
+            seen_sets=seen_sets,
+            category=category,
+            page_size=page_size,
+        )
+
+        results = [
+            self._compose_feed(
+                user_id,
+                modes[user_id],
+                personalized.get(user_id, []),
+                self._unseen_trending(trending, seen_sets[user_id], page_size),
+                page_size,
+            )
+            for user_id in user_ids
+        ]
+        for result in results:
+            FEED_BATCH_GENERATIONS.inc(feed_mode=result.feed_mode.value)
+        return results
+
+    async def _load_user_vectors(self, user_ids: list[str]) -> dict[str, list[float]]:
+        """Load every user's style vector with a single ``retrieve``."""
+        points = await self._qdrant.retrieve(
+            collection_name=self._settings.user_profiles_collection,
+            ids=user_ids,
+            with_vectors=True,
+            with_payload=False,
+        )
+        return {
+            str(point.id): point.vector for point in points if point.vector is not None
+        }
+
+    @staticmethod
+    async def _load_user_rows(user_ids: list[str], session: AsyncSession) -> dict:
+        """Load profile confidence and price profile of every user."""
+        stmt = select(User.id, User.profile_confidence, User.price_profile).where(
+            User.id.in_([UUID(user_id) for user_id in user_ids])
+        )
+        result = await session.execute(stmt)
+        return {str(row.id): row for row in result.all()}
+
+    @staticmethod
+    async def _load_seen_sets(
+        user_ids: list[str], session: AsyncSession
+    ) -> dict[str, SeenSet]:
+        """Load the interacted products of every user in one query."""
+        stmt = select(UserInteraction.user_id, UserInteraction.product_id).where(
+            UserInteraction.user_id.in_([UUID(user_id) for user_id in user_ids])
+        )
+        result = await session.execute(stmt)
+        seen_ids: dict[str, list[str]] = defaultdict(list)
+        for row in result.all():
+            seen_ids[str(row.user_id)].append(str(row.product_id))
+
+        ordinals = ProductOrdinals()
+        return {
+            user_id: SeenSet(ordinals, seen_ids.get(user_id, ()))
+            for user_id in user_ids
+        }
+
+    @staticmethod
+    def _diversity_clusters_many(
+        snapshot: ClusterSnapshot, vectors: list[list[float]]
+    ) -> list[list[int]]:
+        """``_identify_diversity_clusters`` for many users in one matrix product."""
+        if len(snapshot.cluster_indices) <= _PRIMARY_CLUSTER_COUNT or not vectors:
+            return [[] for _ in vectors]
+
+        queries = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1.0)
+        order = np.argsort(-(queries @ snapshot.centroids.T), axis=1, kind="stable")
+        diversity = order[
+            :,
+            _PRIMARY_CLUSTER_COUNT : _PRIMARY_CLUSTER_COUNT + _DIVERSITY_CLUSTER_COUNT,
+        ]
+        return snapshot.cluster_indices[diversity].tolist()
+
+    async def _generate_personalized_feeds(
+        self,
+        user_ids: list[str],
+        *,
+        vectors: dict[str, list[float]],
+        users: dict,
+        seen_sets: dict[str, SeenSet],
+        category: str | None,
+        page_size: int,
+    ) -> dict[str, list[RankedCandidate]]:
+        """Retrieve and rank the vector-based feeds of ``user_ids`` together."""
+        if not user_ids:
+            return {}
+
+        snapshot = await self._cluster_cache.get(self._qdrant, self._settings)
+        use_mmr = self._settings.feed_diversity_mode == "mmr"
+        diversity_clusters = (
+            [[] for _ in user_ids]
+            if use_mmr
+            else self._diversity_clusters_many(
+                snapshot, [vectors[user_id] for user_id in user_ids]
+            )
+        )
+        diversity_limit = (
+            max(
+                _DIVERSITY_CANDIDATE_LIMIT,
+                self._scale_quota(_DIVERSITY_COUNT, page_size) * 2,
+            )
+            + _OVERRETRIEVE_LIMIT
+        )
+
+        plans: list[_RetrievalPlan] = []
+        requests: list[SearchRequest] = []
+        for user_id, cluster_ids in zip(user_ids, diversity_clusters):
+            price_profile = self._price_profile_from_user(users.get(user_id))
+            oversample = min(len(seen_sets[user_id]), _SEEN_OVERSAMPLE_LIMIT)
+            variants = self._build_filter_variants(
+                price_profile.get("price_min", 0.0),
+                price_profile.get("price_max", 0.0),
+                category,
+            )
+            plans.append(
+                _RetrievalPlan(
+                    user_id=user_id,
+                    start=len(requests),
+                    variant_count=len(variants),
+                    has_diversity=bool(cluster_ids),
+                    price_profile=price_profile,
+                )
+            )
+            requests.extend(
+                self._build_search_request(
+                    vectors[user_id],
+                    query_filter,
+                    limit=_OVERRETRIEVE_LIMIT + oversample,
+                    with_vector=use_mmr,
+                )
+                for _, query_filter in variants
+            )
+            if cluster_ids:
+                requests.append(
+                    self._build_search_request(
+                        vectors[user_id],
+                        self._build_diversity_filter(cluster_ids, category),
+                        limit=diversity_limit + oversample,
+                    )
+                )
+
+        with FEED_STAGE_SECONDS.time(stage="batch_retrieval"):
+            results = await self._products().search_batch(requests)
+
+        # Two ranking groups per user: primary, then diversity candidates
+        groups: list[list] = []
+        price_profiles: list[dict] = []
+        for plan in plans:
+            seen = seen_sets[plan.user_id]
+            raw = results[plan.start : plan.start + plan.variant_count]
+            primary = next(
+                (
+                    hits
+                    for hits in (
+                        self._exclude_seen(hits, seen)[:_OVERRETRIEVE_LIMIT]
+                        for hits in raw
+                    )
+                    if len(hits) >= page_size
+                ),
+                raw[-1][:_OVERRETRIEVE_LIMIT],
+            )
+            primary = self._prepare_candidates_for_ranking(primary, source="primary")
+
+            diversity: list = []
+            if plan.has_diversity and primary:
+                primary_ids = {str(c.payload["product_id"]) for c in primary}
+                diversity = [
+                    candidate
+                    for candidate in self._prepare_candidates_for_ranking(
+                        self._exclude_seen(
+                            results[plan.start + plan.variant_count], seen
+                        ),
+                        source="diversity",
+                    )
+                    if str(candidate.payload["product_id"]) not in primary_ids
+                ]
+
+            user_price_profile = {
+                "median": plan.price_profile.get("price_median", 0.0),
+                "std": plan.price_profile.get("price_std", 0.0),
+            }
+            groups.extend((primary, diversity))
+            price_profiles.extend((user_price_profile, user_price_profile))
+
+        with FEED_STAGE_SECONDS.time(stage="batch_ranking"):
+            ranked = rank_candidate_groups(groups, price_profiles, snapshot.priors)
+
+        feeds: dict[str, list[RankedCandidate]] = {}
+        for index, plan in enumerate(plans):
+            primary_ranked, diversity_ranked = ranked[2 * index], ranked[2 * index + 1]
+            if use_mmr:
+                feeds[plan.user_id] = self._mmr_rerank(
+                    primary_ranked, groups[2 * index], page_size
+                )
+            elif diversity_ranked:
+                feeds[plan.user_id] = self._allocate_diversity(
+                    primary_ranked, diversity_ranked, page_size
+                )
+            else:
+                feeds[plan.user_id] = primary_ranked[:page_size]
+        return feeds
+
+    @staticmethod
+    def _unseen_trending(
+        trending: list[RankedCandidate], seen: SeenSet, page_size: int
+    ) -> list[RankedCandidate]:
+        """The user's unseen part of the ranked top list; revisits on shortfall."""
+        is_seen = seen.contains_many(candidate.product_id for candidate in trending)
+        unseen = [
+            candidate for candidate, was_seen in zip(trending, is_seen) if not was_seen
+        ][:_OVERRETRIEVE_LIMIT]
+        if len(unseen) >= page_size:
+            return unseen
+        return trending[:_OVERRETRIEVE_LIMIT]
+
+    def _compose_feed(
+        self,
+        user_id: str,
+        feed_mode: FeedMode,
+        personalized: list[RankedCandidate],
+        trending: list[RankedCandidate],
+        page_size: int,
+    ) -> BatchFeedResult:
+        """Blend a user's stages the way ``generate_feed`` does."""
+        if feed_mode is FeedMode.TRENDING or not personalized:
+            return BatchFeedResult(user_id, FeedMode.TRENDING, trending[:page_size])
+
+        discovery_count, primary_target = self._blend_targets(feed_mode, page_size)
+        if feed_mode is FeedMode.HYBRID or (discovery_count > 0 and trending):
+            personalized = self._blend_ranked_candidates(
+                personalized,
+                trending,
+                page_size=page_size,
+                primary_target=primary_target,
+            )
+        return BatchFeedResult(user_id, feed_mode, personalized[:page_size])
@@ -0,0 +1,197 @@
+"""Ranked feed batch snapshots for cursor pagination.
+
+The first feed page ranks a deep batch of candidates and stores it under the
+cursor's batch_id. Later pages slice the stored snapshot instead of re-running
+retrieval and ranking, so scrolling cost stays flat per page.
+
+Two backends are available:
+- InMemoryFeedBatchStore: bounded LRU with TTL, local to the API process
+- RedisFeedBatchStore: shared across workers, expiry handled by Redis
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import counter
+from src.core.redis import get_redis_client
+from src.features.feed.schemas.schemas import FeedMode
+from src.features.feed.service.ranking_service import RankedCandidate
+
+logger = logging.getLogger(__name__)
+
+_REDIS_KEY_PREFIX = "feed:batch:"
+
+FEED_BATCH_LOOKUPS = counter(
+    "feed_batch_cache_lookups_total",
+    "Feed batch snapshot lookups by result.",
+    labelnames=("result",),
+)
+
+
+@dataclass
+class FeedBatchSnapshot:
+    """A ranked feed batch owned by a single user and category filter."""
+
+    user_id: str
+    category: str | None
+    feed_mode: FeedMode
+    candidates: list[RankedCandidate]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "user_id": self.user_id,
+                "category": self.category,
+                "feed_mode": self.feed_mode.value,
+                "candidates": [asdict(candidate) for candidate in self.candidates],
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> FeedBatchSnapshot:
+        data = json.loads(raw)
+        return cls(
+            user_id=data["user_id"],
+            category=data["category"],
+            feed_mode=FeedMode(data["feed_mode"]),
+            candidates=[RankedCandidate(**item) for item in data["candidates"]],
+        )
+
+
+class FeedBatchStore:
+    """Base class for batch snapshot stores.
+
+    Subclasses implement ``_get`` and ``_put``; lookups are counted here so
+    every backend reports the same hit/miss metrics.
+    """
+
+    async def get(self, batch_id: str) -> FeedBatchSnapshot | None:
+        snapshot = await self._get(batch_id)
+        FEED_BATCH_LOOKUPS.inc(result="hit" if snapshot is not None else "miss")
+        return snapshot
+
+    async def put(self, batch_id: str, snapshot: FeedBatchSnapshot) -> None:
+        await self._put(batch_id, snapshot)
+
+    async def _get(self, batch_id: str) -> FeedBatchSnapshot | None:
+        raise NotImplementedError
+
+    async def _put(self, batch_id: str, snapshot: FeedBatchSnapshot) -> None:
+        raise NotImplementedError
+
+
+class InMemoryFeedBatchStore(FeedBatchStore):
+    """Process-local LRU store with per-entry TTL.
+
+    Args:
+        max_entries: Maximum number of snapshots kept before evicting the
+            least recently used one.
+        ttl_seconds: Lifetime of a snapshot after it was stored.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, FeedBatchSnapshot]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _get(self, batch_id: str) -> FeedBatchSnapshot | None:
+        entry = self._entries.get(batch_id)
+        if entry is None:
+            return None
+
+        expires_at, snapshot = entry
+        if expires_at <= self._clock():
+            del self._entries[batch_id]
+            return None
+
+        self._entries.move_to_end(batch_id)
+        return snapshot
+
+    async def _put(self, batch_id: str, snapshot: FeedBatchSnapshot) -> None:
+        self._entries[batch_id] = (self._clock() + self._ttl_seconds, snapshot)
+        self._entries.move_to_end(batch_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisFeedBatchStore(FeedBatchStore):
+    """Redis-backed store shared across API workers.
+
+    Redis errors are logged and treated as cache misses so the feed keeps
+    working (by regenerating the batch) when Redis is unavailable.
+    """
+
+    def __init__(self, redis_client, ttl_seconds: int) -> None:
+        self._redis = redis_client
+        self._ttl_seconds = ttl_seconds
+
+    async def _get(self, batch_id: str) -> FeedBatchSnapshot | None:
+        try:
+            raw = await self._redis.get(_REDIS_KEY_PREFIX + batch_id)
+        except Exception:
+            logger.warning("Redis feed batch lookup failed", exc_info=True)
+            return None
+
+        if raw is None:
+            return None
+
+        try:
+            return FeedBatchSnapshot.from_json(raw)
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Discarding malformed feed batch snapshot %s", batch_id)
+            return None
+
+    async def _put(self, batch_id: str, snapshot: FeedBatchSnapshot) -> None:
+        try:
+            await self._redis.set(
+                _REDIS_KEY_PREFIX + batch_id,
+                snapshot.to_json(),
+                ex=self._ttl_seconds,
+            )
+        except Exception:
+            logger.warning("Redis feed batch store failed", exc_info=True)
+
+
+_store: FeedBatchStore | None = None
+
+
+def get_feed_batch_store(settings: Settings | None = None) -> FeedBatchStore:
+    """Get or create the process-wide feed batch store.
+
+    Uses Redis when ``feed_batch_cache_backend`` is ``"redis"`` and a Redis URL
+    is configured, otherwise the in-process LRU.
+    """
+    global _store
+    if _store is None:
+        settings = settings or get_settings()
+        redis_client = (
+            get_redis_client() if settings.feed_batch_cache_backend == "redis" else None
+        )
+        if redis_client is not None:
+            _store = RedisFeedBatchStore(
+                redis_client,
+                ttl_seconds=settings.feed_batch_cache_ttl_seconds,
+            )
+        else:
+            _store = InMemoryFeedBatchStore(
+                max_entries=settings.feed_batch_cache_max_entries,
+                ttl_seconds=settings.feed_batch_cache_ttl_seconds,
+            )
+    return _store
@@ -5,19 +5,32 @@ Two-stage feed pipeline:
 2. Python re-ranks candidates with multi-factor scoring and diversity injection
 
 Diversity injection is MANDATORY per PROJECT.md: 3/20 items from adjacent clusters.
+With ``feed_diversity_mode="mmr"`` the primary candidates are instead re-ranked
+by Maximal Marginal Relevance over their vectors, which needs no extra query.
 
-Uses qdrant_client.search() (NOT query_points()) for Qdrant v1.7.4 compatibility.
+Users with several interest vectors (``profile_interest_count`` > 1) get one
+primary search per interest, all in the same search_batch, merged by
+weight-proportional quotas.
+
+Product searches go through ``RetrievalBackend.search_batch``, which uses the
+Query API on servers that have it and search_batch() on Qdrant v1.7.4.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import cached_property
 from types import SimpleNamespace
+from typing import TypeVar
 from uuid import UUID
 
+import numpy as np
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
     FieldCondition,
@@ -25,14 +38,47 @@ from qdrant_client.models import (
     HasIdCondition,
     MatchValue,
     Range,
+    SearchParams,
+    SearchRequest,
 )
-from sqlalchemy import case, func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import Settings
+from src.core.metrics import counter, histogram
+from src.core.qdrant import product_search_params
+from src.core.retrieval import RetrievalBackend, get_retrieval_backend
+from src.core.user_interests import (
+    UserInterest,
+    interest_quotas,
+    load_user_interests,
+)
+from src.features.clustering.service.cluster_cache import (
+    ClusterCache,
+    get_cluster_cache,
+)
 from src.features.feed.schemas.schemas import FeedMode
-from src.features.feed.service.ranking_service import RankedCandidate, rank_candidates
-from src.features.feed.utils.scoring import compute_freshness_score, normalize_scores
+from src.features.feed.service.ranking_service import (
+    RankedCandidate,
+    rank_candidate_groups,
+    rank_candidates,
+)
+from src.features.feed.service.seen_set import (
+    SeenSet,
+    SeenSetCache,
+    get_seen_set_cache,
+)
+from src.features.feed.service.trending_cache import (
+    TrendingCache,
+    get_trending_cache,
+    load_trending_products,
+)
+from src.features.feed.utils.vectorized_scoring import (
+    freshness_scores,
+    mmr_order,
+    normalize_array,
+    to_epoch_seconds,
+)
 from src.models.product import Product
 from src.models.user import User
 from src.models.user_interaction import UserInteraction
@@ -44,23 +90,52 @@ _OVERRETRIEVE_LIMIT = 100
 _SCORE_THRESHOLD = 0.2
 _PRICE_FILTER_LOW_FACTOR = 0.5
 _PRICE_FILTER_HIGH_FACTOR = 2.0
+# Extra candidates fetched to absorb local seen-set post-filtering
+_SEEN_OVERSAMPLE_LIMIT = 200
 
 # Diversity injection constants (hardcoded per PROJECT.md and Phase 03-02)
 _DIVERSITY_COUNT = 3
+# Quotas are defined per 20-item page and scaled for deeper batches
+_QUOTA_PAGE_SIZE = 20
 _PRIMARY_CLUSTER_COUNT = 3
 _DIVERSITY_CLUSTER_COUNT = 2
 _DIVERSITY_CANDIDATE_LIMIT = 20
 _TRENDING_WEIGHT = 0.8
 _TRENDING_FRESHNESS_WEIGHT = 0.2
 
-# Scroll batch size for loading cluster priors
-_SCROLL_BATCH_SIZE = 100
+
+T = TypeVar("T")
+
+FEED_STAGE_SECONDS = histogram(
+    "feed_stage_duration_seconds",
+    "Wall time of feed generation stages.",
+    labelnames=("stage",),
+)
+FEED_GENERATIONS = counter(
+    "feed_generations_total",
+    "Generated feeds by served feed mode.",
+    labelnames=("feed_mode",),
+)
+FEED_SHORTFALL_WIDENINGS = counter(
+    "feed_shortfall_widenings_total",
+    "Retrieval shortfalls that widened the filter, by source and step.",
+    labelnames=("source", "step"),
+)
+FEED_DROPPED_CANDIDATES = counter(
+    "feed_dropped_candidates_total",
+    "Malformed candidates dropped before ranking.",
+    labelnames=("source",),
+)
+
+
+PrefixCallback = Callable[[list[RankedCandidate]], Awaitable[None]]
 
 
 @dataclass
 class FeedGenerationResult:
     feed_mode: FeedMode
     candidates: list[RankedCandidate]
+    stage_timings: dict[str, float] = field(default_factory=dict)
 
 
 class FeedService:
@@ -69,11 +144,41 @@ class FeedService:
     Args:
         qdrant_client: Async Qdrant client instance.
         settings: Application settings.
+        cluster_cache: Cluster priors/centroids cache. Defaults to the
+            process-wide instance.
+        seen_set_cache: Per-user seen-set cache. Defaults to the process-wide
+            instance.
+        trending_cache: Per-category trending top-N cache. Defaults to the
+            process-wide instance.
+        retrieval: Backend for product searches. Defaults to the configured
+            one (``retrieval_backend``).
     """
 
-    def __init__(self, qdrant_client: AsyncQdrantClient, settings: Settings) -> None:
+    def __init__(
+        self,
+        qdrant_client: AsyncQdrantClient,
+        settings: Settings,
+        cluster_cache: ClusterCache | None = None,
+        seen_set_cache: SeenSetCache | None = None,
+        trending_cache: TrendingCache | None = None,
+        retrieval: RetrievalBackend | None = None,
+    ) -> None:
         self._qdrant = qdrant_client
         self._settings = settings
+        self._cluster_cache = cluster_cache or get_cluster_cache()
+        self._seen_sets = (
+            seen_set_cache
+            if seen_set_cache is not None
+            else get_seen_set_cache(settings)
+        )
+        self._trending_cache = trending_cache or get_trending_cache(settings)
+        self._retrieval = retrieval
+
+    def _products(self) -> RetrievalBackend:
+        """Return the backend serving product searches."""
+        if self._retrieval is not None:
+            return self._retrieval
+        return get_retrieval_backend(self._qdrant, self._settings)
 
     async def _load_user_vector(self, user_id: str) -> list[float] | None:
         """Load user style vector from Qdrant user_profiles collection.
@@ -90,6 +195,24 @@ class FeedService:
             return None
         return points[0].vector
 
+    async def _load_user_interests(
+        self, user_id: str, timings: dict
+    ) -> list[UserInterest]:
+        """Load the user's interest vectors, or [] when multi-interest is off."""
+        count = self._settings.profile_interest_count
+        if count <= 1:
+            return []
+        return await self._timed(
+            "user_interests",
+            load_user_interests(
+                self._qdrant,
+                self._settings.user_profiles_collection,
+                user_id,
+                count,
+            ),
+            timings,
+        )
+
     async def _load_user_profile_state(
         self, user_id: str, session: AsyncSession
     ) -> User | None:
@@ -113,17 +236,10 @@ class FeedService:
 
         return FeedMode.PERSONALIZED
 
-    async def _load_price_profile(self, user_id: str, session: AsyncSession) -> dict:
-        """Load user price profile from PostgreSQL users table.
-
-        Returns the price_profile JSONB dict, or a neutral default if not set.
-        """
-        from uuid import UUID
-
-        stmt = select(User.price_profile).where(User.id == UUID(user_id))
-        result = await session.execute(stmt)
-        price_profile = result.scalar_one_or_none()
-
+    @staticmethod
+    def _price_profile_from_user(user: User | None) -> dict:
+        """Return the user's price_profile JSONB dict, or a neutral default."""
+        price_profile = user.price_profile if user is not None else None
         if price_profile is None:
             return {
                 "price_min": 0.0,
@@ -133,55 +249,15 @@ class FeedService:
             }
         return price_profile
 
-    @staticmethod
-    def _coerce_product_ids(product_ids: list[str]) -> list[UUID]:
-        """Parse valid UUID product ids for SQL filtering."""
-        parsed: list[UUID] = []
-        for product_id in product_ids:
-            try:
-                parsed.append(UUID(product_id))
-            except ValueError:
-                logger.warning(
-                    "Skipping invalid product id=%s in SQL filter", product_id
-                )
-        return parsed
-
     async def _load_cluster_priors(self) -> dict[int, float]:
-        """Load cluster priors from Qdrant style_clusters collection.
-
-        Scrolls all points from the small style_clusters collection (~10-200
-        clusters) and builds a dict mapping cluster_id -> prior_probability.
+        """Load cluster priors (cluster_id -> prior_probability).
 
-        Does NOT cache results (caching deferred to Phase 12).
+        Served from the process-wide cluster cache, which reloads the small
+        style_clusters collection only when its version marker changes or the
+        cache TTL expires.
         """
-        priors: dict[int, float] = {}
-        offset = None
-
-        while True:
-            results, next_offset = await self._qdrant.scroll(
-                collection_name=self._settings.cluster_collection,
-                limit=_SCROLL_BATCH_SIZE,
-                offset=offset,
-                with_vectors=False,
-                with_payload=True,
-            )
-
-            if not results:
-                break
-
-            for point in results:
-                payload = point.payload or {}
-                cluster_index = payload.get("cluster_index")
-                prior = payload.get("prior_probability", 0.0)
-                if cluster_index is not None:
-                    priors[int(cluster_index)] = float(prior)
-
-            if next_offset is None:
-                break
-            offset = next_offset
-
-        logger.info("Loaded %d cluster priors from Qdrant", len(priors))
-        return priors
+        snapshot = await self._cluster_cache.get(self._qdrant, self._settings)
+        return snapshot.priors
 
     @staticmethod
     def _build_candidate_filter(
@@ -235,96 +311,365 @@ class FeedService:
 
         return Filter(must=must or None, must_not=must_not or None)
 
-    async def _retrieve_candidates(
+    @staticmethod
+    def _build_diversity_filter(
+        diversity_cluster_ids: list[int],
+        category: str | None = None,
+    ) -> Filter:
+        """Build the Qdrant filter for diversity candidates.
+
+        Matches any of the diversity clusters. Seen items and primary
+        candidates are excluded locally after retrieval, because the diversity
+        query is sent in the same batch as the primary query.
+        """
+        cluster_should = [
+            FieldCondition(
+                key="cluster_id",
+                match=MatchValue(value=cid),
+            )
+            for cid in diversity_cluster_ids
+        ]
+
+        must_not = [FieldCondition(key="archived", match=MatchValue(value=True))]
+
+        must = None
+        if category is not None:
+            must = [
+                FieldCondition(
+                    key="category",
+                    match=MatchValue(value=category),
+                )
+            ]
+
+        return Filter(should=cluster_should, must=must, must_not=must_not)
+
+    @cached_property
+    def _search_params(self) -> SearchParams | None:
+        """HNSW/quantization search parameters sent with every product search."""
+        return product_search_params(self._settings)
+
+    def _build_search_request(
         self,
         user_vector: list[float],
         query_filter: Filter | None,
         limit: int = _OVERRETRIEVE_LIMIT,
-    ) -> list:
-        """Retrieve candidate products from Qdrant via vector search.
-
-        Uses qdrant_client.search() for Qdrant v1.7.4 compatibility.
-        """
-        return await self._qdrant.search(
-            collection_name=self._settings.qdrant_collection,
-            query_vector=user_vector,
-            query_filter=query_filter,
+        with_vector: bool = False,
+    ) -> SearchRequest:
+        """Build one vector search of a ``search_batch`` request."""
+        return SearchRequest(
+            vector=user_vector,
+            filter=query_filter,
             limit=limit,
             score_threshold=_SCORE_THRESHOLD,
             with_payload=True,
-            with_vectors=False,
+            with_vector=with_vector,
+            params=self._search_params,
         )
 
+    @classmethod
+    def _build_filter_variants(
+        cls,
+        price_min: float,
+        price_max: float,
+        category: str | None,
+    ) -> list[tuple[bool, Filter | None]]:
+        """Return the (apply_price, filter) widening variants, deduplicated.
+
+        Seen items are excluded locally, so no variant carries them.
+        """
+        variants: list[tuple[bool, Filter | None]] = []
+        for apply_price in (True, False):
+            query_filter = cls._build_candidate_filter(
+                [],
+                price_min,
+                price_max,
+                category,
+                exclude_seen=False,
+                apply_price=apply_price,
+            )
+            if variants and query_filter == variants[-1][1]:
+                continue
+            variants.append((apply_price, query_filter))
+        return variants
+
+    @staticmethod
+    def _exclude_seen(candidates: list, seen: SeenSet) -> list:
+        """Drop candidates whose point id is in the user's seen-set."""
+        if not candidates or not len(seen):
+            return list(candidates)
+        is_seen = seen.contains_many(str(candidate.id) for candidate in candidates)
+        return [
+            candidate
+            for candidate, was_seen in zip(candidates, is_seen)
+            if not was_seen
+        ]
+
     async def _retrieve_with_shortfall_handling(
         self,
         user_vector: list[float],
-        seen_ids: list[str],
+        seen: SeenSet,
         price_min: float,
         price_max: float,
         category: str | None,
         page_size: int,
-    ) -> list:
+        diversity_filter: Filter | None = None,
+        diversity_limit: int = _DIVERSITY_CANDIDATE_LIMIT,
+        with_vectors: bool = False,
+        min_candidates: int | None = None,
+    ) -> tuple[list, list]:
         """Retrieve candidates with progressive filter widening on shortfall.
 
         Pattern 4 from RESEARCH.md: Narrow first, broaden on shortfall.
         1. Full filter (price + seen exclusion)
         2. Drop price filter
         3. Drop seen exclusion (allow revisits)
-        """
-        # Attempt 1: Full filters
-        query_filter = self._build_candidate_filter(
-            seen_ids,
-            price_min,
-            price_max,
-            category,
-            exclude_seen=True,
-            apply_price=True,
-        )
-        candidates = await self._retrieve_candidates(user_vector, query_filter)
 
-        if len(candidates) >= page_size:
-            return candidates
+        All widening variants (plus the diversity query, if given) are sent in
+        a single search_batch request, which Qdrant v1.7.4 supports, so
+        retrieval costs one round trip. The first variant that fills the page
+        wins; variants whose filter matches the previous one are not sent.
 
-        logger.warning(
-            "Shortfall after full filter: got %d, need %d. "
-            "Retrying without price filter.",
-            len(candidates),
-            page_size,
+        Seen items are not sent to Qdrant. Each search is oversampled by the
+        seen-set size (capped) and post-filtered locally against ``seen``.
+        Only when seen items crowded a saturated result below the page size
+        is a second batch sent with the server-side ``HasIdCondition``.
+
+        ``with_vectors`` returns the primary candidates' vectors (for MMR).
+
+        ``page_size`` is the number of candidates wanted (at least
+        ``_OVERRETRIEVE_LIMIT`` are retrieved). Filters are only widened, and
+        revisits only allowed, when fewer than ``min_candidates`` (default
+        ``page_size``) unseen candidates match: a deep batch is filled with
+        the unseen candidates that exist rather than with revisits.
+
+        Returns:
+            Tuple of (primary candidates, diversity candidates).
+        """
+        needed = page_size if min_candidates is None else min_candidates
+        depth = max(_OVERRETRIEVE_LIMIT, page_size)
+        oversample = min(len(seen), _SEEN_OVERSAMPLE_LIMIT)
+        limit = depth + oversample
+
+        variants = self._build_filter_variants(price_min, price_max, category)
+        requests = [
+            self._build_search_request(
+                user_vector, query_filter, limit=limit, with_vector=with_vectors
+            )
+            for _, query_filter in variants
+        ]
+        if diversity_filter is not None:
+            requests.append(
+                self._build_search_request(
+                    user_vector, diversity_filter, limit=diversity_limit + oversample
+                )
+            )
+
+        with FEED_STAGE_SECONDS.time(stage="retrieval"):
+            results = await self._products().search_batch(requests)
+        raw = results[: len(variants)]
+        diversity_candidates = (
+            self._exclude_seen(results[len(variants)], seen) if diversity_filter else []
         )
 
-        # Attempt 2: Drop price filter
-        query_filter = self._build_candidate_filter(
-            seen_ids,
-            price_min,
-            price_max,
-            category,
-            exclude_seen=True,
-            apply_price=False,
+        unseen = [self._exclude_seen(hits, seen)[:depth] for hits in raw]
+        first_full = next(
+            (i for i, hits in enumerate(unseen) if len(hits) >= needed),
+            len(unseen),
         )
-        candidates = await self._retrieve_candidates(user_vector, query_filter)
+        crowded = [
+            i
+            for i in range(first_full)
+            if len(raw[i]) >= limit and len(unseen[i]) < len(raw[i])
+        ]
+        if crowded:
+            logger.info(
+                "Seen-set crowded out %d candidate variants; "
+                "retrying with server-side id filter.",
+                len(crowded),
+            )
+            seen_ids = seen.product_ids()
+            with FEED_STAGE_SECONDS.time(stage="retrieval_fallback"):
+                fallback = await self._products().search_batch(
+                    [
+                        self._build_search_request(
+                            user_vector,
+                            self._build_candidate_filter(
+                                seen_ids,
+                                price_min,
+                                price_max,
+                                category,
+                                exclude_seen=True,
+                                apply_price=variants[i][0],
+                            ),
+                            limit=depth,
+                            with_vector=with_vectors,
+                        )
+                        for i in crowded
+                    ],
+                )
+            for i, hits in zip(crowded, fallback):
+                unseen[i] = hits
 
-        if len(candidates) >= page_size:
-            return candidates
+        for attempt, candidates in enumerate(unseen, start=1):
+            if len(candidates) >= needed:
+                return candidates, diversity_candidates
+            FEED_SHORTFALL_WIDENINGS.inc(source="personalized", step=str(attempt))
+            logger.warning(
+                "Shortfall after filter variant %d: got %d, need %d. "
+                "Widening filter.",
+                attempt,
+                len(candidates),
+                needed,
+            )
 
-        logger.warning(
-            "Shortfall after dropping price filter: got %d, need %d. "
-            "Allowing revisits.",
-            len(candidates),
-            page_size,
-        )
+        # Allow revisits: the widest variant without seen exclusion
+        return raw[-1][:depth], diversity_candidates
 
-        # Attempt 3: Allow revisits (drop seen exclusion)
-        query_filter = self._build_candidate_filter(
-            seen_ids,
-            price_min,
-            price_max,
-            category,
-            exclude_seen=False,
-            apply_price=False,
+    async def _retrieve_and_rank_interests(
+        self,
+        *,
+        interests: list[UserInterest],
+        user_vector: list[float],
+        seen: SeenSet,
+        price_min: float,
+        price_max: float,
+        category: str | None,
+        page_size: int,
+        user_price_profile: dict,
+        cluster_priors: dict[int, float],
+        diversity_filter: Filter | None,
+        diversity_limit: int,
+        with_vectors: bool,
+        min_candidates: int | None = None,
+    ) -> tuple[list[RankedCandidate], list[SimpleNamespace], list] | None:
+        """Retrieve and rank candidates for every interest in one batch.
+
+        Each interest gets a share of the ``_OVERRETRIEVE_LIMIT`` budget (at
+        least twice its page quota) for every filter variant, so all searches,
+        plus the diversity query on the main vector, go out in a single
+        search_batch and the total candidate count stays flat as the number
+        of interests grows. Per interest, the first variant covering its
+        quota wins. All interests are ranked in one vectorized pass and
+        merged by ``_merge_interest_rankings``.
+
+        Returns (ranked, prepared candidates, diversity candidates), or None
+        when the interests cannot fill ``min_candidates`` (default
+        ``page_size``), in which case the caller falls back to the
+        single-vector path with its full widening. Variants are chosen by
+        the quotas of ``min_candidates``; ``page_size`` sets the merge depth.
+        """
+        needed = page_size if min_candidates is None else min_candidates
+        weights = [interest.weight for interest in interests]
+        quotas = interest_quotas(weights, page_size)
+        needed_quotas = interest_quotas(weights, needed)
+        oversample = min(len(seen), _SEEN_OVERSAMPLE_LIMIT)
+        share = math.ceil(max(_OVERRETRIEVE_LIMIT, page_size) / len(interests))
+        limits = [max(share, 2 * quota) for quota in quotas]
+
+        variants = self._build_filter_variants(price_min, price_max, category)
+        requests = [
+            self._build_search_request(
+                interest.vector,
+                query_filter,
+                limit=limit + oversample,
+                with_vector=with_vectors,
+            )
+            for interest, limit in zip(interests, limits)
+            for _, query_filter in variants
+        ]
+        if diversity_filter is not None:
+            requests.append(
+                self._build_search_request(
+                    user_vector, diversity_filter, limit=diversity_limit + oversample
+                )
+            )
+
+        with FEED_STAGE_SECONDS.time(stage="retrieval"):
+            results = await self._products().search_batch(requests)
+        diversity_candidates = (
+            self._exclude_seen(results[-1], seen) if diversity_filter else []
         )
-        candidates = await self._retrieve_candidates(user_vector, query_filter)
 
-        return candidates
+        groups: list[list[SimpleNamespace]] = []
+        for index, (quota, limit) in enumerate(zip(needed_quotas, limits)):
+            offset = index * len(variants)
+            unseen = [
+                self._exclude_seen(hits, seen)[:limit]
+                for hits in results[offset : offset + len(variants)]
+            ]
+            chosen = next((hits for hits in unseen if len(hits) >= quota), unseen[-1])
+            groups.append(
+                self._prepare_candidates_for_ranking(chosen, source="primary")
+            )
+
+        with FEED_STAGE_SECONDS.time(stage="ranking"):
+            rankings = rank_candidate_groups(
+                groups, [user_price_profile] * len(groups), cluster_priors
+            )
+        ranked = self._merge_interest_rankings(rankings, quotas, page_size)
+        if len(ranked) < needed:
+            FEED_SHORTFALL_WIDENINGS.inc(source="interests", step="1")
+            logger.warning(
+                "Shortfall across %d interests: got %d, need %d. "
+                "Falling back to the main vector.",
+                len(interests),
+                len(ranked),
+                needed,
+            )
+            return None
+        return ranked, [c for group in groups for c in group], diversity_candidates
+
+    @staticmethod
+    def _merge_interest_rankings(
+        rankings: list[list[RankedCandidate]],
+        quotas: list[int],
+        page_size: int,
+    ) -> list[RankedCandidate]:
+        """Merge per-interest rankings into one deduplicated ranking.
+
+        The first ``page_size`` slots are taken round-robin across interests,
+        each interest contributing up to its quota of its best unused items.
+        Slots an exhausted interest leaves open, and everything past the
+        first page, follow by score.
+        """
+        merged: list[RankedCandidate] = []
+        taken: set[str] = set()
+        positions = [0] * len(rankings)
+        remaining = list(quotas)
+
+        progress = True
+        while progress and len(merged) < page_size:
+            progress = False
+            for index, ranked in enumerate(rankings):
+                if remaining[index] <= 0 or len(merged) >= page_size:
+                    continue
+                position = positions[index]
+                while position < len(ranked) and ranked[position].product_id in taken:
+                    position += 1
+                if position >= len(ranked):
+                    positions[index] = position
+                    continue
+                candidate = ranked[position]
+                positions[index] = position + 1
+                merged.append(candidate)
+                taken.add(candidate.product_id)
+                remaining[index] -= 1
+                progress = True
+
+        leftovers = sorted(
+            (
+                candidate
+                for index, ranked in enumerate(rankings)
+                for candidate in ranked[positions[index] :]
+            ),
+            key=lambda candidate: candidate.score,
+            reverse=True,
+        )
+        for candidate in leftovers:
+            if candidate.product_id not in taken:
+                merged.append(candidate)
+                taken.add(candidate.product_id)
+        return merged
 
     async def _get_interacted_product_ids(
         self, user_id: str, session: AsyncSession
@@ -367,90 +712,59 @@ class FeedService:
         exclude_ids: list[str],
         category: str | None,
         limit: int,
-        *,
-        exclude_seen: bool,
     ) -> list[SimpleNamespace]:
-        """Load trending products from PostgreSQL using interaction popularity."""
-        interaction_weight = case(
-            (UserInteraction.action == "save", 3.0),
-            (UserInteraction.action == "like", 2.0),
-            (UserInteraction.action == "dislike", -1.0),
-            else_=0.0,
-        )
-        popularity_subquery = (
-            select(
-                UserInteraction.product_id.label("product_id"),
-                func.sum(interaction_weight).label("popularity"),
-            )
-            .group_by(UserInteraction.product_id)
-            .subquery()
-        )
-
-        popularity = func.coalesce(popularity_subquery.c.popularity, 0.0)
-        stmt = (
-            select(
-                Product.id,
-                Product.price,
-                Product.created_at,
-                Product.category,
-                popularity.label("popularity"),
-            )
-            .outerjoin(
-                popularity_subquery, popularity_subquery.c.product_id == Product.id
-            )
-            .order_by(popularity.desc(), Product.created_at.desc())
-            .limit(limit)
+        """Load trending products from the product_popularity aggregate."""
+        return await load_trending_products(
+            session, category=category, limit=limit, exclude_ids=exclude_ids
         )
 
-        if category is not None:
-            stmt = stmt.where(Product.category == category)
-
-        if exclude_seen and exclude_ids:
-            stmt = stmt.where(Product.id.notin_(self._coerce_product_ids(exclude_ids)))
-
-        result = await session.execute(stmt)
-        rows = result.all()
-        return [
-            SimpleNamespace(
-                product_id=str(row.id),
-                price=float(row.price),
-                created_at=row.created_at,
-                category=row.category,
-                popularity=float(row.popularity or 0.0),
-            )
-            for row in rows
-        ]
-
     async def _retrieve_trending_with_shortfall_handling(
         self,
         session: AsyncSession,
-        exclude_ids: list[str],
+        seen: SeenSet,
         category: str | None,
         page_size: int,
+        min_candidates: int | None = None,
     ) -> list[SimpleNamespace]:
-        """Retrieve trending products, then allow revisits if needed."""
-        candidates = await self._retrieve_trending_products(
-            session=session,
-            exclude_ids=exclude_ids,
-            category=category,
-            limit=_OVERRETRIEVE_LIMIT,
-            exclude_seen=True,
-        )
-        if len(candidates) >= page_size:
+        """Retrieve trending products, then allow revisits if needed.
+
+        1. Cached per-category top-N, seen items filtered locally
+        2. If seen items exhausted a full top-N: SQL query with exclusion
+        3. Allow revisits (top of the cached list)
+
+        Steps 2 and 3 only run when fewer than ``min_candidates`` (default
+        ``page_size``) unseen products are left.
+        """
+        needed = page_size if min_candidates is None else min_candidates
+        depth = max(_OVERRETRIEVE_LIMIT, page_size)
+        with FEED_STAGE_SECONDS.time(stage="trending_top"):
+            top = await self._trending_cache.top(session, category)
+        is_seen = seen.contains_many(candidate.product_id for candidate in top)
+        candidates = [
+            candidate for candidate, was_seen in zip(top, is_seen) if not was_seen
+        ][:depth]
+        if len(candidates) >= needed:
             return candidates
 
+        if len(top) >= self._trending_cache.size and len(seen):
+            FEED_SHORTFALL_WIDENINGS.inc(source="trending", step="1")
+            with FEED_STAGE_SECONDS.time(stage="trending_sql"):
+                candidates = await self._retrieve_trending_products(
+                    session=session,
+                    exclude_ids=seen.product_ids(),
+                    category=category,
+                    limit=depth,
+                )
+            if len(candidates) >= needed:
+                return candidates
+
+        FEED_SHORTFALL_WIDENINGS.inc(source="trending", step="revisits")
         logger.info(
             "Trending shortfall with exclusions: got %d, need %d. Allowing revisits.",
             len(candidates),
-            page_size,
-        )
-        return await self._retrieve_trending_products(
-            session=session,
-            exclude_ids=exclude_ids,
-            category=category,
-            limit=_OVERRETRIEVE_LIMIT,
-            exclude_seen=False,
+            needed,
         )
+        return top[:depth]
 
     @staticmethod
     def _rank_trending_candidates(
@@ -460,39 +774,43 @@ class FeedService:
         if not candidates:
             return []
 
-        popularity_scores = [candidate.popularity for candidate in candidates]
-        freshness_scores = []
-        for candidate in candidates:
-            created_at = candidate.created_at
-            if isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at)
-            if created_at.tzinfo is None:
-                created_at = created_at.replace(tzinfo=timezone.utc)
-            freshness_scores.append(compute_freshness_score(created_at))
-
-        normalized_popularity = normalize_scores(popularity_scores)
-        normalized_freshness = normalize_scores(freshness_scores)
-
-        ranked = []
-        for index, candidate in enumerate(candidates):
-            final_score = (
-                _TRENDING_WEIGHT * normalized_popularity[index]
-                + _TRENDING_FRESHNESS_WEIGHT * normalized_freshness[index]
-            )
-            ranked.append(
-                RankedCandidate(
-                    product_id=candidate.product_id,
-                    score=final_score,
-                    cosine_score=0.0,
-                    cluster_prior_score=0.0,
-                    price_score=0.0,
-                    freshness_score=normalized_freshness[index],
-                    source="trending",
-                )
-            )
+        now_ts = datetime.now(UTC).timestamp()
+        popularity = np.fromiter(
+            (candidate.popularity for candidate in candidates),
+            dtype=np.float64,
+            count=len(candidates),
+        )
+        created_at_ts = np.fromiter(
+            (
+                to_epoch_seconds(candidate.created_at, now_ts)
+                for candidate in candidates
+            ),
+            dtype=np.float64,
+            count=len(candidates),
+        )
 
-        ranked.sort(key=lambda item: item.score, reverse=True)
-        return ranked
+        normalized_popularity = normalize_array(popularity)
+        normalized_freshness = normalize_array(freshness_scores(created_at_ts, now_ts))
+        final_scores = (
+            _TRENDING_WEIGHT * normalized_popularity
+            + _TRENDING_FRESHNESS_WEIGHT * normalized_freshness
+        )
+
+        order = np.argsort(-final_scores, kind="stable").tolist()
+        scores = final_scores.tolist()
+        freshness = normalized_freshness.tolist()
+        return [
+            RankedCandidate(
+                product_id=candidates[index].product_id,
+                score=scores[index],
+                cosine_score=0.0,
+                cluster_prior_score=0.0,
+                price_score=0.0,
+                freshness_score=freshness[index],
+                source="trending",
+            )
+            for index in order
+        ]
 
     @staticmethod
     def _blend_ranked_candidates(
@@ -534,6 +852,44 @@ class FeedService:
 
         return merged[:page_size]
 
+    @staticmethod
+    def _stable_blend_prefix(
+        primary: list[RankedCandidate],
+        *,
+        page_size: int,
+        primary_target: int,
+    ) -> list[RankedCandidate]:
+        """Leading primary items that keep their position under any blend.
+
+        ``_blend_ranked_candidates`` interleaves at most
+        ``page_size - len(primary_slice)`` secondary items, one after every
+        ``ceil(len(primary_slice) / n_secondary)`` primary items. With the
+        largest possible secondary count the first chunk is smallest, so
+        that chunk leads the feed whatever the secondary list turns out to be.
+        """
+        primary_slice = primary[: min(primary_target, page_size)]
+        max_secondary = page_size - len(primary_slice)
+        if not primary_slice or max_secondary <= 0:
+            return primary_slice
+        return primary_slice[: math.ceil(len(primary_slice) / max_secondary)]
+
+    async def _announce_prefix(
+        self,
+        stage: Awaitable[list[RankedCandidate]],
+        on_prefix: PrefixCallback,
+        *,
+        page_size: int,
+        primary_target: int,
+    ) -> list[RankedCandidate]:
+        """Await the personalized stage, then hand its stable prefix out early."""
+        ranked = await stage
+        prefix = self._stable_blend_prefix(
+            ranked, page_size=page_size, primary_target=primary_target
+        )
+        if prefix:
+            await on_prefix(prefix)
+        return ranked
+
     @staticmethod
     def _prepare_candidates_for_ranking(
         candidates: list,
@@ -554,10 +910,10 @@ class FeedService:
             payload = dict(candidate.payload or {})
 
             missing_required = [
-                key
-                for key in ("product_id", "price", "created_at")
-                if key not in payload
+                key for key in ("product_id", "price") if key not in payload
             ]
+            if "created_at_ts" not in payload and "created_at" not in payload:
+                missing_required.append("created_at_ts")
             if missing_required:
                 dropped_count += 1
                 logger.warning(
@@ -575,6 +931,7 @@ class FeedService:
                 SimpleNamespace(
                     score=candidate.score,
                     payload=payload,
+                    vector=getattr(candidate, "vector", None),
                 )
             )
 
@@ -586,6 +943,7 @@ class FeedService:
             )
 
         if dropped_count:
+            FEED_DROPPED_CANDIDATES.inc(dropped_count, source=source)
             logger.warning(
                 "Dropped %d malformed %s candidates before ranking",
                 dropped_count,
@@ -598,64 +956,181 @@ class FeedService:
         self,
         *,
         user_vector: list[float],
-        user_id: str,
-        session: AsyncSession,
-        seen_ids: list[str],
+        price_profile: dict,
+        seen: SeenSet,
         category: str | None,
         page_size: int,
+        interests: list[UserInterest] | None = None,
+        min_candidates: int | None = None,
     ) -> list[RankedCandidate]:
-        """Run the existing vector-based ranking pipeline."""
-        price_profile = await self._load_price_profile(user_id, session)
+        """Run the existing vector-based ranking pipeline.
+
+        Touches Qdrant only (the price profile comes from the already-loaded
+        user row), so it can run alongside SQL-backed stages. With two or more
+        ``interests`` the primary candidates come from the interest vectors
+        (see ``_retrieve_and_rank_interests``); diversity still keys off
+        ``user_vector``.
+        """
         price_min = price_profile.get("price_min", 0.0)
         price_max = price_profile.get("price_max", 0.0)
         cluster_priors = await self._load_cluster_priors()
+        use_mmr = self._settings.feed_diversity_mode == "mmr"
 
-        candidates = await self._retrieve_with_shortfall_handling(
-            user_vector=user_vector,
-            seen_ids=seen_ids,
-            price_min=price_min,
-            price_max=price_max,
-            category=category,
-            page_size=page_size,
+        diversity_cluster_ids = (
+            [] if use_mmr else await self._identify_diversity_clusters(user_vector)
         )
-        candidates = self._prepare_candidates_for_ranking(
-            candidates,
-            source="primary",
+        diversity_filter = None
+        if diversity_cluster_ids:
+            diversity_filter = self._build_diversity_filter(
+                diversity_cluster_ids, category
+            )
+        diversity_count = self._scale_quota(_DIVERSITY_COUNT, page_size)
+        # The diversity query cannot exclude primary ids server-side (they are
+        # fetched in the same batch), so over-fetch by the primary limit.
+        diversity_limit = (
+            max(_DIVERSITY_CANDIDATE_LIMIT, diversity_count * 2) + _OVERRETRIEVE_LIMIT
         )
-        if not candidates:
-            return []
-
         user_price_profile = {
             "median": price_profile.get("price_median", 0.0),
             "std": price_profile.get("price_std", 0.0),
         }
-        ranked = rank_candidates(candidates, user_price_profile, cluster_priors)
-        return await self._inject_diversity(
-            user_vector=user_vector,
-            cluster_priors=cluster_priors,
-            user_price_profile=user_price_profile,
-            primary_ranked=ranked,
-            seen_ids=seen_ids,
-            category=category,
-            page_size=page_size,
-        )
+
+        interest_result = None
+        if interests is not None and len(interests) > 1:
+            interest_result = await self._retrieve_and_rank_interests(
+                interests=interests,
+                user_vector=user_vector,
+                seen=seen,
+                price_min=price_min,
+                price_max=price_max,
+                category=category,
+                page_size=page_size,
+                user_price_profile=user_price_profile,
+                cluster_priors=cluster_priors,
+                diversity_filter=diversity_filter,
+                diversity_limit=diversity_limit,
+                with_vectors=use_mmr,
+                min_candidates=min_candidates,
+            )
+
+        if interest_result is not None:
+            ranked, candidates, diversity_candidates = interest_result
+        else:
+            (
+                candidates,
+                diversity_candidates,
+            ) = await self._retrieve_with_shortfall_handling(
+                user_vector=user_vector,
+                seen=seen,
+                price_min=price_min,
+                price_max=price_max,
+                category=category,
+                page_size=page_size,
+                diversity_filter=diversity_filter,
+                diversity_limit=diversity_limit,
+                with_vectors=use_mmr,
+                min_candidates=min_candidates,
+            )
+            candidates = self._prepare_candidates_for_ranking(
+                candidates,
+                source="primary",
+            )
+            if not candidates:
+                return []
+
+            with FEED_STAGE_SECONDS.time(stage="ranking"):
+                ranked = rank_candidates(candidates, user_price_profile, cluster_priors)
+        if use_mmr:
+            with FEED_STAGE_SECONDS.time(stage="diversity"):
+                return self._mmr_rerank(ranked, candidates, page_size)
+        if diversity_filter is None:
+            return ranked[:page_size]
+
+        with FEED_STAGE_SECONDS.time(stage="diversity"):
+            return self._inject_diversity(
+                cluster_priors=cluster_priors,
+                user_price_profile=user_price_profile,
+                primary_ranked=ranked,
+                diversity_candidates=diversity_candidates,
+                page_size=page_size,
+            )
 
     async def _generate_trending_feed(
         self,
         *,
         session: AsyncSession,
-        seen_ids: list[str],
+        seen: SeenSet,
         category: str | None,
         page_size: int,
+        min_candidates: int | None = None,
     ) -> list[RankedCandidate]:
         """Build a non-vector feed from popularity plus freshness."""
         candidates = await self._retrieve_trending_with_shortfall_handling(
             session=session,
-            exclude_ids=seen_ids,
+            seen=seen,
             category=category,
             page_size=page_size,
+            min_candidates=min_candidates,
         )
-        return self._rank_trending_candidates(candidates)
+        with FEED_STAGE_SECONDS.time(stage="trending_ranking"):
+            return self._rank_trending_candidates(candidates)
+
+    @staticmethod
+    async def _timed(name: str, awaitable: Awaitable[T], timings: dict) -> T:
+        """Await ``awaitable`` and record its wall time in ms under ``name``.
+
+        The duration is also observed in the ``feed_stage_duration_seconds``
+        histogram with ``stage=name``.
+        """
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[name] = elapsed * 1000
+            FEED_STAGE_SECONDS.observe(elapsed, stage=name)
+
+    @staticmethod
+    async def _run_concurrently(*awaitables: Awaitable) -> list:
+        """Run independent stages concurrently.
+
+        Unlike a bare ``asyncio.gather``, a failure cancels the sibling stages
+        before re-raising so none of them keeps using the request's session.
+        """
+        tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _load_user_state_and_seen_set(
+        self,
+        user_id: str,
+        session: AsyncSession,
+        timings: dict,
+    ) -> tuple[User | None, SeenSet]:
+        """Run the SQL lookups in sequence (a session is not concurrency-safe).
+
+        The seen-set is served from the per-user cache; SQL is only hit on a
+        cache miss.
+        """
+        user = await self._timed(
+            "profile_state",
+            self._load_user_profile_state(user_id, session),
+            timings,
+        )
+        seen = await self._timed(
+            "seen_ids",
+            self._seen_sets.get_or_load(
+                user_id,
+                lambda: self._get_interacted_product_ids(user_id, session),
+            ),
+            timings,
+        )
+        return user, seen
 
     async def generate_feed(
         self,
@@ -664,208 +1139,253 @@ class FeedService:
         session: AsyncSession,
         category: str | None = None,
         page_size: int = 20,
+        on_prefix: PrefixCallback | None = None,
+        batch_size: int | None = None,
+    ) -> FeedGenerationResult:
+        """Generate a ranked, diversity-injected feed for a user.
+
+        ``page_size`` is the page the client asked for: retrieval widens its
+        filters, and finally allows revisits, only when fewer unseen
+        candidates than that match. ``batch_size`` (default ``page_size``) is
+        how many ranked candidates to return, e.g. for a snapshot that serves
+        several pages; it only raises the retrieval and ranking depth.
+
+        Stages run as a small dependency graph:
+        1. User vector and interests (Qdrant) in parallel with user state
+           (SQL) + seen-set (cached, SQL on a miss)
+        2. Feed mode selection
+        3. Personalized retrieval (Qdrant) in parallel with trending (SQL),
+           where trending only runs when the mode blends it in
+
+        Wall time per stage is reported in ``FeedGenerationResult.stage_timings``
+        and, like the served feed mode, recorded in the process metrics.
+
+        ``on_prefix`` (used by the streaming endpoint) is awaited once the
+        personalized stage is ranked, possibly while trending is still
+        running, with the leading candidates whose positions in the final
+        feed are already fixed.
+        """
+        with FEED_STAGE_SECONDS.time(stage="total"):
+            result = await self._generate_feed(
+                user_id=user_id,
+                seen_ids=seen_ids,
+                session=session,
+                category=category,
+                page_size=max(batch_size or page_size, page_size),
+                on_prefix=on_prefix,
+                min_candidates=page_size,
+            )
+        FEED_GENERATIONS.inc(feed_mode=result.feed_mode.value)
+        return result
+
+    async def _generate_feed(
+        self,
+        user_id: str,
+        seen_ids: list[str],
+        session: AsyncSession,
+        category: str | None,
+        page_size: int,
+        on_prefix: PrefixCallback | None = None,
+        min_candidates: int | None = None,
     ) -> FeedGenerationResult:
-        """Generate a ranked, diversity-injected feed for a user."""
-        user_vector = await self._load_user_vector(user_id)
-        user = await self._load_user_profile_state(user_id, session)
-        interacted_ids = await self._get_interacted_product_ids(user_id, session)
-        all_exclude_ids = list(set(seen_ids) | interacted_ids)
+        timings: dict[str, float] = {}
+        user_vector, interests, (user, seen) = await self._run_concurrently(
+            self._timed("user_vector", self._load_user_vector(user_id), timings),
+            self._load_user_interests(user_id, timings),
+            self._load_user_state_and_seen_set(user_id, session, timings),
+        )
+        if seen_ids:
+            seen = seen.union(seen_ids)
         feed_mode = self._select_feed_mode(
             user_vector=user_vector,
             profile_confidence=user.profile_confidence if user is not None else 0.0,
         )
 
-        if feed_mode is FeedMode.TRENDING:
-            ranked = await self._generate_trending_feed(
-                session=session,
-                seen_ids=all_exclude_ids,
-                category=category,
-                page_size=page_size,
+        def trending_stage() -> Awaitable[list[RankedCandidate]]:
+            return self._timed(
+                "trending",
+                self._generate_trending_feed(
+                    session=session,
+                    seen=seen,
+                    category=category,
+                    page_size=page_size,
+                    min_candidates=min_candidates,
+                ),
+                timings,
             )
+
+        if feed_mode is FeedMode.TRENDING:
+            ranked = await trending_stage()
             return FeedGenerationResult(
                 feed_mode=FeedMode.TRENDING,
                 candidates=ranked[:page_size],
+                stage_timings=timings,
             )
 
-        personalized_ranked = await self._generate_personalized_feed(
-            user_vector=user_vector,
-            user_id=user_id,
-            session=session,
-            seen_ids=all_exclude_ids,
-            category=category,
-            page_size=page_size,
-        )
+        discovery_count, primary_target = self._blend_targets(feed_mode, page_size)
 
-        trending_ranked = await self._generate_trending_feed(
-            session=session,
-            seen_ids=all_exclude_ids,
-            category=category,
-            page_size=page_size,
+        personalized_stage = self._timed(
+            "personalized",
+            self._generate_personalized_feed(
+                user_vector=user_vector,
+                price_profile=self._price_profile_from_user(user),
+                seen=seen,
+                category=category,
+                page_size=page_size,
+                interests=interests,
+                min_candidates=min_candidates,
+            ),
+            timings,
         )
+        if on_prefix is not None:
+            personalized_stage = self._announce_prefix(
+                personalized_stage,
+                on_prefix,
+                page_size=page_size,
+                primary_target=primary_target,
+            )
+
+        trending_ranked: list[RankedCandidate] | None = None
+        if feed_mode is FeedMode.HYBRID or discovery_count > 0:
+            personalized_ranked, trending_ranked = await self._run_concurrently(
+                personalized_stage, trending_stage()
+            )
+        else:
+            personalized_ranked = await personalized_stage
 
         if not personalized_ranked:
+            if trending_ranked is None:
+                trending_ranked = await trending_stage()
             return FeedGenerationResult(
                 feed_mode=FeedMode.TRENDING,
                 candidates=trending_ranked[:page_size],
+                stage_timings=timings,
             )
 
         if feed_mode is FeedMode.HYBRID:
-            primary_target = max(
-                1,
-                min(
-                    page_size,
-                    math.ceil(
-                        page_size * self._settings.feed_hybrid_personalized_ratio
-                    ),
-                ),
-            )
             blended = self._blend_ranked_candidates(
                 personalized_ranked,
                 trending_ranked,
                 page_size=page_size,
                 primary_target=primary_target,
             )
-            return FeedGenerationResult(feed_mode=FeedMode.HYBRID, candidates=blended)
+            return FeedGenerationResult(
+                feed_mode=FeedMode.HYBRID,
+                candidates=blended,
+                stage_timings=timings,
+            )
 
-        discovery_count = min(
-            self._settings.feed_personalized_discovery_count,
-            max(page_size - 1, 0),
-        )
         if discovery_count > 0 and trending_ranked:
             personalized_ranked = self._blend_ranked_candidates(
                 personalized_ranked,
                 trending_ranked,
                 page_size=page_size,
-                primary_target=max(page_size - discovery_count, 1),
+                primary_target=primary_target,
             )
 
         return FeedGenerationResult(
             feed_mode=FeedMode.PERSONALIZED,
             candidates=personalized_ranked[:page_size],
+            stage_timings=timings,
         )
 
+    def _blend_targets(self, feed_mode: FeedMode, page_size: int) -> tuple[int, int]:
+        """Return (discovery_count, primary_target) for a vector-based feed.
+
+        HYBRID feeds keep ``feed_hybrid_personalized_ratio`` of the page for
+        personalized items; PERSONALIZED feeds reserve the scaled discovery
+        quota for trending items.
+        """
+        discovery_count = min(
+            self._scale_quota(
+                self._settings.feed_personalized_discovery_count, page_size
+            ),
+            max(page_size - 1, 0),
+        )
+        if feed_mode is FeedMode.HYBRID:
+            primary_target = max(
+                1,
+                min(
+                    page_size,
+                    math.ceil(
+                        page_size * self._settings.feed_hybrid_personalized_ratio
+                    ),
+                ),
+            )
+        else:
+            primary_target = max(page_size - discovery_count, 1)
+        return discovery_count, primary_target
+
     async def _identify_diversity_clusters(
         self,
         user_vector: list[float],
     ) -> list[int]:
         """Identify diversity clusters (4th-5th ranked by similarity).
 
-        Searches style_clusters collection with user_vector to find the
-        nearest clusters, then takes the 4th and 5th ranked as diversity
-        clusters (adjacent, not random -- per Phase 03-02 decision).
+        Ranks the cached style cluster centroids by cosine similarity to
+        user_vector (a local matrix-vector product), then takes the 4th and
+        5th ranked as diversity clusters (adjacent, not random -- per Phase
+        03-02 decision).
 
         Returns:
             List of cluster indices for diversity injection.
         """
         total_needed = _PRIMARY_CLUSTER_COUNT + _DIVERSITY_CLUSTER_COUNT
-        results = await self._qdrant.search(
-            collection_name=self._settings.cluster_collection,
-            query_vector=user_vector,
-            limit=total_needed,
-            with_payload=True,
-            with_vectors=False,
-        )
+        snapshot = await self._cluster_cache.get(self._qdrant, self._settings)
+        nearest = snapshot.nearest_clusters(user_vector, total_needed)
 
-        if len(results) <= _PRIMARY_CLUSTER_COUNT:
+        if len(nearest) <= _PRIMARY_CLUSTER_COUNT:
             logger.info(
                 "Not enough clusters for diversity injection "
                 "(found %d, need %d for diversity).",
-                len(results),
+                len(nearest),
                 total_needed,
             )
             return []
 
         # Take 4th-5th ranked clusters as diversity clusters
-        diversity_clusters = []
-        for hit in results[_PRIMARY_CLUSTER_COUNT:total_needed]:
-            payload = hit.payload or {}
-            cluster_index = payload.get("cluster_index")
-            if cluster_index is not None:
-                diversity_clusters.append(int(cluster_index))
+        diversity_clusters = nearest[_PRIMARY_CLUSTER_COUNT:total_needed]
 
         logger.info("Diversity clusters identified: %s", diversity_clusters)
         return diversity_clusters
 
-    async def _inject_diversity(
+    def _inject_diversity(
         self,
-        user_vector: list[float],
         cluster_priors: dict[int, float],
         user_price_profile: dict,
         primary_ranked: list[RankedCandidate],
-        seen_ids: list[str],
-        category: str | None,
+        diversity_candidates: list,
         page_size: int,
     ) -> list[RankedCandidate]:
         """Inject diversity items into the ranked feed.
 
         Mandatory per PROJECT.md: 3/20 items from adjacent clusters.
-        - Reserve 3 slots for diversity items
-        - Take top (page_size - 3) from primary ranking
-        - Top 3 from diversity ranking
+        - Reserve 3 slots per 20 items for diversity items
+        - Take the remaining top items from primary ranking
+        - Top diversity-ranked items fill the reserved slots
         - Interleave evenly across the feed
 
         Args:
-            user_vector: User's style vector.
             cluster_priors: Cluster ID -> prior probability mapping.
             user_price_profile: Dict with 'median' and 'std' keys.
             primary_ranked: Primary ranked candidates.
-            seen_ids: Already seen product IDs.
+            diversity_candidates: Raw Qdrant hits from the diversity clusters.
             page_size: Target feed size.
 
         Returns:
             Diversity-injected list of RankedCandidate.
         """
-        # Identify diversity clusters
-        diversity_cluster_ids = await self._identify_diversity_clusters(user_vector)
-
-        if not diversity_cluster_ids:
-            return primary_ranked[:page_size]
-
-        # Build filter for diversity candidates: must be in diversity clusters
-        cluster_should = [
-            FieldCondition(
-                key="cluster_id",
-                match=MatchValue(value=cid),
+        # Exclude primary candidate IDs from the diversity pool
+        primary_ids = {rc.product_id for rc in primary_ranked}
+        diversity_candidates = [
+            candidate
+            for candidate in self._prepare_candidates_for_ranking(
+                diversity_candidates,
+                source="diversity",
             )
-            for cid in diversity_cluster_ids
+            if str(candidate.payload["product_id"]) not in primary_ids
         ]
 
-        # Exclude seen IDs and primary candidate IDs from diversity pool
-        primary_ids = {rc.product_id for rc in primary_ranked}
-        all_exclude_ids = list(set(seen_ids) | primary_ids)
-
-        must_not = []
-        if all_exclude_ids:
-            must_not.append(HasIdCondition(has_id=all_exclude_ids))
-
-        must = None
-        if category is not None:
-            must = [
-                FieldCondition(
-                    key="category",
-                    match=MatchValue(value=category),
-                )
-            ]
-
-        diversity_filter = Filter(
-            should=cluster_should, must=must, must_not=must_not or None
-        )
-
-        # Retrieve diversity candidates
-        diversity_candidates = await self._qdrant.search(
-            collection_name=self._settings.qdrant_collection,
-            query_vector=user_vector,
-            query_filter=diversity_filter,
-            limit=_DIVERSITY_CANDIDATE_LIMIT,
-            score_threshold=_SCORE_THRESHOLD,
-            with_payload=True,
-            with_vectors=False,
-        )
-        diversity_candidates = self._prepare_candidates_for_ranking(
-            diversity_candidates,
-            source="diversity",
-        )
-
         if not diversity_candidates:
             logger.info("No diversity candidates found. Returning primary only.")
             return primary_ranked[:page_size]
@@ -875,15 +1395,74 @@ class FeedService:
             diversity_candidates, user_price_profile, cluster_priors
         )
 
-        # Allocate slots: 3 diversity, rest primary
-        actual_diversity_count = min(_DIVERSITY_COUNT, len(diversity_ranked))
+        return self._allocate_diversity(primary_ranked, diversity_ranked, page_size)
+
+    @classmethod
+    def _allocate_diversity(
+        cls,
+        primary_ranked: list[RankedCandidate],
+        diversity_ranked: list[RankedCandidate],
+        page_size: int,
+    ) -> list[RankedCandidate]:
+        """Fill the diversity quota from ``diversity_ranked``, the rest from primary."""
+        # Allocate slots: 3 diversity per 20 items, rest primary
+        diversity_count = cls._scale_quota(_DIVERSITY_COUNT, page_size)
+        actual_diversity_count = min(diversity_count, len(diversity_ranked))
         primary_count = page_size - actual_diversity_count
 
         primary_slice = primary_ranked[:primary_count]
         diversity_slice = diversity_ranked[:actual_diversity_count]
 
         # Interleave diversity items evenly
-        return self._interleave_diversity(primary_slice, diversity_slice)
+        return cls._interleave_diversity(primary_slice, diversity_slice)
+
+    def _mmr_rerank(
+        self,
+        ranked: list[RankedCandidate],
+        candidates: list[SimpleNamespace],
+        page_size: int,
+    ) -> list[RankedCandidate]:
+        """Pick ``page_size`` of the ranked candidates by MMR over their vectors.
+
+        Relevance is the ranking score; ``feed_mmr_lambda`` trades it against
+        similarity to the items already picked. Candidates without a vector
+        are left out.
+        """
+        vectors = {
+            str(candidate.payload["product_id"]): candidate.vector
+            for candidate in candidates
+            if candidate.vector is not None
+        }
+        pool = [candidate for candidate in ranked if candidate.product_id in vectors]
+        if not pool:
+            return ranked[:page_size]
+
+        order = mmr_order(
+            np.fromiter(
+                (candidate.score for candidate in pool),
+                dtype=np.float64,
+                count=len(pool),
+            ),
+            np.asarray(
+                [vectors[candidate.product_id] for candidate in pool],
+                dtype=np.float32,
+            ),
+            page_size,
+            self._settings.feed_mmr_lambda,
+        )
+        return [pool[index] for index in order.tolist()]
+
+    @staticmethod
+    def _scale_quota(per_page: int, page_size: int) -> int:
+        """Scale a per-page slot quota to a batch of ``page_size`` items.
+
+        Quotas are specified for a standard 20-item page. Deeper batches (used
+        for cursor pagination snapshots) keep the same ratio so every page
+        sliced from the batch sees roughly the same mix.
+        """
+        if page_size <= _QUOTA_PAGE_SIZE:
+            return per_page
+        return math.ceil(per_page * page_size / _QUOTA_PAGE_SIZE)
 
     @staticmethod
     def _interleave_diversity(
@@ -0,0 +1,201 @@
+"""Background warming of a user's next feed batch after a profile update.
+
+A swipe schedules a profile update as a background task. When that update
+commits a new ``profile_version``, the warmer ranks the user's next
+(uncategorized) batch right away, so the following ``GET /feed`` can serve it
+without paying retrieval and ranking on the request path.
+
+Warming must never compete with live requests:
+- at most ``feed_warm_max_concurrency`` batches are computed at once, and a
+  warm request that finds no free slot is skipped rather than queued
+- one warm per user is in flight at a time
+- at most ``feed_warm_max_entries`` batches are kept (LRU), each for
+  ``feed_warm_ttl_seconds``
+
+A warmed batch is only served if the user's ``profile_version`` still
+matches, and is consumed on first use. Entries are process-local.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import counter
+from src.features.feed.service.batch_store import FeedBatchSnapshot
+from src.features.feed.service.feed_service import FeedService
+from src.features.feed.service.seen_set import get_seen_set_cache
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+FEED_WARM_EVENTS = counter(
+    "feed_warm_events_total",
+    "Feed warming outcomes (stored, skipped, failed, served, stale).",
+    labelnames=("result",),
+)
+
+
+def _get_session_factory():
+    from src.core.database import SessionLocal
+
+    return SessionLocal
+
+
+async def _get_qdrant():
+    from src.core.qdrant import get_qdrant_client
+
+    return await get_qdrant_client()
+
+
+async def _load_profile_version(session: AsyncSession, user_id: str) -> int | None:
+    return await session.scalar(
+        select(User.profile_version).where(User.id == UUID(user_id))
+    )
+
+
+class FeedWarmer:
+    """Precomputes and hands out one ranked batch per user.
+
+    Args:
+        settings: Application settings.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._settings = settings
+        self._clock = clock
+        self._max_concurrency = max(1, settings.feed_warm_max_concurrency)
+        self._max_entries = max(1, settings.feed_warm_max_entries)
+        self._ttl_seconds = settings.feed_warm_ttl_seconds
+        self._inflight: set[str] = set()
+        self._entries: OrderedDict[str, tuple[float, int, FeedBatchSnapshot]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def warm(self, user_id: str) -> bool:
+        """Rank and store the user's next batch; returns whether one was stored."""
+        if not self._settings.feed_warm_enabled:
+            return False
+        if user_id in self._inflight:
+            FEED_WARM_EVENTS.inc(result="skipped_inflight")
+            return False
+        if len(self._inflight) >= self._max_concurrency:
+            FEED_WARM_EVENTS.inc(result="skipped_busy")
+            return False
+
+        self._inflight.add(user_id)
+        try:
+            warmed = await self._generate(user_id)
+        except Exception:
+            FEED_WARM_EVENTS.inc(result="failed")
+            logger.warning("Feed warming failed for user=%s", user_id, exc_info=True)
+            return False
+        finally:
+            self._inflight.discard(user_id)
+
+        if warmed is None:
+            return False
+
+        profile_version, snapshot = warmed
+        self._entries[user_id] = (
+            self._clock() + self._ttl_seconds,
+            profile_version,
+            snapshot,
+        )
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        FEED_WARM_EVENTS.inc(result="stored")
+        return True
+
+    async def take(
+        self,
+        user_id: str,
+        category: str | None,
+        session: AsyncSession,
+        page_size: int,
+    ) -> FeedBatchSnapshot | None:
+        """Consume the user's warmed batch if it is still valid.
+
+        Only uncategorized first pages are warmed. The stored profile version
+        must match the current one; candidates seen since warming (per the
+        cached seen-set) are dropped. A batch left with fewer than
+        ``page_size`` candidates counts as stale, so the caller generates a
+        fresh one instead of serving a short page.
+        """
+        if category is not None or user_id not in self._entries:
+            return None
+
+        expires_at, profile_version, snapshot = self._entries.pop(user_id)
+        if expires_at <= self._clock():
+            FEED_WARM_EVENTS.inc(result="stale")
+            return None
+        if await _load_profile_version(session, user_id) != profile_version:
+            FEED_WARM_EVENTS.inc(result="stale")
+            return None
+
+        seen = await get_seen_set_cache().get_current(user_id)
+        if seen is not None and len(seen):
+            is_seen = seen.contains_many(c.product_id for c in snapshot.candidates)
+            snapshot.candidates = [
+                candidate
+                for candidate, was_seen in zip(snapshot.candidates, is_seen)
+                if not was_seen
+            ]
+            if len(snapshot.candidates) < page_size:
+                FEED_WARM_EVENTS.inc(result="stale")
+                return None
+
+        FEED_WARM_EVENTS.inc(result="served")
+        return snapshot
+
+    async def _generate(self, user_id: str) -> tuple[int, FeedBatchSnapshot] | None:
+        """Rank the next batch in a dedicated session."""
+        session_factory = _get_session_factory()
+        async with session_factory() as session:
+            profile_version = await _load_profile_version(session, user_id)
+            if profile_version is None:
+                return None
+
+            feed_service = FeedService(
+                qdrant_client=await _get_qdrant(), settings=self._settings
+            )
+            feed_result = await feed_service.generate_feed(
+                user_id=user_id,
+                seen_ids=[],
+                session=session,
+                batch_size=self._settings.feed_batch_size,
+            )
+
+        return profile_version, FeedBatchSnapshot(
+            user_id=user_id,
+            category=None,
+            feed_mode=feed_result.feed_mode,
+            candidates=feed_result.candidates,
+        )
+
+
+_warmer: FeedWarmer | None = None
+
+
+def get_feed_warmer(settings: Settings | None = None) -> FeedWarmer:
+    """Get or create the process-wide feed warmer."""
+    global _warmer
+    if _warmer is None:
+        _warmer = FeedWarmer(settings or get_settings())
+    return _warmer
@@ -4,13 +4,20 @@ Combines cosine similarity, cluster prior, price affinity, and freshness
 into a single weighted score for candidate ranking.
 """
 
+from collections.abc import Sequence
 from dataclasses import dataclass
-from datetime import datetime, timezone
-
-from src.features.feed.utils.scoring import (
-    compute_freshness_score,
-    compute_price_affinity,
-    normalize_scores,
+from datetime import UTC, datetime
+
+import numpy as np
+
+from src.core.product_payload import display_fields
+from src.features.feed.utils.vectorized_scoring import (
+    freshness_scores,
+    normalize_array,
+    normalize_segments,
+    price_affinities,
+    price_affinities_per_row,
+    to_epoch_seconds,
 )
 
 # Ranking weights (must sum to 1.0)
@@ -20,7 +27,7 @@ W_PRICE = 0.10
 W_FRESHNESS = 0.10
 
 
-@dataclass
+@dataclass(slots=True)
 class RankedCandidate:
     """A product candidate with its final weighted score and individual components."""
 
@@ -31,6 +38,91 @@ class RankedCandidate:
     price_score: float
     freshness_score: float
     source: str = "personalized"
+    # Denormalized display fields from the payload, when present
+    display: dict | None = None
+
+
+@dataclass(slots=True)
+class _CandidateColumns:
+    """Payload fields of a candidate batch extracted into NumPy columns."""
+
+    payloads: list[dict]
+    product_ids: list[str]
+    cosine: np.ndarray
+    cluster_prior: np.ndarray
+    price: np.ndarray
+    created_at_ts: np.ndarray
+
+
+def _extract_columns(
+    candidates: list, cluster_priors: dict, now_ts: float
+) -> _CandidateColumns:
+    count = len(candidates)
+    payloads = [candidate.payload or {} for candidate in candidates]
+    return _CandidateColumns(
+        payloads=payloads,
+        product_ids=[str(payload.get("product_id", "")) for payload in payloads],
+        cosine=np.fromiter(
+            (candidate.score for candidate in candidates),
+            dtype=np.float64,
+            count=count,
+        ),
+        cluster_prior=np.fromiter(
+            (
+                cluster_priors.get(payload.get("cluster_id", 0), 0.0)
+                for payload in payloads
+            ),
+            dtype=np.float64,
+            count=count,
+        ),
+        price=np.fromiter(
+            (payload.get("price", 0.0) for payload in payloads),
+            dtype=np.float64,
+            count=count,
+        ),
+        # Typed payloads carry created_at_ts; only legacy points need parsing
+        created_at_ts=np.fromiter(
+            (
+                (
+                    payload["created_at_ts"]
+                    if "created_at_ts" in payload
+                    else to_epoch_seconds(payload.get("created_at"), now_ts)
+                )
+                for payload in payloads
+            ),
+            dtype=np.float64,
+            count=count,
+        ),
+    )
+
+
+def _build_ranked(
+    columns: _CandidateColumns,
+    order: list[int],
+    final_scores: np.ndarray,
+    norm_cosine: np.ndarray,
+    norm_cluster: np.ndarray,
+    norm_price: np.ndarray,
+    norm_freshness: np.ndarray,
+) -> list[RankedCandidate]:
+    scores = final_scores.tolist()
+    cosine = norm_cosine.tolist()
+    cluster = norm_cluster.tolist()
+    price = norm_price.tolist()
+    freshness = norm_freshness.tolist()
+
+    return [
+        RankedCandidate(
+            product_id=columns.product_ids[i],
+            score=scores[i],
+            cosine_score=cosine[i],
+            cluster_prior_score=cluster[i],
+            price_score=price[i],
+            freshness_score=freshness[i],
+            display=display_fields(columns.payloads[i]),
+        )
+        for i in order
+    ]
 
 
 def rank_candidates(
@@ -41,11 +133,14 @@ def rank_candidates(
     """Rank candidates using multi-factor weighted scoring.
 
     Each factor is normalized across the candidate batch before weighting
-    to prevent any single factor from dominating.
+    to prevent any single factor from dominating. Payload fields are
+    extracted into NumPy columns once and every factor is computed as an
+    array operation (see ``vectorized_scoring``).
 
     Args:
         candidates: Qdrant ScoredPoint objects with payload containing
-            product_id, price, created_at, cluster_id.
+            product_id, price, created_at_ts (or legacy created_at),
+            cluster_id.
         user_price_profile: Dict with 'median' and 'std' keys.
         cluster_priors: Dict mapping cluster_id -> prior score (0-1).
 
@@ -57,58 +152,101 @@ def rank_candidates(
 
     price_median = user_price_profile.get("median", 0.0)
     price_std = user_price_profile.get("std", 0.0)
+    now_ts = datetime.now(UTC).timestamp()
 
-    # Extract raw scores for each factor
-    raw_cosine = []
-    raw_cluster = []
-    raw_price = []
-    raw_freshness = []
-
-    for candidate in candidates:
-        payload = candidate.payload or {}
-
-        raw_cosine.append(candidate.score)
-        raw_cluster.append(cluster_priors.get(payload.get("cluster_id", 0), 0.0))
-        raw_price.append(
-            compute_price_affinity(
-                float(payload.get("price", 0.0)), price_median, price_std
-            )
-        )
-
-        created_at = payload.get("created_at", datetime.now(timezone.utc))
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        if created_at.tzinfo is None:
-            created_at = created_at.replace(tzinfo=timezone.utc)
-        raw_freshness.append(compute_freshness_score(created_at))
+    # Extract payload columns once
+    columns = _extract_columns(candidates, cluster_priors, now_ts)
 
     # Normalize each factor to [0, 1] within the batch
-    norm_cosine = normalize_scores(raw_cosine)
-    norm_cluster = normalize_scores(raw_cluster)
-    norm_price = normalize_scores(raw_price)
-    norm_freshness = normalize_scores(raw_freshness)
-
-    # Compute weighted final scores and build result
-    results = []
-    for i, candidate in enumerate(candidates):
-        payload = candidate.payload or {}
-        final_score = (
-            W_COSINE * norm_cosine[i]
-            + W_CLUSTER_PRIOR * norm_cluster[i]
-            + W_PRICE * norm_price[i]
-            + W_FRESHNESS * norm_freshness[i]
-        )
+    norm_cosine = normalize_array(columns.cosine)
+    norm_cluster = normalize_array(columns.cluster_prior)
+    norm_price = normalize_array(
+        price_affinities(columns.price, price_median, price_std)
+    )
+    norm_freshness = normalize_array(freshness_scores(columns.created_at_ts, now_ts))
+
+    final_scores = (
+        W_COSINE * norm_cosine
+        + W_CLUSTER_PRIOR * norm_cluster
+        + W_PRICE * norm_price
+        + W_FRESHNESS * norm_freshness
+    )
+
+    # Stable descending order keeps input order for ties
+    order = np.argsort(-final_scores, kind="stable").tolist()
+    return _build_ranked(
+        columns,
+        order,
+        final_scores,
+        norm_cosine,
+        norm_cluster,
+        norm_price,
+        norm_freshness,
+    )
+
+
+def rank_candidate_groups(
+    groups: Sequence[list],
+    user_price_profiles: Sequence[dict],
+    cluster_priors: dict,
+) -> list[list[RankedCandidate]]:
+    """Rank many users' candidate lists in one vectorized pass.
 
-        results.append(
-            RankedCandidate(
-                product_id=str(payload.get("product_id", "")),
-                score=final_score,
-                cosine_score=norm_cosine[i],
-                cluster_prior_score=norm_cluster[i],
-                price_score=norm_price[i],
-                freshness_score=norm_freshness[i],
-            )
-        )
+    Equivalent to calling ``rank_candidates`` once per group: factors are
+    normalized within each group (segment-wise min-max) and each group is
+    sorted on its own. The payload columns of all groups are extracted and
+    scored together, so the per-call overhead is paid once per batch.
+
+    Args:
+        groups: One candidate list per user.
+        user_price_profiles: One {'median', 'std'} dict per group.
+        cluster_priors: Dict mapping cluster_id -> prior score (0-1).
 
-    results.sort(key=lambda rc: rc.score, reverse=True)
-    return results
+    Returns:
+        One ranked list per group, in input order.
+    """
+    sizes = np.fromiter((len(group) for group in groups), dtype=np.int64)
+    if not sizes.sum():
+        return [[] for _ in groups]
+
+    now_ts = datetime.now(UTC).timestamp()
+    row_group = np.repeat(np.arange(len(groups)), sizes)
+    nonempty = sizes[sizes > 0]
+    starts = np.concatenate(([0], np.cumsum(nonempty)[:-1]))
+
+    columns = _extract_columns(
+        [candidate for group in groups for candidate in group], cluster_priors, now_ts
+    )
+    medians = np.array([p.get("median", 0.0) for p in user_price_profiles])[row_group]
+    stds = np.array([p.get("std", 0.0) for p in user_price_profiles])[row_group]
+
+    norm_cosine = normalize_segments(columns.cosine, starts)
+    norm_cluster = normalize_segments(columns.cluster_prior, starts)
+    norm_price = normalize_segments(
+        price_affinities_per_row(columns.price, medians, stds), starts
+    )
+    norm_freshness = normalize_segments(
+        freshness_scores(columns.created_at_ts, now_ts), starts
+    )
+
+    final_scores = (
+        W_COSINE * norm_cosine
+        + W_CLUSTER_PRIOR * norm_cluster
+        + W_PRICE * norm_price
+        + W_FRESHNESS * norm_freshness
+    )
+
+    # Group-major, score-descending order; lexsort is stable, so ties keep
+    # input order exactly like rank_candidates
+    order = np.lexsort((-final_scores, row_group))
+    ranked = _build_ranked(
+        columns,
+        order.tolist(),
+        final_scores,
+        norm_cosine,
+        norm_cluster,
+        norm_price,
+        norm_freshness,
+    )
+    bounds = np.concatenate(([0], np.cumsum(sizes))).tolist()
+    return [ranked[bounds[i] : bounds[i + 1]] for i in range(len(groups))]
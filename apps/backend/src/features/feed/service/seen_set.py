@@ -0,0 +1,380 @@
+"""Compact per-user seen-sets for feed exclusion.
+
+Heavy users can have thousands of interacted products. Sending them all to
+Qdrant as ``HasIdCondition`` inflates every search request and slows
+filtering, and reloading them from SQL on every feed request is an unbounded
+scan. Instead, each user's seen products are kept in a cached ``SeenSet`` and
+oversampled ANN results are post-filtered locally.
+
+Product UUIDs are mapped to dense ordinals by a process-wide
+``ProductOrdinals`` registry. A ``SeenSet`` stores those ordinals the way a
+roaring bitmap container does: a sorted uint32 array while the set is sparse,
+switching to a bitmap once that is smaller.
+
+Feedback and exposure completions recorded by this process update cached sets
+directly. With ``feed_seen_cache_backend = "redis"`` every record also bumps a
+per-user generation in Redis, and a worker whose cached set is from an older
+generation reloads it, so swipes recorded by other workers and replicas are
+excluded on the next request. The ``memory`` backend assumes a single worker:
+other workers only pick up new interactions when their entry expires
+(``feed_seen_cache_ttl_seconds``, a few seconds by default).
+
+The ordinal registry only grows, so once it holds more than
+``feed_seen_cache_max_products`` ids the cache starts over with a fresh
+registry and reloads sets on demand.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+
+import numpy as np
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import counter
+from src.core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Bits per sorted-array entry; the bitmap wins once it needs fewer bytes
+_ARRAY_ENTRY_BITS = 32
+
+_REDIS_KEY_PREFIX = "feed:seen_generation:"
+# Generations only need to outlive the cached sets they invalidate
+_GENERATION_TTL_SECONDS = 86400
+
+SEEN_SET_LOOKUPS = counter(
+    "feed_seen_set_cache_lookups_total",
+    "Per-user seen-set cache lookups by result.",
+    labelnames=("result",),
+)
+
+
+class ProductOrdinals:
+    """Assigns dense integer ordinals to product ids on first sight."""
+
+    def __init__(self) -> None:
+        self._ordinals: dict[str, int] = {}
+        self._product_ids: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._product_ids)
+
+    def ordinal(self, product_id: str) -> int:
+        """Return the ordinal for ``product_id``, assigning one if needed."""
+        ordinal = self._ordinals.get(product_id)
+        if ordinal is None:
+            ordinal = len(self._product_ids)
+            self._ordinals[product_id] = ordinal
+            self._product_ids.append(product_id)
+        return ordinal
+
+    def lookup(self, product_ids: Iterable[str]) -> np.ndarray:
+        """Return ordinals for ``product_ids``; unknown ids map to -1."""
+        get = self._ordinals.get
+        return np.fromiter(
+            (get(product_id, -1) for product_id in product_ids), dtype=np.int64
+        )
+
+    def product_id(self, ordinal: int) -> str:
+        return self._product_ids[ordinal]
+
+
+class SeenSet:
+    """Set of product ordinals stored as a sorted array or a bitmap.
+
+    Args:
+        ordinals: Registry used to translate product ids.
+        product_ids: Initial members.
+    """
+
+    __slots__ = ("_array", "_bitmap", "_ordinals", "_size")
+
+    def __init__(
+        self, ordinals: ProductOrdinals, product_ids: Iterable[str] = ()
+    ) -> None:
+        self._ordinals = ordinals
+        self._array: np.ndarray | None = np.empty(0, dtype=np.uint32)
+        self._bitmap: np.ndarray | None = None
+        self._size = 0
+        self.add_many(product_ids)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_bitmap(self) -> bool:
+        return self._bitmap is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the member storage."""
+        storage = self._bitmap if self._bitmap is not None else self._array
+        return int(storage.nbytes)
+
+    def add_many(self, product_ids: Iterable[str]) -> None:
+        """Add products to the set."""
+        new = np.fromiter(
+            (self._ordinals.ordinal(product_id) for product_id in product_ids),
+            dtype=np.uint32,
+        )
+        if len(new) == 0:
+            return
+
+        if self._bitmap is None:
+            self._array = np.union1d(self._array, new).astype(np.uint32)
+            self._size = len(self._array)
+            self._maybe_convert()
+        else:
+            new = np.unique(new)
+            self._ensure_bitmap_capacity(int(new[-1]) + 1)
+            already = (self._bitmap[new >> 3] >> (new & 7)) & 1 == 1
+            np.bitwise_or.at(
+                self._bitmap, new >> 3, np.left_shift(1, new & 7).astype(np.uint8)
+            )
+            self._size += int((~already).sum())
+
+    def contains_many(self, product_ids: Iterable[str]) -> np.ndarray:
+        """Vectorized membership test, returning a boolean mask."""
+        ordinals = self._ordinals.lookup(product_ids)
+        known = ordinals >= 0
+        mask = np.zeros(len(ordinals), dtype=bool)
+        if not known.any() or self._size == 0:
+            return mask
+
+        candidates = ordinals[known]
+        if self._bitmap is None:
+            positions = np.searchsorted(self._array, candidates)
+            positions = np.minimum(positions, len(self._array) - 1)
+            mask[known] = self._array[positions] == candidates
+        else:
+            in_range = candidates < len(self._bitmap) * 8
+            hits = np.zeros(len(candidates), dtype=bool)
+            present = candidates[in_range]
+            hits[in_range] = (self._bitmap[present >> 3] >> (present & 7)) & 1 == 1
+            mask[known] = hits
+        return mask
+
+    def __contains__(self, product_id: str) -> bool:
+        return bool(self.contains_many([product_id])[0])
+
+    def product_ids(self) -> list[str]:
+        """Return members as product id strings (for server-side filters)."""
+        if self._bitmap is None:
+            ordinals = self._array
+        else:
+            ordinals = np.flatnonzero(np.unpackbits(self._bitmap, bitorder="little"))
+        return [self._ordinals.product_id(int(ordinal)) for ordinal in ordinals]
+
+    def union(self, product_ids: Iterable[str]) -> SeenSet:
+        """Return a copy of this set with ``product_ids`` added."""
+        merged = SeenSet(self._ordinals)
+        merged._array = None if self._array is None else self._array.copy()
+        merged._bitmap = None if self._bitmap is None else self._bitmap.copy()
+        merged._size = self._size
+        merged.add_many(product_ids)
+        return merged
+
+    def _ensure_bitmap_capacity(self, bits: int) -> None:
+        needed = (bits + 7) // 8
+        if len(self._bitmap) < needed:
+            grown = np.zeros(max(needed, len(self._bitmap) * 2), dtype=np.uint8)
+            grown[: len(self._bitmap)] = self._bitmap
+            self._bitmap = grown
+
+    def _maybe_convert(self) -> None:
+        """Switch to a bitmap once it is smaller than the sorted array."""
+        if self._size == 0:
+            return
+        bitmap_bytes = (int(self._array[-1]) + 8) // 8
+        if bitmap_bytes >= self._size * _ARRAY_ENTRY_BITS // 8:
+            return
+
+        bitmap = np.zeros(bitmap_bytes, dtype=np.uint8)
+        np.bitwise_or.at(
+            bitmap,
+            self._array >> 3,
+            np.left_shift(1, self._array & 7).astype(np.uint8),
+        )
+        self._bitmap = bitmap
+        self._array = None
+
+
+class SeenSetCache:
+    """Bounded LRU of per-user seen-sets with a per-entry TTL.
+
+    Args:
+        max_users: Maximum number of cached users.
+        ttl_seconds: Lifetime of an entry after it was loaded.
+        clock: Monotonic time source (injectable for tests).
+        ordinals: Product ordinal registry shared by all cached sets.
+        max_products: Registry size that triggers a reset of the cache.
+        redis_client: Optional Redis client holding per-user generations that
+            invalidate other workers' cached sets.
+    """
+
+    def __init__(
+        self,
+        max_users: int = 10_000,
+        ttl_seconds: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+        ordinals: ProductOrdinals | None = None,
+        max_products: int = 500_000,
+        redis_client=None,
+    ) -> None:
+        self._max_users = max(1, max_users)
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._ordinals = ordinals or ProductOrdinals()
+        self._max_products = max_products
+        self._redis = redis_client
+        self._entries: OrderedDict[str, tuple[float, int | None, SeenSet]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def empty(self) -> SeenSet:
+        """Return an empty set bound to this cache's ordinal registry."""
+        return SeenSet(self._ordinals)
+
+    async def get_or_load(
+        self,
+        user_id: str,
+        loader: Callable[[], Awaitable[Iterable[str]]],
+    ) -> SeenSet:
+        """Return the cached set for ``user_id``, loading it on a miss."""
+        generation = await self._load_generation(user_id)
+        seen = self._get_current(user_id, generation)
+        if seen is not None:
+            SEEN_SET_LOOKUPS.inc(result="hit")
+            return seen
+
+        # Concurrent misses for one user may both load; the last one wins.
+        # The generation is read before loading, so a record in between only
+        # causes an extra reload.
+        SEEN_SET_LOOKUPS.inc(result="miss")
+        self._maybe_reset_ordinals()
+        seen = SeenSet(self._ordinals, await loader())
+        self._entries[user_id] = (self._clock() + self._ttl_seconds, generation, seen)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self._max_users:
+            self._entries.popitem(last=False)
+        return seen
+
+    async def get_current(self, user_id: str) -> SeenSet | None:
+        """Return the cached set if it is still current, without loading it."""
+        return self._get_current(user_id, await self._load_generation(user_id))
+
+    async def record(self, user_id: str, product_ids: Iterable[str]) -> None:
+        """Add newly seen products to the user's cached set, if cached.
+
+        Uncached users are left alone: their next load reads the committed
+        interactions from the database. With Redis, the user's generation is
+        bumped so other workers drop their copy.
+        """
+        self._maybe_reset_ordinals()
+        entry = self._entries.get(user_id)
+        seen = self.get(user_id)
+        if seen is not None:
+            seen.add_many(product_ids)
+        if self._redis is None:
+            return
+
+        try:
+            key = _REDIS_KEY_PREFIX + user_id
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, _GENERATION_TTL_SECONDS)
+                generation, _ = await pipe.execute()
+        except Exception:
+            logger.warning("Redis seen-set generation bump failed", exc_info=True)
+            return
+        # Our copy already has the new products; keep it current unless
+        # another worker bumped the generation in between
+        if seen is not None and entry[1] == int(generation) - 1:
+            self._entries[user_id] = (entry[0], int(generation), seen)
+        else:
+            self.invalidate(user_id)
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def get(self, user_id: str) -> SeenSet | None:
+        """Return the locally cached set for ``user_id`` without loading it."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, _, seen = entry
+        if expires_at <= self._clock():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return seen
+
+    def _get_current(self, user_id: str, generation: int | None) -> SeenSet | None:
+        seen = self.get(user_id)
+        if (
+            seen is not None
+            and generation is not None
+            and self._entries[user_id][1] != generation
+        ):
+            self.invalidate(user_id)
+            return None
+        return seen
+
+    async def _load_generation(self, user_id: str) -> int | None:
+        """Current Redis generation of the user (0 if never bumped).
+
+        None without Redis or when Redis fails; entries then live until
+        their TTL.
+        """
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(_REDIS_KEY_PREFIX + user_id)
+        except Exception:
+            logger.warning("Redis seen-set generation lookup failed", exc_info=True)
+            return None
+        return int(raw) if raw is not None else 0
+
+    def _maybe_reset_ordinals(self) -> None:
+        if len(self._ordinals) <= self._max_products:
+            return
+        logger.info(
+            "Seen-set ordinal registry reached %d products; resetting",
+            len(self._ordinals),
+        )
+        self._ordinals = ProductOrdinals()
+        self._entries.clear()
+
+
+_cache: SeenSetCache | None = None
+
+
+def get_seen_set_cache(settings: Settings | None = None) -> SeenSetCache:
+    """Get or create the process-wide seen-set cache.
+
+    Shares invalidations through Redis when ``feed_seen_cache_backend`` is
+    ``"redis"`` and a Redis URL is configured.
+    """
+    global _cache
+    if _cache is None:
+        settings = settings or get_settings()
+        _cache = SeenSetCache(
+            max_users=settings.feed_seen_cache_max_users,
+            ttl_seconds=settings.feed_seen_cache_ttl_seconds,
+            max_products=settings.feed_seen_cache_max_products,
+            redis_client=(
+                get_redis_client()
+                if settings.feed_seen_cache_backend == "redis"
+                else None
+            ),
+        )
+    return _cache
@@ -0,0 +1,168 @@
+"""Per-category top-N cache of trending products.
+
+TRENDING and HYBRID feeds read a pre-sorted list of the most popular products
+instead of aggregating ``user_interactions`` per request. Lists come from the
+``product_popularity`` table (see ``src.core.popularity``), so building them
+costs an index scan of N rows regardless of interaction volume.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import counter
+from src.core.popularity import decayed_score
+from src.models.product import Product
+from src.models.product_popularity import ProductPopularity
+
+logger = logging.getLogger(__name__)
+
+TRENDING_CACHE_LOOKUPS = counter(
+    "feed_trending_cache_lookups_total",
+    "Trending top-N cache lookups by result.",
+    labelnames=("result",),
+)
+
+
+def _coerce_product_ids(product_ids: Iterable[str]) -> list[UUID]:
+    """Parse valid UUID product ids for SQL filtering."""
+    parsed: list[UUID] = []
+    for product_id in product_ids:
+        try:
+            parsed.append(UUID(product_id))
+        except ValueError:
+            logger.warning("Skipping invalid product id=%s in SQL filter", product_id)
+    return parsed
+
+
+async def load_trending_products(
+    session: AsyncSession,
+    *,
+    category: str | None,
+    limit: int,
+    exclude_ids: Iterable[str] = (),
+) -> list[SimpleNamespace]:
+    """Load products ordered by decayed popularity, then newest first.
+
+    Products with positive popularity come first (an index scan on
+    ``product_popularity.score``). Any remaining slots are filled with the
+    newest products, so the feed still works without interaction data.
+    """
+    excluded = _coerce_product_ids(exclude_ids)
+    now = datetime.now(UTC)
+
+    popular_stmt = (
+        select(
+            Product.id,
+            Product.price,
+            Product.created_at,
+            Product.category,
+            ProductPopularity.score,
+        )
+        .join(ProductPopularity, ProductPopularity.product_id == Product.id)
+        .where(ProductPopularity.score > 0, Product.archived_at.is_(None))
+        .order_by(ProductPopularity.score.desc(), Product.created_at.desc())
+        .limit(limit)
+    )
+    if category is not None:
+        popular_stmt = popular_stmt.where(Product.category == category)
+    if excluded:
+        popular_stmt = popular_stmt.where(Product.id.notin_(excluded))
+
+    rows = list((await session.execute(popular_stmt)).all())
+
+    if len(rows) < limit:
+        newest_stmt = (
+            select(
+                Product.id,
+                Product.price,
+                Product.created_at,
+                Product.category,
+                ProductPopularity.score,
+            )
+            .outerjoin(ProductPopularity, ProductPopularity.product_id == Product.id)
+            .where(Product.archived_at.is_(None))
+            .order_by(Product.created_at.desc())
+            .limit(limit - len(rows))
+        )
+        if category is not None:
+            newest_stmt = newest_stmt.where(Product.category == category)
+        already = excluded + [row.id for row in rows]
+        if already:
+            newest_stmt = newest_stmt.where(Product.id.notin_(already))
+        rows.extend((await session.execute(newest_stmt)).all())
+
+    return [
+        SimpleNamespace(
+            product_id=str(row.id),
+            price=float(row.price),
+            created_at=row.created_at,
+            category=row.category,
+            popularity=decayed_score(row.score or 0.0, now),
+        )
+        for row in rows
+    ]
+
+
+class TrendingCache:
+    """Per-category, TTL-bounded cache of the top-N trending products.
+
+    Args:
+        size: Number of products kept per category.
+        ttl_seconds: Lifetime of a cached list.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        size: int = 500,
+        ttl_seconds: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.size = size
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: dict[str | None, tuple[float, list[SimpleNamespace]]] = {}
+
+    async def top(
+        self, session: AsyncSession, category: str | None
+    ) -> list[SimpleNamespace]:
+        """Return the cached top-N list for ``category`` (None = all)."""
+        entry = self._entries.get(category)
+        if entry is not None and entry[0] > self._clock():
+            TRENDING_CACHE_LOOKUPS.inc(result="hit")
+            return entry[1]
+
+        TRENDING_CACHE_LOOKUPS.inc(result="miss")
+        products = await load_trending_products(
+            session, category=category, limit=self.size
+        )
+        self._entries[category] = (self._clock() + self._ttl_seconds, products)
+        return products
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+
+_cache: TrendingCache | None = None
+
+
+def get_trending_cache(settings: Settings | None = None) -> TrendingCache:
+    """Get or create the process-wide trending cache."""
+    global _cache
+    if _cache is None:
+        settings = settings or get_settings()
+        _cache = TrendingCache(
+            size=settings.trending_cache_size,
+            ttl_seconds=settings.trending_cache_ttl_seconds,
+        )
+    return _cache
@@ -0,0 +1,137 @@
+"""Columnar (NumPy) versions of the feed scoring functions.
+
+Each function mirrors its scalar counterpart in ``scoring.py`` but operates on
+a whole candidate batch at once. The scalar functions remain the reference
+implementation; parity between the two is covered by tests.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import UTC, datetime
+
+import numpy as np
+
+from src.features.feed.utils.scoring import FRESHNESS_LAMBDA
+
+_SECONDS_PER_DAY = 86400.0
+
+
+def to_epoch_seconds(value: object, default: float) -> float:
+    """Convert a payload ``created_at`` value to UTC epoch seconds.
+
+    Accepts epoch numbers, ISO-8601 strings, and datetimes. Naive datetimes are
+    treated as UTC, matching the scalar ranking path. Missing values fall back
+    to ``default``.
+    """
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+def freshness_scores(created_at_ts: np.ndarray, now_ts: float) -> np.ndarray:
+    """Exponential decay freshness with a 14-day half-life (future clamped to 1.0)."""
+    days_old = np.maximum((now_ts - created_at_ts) / _SECONDS_PER_DAY, 0.0)
+    return np.exp(-FRESHNESS_LAMBDA * days_old)
+
+
+def price_affinities(
+    prices: np.ndarray,
+    price_median: float,
+    price_std: float,
+) -> np.ndarray:
+    """Log-normal Gaussian price affinity; 0.5 where price or median is non-positive."""
+    if price_median <= 0:
+        return np.full(prices.shape, 0.5)
+
+    sigma = max(price_std, price_median * 0.3)
+    log_sigma = max(math.log(sigma), 0.1)
+    valid = prices > 0
+    log_price = np.log(np.where(valid, prices, 1.0))
+    exponent = -((log_price - math.log(price_median)) ** 2) / (2 * log_sigma**2)
+    return np.where(valid, np.exp(exponent), 0.5)
+
+
+def price_affinities_per_row(
+    prices: np.ndarray,
+    price_medians: np.ndarray,
+    price_stds: np.ndarray,
+) -> np.ndarray:
+    """``price_affinities`` with a (median, std) pair per row."""
+    valid_median = price_medians > 0
+    sigma = np.maximum(price_stds, price_medians * 0.3)
+    log_sigma = np.maximum(np.log(np.where(valid_median, sigma, 1.0)), 0.1)
+    valid = (prices > 0) & valid_median
+    log_price = np.log(np.where(prices > 0, prices, 1.0))
+    log_median = np.log(np.where(valid_median, price_medians, 1.0))
+    exponent = -((log_price - log_median) ** 2) / (2 * log_sigma**2)
+    return np.where(valid, np.exp(exponent), 0.5)
+
+
+def normalize_segments(scores: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """``normalize_array`` applied to each contiguous segment of ``scores``.
+
+    ``starts`` holds the (strictly increasing) first index of every
+    non-empty segment.
+    """
+    if scores.size == 0:
+        return scores.astype(np.float64)
+
+    lengths = np.diff(np.append(starts, scores.size))
+    minimum = np.repeat(np.minimum.reduceat(scores, starts), lengths)
+    spread = np.repeat(np.maximum.reduceat(scores, starts), lengths) - minimum
+    flat = spread < 1e-8
+    return np.where(flat, 0.5, (scores - minimum) / np.where(flat, 1.0, spread))
+
+
+def normalize_array(scores: np.ndarray) -> np.ndarray:
+    """Min-max normalization to [0, 1]; near-uniform input maps to 0.5."""
+    if scores.size == 0:
+        return scores.astype(np.float64)
+
+    minimum = scores.min()
+    spread = scores.max() - minimum
+    if spread < 1e-8:
+        return np.full(scores.shape, 0.5)
+    return (scores - minimum) / spread
+
+
+def mmr_order(
+    relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_: float
+) -> np.ndarray:
+    """Select ``k`` rows by Maximal Marginal Relevance.
+
+    Greedily picks the row maximizing
+    ``lambda_ * relevance - (1 - lambda_) * max_sim``, where ``max_sim`` is
+    the row's highest cosine similarity to the rows already picked (0 before
+    the first pick). The pairwise similarities come from one matrix product;
+    each step then only updates ``max_sim`` with the picked row. Ties go to
+    the lower row index, so rows passed in ranked order keep that order when
+    ``lambda_`` is 1.
+
+    Returns:
+        Indices of the selected rows in pick order.
+    """
+    k = min(k, len(relevance))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = unit @ unit.T
+    gain = lambda_ * np.asarray(relevance, dtype=np.float64)
+    max_similarity = np.zeros(len(relevance))
+    available = np.ones(len(relevance), dtype=bool)
+    selected = np.empty(k, dtype=np.int64)
+    for step in range(k):
+        marginal = np.where(available, gain - (1 - lambda_) * max_similarity, -np.inf)
+        pick = int(np.argmax(marginal))
+        selected[step] = pick
+        available[pick] = False
+        np.maximum(max_similarity, similarity[pick], out=max_similarity)
+    return selected
@@ -1,11 +1,13 @@
 """Feedback API router.
 
 Provides POST /feedback endpoint for recording user interactions
-(like/dislike/save) with products.
+(like/dislike/save) with products, and POST /feedback/batch for clients
+that buffer swipes.
 """
 
 from __future__ import annotations
 
+from typing import Annotated
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
@@ -13,13 +15,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
 from src.core.dependencies import get_current_user
+from src.features.feed.service.feed_warmer import get_feed_warmer
+from src.features.feed.service.seen_set import get_seen_set_cache
 from src.features.feedback.schemas.schemas import (
     ExposureBatchRequest,
     ExposureBatchResponse,
+    FeedbackBatchRequest,
+    FeedbackBatchResponse,
     FeedbackRequest,
     FeedbackResponse,
 )
 from src.features.feedback.service.exposure_service import ExposureService
+from src.features.feedback.service.profile_update_queue import (
+    get_profile_update_queue,
+)
 from src.features.feedback.service.profile_update_service import ProfileUpdateService
 from src.features.feedback.service.service import FeedbackService
 
@@ -30,6 +39,13 @@ _exposure_service = ExposureService()
 _profile_update_service = ProfileUpdateService()
 
 
+async def _update_profile_and_warm_feed(user_id: UUID) -> None:
+    """Apply pending feedback, then warm the next feed batch if it changed."""
+    consumed = await _profile_update_service.process_pending_updates(user_id)
+    if consumed:
+        await get_feed_warmer().warm(str(user_id))
+
+
 @router.post("/", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
 async def record_feedback(
     body: FeedbackRequest,
@@ -50,12 +66,14 @@ async def record_feedback(
     Raises:
         HTTPException 404: Product not found with the given external_id.
     """
+    profile_update_queue = get_profile_update_queue()
     try:
         interaction = await _feedback_service.record_feedback(
             user_id=user_id,
             product_id_external=body.product_id,
             action=body.action.value,
             session=session,
+            profile_update_queue=profile_update_queue,
         )
     except ValueError as exc:
         raise HTTPException(
@@ -63,7 +81,9 @@ async def record_feedback(
             detail=str(exc),
         )
 
-    background_tasks.add_task(_profile_update_service.process_pending_updates, user_id)
+    await get_seen_set_cache().record(str(user_id), [str(interaction.product_id)])
+    if profile_update_queue is None:
+        background_tasks.add_task(_update_profile_and_warm_feed, user_id)
 
     return FeedbackResponse(
         id=str(interaction.id),
@@ -72,6 +92,58 @@ async def record_feedback(
     )
 
 
+@router.post(
+    "/batch",
+    response_model=FeedbackBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def record_feedback_batch(
+    body: FeedbackBatchRequest,
+    background_tasks: BackgroundTasks,
+    user_id: Annotated[UUID, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+) -> FeedbackBatchResponse:
+    """Record a batch of buffered swipes in one transaction.
+
+    Swipes on unknown products are skipped and reported instead of failing
+    the batch. The user's profile is updated once for the whole batch.
+
+    Args:
+        body: Swipes in the order they happened.
+        user_id: Authenticated user ID from JWT token.
+        session: Async SQLAlchemy database session.
+
+    Returns:
+        FeedbackBatchResponse with the created interactions and skipped ids.
+    """
+    profile_update_queue = get_profile_update_queue()
+    result = await _feedback_service.record_feedback_batch(
+        user_id=user_id,
+        interactions=[
+            (item.product_id, item.action.value) for item in body.interactions
+        ],
+        session=session,
+        profile_update_queue=profile_update_queue,
+    )
+
+    if result.interactions:
+        await get_seen_set_cache().record(
+            str(user_id), [str(row.product_id) for row in result.interactions]
+        )
+        if profile_update_queue is None:
+            background_tasks.add_task(_update_profile_and_warm_feed, user_id)
+
+    return FeedbackBatchResponse(
+        interactions=[
+            FeedbackResponse(
+                id=str(row.id), action=row.action, created_at=row.created_at
+            )
+            for row in result.interactions
+        ],
+        skipped_product_ids=result.skipped_product_ids,
+    )
+
+
 @router.post("/exposures", response_model=ExposureBatchResponse)
 async def record_exposures(
     body: ExposureBatchRequest,
@@ -84,4 +156,8 @@ async def record_exposures(
         events=body.events,
         session=session,
     )
+    await get_seen_set_cache().record(
+        str(user_id),
+        [event.product_id for event in body.events if event.action is not None],
+    )
     return ExposureBatchResponse(received=len(body.events), processed=processed)
@@ -1,7 +1,8 @@
 """Pydantic v2 schemas for the feedback API endpoint.
 
 Defines FeedbackAction enum, FeedbackRequest, and FeedbackResponse
-for recording user interactions (like/dislike/save) with products.
+(plus their batch forms) for recording user interactions
+(like/dislike/save) with products.
 """
 
 from datetime import datetime
@@ -48,6 +49,25 @@ class FeedbackResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FeedbackBatchRequest(BaseModel):
+    """Batch of buffered swipes, oldest first."""
+
+    interactions: list[FeedbackRequest] = Field(min_length=1, max_length=100)
+
+
+class FeedbackBatchResponse(BaseModel):
+    """Response after recording a batch of swipes.
+
+    Attributes:
+        interactions: Recorded interactions, in submission order.
+        skipped_product_ids: Product ids that were malformed or not found;
+            their swipes were not recorded.
+    """
+
+    interactions: list[FeedbackResponse]
+    skipped_product_ids: list[str]
+
+
 class ExposureEvent(BaseModel):
     """A single feed exposure or exposure completion event."""
 
@@ -0,0 +1,414 @@
+"""Periodic full rebuild of user profile vectors from interaction history.
+
+Incremental updates move a profile one swipe at a time, and the guardrails
+that keep each step small also let it drift (THE_BRAIN.md, A4). A rebuild
+recomputes the vector from the history the profile already consumed (up to
+``last_profile_update_at``) with the onboarding Rocchio form and time decay:
+
+    vector = normalize(mean_w(liked/saved) - dislike_weight * mean_w(disliked))
+
+Each mean is over normalized product vectors, weighted by signal weight and
+``2 ** (-age / half_life)``. Interactions recorded after
+``last_profile_update_at`` stay pending for the incremental path, which
+applies them on top of the rebuilt vector.
+
+The job walks users in id order, ``profile_rebuild_user_chunk_size`` at a
+time, and streams each chunk's interactions in keyset pages of
+``profile_rebuild_interaction_page_size`` rows. Pages are folded into per-user
+decayed sums, so memory depends on the chunk and page sizes, not on how long
+the histories are. The product vectors of a page come from one batched
+retrieve. Each chunk is written in one transaction that holds the users'
+profile update locks. A versioned ``UPDATE`` keeps only users whose
+``profile_version`` is still the one read at the start of the chunk, and
+only their points are upserted. After every chunk the ``RebuildCheckpoint``
+records the last user id, so an interrupted run resumes from there.
+
+Only the main vector is rebuilt: interest sub-points
+(``profile_interest_count > 1``) keep following the incremental path.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Float, Integer, String, column, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+
+from src.core.locks import advisory_xact_lock_many
+from src.core.metrics import counter
+from src.core.profile_state import compute_profile_confidence
+from src.core.retrieval import get_retrieval_backend
+from src.features.feedback.service.profile_update_kernel import normalize_rows
+from src.features.feedback.service.profile_update_service import (
+    _USER_PROFILE_LOCKS,
+    PROFILE_UPDATE_LOCK_NAME,
+    ProfileUpdateService,
+    _get_qdrant,
+    _get_session_factory,
+)
+from src.models.user import User
+from src.models.user_interaction import UserInteraction
+
+logger = logging.getLogger(__name__)
+
+PROFILE_REBUILD_USERS = counter(
+    "profile_rebuild_users_total",
+    "Users visited by the profile rebuild, by outcome.",
+    labelnames=("result",),
+)
+
+
+@dataclass
+class RebuildCheckpoint:
+    """Progress of one rebuild run.
+
+    ``started_at`` is also the reference time of the decay, so a resumed run
+    weighs interactions exactly as the interrupted one did.
+    """
+
+    started_at: datetime
+    after_user_id: UUID | None = None
+    users_rebuilt: int = 0
+    users_skipped: int = 0
+    completed_at: datetime | None = None
+
+    @classmethod
+    def start(cls, now: datetime | None = None) -> RebuildCheckpoint:
+        return cls(started_at=now or datetime.now(UTC))
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for key in ("started_at", "completed_at"):
+            if data[key] is not None:
+                data[key] = data[key].isoformat()
+        if self.after_user_id is not None:
+            data["after_user_id"] = str(self.after_user_id)
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> RebuildCheckpoint:
+        data = json.loads(raw)
+        return cls(
+            started_at=datetime.fromisoformat(data["started_at"]),
+            after_user_id=(
+                UUID(data["after_user_id"]) if data.get("after_user_id") else None
+            ),
+            users_rebuilt=int(data.get("users_rebuilt", 0)),
+            users_skipped=int(data.get("users_skipped", 0)),
+            completed_at=(
+                datetime.fromisoformat(data["completed_at"])
+                if data.get("completed_at")
+                else None
+            ),
+        )
+
+
+class DecayedInteractionSums:
+    """Running per-user weighted sums of positive and negative product vectors.
+
+    Args:
+        users: Number of user rows.
+    """
+
+    def __init__(self, users: int) -> None:
+        self.users = users
+        self.positive_sum: np.ndarray | None = None
+        self.negative_sum: np.ndarray | None = None
+        self.positive_weight = np.zeros(users, dtype=np.float64)
+        self.negative_weight = np.zeros(users, dtype=np.float64)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray, weights: np.ndarray) -> None:
+        """Fold one page of interactions into the sums.
+
+        Args:
+            rows: ``(n,)`` user row of each interaction, grouped by user.
+            vectors: ``(n, dim)`` product vectors (normalized here).
+            weights: ``(n,)`` decayed signal weights, negative for dislikes.
+        """
+        if len(rows) == 0:
+            return
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float64))
+        if self.positive_sum is None:
+            self.positive_sum = np.zeros((self.users, vectors.shape[1]))
+            self.negative_sum = np.zeros((self.users, vectors.shape[1]))
+
+        # Rows arrive grouped by user: reduceat sums each run in one pass
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        targets = rows[starts]
+        for sums, totals, coefficients in (
+            (self.positive_sum, self.positive_weight, np.maximum(weights, 0.0)),
+            (self.negative_sum, self.negative_weight, np.maximum(-weights, 0.0)),
+        ):
+            sums[targets] += np.add.reduceat(
+                coefficients[:, None] * vectors, starts, axis=0
+            )
+            totals[targets] += np.add.reduceat(coefficients, starts)
+
+    def vectors(self, dislike_weight: float) -> tuple[np.ndarray, np.ndarray]:
+        """Return the rebuilt unit vectors and which rows have one.
+
+        A row needs positive signal; dislikes alone say too little about
+        what the user wants.
+        """
+        valid = self.positive_weight > 0
+        if self.positive_sum is None:
+            return np.zeros((self.users, 0)), valid
+        positive = (
+            self.positive_sum / np.where(valid, self.positive_weight, 1.0)[:, None]
+        )
+        negative = (
+            self.negative_sum
+            / np.where(self.negative_weight > 0, self.negative_weight, 1.0)[:, None]
+        )
+        vectors = normalize_rows(positive - dislike_weight * negative)
+        valid &= np.any(vectors != 0, axis=1)
+        return vectors, valid
+
+
+class ProfileRebuildService(ProfileUpdateService):
+    """Recompute profile vectors from full interaction history.
+
+    Takes the same arguments as ``ProfileUpdateService``.
+    """
+
+    async def rebuild_profiles(
+        self,
+        checkpoint: RebuildCheckpoint | None = None,
+        on_checkpoint: Callable[[RebuildCheckpoint], None] | None = None,
+    ) -> RebuildCheckpoint:
+        """Rebuild every eligible user after ``checkpoint.after_user_id``.
+
+        ``on_checkpoint`` is called after each committed chunk and once more
+        when the run completes.
+        """
+        checkpoint = checkpoint or RebuildCheckpoint.start()
+        while True:
+            users = await self._load_rebuild_users(checkpoint.after_user_id)
+            if not users:
+                break
+            rebuilt, skipped = await self._rebuild_chunk(users, checkpoint.started_at)
+            checkpoint.after_user_id = users[-1].id
+            checkpoint.users_rebuilt += rebuilt
+            checkpoint.users_skipped += skipped
+            logger.info(
+                "Rebuilt %d of %d profiles up to user %s",
+                rebuilt,
+                len(users),
+                checkpoint.after_user_id,
+            )
+            if on_checkpoint is not None:
+                on_checkpoint(checkpoint)
+
+        checkpoint.completed_at = datetime.now(UTC)
+        if on_checkpoint is not None:
+            on_checkpoint(checkpoint)
+        return checkpoint
+
+    async def _rebuild_chunk(
+        self, users: Sequence, reference_time: datetime
+    ) -> tuple[int, int]:
+        """Rebuild one chunk of users; return ``(rebuilt, skipped)``."""
+        rows_by_user = {user.id: row for row, user in enumerate(users)}
+        user_ids = list(rows_by_user)
+        sums = DecayedInteractionSums(len(users))
+        half_life = self._settings.profile_rebuild_half_life_days * 86400.0
+        qdrant = self._qdrant or await _get_qdrant()
+        retrieval = (
+            self._retrieval
+            if self._retrieval is not None
+            else get_retrieval_backend(qdrant, self._settings)
+        )
+
+        cursor = None
+        while True:
+            page = await self._load_interaction_page(user_ids, cursor)
+            if not page:
+                break
+            product_vectors = await self._load_product_vectors(
+                retrieval, [str(row.product_id) for row in page]
+            )
+            kept = [
+                row
+                for row in page
+                if str(row.product_id) in product_vectors
+                and self._get_signal_weight(row.action) != 0
+            ]
+            if kept:
+                ages = np.array(
+                    [
+                        (
+                            reference_time - self._coerce_timestamp(row.created_at)
+                        ).total_seconds()
+                        for row in kept
+                    ]
+                )
+                sums.add(
+                    np.array([rows_by_user[row.user_id] for row in kept]),
+                    np.array([product_vectors[str(row.product_id)] for row in kept]),
+                    np.array([self._get_signal_weight(row.action) for row in kept])
+                    * np.exp2(-np.maximum(ages, 0.0) / half_life),
+                )
+            last = page[-1]
+            cursor = (last.user_id, last.created_at, last.id)
+            if len(page) < self._settings.profile_rebuild_interaction_page_size:
+                break
+
+        vectors, valid = sums.vectors(self._settings.profile_rebuild_dislike_weight)
+        candidates = [user for row, user in enumerate(users) if valid[row]]
+        PROFILE_REBUILD_USERS.inc(len(users) - len(candidates), result="no_signal")
+        if not candidates:
+            return 0, len(users)
+
+        profile_points = await self._load_user_profile_points(
+            qdrant, [user.id for user in candidates]
+        )
+        missing = [user for user in candidates if user.id not in profile_points]
+        PROFILE_REBUILD_USERS.inc(len(missing), result="missing_profile")
+        candidates = [user for user in candidates if user.id in profile_points]
+        if not candidates:
+            return 0, len(users)
+
+        session_factory = self._session_factory or _get_session_factory()
+        keys = [str(user.id) for user in candidates]
+        async with _USER_PROFILE_LOCKS.hold_many(keys), session_factory() as session:
+            if self._settings.profile_update_lock_backend == "postgres":
+                await advisory_xact_lock_many(session, PROFILE_UPDATE_LOCK_NAME, keys)
+            updated = await self._update_rebuilt_users(session, candidates)
+            points = [
+                self._build_profile_point(
+                    user_id=user.id,
+                    user=user,
+                    vector=vectors[rows_by_user[user.id]],
+                    payload=profile_points[user.id][1],
+                    next_profile_version=user.profile_version + 1,
+                    next_profile_source=self._resolve_profile_source(
+                        user.profile_source
+                    ),
+                    last_processed_at=self._coerce_timestamp(
+                        user.last_profile_update_at
+                    ),
+                )
+                for user in candidates
+                if user.id in updated
+            ]
+            if points:
+                await qdrant.upsert(
+                    collection_name=self._settings.user_profiles_collection,
+                    points=points,
+                )
+            await session.commit()
+
+        PROFILE_REBUILD_USERS.inc(len(updated), result="rebuilt")
+        PROFILE_REBUILD_USERS.inc(len(candidates) - len(updated), result="stale")
+        return len(updated), len(users) - len(updated)
+
+    async def _load_rebuild_users(self, after_user_id: UUID | None) -> list:
+        """Next chunk of users with enough consumed history, in id order."""
+        stmt = (
+            select(
+                User.id,
+                User.profile_version,
+                User.profile_source,
+                User.interaction_count,
+                User.last_profile_update_at,
+            )
+            .where(
+                User.interaction_count
+                >= self._settings.profile_rebuild_min_interactions,
+                User.last_profile_update_at.is_not(None),
+            )
+            .order_by(User.id)
+            .limit(self._settings.profile_rebuild_user_chunk_size)
+        )
+        if after_user_id is not None:
+            stmt = stmt.where(User.id > after_user_id)
+        session_factory = self._session_factory or _get_session_factory()
+        async with session_factory() as session:
+            result = await session.execute(stmt)
+            return list(result.all())
+
+    async def _load_interaction_page(
+        self, user_ids: list[UUID], cursor: tuple | None
+    ) -> list:
+        """Next page of consumed interactions of ``user_ids`` after ``cursor``.
+
+        Pages are ordered by ``(user_id, created_at, id)``, so each user's
+        interactions are contiguous and ``cursor`` is the last row's key.
+        """
+        stmt = (
+            select(
+                UserInteraction.id,
+                UserInteraction.user_id,
+                UserInteraction.product_id,
+                UserInteraction.action,
+                UserInteraction.created_at,
+            )
+            .join(User, User.id == UserInteraction.user_id)
+            .where(
+                UserInteraction.user_id.in_(user_ids),
+                UserInteraction.created_at <= User.last_profile_update_at,
+            )
+            .order_by(
+                UserInteraction.user_id,
+                UserInteraction.created_at.asc(),
+                UserInteraction.id.asc(),
+            )
+            .limit(self._settings.profile_rebuild_interaction_page_size)
+        )
+        if cursor is not None:
+            stmt = stmt.where(
+                tuple_(
+                    UserInteraction.user_id,
+                    UserInteraction.created_at,
+                    UserInteraction.id,
+                )
+                > tuple_(*cursor)
+            )
+        session_factory = self._session_factory or _get_session_factory()
+        async with session_factory() as session:
+            result = await session.execute(stmt)
+            return list(result.all())
+
+    async def _update_rebuilt_users(self, session, users: Sequence) -> set[UUID]:
+        """Bump the version of every user still at the version read; no commit.
+
+        Returns the users whose row was updated.
+        """
+        rows = values(
+            column("id", PGUUID(as_uuid=True)),
+            column("expected_version", Integer),
+            column("profile_confidence", Float),
+            column("profile_source", String),
+            name="profile_rebuilds",
+        ).data(
+            [
+                (
+                    user.id,
+                    user.profile_version,
+                    compute_profile_confidence(user.interaction_count),
+                    self._resolve_profile_source(user.profile_source),
+                )
+                for user in users
+            ]
+        )
+        stmt = (
+            update(User)
+            .where(
+                User.id == rows.c.id, User.profile_version == rows.c.expected_version
+            )
+            .values(
+                profile_version=rows.c.expected_version + 1,
+                profile_confidence=rows.c.profile_confidence,
+                profile_source=rows.c.profile_source,
+            )
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return set(result.scalars().all())
@@ -0,0 +1,149 @@
+"""Vectorized profile update kernel for many users at once.
+
+``apply_interactions`` runs the per-interaction update of
+``ProfileUpdateService._apply_interaction_update`` (learning-rate blend,
+dislike push-away, max-delta guardrail) over a stack of users. A user's
+interactions depend on each other, so the kernel steps through interaction
+positions: step ``t`` applies the ``t``-th pending interaction of every user
+in a block in one set of array operations. The loop runs once per block and
+position, not once per interaction.
+
+Arithmetic mirrors the scalar path operation for operation in float64, so
+results match it up to the rounding of the reductions (row norms and dot
+products are summed in a different order).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Upper bound of the effective learning rate of a positive signal
+MAX_POSITIVE_LEARNING_RATE = 0.35
+
+DEFAULT_BLOCK_SIZE = 128
+
+
+def row_norms(matrix: np.ndarray) -> np.ndarray:
+    """Return the L2 norm of every row."""
+    return np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale every row to unit length; all-zero rows are returned unchanged."""
+    norms = row_norms(matrix)
+    return matrix / np.where(norms == 0, 1.0, norms)[:, None]
+
+
+def row_cosine_distances(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Cosine distance between matching rows (0 where either row is zero)."""
+    norms = row_norms(left) * row_norms(right)
+    dots = np.einsum("ij,ij->i", left, right)
+    similarity = np.clip(dots / np.where(norms == 0, 1.0, norms), -1.0, 1.0)
+    return np.where(norms == 0, 0.0, 1.0 - similarity)
+
+
+def apply_interactions(
+    user_vectors: np.ndarray,
+    product_vectors: np.ndarray,
+    product_index: np.ndarray,
+    signal_weights: np.ndarray,
+    learning_rates: np.ndarray,
+    dislike_gammas: np.ndarray,
+    max_delta: float,
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> np.ndarray:
+    """Apply every user's ordered pending interactions to their vector.
+
+    Args:
+        user_vectors: ``(users, dim)`` current profile vectors.
+        product_vectors: ``(products, dim)`` vectors referenced by
+            ``product_index`` (normalized here, as the per-user path does).
+        product_index: ``(users, steps)`` row of ``product_vectors`` for each
+            user's ``t``-th interaction, ``-1`` for padding and interactions
+            without a product vector.
+        signal_weights: ``(users, steps)`` signal weight of each interaction
+            (positive for like/save, negative for dislike, 0 for no-ops).
+        learning_rates: ``(users,)`` learning rate from profile confidence.
+        dislike_gammas: ``(users,)`` dislike push-away strength, burst scaling
+            already applied.
+        max_delta: Maximum cosine distance one interaction may move a vector.
+        block_size: Users updated together. Blocks small enough to stay in
+            CPU cache across all steps beat whole-batch array operations,
+            which are memory-bound at thousands of 768-d users.
+
+    Returns:
+        ``(users, dim)`` updated vectors; the input is not modified.
+    """
+    vectors = np.array(user_vectors, dtype=np.float64)
+    products = np.asarray(product_vectors, dtype=np.float64)
+    learning_rates = np.asarray(learning_rates, dtype=np.float64)
+    dislike_gammas = np.asarray(dislike_gammas, dtype=np.float64)
+    block_size = max(1, block_size)
+
+    for start in range(0, len(vectors), block_size):
+        block = slice(start, start + block_size)
+        vectors[block] = _apply_block(
+            vectors[block],
+            products,
+            product_index[block],
+            signal_weights[block],
+            learning_rates[block],
+            dislike_gammas[block],
+            max_delta,
+        )
+    return vectors
+
+
+def _apply_block(
+    vectors: np.ndarray,
+    products: np.ndarray,
+    product_index: np.ndarray,
+    signal_weights: np.ndarray,
+    learning_rates: np.ndarray,
+    dislike_gammas: np.ndarray,
+    max_delta: float,
+) -> np.ndarray:
+    for step in range(product_index.shape[1]):
+        weights = signal_weights[:, step]
+        active = (product_index[:, step] >= 0) & (weights != 0.0)
+        if not active.any():
+            continue
+        rows = None if active.all() else np.flatnonzero(active)
+        select = slice(None) if rows is None else rows
+
+        current = vectors[select]
+        weight = weights[select]
+        learning_rate = learning_rates[select]
+        positive = weight > 0
+        effective_lr = np.minimum(learning_rate * weight, MAX_POSITIVE_LEARNING_RATE)
+        keep = np.where(positive, 1.0 - effective_lr, 1.0 - learning_rate)
+        push = np.where(
+            positive, effective_lr, -(np.abs(weight) * dislike_gammas[select])
+        )
+
+        # candidate = keep * current + push * normalize(product), in place
+        candidate = _normalize_rows_inplace(products[product_index[select, step]])
+        candidate *= push[:, None]
+        candidate += keep[:, None] * current
+        _normalize_rows_inplace(candidate)
+
+        distances = row_cosine_distances(current, candidate)
+        over = np.flatnonzero(distances > max_delta)
+        if over.size:
+            ratio = (max_delta / distances[over])[:, None]
+            candidate[over] = normalize_rows(
+                (1.0 - ratio) * current[over] + ratio * candidate[over]
+            )
+
+        if rows is None:
+            vectors = candidate
+        else:
+            vectors[rows] = candidate
+    return vectors
+
+
+def _normalize_rows_inplace(matrix: np.ndarray) -> np.ndarray:
+    norms = row_norms(matrix)
+    matrix /= np.where(norms == 0, 1.0, norms)[:, None]
+    return matrix
@@ -0,0 +1,406 @@
+"""Durable, per-user coalescing queue of profile updates.
+
+With ``profile_update_queue_backend = "postgres"`` a swipe no longer schedules
+a background task in the API process. It upserts one row per user into
+``profile_update_jobs`` in the same transaction as the interaction, so a
+recorded swipe always has a pending update, even across restarts. Workers
+(``scripts/profile_update_worker.py``) claim jobs with
+``FOR UPDATE SKIP LOCKED`` and run ``process_pending_updates``.
+
+Jobs coalesce per user: ten swipes before a worker gets to the user leave a
+single job, and one pass consumes all ten interactions. A swipe that arrives
+while its user's job is running bumps ``enqueued_at``; ``complete`` notices
+the change and makes the job available again instead of deleting it.
+
+A claimed job is leased for ``profile_update_lease_seconds`` (its
+``available_at`` moves to the lease expiry), so the job of a crashed worker is
+picked up again once the lease runs out. Failures retry with exponential
+backoff; after ``profile_update_max_attempts`` the job stays in the table with
+``failed_at`` set until the user swipes again.
+
+Two backends are available:
+- PostgresProfileUpdateQueue: durable, shared by every worker process
+- InMemoryProfileUpdateQueue: process-local stand-in with the same semantics
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import gauge
+from src.models.profile_update_job import ProfileUpdateJob
+
+logger = logging.getLogger(__name__)
+
+PROFILE_UPDATE_QUEUE_DEPTH = gauge(
+    "profile_update_queue_depth",
+    "Profile update jobs by state (pending, failed).",
+    labelnames=("state",),
+)
+PROFILE_UPDATE_QUEUE_LAG = gauge(
+    "profile_update_queue_lag_seconds",
+    "Age of the oldest pending profile update job.",
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
+def _get_session_factory():
+    from src.core.database import SessionLocal
+
+    return SessionLocal
+
+
+@dataclass(frozen=True)
+class ClaimedProfileUpdate:
+    """A job handed to a worker by ``claim``."""
+
+    user_id: UUID
+    enqueued_at: datetime
+    attempts: int
+
+
+@dataclass
+class ProfileUpdateQueueStats:
+    pending: int
+    failed: int
+    oldest_enqueued_at: datetime | None
+
+
+class ProfileUpdateQueue:
+    """Base class for profile update queues.
+
+    Args:
+        max_attempts: Attempts before a job is marked failed.
+        retry_base_seconds: Delay before the first retry; doubles per attempt.
+        lease_seconds: How long a claimed job stays invisible to other workers.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 5.0,
+        lease_seconds: float = 300.0,
+    ) -> None:
+        self._max_attempts = max(1, max_attempts)
+        self._retry_base_seconds = retry_base_seconds
+        self._lease_seconds = lease_seconds
+
+    def _retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(seconds=self._retry_base_seconds * 2 ** max(0, attempts - 1))
+
+    async def enqueue(self, session: AsyncSession, user_id: UUID) -> None:
+        """Schedule a profile update for ``user_id``.
+
+        Runs in the caller's transaction (where the backend has one), so the
+        job commits together with the interaction row.
+        """
+        raise NotImplementedError
+
+    async def claim(self, limit: int) -> list[ClaimedProfileUpdate]:
+        """Lease up to ``limit`` available jobs, oldest first."""
+        raise NotImplementedError
+
+    async def complete(self, job: ClaimedProfileUpdate) -> None:
+        """Remove a processed job, or requeue it if it was enqueued again."""
+        raise NotImplementedError
+
+    async def fail(self, job: ClaimedProfileUpdate, error: str) -> bool:
+        """Schedule a retry of ``job``; return True if it was marked failed."""
+        raise NotImplementedError
+
+    async def stats(self) -> ProfileUpdateQueueStats:
+        raise NotImplementedError
+
+    async def refresh_metrics(self) -> ProfileUpdateQueueStats:
+        """Publish queue depth and lag gauges from the current stats."""
+        stats = await self.stats()
+        PROFILE_UPDATE_QUEUE_DEPTH.set(stats.pending, state="pending")
+        PROFILE_UPDATE_QUEUE_DEPTH.set(stats.failed, state="failed")
+        lag = 0.0
+        if stats.oldest_enqueued_at is not None:
+            lag = max(0.0, (_utcnow() - stats.oldest_enqueued_at).total_seconds())
+        PROFILE_UPDATE_QUEUE_LAG.set(lag)
+        return stats
+
+
+@dataclass
+class _MemoryJob:
+    enqueued_at: datetime
+    first_enqueued_at: datetime
+    available_at: datetime
+    attempts: int = 0
+    last_error: str | None = None
+    failed_at: datetime | None = None
+
+
+class InMemoryProfileUpdateQueue(ProfileUpdateQueue):
+    """Process-local queue with the semantics of the Postgres one.
+
+    Not durable; meant for tests and single-process tools.
+
+    Args:
+        clock: Wall-clock time source returning aware datetimes (injectable
+            for tests).
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 5.0,
+        lease_seconds: float = 300.0,
+        clock: Callable[[], datetime] = _utcnow,
+    ) -> None:
+        super().__init__(max_attempts, retry_base_seconds, lease_seconds)
+        self._clock = clock
+        self._jobs: dict[UUID, _MemoryJob] = {}
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    async def enqueue(self, session: AsyncSession | None, user_id: UUID) -> None:
+        now = self._clock()
+        job = self._jobs.get(user_id)
+        if job is None or job.failed_at is not None:
+            self._jobs[user_id] = _MemoryJob(
+                enqueued_at=now, first_enqueued_at=now, available_at=now
+            )
+        else:
+            job.enqueued_at = now
+
+    async def claim(self, limit: int) -> list[ClaimedProfileUpdate]:
+        now = self._clock()
+        available = sorted(
+            (
+                (job.available_at, user_id)
+                for user_id, job in self._jobs.items()
+                if job.failed_at is None and job.available_at <= now
+            ),
+        )[:limit]
+        claimed = []
+        for _, user_id in available:
+            job = self._jobs[user_id]
+            job.available_at = now + timedelta(seconds=self._lease_seconds)
+            job.attempts += 1
+            claimed.append(
+                ClaimedProfileUpdate(
+                    user_id=user_id,
+                    enqueued_at=job.enqueued_at,
+                    attempts=job.attempts,
+                )
+            )
+        return claimed
+
+    async def complete(self, job: ClaimedProfileUpdate) -> None:
+        current = self._jobs.get(job.user_id)
+        if current is None:
+            return
+        if current.enqueued_at == job.enqueued_at:
+            del self._jobs[job.user_id]
+            return
+        now = self._clock()
+        current.available_at = now
+        current.first_enqueued_at = job.enqueued_at
+        current.attempts = 0
+        current.last_error = None
+
+    async def fail(self, job: ClaimedProfileUpdate, error: str) -> bool:
+        current = self._jobs.get(job.user_id)
+        if current is None:
+            return False
+        now = self._clock()
+        current.last_error = error
+        if job.attempts >= self._max_attempts:
+            current.failed_at = now
+            return True
+        current.available_at = now + self._retry_delay(job.attempts)
+        return False
+
+    async def stats(self) -> ProfileUpdateQueueStats:
+        pending = [job for job in self._jobs.values() if job.failed_at is None]
+        return ProfileUpdateQueueStats(
+            pending=len(pending),
+            failed=len(self._jobs) - len(pending),
+            oldest_enqueued_at=min(
+                (job.first_enqueued_at for job in pending), default=None
+            ),
+        )
+
+
+class PostgresProfileUpdateQueue(ProfileUpdateQueue):
+    """Queue backed by the ``profile_update_jobs`` table.
+
+    Args:
+        session_factory: Async session factory for claim/complete/fail/stats
+            (each runs in its own transaction). Defaults to the app's
+            ``SessionLocal``.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 5.0,
+        lease_seconds: float = 300.0,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
+        super().__init__(max_attempts, retry_base_seconds, lease_seconds)
+        self._session_factory = session_factory
+
+    def _sessions(self) -> async_sessionmaker[AsyncSession]:
+        return self._session_factory or _get_session_factory()
+
+    async def enqueue(self, session: AsyncSession, user_id: UUID) -> None:
+        now = func.now()
+        stmt = insert(ProfileUpdateJob).values(
+            user_id=user_id,
+            enqueued_at=now,
+            first_enqueued_at=now,
+            available_at=now,
+            attempts=0,
+        )
+        failed = ProfileUpdateJob.failed_at.is_not(None)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProfileUpdateJob.user_id],
+            set_={
+                "enqueued_at": stmt.excluded.enqueued_at,
+                # A failed job starts over; a pending or running one keeps
+                # its schedule and only records that there is more to do
+                "first_enqueued_at": case(
+                    (failed, stmt.excluded.first_enqueued_at),
+                    else_=ProfileUpdateJob.first_enqueued_at,
+                ),
+                "available_at": case(
+                    (failed, stmt.excluded.available_at),
+                    else_=ProfileUpdateJob.available_at,
+                ),
+                "attempts": case((failed, 0), else_=ProfileUpdateJob.attempts),
+                "failed_at": None,
+                "updated_at": func.now(),
+            },
+        )
+        await session.execute(stmt)
+
+    async def claim(self, limit: int) -> list[ClaimedProfileUpdate]:
+        available = (
+            select(ProfileUpdateJob.id)
+            .where(
+                ProfileUpdateJob.failed_at.is_(None),
+                ProfileUpdateJob.available_at <= func.now(),
+            )
+            .order_by(ProfileUpdateJob.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(ProfileUpdateJob)
+            .where(ProfileUpdateJob.id.in_(available.scalar_subquery()))
+            .values(
+                available_at=func.now() + timedelta(seconds=self._lease_seconds),
+                attempts=ProfileUpdateJob.attempts + 1,
+                updated_at=func.now(),
+            )
+            .returning(
+                ProfileUpdateJob.user_id,
+                ProfileUpdateJob.enqueued_at,
+                ProfileUpdateJob.attempts,
+            )
+        )
+        async with self._sessions()() as session:
+            rows = (await session.execute(stmt)).all()
+            await session.commit()
+        return [
+            ClaimedProfileUpdate(
+                user_id=row.user_id, enqueued_at=row.enqueued_at, attempts=row.attempts
+            )
+            for row in rows
+        ]
+
+    async def complete(self, job: ClaimedProfileUpdate) -> None:
+        async with self._sessions()() as session:
+            deleted = await session.execute(
+                delete(ProfileUpdateJob).where(
+                    ProfileUpdateJob.user_id == job.user_id,
+                    ProfileUpdateJob.enqueued_at == job.enqueued_at,
+                )
+            )
+            if deleted.rowcount == 0:
+                # Enqueued again while the worker ran: swipes recorded after
+                # the pass loaded its interactions still need an update
+                await session.execute(
+                    update(ProfileUpdateJob)
+                    .where(ProfileUpdateJob.user_id == job.user_id)
+                    .values(
+                        available_at=func.now(),
+                        first_enqueued_at=job.enqueued_at,
+                        attempts=0,
+                        last_error=None,
+                        updated_at=func.now(),
+                    )
+                )
+            await session.commit()
+
+    async def fail(self, job: ClaimedProfileUpdate, error: str) -> bool:
+        exhausted = job.attempts >= self._max_attempts
+        values: dict = {"last_error": error, "updated_at": func.now()}
+        if exhausted:
+            values["failed_at"] = func.now()
+        else:
+            values["available_at"] = func.now() + self._retry_delay(job.attempts)
+        async with self._sessions()() as session:
+            await session.execute(
+                update(ProfileUpdateJob)
+                .where(ProfileUpdateJob.user_id == job.user_id)
+                .values(**values)
+            )
+            await session.commit()
+        return exhausted
+
+    async def stats(self) -> ProfileUpdateQueueStats:
+        pending = ProfileUpdateJob.failed_at.is_(None)
+        stmt = select(
+            func.count().filter(pending),
+            func.count().filter(ProfileUpdateJob.failed_at.is_not(None)),
+            func.min(ProfileUpdateJob.first_enqueued_at).filter(pending),
+        )
+        async with self._sessions()() as session:
+            pending_count, failed_count, oldest = (await session.execute(stmt)).one()
+        return ProfileUpdateQueueStats(
+            pending=pending_count,
+            failed=failed_count,
+            oldest_enqueued_at=oldest,
+        )
+
+
+_queue: ProfileUpdateQueue | None = None
+
+
+def get_profile_update_queue(
+    settings: Settings | None = None,
+) -> ProfileUpdateQueue | None:
+    """Get or create the process-wide profile update queue.
+
+    Returns None when ``profile_update_queue_backend`` is ``"background"``:
+    updates then run as FastAPI background tasks in the API process.
+    """
+    global _queue
+    settings = settings or get_settings()
+    if settings.profile_update_queue_backend != "postgres":
+        return None
+    if _queue is None:
+        _queue = PostgresProfileUpdateQueue(
+            max_attempts=settings.profile_update_max_attempts,
+            retry_base_seconds=settings.profile_update_retry_base_seconds,
+            lease_seconds=settings.profile_update_lease_seconds,
+        )
+    return _queue
@@ -2,23 +2,50 @@
 
 This service batches any interactions recorded since the user's last successful
 profile update and applies them to the user's vector in Qdrant. The write path
-is intentionally decoupled from the swipe request via FastAPI BackgroundTasks.
+is intentionally decoupled from the swipe request: it runs as a FastAPI
+background task or from the durable queue (``profile_update_queue``).
 """
 
 from __future__ import annotations
 
-import asyncio
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from uuid import UUID
 
 import numpy as np
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import PointStruct
-from sqlalchemy import select, update
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Integer,
+    String,
+    column,
+    func,
+    or_,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.core.config import Settings, get_settings
+from src.core.locks import KeyedLocks, advisory_xact_lock, advisory_xact_lock_many
 from src.core.profile_state import compute_profile_confidence
+from src.core.retrieval import RetrievalBackend, get_retrieval_backend
+from src.core.user_interests import (
+    UserInterest,
+    build_interest_points,
+    load_user_interests,
+)
+from src.features.feedback.service.profile_update_kernel import (
+    MAX_POSITIVE_LEARNING_RATE,
+    apply_interactions,
+)
 from src.models.product import Product
 from src.models.user import User
 from src.models.user_interaction import UserInteraction
@@ -32,7 +59,8 @@ _POSITIVE_SIGNAL_WEIGHTS = {
 _NEGATIVE_SIGNAL_WEIGHTS = {
     "dislike": -1.0,
 }
-_USER_PROFILE_LOCKS: dict[str, asyncio.Lock] = {}
+PROFILE_UPDATE_LOCK_NAME = "profile_update"
+_USER_PROFILE_LOCKS = KeyedLocks(PROFILE_UPDATE_LOCK_NAME)
 
 
 @dataclass
@@ -43,6 +71,17 @@ class PendingInteraction:
     created_at: datetime
 
 
+@dataclass
+class _ProfileStateUpdate:
+    user_id: UUID
+    expected_version: int
+    next_version: int
+    last_processed_at: datetime
+    price_profile: dict
+    profile_confidence: float
+    profile_source: str | None
+
+
 def _get_session_factory():
     from src.core.database import SessionLocal
 
@@ -56,23 +95,48 @@ async def _get_qdrant():
 
 
 class ProfileUpdateService:
-    """Apply pending feedback interactions to a user's learned profile."""
-
-    def __init__(self, settings: Settings | None = None) -> None:
+    """Apply pending feedback interactions to a user's learned profile.
+
+    Args:
+        settings: Application settings.
+        session_factory: Async session factory. Defaults to the app's
+            ``SessionLocal``.
+        qdrant_client: Async Qdrant client. Defaults to the process-wide client.
+        retrieval: Backend for product vector lookups. Defaults to the
+            configured one (``retrieval_backend``).
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        *,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        qdrant_client: AsyncQdrantClient | None = None,
+        retrieval: RetrievalBackend | None = None,
+    ) -> None:
         self._settings = settings or get_settings()
+        self._session_factory = session_factory
+        self._qdrant = qdrant_client
+        self._retrieval = retrieval
 
     async def process_pending_updates(self, user_id: UUID) -> int:
         """Process all interactions recorded since the last successful update.
 
         Returns the number of interactions consumed by this update pass.
+        Passes for the same user are serialized in this process and, with
+        ``profile_update_lock_backend = "postgres"``, across processes by an
+        advisory lock held until the pass commits or rolls back.
         """
-        lock = _USER_PROFILE_LOCKS.setdefault(str(user_id), asyncio.Lock())
-        async with lock:
+        async with _USER_PROFILE_LOCKS.hold(str(user_id)):
             return await self._process_pending_updates_locked(user_id)
 
     async def _process_pending_updates_locked(self, user_id: UUID) -> int:
-        session_factory = _get_session_factory()
+        session_factory = self._session_factory or _get_session_factory()
         async with session_factory() as session:
+            if self._settings.profile_update_lock_backend == "postgres":
+                await advisory_xact_lock(
+                    session, PROFILE_UPDATE_LOCK_NAME, str(user_id)
+                )
             user = await self._load_user(session, user_id)
             if user is None:
                 logger.warning("Skipping profile update for missing user=%s", user_id)
@@ -82,7 +146,7 @@ class ProfileUpdateService:
             if not pending_interactions:
                 return 0
 
-            qdrant = await _get_qdrant()
+            qdrant = self._qdrant or await _get_qdrant()
             current_vector, payload = await self._load_user_profile_point(
                 qdrant, user_id
             )
@@ -95,11 +159,16 @@ class ProfileUpdateService:
 
             burst_active = await self._has_recent_dislike_burst(session, user_id)
             product_vectors = await self._load_product_vectors(
-                qdrant,
+                (
+                    self._retrieval
+                    if self._retrieval is not None
+                    else get_retrieval_backend(qdrant, self._settings)
+                ),
                 [interaction.product_id for interaction in pending_interactions],
             )
 
             new_vector = np.array(current_vector, dtype=np.float64)
+            interests = await self._load_user_interests(qdrant, user_id, new_vector)
             new_price_profile = dict(user.price_profile or {})
             applied_count = 0
 
@@ -120,6 +189,14 @@ class ProfileUpdateService:
                     profile_confidence=user.profile_confidence,
                     burst_active=burst_active,
                 )
+                if interests is not None:
+                    self._apply_interest_update(
+                        interests=interests,
+                        product_vector=np.array(product_vector, dtype=np.float64),
+                        action=interaction.action,
+                        profile_confidence=user.profile_confidence,
+                        burst_active=burst_active,
+                    )
                 new_price_profile = self._update_price_profile(
                     current_profile=new_price_profile,
                     price=interaction.price,
@@ -134,24 +211,30 @@ class ProfileUpdateService:
             next_version = user.profile_version + 1
             next_confidence = compute_profile_confidence(user.interaction_count)
             next_source = self._resolve_profile_source(user.profile_source)
-            next_payload = {
-                **payload,
-                "user_id": str(user_id),
-                "profile_version": next_version,
-                "profile_source": next_source,
-                "interaction_count": user.interaction_count,
-                "last_profile_update_at": last_processed_at.isoformat(),
-            }
-
+            points = [
+                self._build_profile_point(
+                    user_id=user_id,
+                    user=user,
+                    vector=new_vector,
+                    payload=payload,
+                    next_profile_version=next_version,
+                    next_profile_source=next_source,
+                    last_processed_at=last_processed_at,
+                )
+            ]
+            if interests is not None:
+                points.extend(
+                    build_interest_points(
+                        user_id,
+                        [
+                            UserInterest(vector=vector.tolist(), weight=weight)
+                            for vector, weight in interests
+                        ],
+                    )
+                )
             await qdrant.upsert(
                 collection_name=self._settings.user_profiles_collection,
-                points=[
-                    PointStruct(
-                        id=str(user_id),
-                        vector=new_vector.tolist(),
-                        payload=next_payload,
-                    )
-                ],
+                points=points,
             )
 
             updated = await self._commit_user_profile_update(
@@ -179,6 +262,287 @@ class ProfileUpdateService:
             )
             return len(pending_interactions)
 
+    async def process_pending_updates_batch(
+        self, user_ids: Sequence[UUID]
+    ) -> dict[UUID, int]:
+        """Process the pending interactions of many users in bulk.
+
+        Users are handled in chunks of ``profile_update_batch_size``. A chunk
+        costs the same number of round trips whatever its size: one query
+        each for users, pending interactions and dislike bursts, one Qdrant
+        retrieve for the user points and one for all product vectors, one
+        bulk ``upsert`` and one versioned ``UPDATE users``. Vectors are
+        updated by the vectorized kernel (``profile_update_kernel``); results
+        match ``process_pending_updates`` user by user.
+
+        A chunk holds the in-process locks of all its users and, with
+        ``profile_update_lock_backend = "postgres"``, their advisory locks.
+        Multi-interest profiles go through the per-user path.
+
+        Returns the number of interactions consumed per user (0 when the user
+        was skipped or lost a version race).
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        if self._settings.profile_interest_count > 1:
+            return {
+                user_id: await self.process_pending_updates(user_id)
+                for user_id in unique_ids
+            }
+
+        consumed: dict[UUID, int] = {}
+        chunk_size = max(1, self._settings.profile_update_batch_size)
+        for start in range(0, len(unique_ids), chunk_size):
+            consumed.update(
+                await self._process_pending_updates_chunk(
+                    unique_ids[start : start + chunk_size]
+                )
+            )
+        return consumed
+
+    async def _process_pending_updates_chunk(
+        self, user_ids: list[UUID]
+    ) -> dict[UUID, int]:
+        consumed = dict.fromkeys(user_ids, 0)
+        session_factory = self._session_factory or _get_session_factory()
+        keys = [str(user_id) for user_id in user_ids]
+        async with _USER_PROFILE_LOCKS.hold_many(keys), session_factory() as session:
+            if self._settings.profile_update_lock_backend == "postgres":
+                await advisory_xact_lock_many(session, PROFILE_UPDATE_LOCK_NAME, keys)
+            users = await self._load_users(session, user_ids)
+            pending = await self._load_pending_interactions_batch(session, users)
+            if not pending:
+                return consumed
+
+            qdrant = self._qdrant or await _get_qdrant()
+            profile_points = await self._load_user_profile_points(qdrant, list(pending))
+            ids = [user_id for user_id in pending if user_id in profile_points]
+            if not ids:
+                return consumed
+
+            bursts = await self._load_dislike_bursts(session, ids)
+            product_vectors = await self._load_product_vectors(
+                (
+                    self._retrieval
+                    if self._retrieval is not None
+                    else get_retrieval_backend(qdrant, self._settings)
+                ),
+                [
+                    interaction.product_id
+                    for user_id in ids
+                    for interaction in pending[user_id]
+                ],
+            )
+
+            user_matrix = np.array(
+                [profile_points[user_id][0] for user_id in ids], dtype=np.float64
+            )
+            product_ids = list(product_vectors)
+            product_rows = {
+                product_id: row for row, product_id in enumerate(product_ids)
+            }
+            steps = max(len(pending[user_id]) for user_id in ids)
+            product_index = np.full((len(ids), steps), -1, dtype=np.intp)
+            signal_weights = np.zeros((len(ids), steps), dtype=np.float64)
+            for row, user_id in enumerate(ids):
+                for step, interaction in enumerate(pending[user_id]):
+                    product_index[row, step] = product_rows.get(
+                        interaction.product_id, -1
+                    )
+                    signal_weights[row, step] = self._get_signal_weight(
+                        interaction.action
+                    )
+            gamma = self._settings.profile_update_dislike_gamma
+            burst_gamma = (
+                gamma * self._settings.profile_update_dislike_burst_gamma_scale
+            )
+            new_vectors = apply_interactions(
+                user_matrix,
+                np.array(
+                    [product_vectors[product_id] for product_id in product_ids],
+                    dtype=np.float64,
+                ).reshape(len(product_ids), user_matrix.shape[1]),
+                product_index,
+                signal_weights,
+                np.array(
+                    [
+                        self._get_learning_rate(users[user_id].profile_confidence)
+                        for user_id in ids
+                    ]
+                ),
+                np.array(
+                    [burst_gamma if user_id in bursts else gamma for user_id in ids]
+                ),
+                self._settings.profile_update_max_delta,
+            )
+
+            points: list[PointStruct] = []
+            updates: list[_ProfileStateUpdate] = []
+            for row, user_id in enumerate(ids):
+                user = users[user_id]
+                applied = [
+                    interaction
+                    for interaction in pending[user_id]
+                    if interaction.product_id in product_rows
+                ]
+                if not applied:
+                    continue
+
+                price_profile = dict(user.price_profile or {})
+                for interaction in applied:
+                    price_profile = self._update_price_profile(
+                        current_profile=price_profile,
+                        price=interaction.price,
+                        action=interaction.action,
+                    )
+                last_processed_at = pending[user_id][-1].created_at
+                next_version = user.profile_version + 1
+                next_source = self._resolve_profile_source(user.profile_source)
+                points.append(
+                    self._build_profile_point(
+                        user_id=user_id,
+                        user=user,
+                        vector=new_vectors[row],
+                        payload=profile_points[user_id][1],
+                        next_profile_version=next_version,
+                        next_profile_source=next_source,
+                        last_processed_at=last_processed_at,
+                    )
+                )
+                updates.append(
+                    _ProfileStateUpdate(
+                        user_id=user_id,
+                        expected_version=user.profile_version,
+                        next_version=next_version,
+                        last_processed_at=last_processed_at,
+                        price_profile=price_profile,
+                        profile_confidence=compute_profile_confidence(
+                            user.interaction_count
+                        ),
+                        profile_source=next_source,
+                    )
+                )
+            if not updates:
+                return consumed
+
+            await qdrant.upsert(
+                collection_name=self._settings.user_profiles_collection,
+                points=points,
+            )
+            updated = await self._commit_user_profile_updates(session, updates)
+
+        for state in updates:
+            if state.user_id in updated:
+                consumed[state.user_id] = len(pending[state.user_id])
+        if len(updated) < len(updates):
+            logger.info(
+                "Discarded %d stale profile updates in a batch of %d users",
+                len(updates) - len(updated),
+                len(user_ids),
+            )
+        logger.info(
+            "Processed %d profile interactions for %d users in one batch",
+            sum(consumed.values()),
+            len(updated),
+        )
+        return consumed
+
+    async def _load_users(self, session, user_ids: list[UUID]) -> dict[UUID, User]:
+        result = await session.execute(select(User).where(User.id.in_(user_ids)))
+        return {user.id: user for user in result.scalars().all()}
+
+    async def _load_pending_interactions_batch(
+        self,
+        session,
+        users: dict[UUID, User],
+    ) -> dict[UUID, list[PendingInteraction]]:
+        """Pending interactions of every user, in the per-user path's order."""
+        if not users:
+            return {}
+        stmt = (
+            select(
+                UserInteraction.user_id,
+                UserInteraction.action,
+                UserInteraction.created_at,
+                Product.id.label("product_id"),
+                Product.price,
+            )
+            .join(Product, Product.id == UserInteraction.product_id)
+            .join(User, User.id == UserInteraction.user_id)
+            .where(
+                UserInteraction.user_id.in_(list(users)),
+                or_(
+                    User.last_profile_update_at.is_(None),
+                    UserInteraction.created_at > User.last_profile_update_at,
+                ),
+            )
+            .order_by(
+                UserInteraction.user_id,
+                UserInteraction.created_at.asc(),
+                UserInteraction.id.asc(),
+            )
+        )
+        result = await session.execute(stmt)
+        pending: dict[UUID, list[PendingInteraction]] = {}
+        for row in result.all():
+            pending.setdefault(row.user_id, []).append(
+                PendingInteraction(
+                    product_id=str(row.product_id),
+                    action=row.action,
+                    price=float(row.price),
+                    created_at=self._coerce_timestamp(row.created_at),
+                )
+            )
+        return pending
+
+    async def _load_user_profile_points(
+        self,
+        qdrant,
+        user_ids: list[UUID],
+    ) -> dict[UUID, tuple[list[float], dict]]:
+        points = await qdrant.retrieve(
+            collection_name=self._settings.user_profiles_collection,
+            ids=[str(user_id) for user_id in user_ids],
+            with_vectors=True,
+            with_payload=True,
+        )
+        return {
+            UUID(str(point.id)): (point.vector, dict(point.payload or {}))
+            for point in points
+            if point.vector is not None
+        }
+
+    async def _load_dislike_bursts(self, session, user_ids: list[UUID]) -> set[UUID]:
+        """Users whose recent actions form a dislike burst (batch form)."""
+        limit = self._settings.profile_update_dislike_burst_count
+        ranked = (
+            select(
+                UserInteraction.user_id,
+                UserInteraction.action,
+                func.row_number()
+                .over(
+                    partition_by=UserInteraction.user_id,
+                    order_by=(
+                        UserInteraction.created_at.desc(),
+                        UserInteraction.id.desc(),
+                    ),
+                )
+                .label("position"),
+            )
+            .where(UserInteraction.user_id.in_(user_ids))
+            .subquery()
+        )
+        stmt = (
+            select(ranked.c.user_id)
+            .where(ranked.c.position <= limit)
+            .group_by(ranked.c.user_id)
+            .having(
+                func.count() == limit,
+                func.count().filter(ranked.c.action != "dislike") == 0,
+            )
+        )
+        result = await session.execute(stmt)
+        return set(result.scalars().all())
+
     async def _load_user(self, session, user_id: UUID) -> User | None:
         stmt = select(User).where(User.id == user_id)
         result = await session.execute(stmt)
@@ -229,18 +593,42 @@ class ProfileUpdateService:
             return None, {}
         return points[0].vector, dict(points[0].payload or {})
 
-    async def _load_product_vectors(
+    async def _load_user_interests(
         self,
         qdrant,
+        user_id: UUID,
+        current_vector: np.ndarray,
+    ) -> list[tuple[np.ndarray, float]] | None:
+        """Load the user's interests as ``(vector, weight)`` pairs.
+
+        Returns None when multi-interest profiles are disabled. A user without
+        stored interests starts with a single interest seeded from the main
+        vector.
+        """
+        count = self._settings.profile_interest_count
+        if count <= 1:
+            return None
+        stored = await load_user_interests(
+            qdrant, self._settings.user_profiles_collection, user_id, count
+        )
+        if not stored:
+            return [(current_vector.copy(), 1.0)]
+        return [
+            (np.array(interest.vector, dtype=np.float64), interest.weight)
+            for interest in stored
+        ]
+
+    async def _load_product_vectors(
+        self,
+        retrieval: RetrievalBackend,
         product_ids: list[str],
     ) -> dict[str, list[float]]:
         unique_ids = list(dict.fromkeys(product_ids))
         if not unique_ids:
             return {}
 
-        points = await qdrant.retrieve(
-            collection_name=self._settings.qdrant_collection,
-            ids=unique_ids,
+        points = await retrieval.retrieve(
+            unique_ids,
             with_vectors=True,
             with_payload=False,
         )
@@ -295,6 +683,80 @@ class ProfileUpdateService:
         await session.commit()
         return True
 
+    async def _commit_user_profile_updates(
+        self, session, updates: list[_ProfileStateUpdate]
+    ) -> set[UUID]:
+        """Apply every state update guarded by its expected version; commit.
+
+        Returns the users whose row was updated.
+        """
+        rows = values(
+            column("id", PGUUID(as_uuid=True)),
+            column("expected_version", Integer),
+            column("next_version", Integer),
+            column("last_profile_update_at", DateTime(timezone=True)),
+            column("price_profile", JSONB),
+            column("profile_confidence", Float),
+            column("profile_source", String),
+            name="profile_updates",
+        ).data(
+            [
+                (
+                    state.user_id,
+                    state.expected_version,
+                    state.next_version,
+                    state.last_processed_at,
+                    state.price_profile,
+                    state.profile_confidence,
+                    state.profile_source,
+                )
+                for state in updates
+            ]
+        )
+        stmt = (
+            update(User)
+            .where(
+                User.id == rows.c.id, User.profile_version == rows.c.expected_version
+            )
+            .values(
+                profile_version=rows.c.next_version,
+                last_profile_update_at=rows.c.last_profile_update_at,
+                price_profile=rows.c.price_profile,
+                profile_confidence=rows.c.profile_confidence,
+                profile_source=rows.c.profile_source,
+            )
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        updated = set(result.scalars().all())
+        await session.commit()
+        return updated
+
+    @staticmethod
+    def _build_profile_point(
+        *,
+        user_id: UUID,
+        user: User,
+        vector: np.ndarray,
+        payload: dict,
+        next_profile_version: int,
+        next_profile_source: str | None,
+        last_processed_at: datetime,
+    ) -> PointStruct:
+        return PointStruct(
+            id=str(user_id),
+            vector=vector.tolist(),
+            payload={
+                **payload,
+                "user_id": str(user_id),
+                "profile_version": next_profile_version,
+                "profile_source": next_profile_source,
+                "interaction_count": user.interaction_count,
+                "last_profile_update_at": last_processed_at.isoformat(),
+            },
+        )
+
     def _apply_interaction_update(
         self,
         *,
@@ -312,7 +774,9 @@ class ProfileUpdateService:
             return user_vector
 
         if signal_weight > 0:
-            effective_lr = min(learning_rate * signal_weight, 0.35)
+            effective_lr = min(
+                learning_rate * signal_weight, MAX_POSITIVE_LEARNING_RATE
+            )
             candidate = self._normalize_vector(
                 (1.0 - effective_lr) * user_vector + effective_lr * product_vector
             )
@@ -327,6 +791,50 @@ class ProfileUpdateService:
 
         return self._limit_delta(user_vector, candidate)
 
+    def _apply_interest_update(
+        self,
+        *,
+        interests: list[tuple[np.ndarray, float]],
+        product_vector: np.ndarray,
+        action: str,
+        profile_confidence: float,
+        burst_active: bool,
+    ) -> None:
+        """Move the interest nearest to the product, or spawn a new one.
+
+        A positive signal on a product unlike every existing interest starts a
+        new interest while fewer than ``profile_interest_count`` exist.
+        Updates ``interests`` in place.
+        """
+        signal_weight = self._get_signal_weight(action)
+        if signal_weight == 0.0:
+            return
+
+        similarities = [
+            1.0 - self._cosine_distance(vector, product_vector)
+            for vector, _ in interests
+        ]
+        nearest = int(np.argmax(similarities))
+        if (
+            signal_weight > 0
+            and len(interests) < self._settings.profile_interest_count
+            and similarities[nearest] < self._settings.profile_interest_spawn_similarity
+        ):
+            interests.append((self._normalize_vector(product_vector), signal_weight))
+            return
+
+        vector, weight = interests[nearest]
+        interests[nearest] = (
+            self._apply_interaction_update(
+                user_vector=vector,
+                product_vector=product_vector,
+                action=action,
+                profile_confidence=profile_confidence,
+                burst_active=burst_active,
+            ),
+            weight + max(signal_weight, 0.0),
+        )
+
     def _get_learning_rate(self, profile_confidence: float) -> float:
         if profile_confidence < self._settings.profile_update_lr_mid_confidence:
             return self._settings.profile_update_lr_new
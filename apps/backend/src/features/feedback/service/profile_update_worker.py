@@ -0,0 +1,132 @@
+"""Worker loop that drains the profile update queue.
+
+Each worker process (``scripts/profile_update_worker.py``) runs one
+``ProfileUpdateWorker``. The worker claims up to ``concurrency`` jobs at a
+time and runs their updates concurrently. With
+``profile_update_worker_batch_size`` above 1 it instead claims that many jobs
+and applies them in one bulk pass (``process_pending_updates_batch``); if
+the pass fails, the jobs are retried one by one so each keeps its own retry
+count. When the queue is empty it polls every
+``profile_update_poll_seconds``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import counter, histogram
+from src.features.feedback.service.profile_update_queue import (
+    ClaimedProfileUpdate,
+    ProfileUpdateQueue,
+)
+from src.features.feedback.service.profile_update_service import ProfileUpdateService
+
+logger = logging.getLogger(__name__)
+
+PROFILE_UPDATE_JOBS = counter(
+    "profile_update_jobs_total",
+    "Processed profile update jobs by result (completed, retried, failed).",
+    labelnames=("result",),
+)
+PROFILE_UPDATE_JOB_SECONDS = histogram(
+    "profile_update_job_duration_seconds",
+    "Wall time of one queued profile update.",
+)
+
+
+class ProfileUpdateWorker:
+    """Claim profile update jobs and apply them.
+
+    Args:
+        queue: Queue to drain.
+        service: Service that applies a user's pending interactions.
+        settings: Application settings.
+        concurrency: Jobs processed at once. Defaults to
+            ``profile_update_worker_concurrency``.
+    """
+
+    def __init__(
+        self,
+        queue: ProfileUpdateQueue,
+        service: ProfileUpdateService | None = None,
+        settings: Settings | None = None,
+        *,
+        concurrency: int | None = None,
+    ) -> None:
+        self._settings = settings or get_settings()
+        self._queue = queue
+        self._service = service or ProfileUpdateService(self._settings)
+        self._concurrency = max(
+            1, concurrency or self._settings.profile_update_worker_concurrency
+        )
+        self._batch_size = self._settings.profile_update_worker_batch_size
+
+    async def run_once(self) -> int:
+        """Claim and process one round of jobs; return how many were claimed."""
+        if self._batch_size > 1:
+            jobs = await self._queue.claim(self._batch_size)
+            if jobs:
+                await self._process_batch(jobs)
+            return len(jobs)
+
+        jobs = await self._queue.claim(self._concurrency)
+        if jobs:
+            await asyncio.gather(*(self._process(job) for job in jobs))
+        return len(jobs)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Process jobs until ``stop`` is set.
+
+        Finishes the jobs in flight before returning, so their leases do not
+        have to expire.
+        """
+        poll_seconds = self._settings.profile_update_poll_seconds
+        while not stop.is_set():
+            try:
+                claimed = await self.run_once()
+                await self._queue.refresh_metrics()
+            except Exception:
+                logger.exception("Profile update worker round failed")
+                claimed = 0
+            if claimed == 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(stop.wait(), timeout=poll_seconds)
+
+    async def _process_batch(self, jobs: list[ClaimedProfileUpdate]) -> None:
+        try:
+            await self._service.process_pending_updates_batch(
+                [job.user_id for job in jobs]
+            )
+        except Exception:
+            logger.exception(
+                "Batch profile update of %d jobs failed; retrying one by one",
+                len(jobs),
+            )
+            await asyncio.gather(*(self._process(job) for job in jobs))
+            return
+
+        for job in jobs:
+            await self._queue.complete(job)
+        PROFILE_UPDATE_JOBS.inc(len(jobs), result="completed")
+
+    async def _process(self, job: ClaimedProfileUpdate) -> None:
+        start = time.perf_counter()
+        try:
+            consumed = await self._service.process_pending_updates(job.user_id)
+        except Exception as exc:
+            PROFILE_UPDATE_JOB_SECONDS.observe(time.perf_counter() - start)
+            logger.exception(
+                "Profile update failed: user=%s attempt=%d", job.user_id, job.attempts
+            )
+            failed = await self._queue.fail(job, repr(exc))
+            PROFILE_UPDATE_JOBS.inc(result="failed" if failed else "retried")
+            return
+
+        PROFILE_UPDATE_JOB_SECONDS.observe(time.perf_counter() - start)
+        await self._queue.complete(job)
+        PROFILE_UPDATE_JOBS.inc(result="completed")
+        logger.debug("Profile update done: user=%s consumed=%d", job.user_id, consumed)
@@ -2,17 +2,24 @@
 
 Handles the persistence of like/dislike/save actions, looking up
 products by external_id (Qdrant point ID) to obtain the UUID FK.
+``record_feedback_batch`` records many buffered swipes in one transaction
+with a fixed number of statements.
 """
 
 from __future__ import annotations
 
 import logging
-from uuid import UUID
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import timedelta
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import Row, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.profile_state import compute_profile_confidence
+from src.core.popularity import record_popularity, record_popularity_many
+from src.core.profile_state import profile_confidence_expression
+from src.features.feedback.service.profile_update_queue import ProfileUpdateQueue
 from src.models.product import Product
 from src.models.user import User
 from src.models.user_interaction import UserInteraction
@@ -20,6 +27,21 @@ from src.models.user_interaction import UserInteraction
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class FeedbackBatchResult:
+    """Outcome of ``FeedbackService.record_feedback_batch``.
+
+    Attributes:
+        interactions: Created rows (id, product_id, action, created_at) in
+            the order they were submitted.
+        skipped_product_ids: Submitted product ids that are malformed or
+            unknown; their interactions were not recorded.
+    """
+
+    interactions: list[Row] = field(default_factory=list)
+    skipped_product_ids: list[str] = field(default_factory=list)
+
+
 class FeedbackService:
     """Service for recording user feedback on products."""
 
@@ -29,6 +51,7 @@ class FeedbackService:
         product_id_external: str,
         action: str,
         session: AsyncSession,
+        profile_update_queue: ProfileUpdateQueue | None = None,
     ) -> UserInteraction:
         """Record a user interaction (like/dislike/save) with a product.
 
@@ -38,6 +61,8 @@ class FeedbackService:
                 by the feed endpoint.
             action: The feedback action string (like, dislike, save).
             session: Async SQLAlchemy database session.
+            profile_update_queue: Queue that receives the user's profile
+                update job, committed together with the interaction.
 
         Returns:
             The created UserInteraction record.
@@ -66,13 +91,11 @@ class FeedbackService:
             action=action,
         )
         session.add(interaction)
+        await record_popularity(session, product.id, action)
 
-        stmt_user = select(User).where(User.id == user_id)
-        user_result = await session.execute(stmt_user)
-        user = user_result.scalar_one_or_none()
-        if user is not None:
-            user.interaction_count += 1
-            user.profile_confidence = compute_profile_confidence(user.interaction_count)
+        await self._increment_interaction_count(session, user_id, 1)
+        if profile_update_queue is not None:
+            await profile_update_queue.enqueue(session, user_id)
 
         await session.commit()
         await session.refresh(interaction)
@@ -85,3 +108,113 @@ class FeedbackService:
         )
 
         return interaction
+
+    async def record_feedback_batch(
+        self,
+        user_id: UUID,
+        interactions: Sequence[tuple[str, str]],
+        session: AsyncSession,
+        profile_update_queue: ProfileUpdateQueue | None = None,
+    ) -> FeedbackBatchResult:
+        """Record buffered ``(product_id, action)`` interactions at once.
+
+        Products are validated with one ``IN`` query, the interactions are
+        bulk-inserted, popularity and the user's counters are each updated
+        by one statement, and the user gets a single profile update job.
+        Interactions keep the submitted order in ``created_at``, which is
+        the order profile updates apply them in.
+
+        Args:
+            user_id: The authenticated user's UUID.
+            interactions: ``(product_id, action)`` pairs, oldest first.
+            session: Async SQLAlchemy database session.
+            profile_update_queue: Queue that receives the user's profile
+                update job, committed together with the interactions.
+
+        Returns:
+            The created rows and the product ids that were skipped.
+        """
+        product_ids: dict[str, UUID] = {}
+        for product_id_external, _ in interactions:
+            try:
+                product_ids[product_id_external] = UUID(product_id_external)
+            except ValueError:
+                continue
+
+        known: set[UUID] = set()
+        if product_ids:
+            stmt = select(Product.id).where(Product.id.in_(set(product_ids.values())))
+            known = set((await session.execute(stmt)).scalars().all())
+
+        accepted: list[tuple[UUID, str]] = []
+        skipped: list[str] = []
+        for product_id_external, action in interactions:
+            product_id = product_ids.get(product_id_external)
+            if product_id in known:
+                accepted.append((product_id, action))
+            else:
+                skipped.append(product_id_external)
+        if not accepted:
+            return FeedbackBatchResult(skipped_product_ids=skipped)
+
+        # One timestamp per transaction, offset by position to keep the order
+        stmt = (
+            insert(UserInteraction)
+            .values(
+                [
+                    {
+                        "id": uuid4(),
+                        "user_id": user_id,
+                        "product_id": product_id,
+                        "action": action,
+                        "created_at": func.now() + timedelta(microseconds=position),
+                    }
+                    for position, (product_id, action) in enumerate(accepted)
+                ]
+            )
+            .returning(
+                UserInteraction.id,
+                UserInteraction.product_id,
+                UserInteraction.action,
+                UserInteraction.created_at,
+            )
+        )
+        rows = sorted(
+            (await session.execute(stmt)).all(), key=lambda row: row.created_at
+        )
+        await record_popularity_many(session, accepted)
+        await self._increment_interaction_count(session, user_id, len(accepted))
+        if profile_update_queue is not None:
+            await profile_update_queue.enqueue(session, user_id)
+
+        await session.commit()
+
+        logger.info(
+            "Recorded feedback batch: user=%s recorded=%d skipped=%d",
+            user_id,
+            len(rows),
+            len(skipped),
+        )
+        return FeedbackBatchResult(interactions=rows, skipped_product_ids=skipped)
+
+    @staticmethod
+    async def _increment_interaction_count(
+        session: AsyncSession, user_id: UUID, count: int
+    ) -> int | None:
+        """Atomically add ``count`` interactions and recompute confidence.
+
+        Returns the new interaction count, or None if the user does not exist.
+        """
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                interaction_count=User.interaction_count + count,
+                profile_confidence=profile_confidence_expression(
+                    User.interaction_count + count
+                ),
+            )
+            .returning(User.interaction_count)
+            .execution_options(synchronize_session=False)
+        )
+        return (await session.execute(stmt)).scalar_one_or_none()
@@ -16,12 +16,13 @@ from uuid import UUID, uuid4
 from fastapi import HTTPException, UploadFile, status
 from PIL import Image
 from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import PointStruct
+from qdrant_client.models import PointIdsList, PointStruct
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import Settings
 from src.core.profile_state import compute_profile_confidence
+from src.core.user_interests import interest_point_ids
 from src.features.ai.service.embedding_service import EmbeddingService
 from src.features.ai.service.quality_gate import QualityGateService
 from src.features.clustering.service.cold_start_service import ColdStartService
@@ -36,6 +37,9 @@ from src.features.onboarding.service.user_vector import (
     compute_user_vector,
     initialize_price_profile,
 )
+from src.features.products.service.product_card_cache import (
+    get_product_card_cache,
+)
 from src.features.storage.service.service import S3StorageService
 from src.models.product import Product
 from src.models.user import User
@@ -191,33 +195,23 @@ class OnboardingService:
             for match in cold_start_response.matches
         }
 
-        # Look up product details from PostgreSQL
-        product_uuids = []
-        for pid in product_ids:
-            try:
-                product_uuids.append(UUID(pid))
-            except ValueError:
-                logger.warning("Invalid product UUID from cold-start: %s", pid)
-                continue
-
-        stmt = select(Product).where(Product.id.in_(product_uuids))
-        result = await session.execute(stmt)
-        products_by_id = {str(p.id): p for p in result.scalars().all()}
+        # Look up product details (shared card cache, then PostgreSQL)
+        cards = await get_product_card_cache().get_many(session, product_ids)
 
         # Transform matches into CalibrationItem list, preserving order
         items: list[CalibrationItem] = []
         for pid in product_ids:
-            product = products_by_id.get(pid)
-            if product is None:
+            card = cards.get(pid)
+            if card is None:
                 logger.warning("Product %s not found in PostgreSQL, skipping", pid)
                 continue
             items.append(
                 CalibrationItem(
                     product_id=pid,
-                    title=product.title,
-                    price=float(product.price),
-                    currency=product.currency,
-                    image_url=product.image_url,
+                    title=card.title,
+                    price=card.price,
+                    currency=card.currency,
+                    image_url=card.image_url,
                     is_diversity=diversity_map.get(pid, False),
                 )
             )
@@ -336,6 +330,16 @@ class OnboardingService:
                 )
             ],
         )
+        # Interests learned from a previous calibration no longer apply; the
+        # next profile update reseeds them from the new vector
+        interest_count = self._settings.profile_interest_count
+        if interest_count > 1:
+            await self._qdrant.delete(
+                collection_name=self._settings.user_profiles_collection,
+                points_selector=PointIdsList(
+                    points=interest_point_ids(user_id, interest_count)
+                ),
+            )
 
         # Update User in PostgreSQL
         stmt_user = select(User).where(User.id == user_id)
@@ -18,7 +18,9 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ....core.config import get_settings
 from ....core.database import get_db
+from ....core.local_index import get_local_index
 from ....core.qdrant import get_qdrant_client
 from ....models.product import Product
 from ...ai.service.quality_gate import QualityGateService
@@ -31,6 +33,7 @@ from ..schemas.schemas import (
     RejectedItem,
 )
 from ..service.ingestion_service import IngestionService
+from ..service.product_card_cache import get_product_card_cache
 from ..service.product_repository import ProductRepository
 
 logger = logging.getLogger(__name__)
@@ -75,6 +78,9 @@ async def get_ingestion_service(
         embedding_service=embedding_service,
         quality_gate=_quality_gate_service,
         qdrant_client=qdrant_client,
+        local_index=get_local_index(),
+        display_payload=get_settings().product_payload_display_fields,
+        card_cache=get_product_card_cache(),
     )
 
 
@@ -205,6 +211,7 @@ async def ingest_batch(
             )
 
     await session.commit()
+    await service.invalidate_committed_cards()
 
     response = BatchIngestResponse(
         total=total,
@@ -249,6 +256,7 @@ async def archive_batch(
         session=session,
     )
     await session.commit()
+    await service.invalidate_committed_cards()
 
     return BatchArchiveResponse(
         archived_count=len(archived_ids),
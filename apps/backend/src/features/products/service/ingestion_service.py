@@ -26,12 +26,15 @@ if TYPE_CHECKING:
     from qdrant_client import AsyncQdrantClient
     from sqlalchemy.ext.asyncio import AsyncSession
 
+    from ....core.local_index import LocalVectorIndex
     from ....models.product import Product
     from ...ai.service.embedding_service import EmbeddingService
     from ...ai.service.quality_gate import QualityGateService
     from ..schemas.schemas import ProductCreate
+    from .product_card_cache import ProductCardCache
     from .product_repository import ProductRepository
 
+from ....core.product_payload import build_display_fields, build_product_payload
 from ..utils.category import normalize_raw_categories
 
 logger = logging.getLogger(__name__)
@@ -68,6 +71,13 @@ class IngestionService:
         quality_gate: QualityGateService for image validation.
         qdrant_client: AsyncQdrantClient for vector storage.
         collection_name: Qdrant collection name. Defaults to "products".
+        local_index: In-process product index to keep in sync with Qdrant
+            writes, when the local retrieval backend is enabled.
+        display_payload: Also write the feed's display fields (title,
+            currency, image and product URLs) into the point payload.
+        card_cache: Product card cache to invalidate when a product is
+            updated or archived. Invalidation waits for the caller's commit
+            (``invalidate_committed_cards``).
     """
 
     def __init__(
@@ -77,12 +87,75 @@ class IngestionService:
         quality_gate: QualityGateService,
         qdrant_client: AsyncQdrantClient,
         collection_name: str = "products",
+        local_index: LocalVectorIndex | None = None,
+        display_payload: bool = False,
+        card_cache: ProductCardCache | None = None,
     ) -> None:
         self.repository = repository
         self.embedding_service = embedding_service
         self.quality_gate = quality_gate
         self.qdrant = qdrant_client
         self.collection_name = collection_name
+        self.local_index = local_index
+        self.display_payload = display_payload
+        self.card_cache = card_cache
+        self._pending_card_invalidations: list = []
+
+    async def _upsert_point(self, point: PointStruct) -> None:
+        """Write a product point to Qdrant and mirror it into the local index."""
+        await self.qdrant.upsert(collection_name=self.collection_name, points=[point])
+        if self.local_index is not None:
+            self.local_index.upsert([point])
+
+    async def _set_payload(self, payload: dict, point_id: str) -> None:
+        """Update product payload fields in Qdrant and the local index."""
+        await self.qdrant.set_payload(
+            collection_name=self.collection_name,
+            payload=payload,
+            points=[point_id],
+        )
+        if self.local_index is not None:
+            self.local_index.set_payload(payload, [point_id])
+
+    def _invalidate_cards_after_commit(self, product_ids) -> None:
+        """Queue cached product cards to drop once the change is committed."""
+        if self.card_cache is not None:
+            self._pending_card_invalidations.extend(product_ids)
+
+    async def invalidate_committed_cards(self) -> None:
+        """Drop the cards of products changed since the last call.
+
+        Call it after the session commits: invalidating earlier lets a
+        concurrent read cache the old committed row again until the TTL.
+        """
+        product_ids, self._pending_card_invalidations = (
+            self._pending_card_invalidations,
+            [],
+        )
+        if self.card_cache is not None and product_ids:
+            await self.card_cache.invalidate(product_ids)
+
+    def _build_payload(self, product: Product) -> dict:
+        """Build the Qdrant payload for a freshly stored product."""
+        payload = build_product_payload(
+            product_id=product.id,
+            store_id=product.store_id,
+            category=product.category,
+            price=product.price,
+            created_at=product.created_at,
+        )
+        if self.display_payload:
+            payload.update(
+                build_display_fields(
+                    title=product.title,
+                    price=product.price,
+                    currency=product.currency,
+                    image_url=product.image_url,
+                    product_url=product.product_url,
+                    category=product.category,
+                )
+            )
+        return payload
 
     def _canonicalize_product_data(self, product_data: ProductCreate) -> ProductCreate:
         """Normalize raw categories and derive the canonical category server-side."""
@@ -146,21 +219,12 @@ class IngestionService:
         product = await self.repository.create(product_data)
 
         # 6. Store embedding in Qdrant
-        await self.qdrant.upsert(
-            collection_name=self.collection_name,
-            points=[
-                PointStruct(
-                    id=str(product.id),
-                    vector=embedding,
-                    payload={
-                        "product_id": str(product.id),
-                        "store_id": product.store_id,
-                        "price": float(product.price),
-                        "category": product.category,
-                        "created_at": product.created_at.isoformat(),
-                    },
-                )
-            ],
+        await self._upsert_point(
+            PointStruct(
+                id=str(product.id),
+                vector=embedding,
+                payload=self._build_payload(product),
+            )
         )
 
         return IngestionResult(success=True, product_id=product.id)
@@ -195,11 +259,7 @@ class IngestionService:
                 product_data.external_id,
             )
             existing.archived_at = None
-            await self.qdrant.set_payload(
-                collection_name=self.collection_name,
-                payload={"archived": False},
-                points=[str(existing.id)],
-            )
+            await self._set_payload({"archived": False}, str(existing.id))
 
         return await self._update_existing(existing, product_data)
 
@@ -239,21 +299,12 @@ class IngestionService:
         product = await self.repository.create(product_data)
 
         # 5. Store embedding in Qdrant
-        await self.qdrant.upsert(
-            collection_name=self.collection_name,
-            points=[
-                PointStruct(
-                    id=str(product.id),
-                    vector=embedding,
-                    payload={
-                        "product_id": str(product.id),
-                        "store_id": product.store_id,
-                        "price": float(product.price),
-                        "category": product.category,
-                        "created_at": product.created_at.isoformat(),
-                    },
-                )
-            ],
+        await self._upsert_point(
+            PointStruct(
+                id=str(product.id),
+                vector=embedding,
+                payload=self._build_payload(product),
+            )
         )
 
         return IngestionResult(success=True, product_id=product.id)
@@ -286,14 +337,26 @@ class IngestionService:
         await self.repository.update(
             product_data.external_id, product_data.store_id, update_fields
         )
-
-        payload = {
-            "product_id": str(existing.id),
-            "store_id": existing.store_id,
-            "price": float(product_data.price),
-            "category": product_data.category.value,
-            "created_at": existing.created_at.isoformat(),
-        }
+        self._invalidate_cards_after_commit([existing.id])
+
+        payload = build_product_payload(
+            product_id=existing.id,
+            store_id=existing.store_id,
+            category=product_data.category.value,
+            price=product_data.price,
+            created_at=existing.created_at,
+        )
+        if self.display_payload:
+            payload.update(
+                build_display_fields(
+                    title=product_data.title,
+                    price=product_data.price,
+                    currency=product_data.currency,
+                    image_url=product_data.image_url,
+                    product_url=product_data.product_url,
+                    category=product_data.category,
+                )
+            )
 
         # 2. If image changed, re-fetch, validate, embed, and update Qdrant
         if image_changed:
@@ -323,22 +386,15 @@ class IngestionService:
                 logger.error("Embedding generation failed on update: %s", e)
                 return IngestionResult(success=False, error=f"Embedding failed: {e!s}")
 
-            await self.qdrant.upsert(
-                collection_name=self.collection_name,
-                points=[
-                    PointStruct(
-                        id=str(existing.id),
-                        vector=embedding,
-                        payload=payload,
-                    )
-                ],
+            await self._upsert_point(
+                PointStruct(
+                    id=str(existing.id),
+                    vector=embedding,
+                    payload=payload,
+                )
             )
         else:
-            await self.qdrant.set_payload(
-                collection_name=self.collection_name,
-                payload=payload,
-                points=[str(existing.id)],
-            )
+            await self._set_payload(payload, str(existing.id))
 
         return IngestionResult(success=True, product_id=existing.id, updated=True)
 
@@ -380,12 +436,9 @@ class IngestionService:
             product.archived_at = now
             archived_ids.append(product.external_id)
 
-            await self.qdrant.set_payload(
-                collection_name=self.collection_name,
-                payload={"archived": True},
-                points=[str(product.id)],
-            )
+            await self._set_payload({"archived": True}, str(product.id))
 
+        self._invalidate_cards_after_commit(product.id for product in products)
         logger.info("Archived %d products for store %s", len(archived_ids), store_id)
         return archived_ids
 
@@ -0,0 +1,289 @@
+"""Shared cache of product cards (the display fields of a product).
+
+Feed enrichment and calibration items read the same popular products over
+and over. ``ProductCardCache.get_many`` answers those lookups from a bounded
+in-process LRU first, then an optional Redis tier, and only queries
+PostgreSQL (display columns only) for the remaining ids. Loaded cards are
+written back to both tiers.
+
+Ingestion invalidates a product's card whenever it updates or archives the
+product. Invalidation clears the local LRU and Redis; LRUs of other API
+workers expire their copy after ``product_card_cache_ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import counter
+from src.core.redis import get_redis_client
+from src.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+_REDIS_KEY_PREFIX = "product:card:"
+
+PRODUCT_CARD_LOOKUPS = counter(
+    "product_card_cache_lookups_total",
+    "Product card lookups by the tier that answered (memory, redis, db, missing).",
+    labelnames=("result",),
+)
+
+
+class ProductCard:
+    """Compact, immutable-by-convention record of a product's display fields."""
+
+    __slots__ = (
+        "category",
+        "currency",
+        "image_url",
+        "price",
+        "product_id",
+        "product_url",
+        "title",
+    )
+
+    # Field order of the cached JSON array (shared by every worker's cache)
+    _JSON_FIELDS = (
+        "product_id",
+        "title",
+        "price",
+        "currency",
+        "image_url",
+        "product_url",
+        "category",
+    )
+
+    def __init__(
+        self,
+        product_id: str,
+        title: str,
+        price: float,
+        currency: str,
+        image_url: str,
+        product_url: str,
+        category: str,
+    ) -> None:
+        self.product_id = product_id
+        self.title = title
+        self.price = price
+        self.currency = currency
+        self.image_url = image_url
+        self.product_url = product_url
+        self.category = category
+
+    @classmethod
+    def from_row(cls, row) -> ProductCard:
+        """Build a card from a ``Product`` row (or a row of its columns)."""
+        return cls(
+            product_id=str(row.id),
+            title=row.title,
+            price=float(row.price),
+            currency=row.currency,
+            image_url=row.image_url,
+            product_url=row.product_url,
+            category=str(row.category),
+        )
+
+    def display(self) -> dict:
+        """Display fields in the shape of ``build_display_fields``."""
+        return {
+            "title": self.title,
+            "price": self.price,
+            "currency": self.currency,
+            "image_url": self.image_url,
+            "product_url": self.product_url,
+            "category": self.category,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps([getattr(self, name) for name in self._JSON_FIELDS])
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> ProductCard:
+        return cls(**dict(zip(cls._JSON_FIELDS, json.loads(raw), strict=True)))
+
+
+async def load_product_cards(
+    session: AsyncSession, product_ids: Iterable[UUID]
+) -> list[ProductCard]:
+    """Load cards from PostgreSQL, selecting only the display columns."""
+    stmt = select(
+        Product.id,
+        Product.title,
+        Product.price,
+        Product.currency,
+        Product.image_url,
+        Product.product_url,
+        Product.category,
+    ).where(Product.id.in_(list(product_ids)))
+    result = await session.execute(stmt)
+    return [ProductCard.from_row(row) for row in result.all()]
+
+
+class ProductCardCache:
+    """Two-tier (LRU, optional Redis) read-through cache of product cards.
+
+    Args:
+        max_entries: Maximum number of cards kept in the process-local LRU.
+        ttl_seconds: Lifetime of a card in either tier.
+        redis_client: Optional shared tier; Redis errors are logged and
+            treated as misses.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        redis_client=None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._redis = redis_client
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, ProductCard]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_many(
+        self, session: AsyncSession, product_ids: Iterable[str]
+    ) -> dict[str, ProductCard]:
+        """Return the cards of the given products, keyed by product id.
+
+        Unknown and malformed ids are absent from the result.
+        """
+        cards: dict[str, ProductCard] = {}
+        pending: list[str] = []
+        now = self._clock()
+        for product_id in dict.fromkeys(str(pid) for pid in product_ids):
+            entry = self._entries.get(product_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(product_id)
+                cards[product_id] = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[product_id]
+                pending.append(product_id)
+        if cards:
+            PRODUCT_CARD_LOOKUPS.inc(len(cards), result="memory")
+        if not pending:
+            return cards
+
+        from_redis = await self._redis_get_many(pending)
+        if from_redis:
+            PRODUCT_CARD_LOOKUPS.inc(len(from_redis), result="redis")
+            for card in from_redis.values():
+                self._store(card)
+            cards.update(from_redis)
+            pending = [pid for pid in pending if pid not in from_redis]
+        if not pending:
+            return cards
+
+        uuids = []
+        for product_id in pending:
+            try:
+                uuids.append(UUID(product_id))
+            except ValueError:
+                logger.warning("Skipping invalid product id=%s", product_id)
+        loaded = await load_product_cards(session, uuids) if uuids else []
+        for card in loaded:
+            self._store(card)
+            cards[card.product_id] = card
+        await self._redis_set_many(loaded)
+
+        if loaded:
+            PRODUCT_CARD_LOOKUPS.inc(len(loaded), result="db")
+        if len(pending) > len(loaded):
+            PRODUCT_CARD_LOOKUPS.inc(len(pending) - len(loaded), result="missing")
+        return cards
+
+    async def invalidate(self, product_ids: Iterable) -> None:
+        """Drop the cards of updated or archived products from both tiers."""
+        keys = [str(product_id) for product_id in product_ids]
+        for product_id in keys:
+            self._entries.pop(product_id, None)
+        if self._redis is None or not keys:
+            return
+        try:
+            await self._redis.delete(*(_REDIS_KEY_PREFIX + key for key in keys))
+        except Exception:
+            logger.warning("Redis product card invalidation failed", exc_info=True)
+
+    def _store(self, card: ProductCard) -> None:
+        self._entries[card.product_id] = (self._clock() + self._ttl_seconds, card)
+        self._entries.move_to_end(card.product_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def _redis_get_many(self, product_ids: list[str]) -> dict[str, ProductCard]:
+        if self._redis is None:
+            return {}
+        try:
+            raws = await self._redis.mget(
+                [_REDIS_KEY_PREFIX + product_id for product_id in product_ids]
+            )
+        except Exception:
+            logger.warning("Redis product card lookup failed", exc_info=True)
+            return {}
+
+        cards: dict[str, ProductCard] = {}
+        for product_id, raw in zip(product_ids, raws):
+            if raw is None:
+                continue
+            try:
+                cards[product_id] = ProductCard.from_json(raw)
+            except (TypeError, ValueError):
+                logger.warning("Discarding malformed product card %s", product_id)
+        return cards
+
+    async def _redis_set_many(self, cards: list[ProductCard]) -> None:
+        if self._redis is None or not cards:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for card in cards:
+                    pipe.set(
+                        _REDIS_KEY_PREFIX + card.product_id,
+                        card.to_json(),
+                        ex=int(self._ttl_seconds),
+                    )
+                await pipe.execute()
+        except Exception:
+            logger.warning("Redis product card store failed", exc_info=True)
+
+
+_cache: ProductCardCache | None = None
+
+
+def get_product_card_cache(settings: Settings | None = None) -> ProductCardCache:
+    """Get or create the process-wide product card cache.
+
+    Adds the Redis tier when ``product_card_cache_backend`` is ``"redis"`` and
+    a Redis URL is configured.
+    """
+    global _cache
+    if _cache is None:
+        settings = settings or get_settings()
+        redis_client = (
+            get_redis_client()
+            if settings.product_card_cache_backend == "redis"
+            else None
+        )
+        _cache = ProductCardCache(
+            max_entries=settings.product_card_cache_max_entries,
+            ttl_seconds=settings.product_card_cache_ttl_seconds,
+            redis_client=redis_client,
+        )
+    return _cache
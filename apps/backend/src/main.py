@@ -5,19 +5,25 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from src.core.config import get_settings
+from src.core.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
 from src.core.qdrant import (
     ensure_cluster_collection,
     ensure_products_payload_indexes,
     ensure_user_profiles_collection,
 )
+from src.core.redis import close_client as close_redis_client
 from src.features.ai.router.router import router as ai_router
 from src.features.ai.service.embedding_service import EmbeddingService
 from src.features.auth.router.router import router as auth_router
 from src.features.clustering.router.router import router as clustering_router
 from src.features.feed.router.router import router as feed_router
 from src.features.feedback.router.router import router as feedback_router
+from src.features.feedback.service.profile_update_queue import (
+    get_profile_update_queue,
+)
 from src.features.onboarding.router.router import router as onboarding_router
 from src.features.products.router.router import router as products_router
 from src.features.storage.router.router import router as storage_router
@@ -77,7 +83,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Shutdown
     logger.info("Shutting down Stylipp API...")
-    # Cleanup if needed (model will be garbage collected)
+    # The embedding model is garbage collected; shared clients are closed
+    await close_redis_client()
 
 
 app = FastAPI(
@@ -100,6 +107,18 @@ async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Expose in-process metrics in the Prometheus text format."""
+    profile_update_queue = get_profile_update_queue()
+    if profile_update_queue is not None:
+        try:
+            await profile_update_queue.refresh_metrics()
+        except Exception:
+            logger.exception("Failed to read profile update queue stats")
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # Feature routers
 app.include_router(auth_router, prefix="/api")
 app.include_router(storage_router, prefix="/api")
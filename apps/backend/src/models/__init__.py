@@ -2,7 +2,18 @@ from src.models.base import Base
 from src.models.cluster import StyleCluster
 from src.models.exposure_log import ExposureLog
 from src.models.product import Product
+from src.models.product_popularity import ProductPopularity
+from src.models.profile_update_job import ProfileUpdateJob
 from src.models.user import User
 from src.models.user_interaction import UserInteraction
 
-__all__ = ["Base", "ExposureLog", "Product", "StyleCluster", "User", "UserInteraction"]
+__all__ = [
+    "Base",
+    "ExposureLog",
+    "Product",
+    "ProductPopularity",
+    "ProfileUpdateJob",
+    "StyleCluster",
+    "User",
+    "UserInteraction",
+]
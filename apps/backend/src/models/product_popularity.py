@@ -0,0 +1,29 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class ProductPopularity(Base):
+    """Incrementally maintained, time-decayed engagement per product.
+
+    ``score`` is forward-decayed against a fixed epoch (see
+    ``src.core.popularity``), so it only ever receives additive updates.
+    """
+
+    __tablename__ = "product_popularity"
+
+    product_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("products.id"), unique=True, nullable=False
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    interaction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_interaction_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    __table_args__ = (Index("ix_product_popularity_score", "score"),)
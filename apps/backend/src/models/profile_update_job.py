@@ -0,0 +1,50 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text, text
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class ProfileUpdateJob(Base):
+    """Pending profile update for one user (see ``profile_update_queue``).
+
+    At most one row exists per user: enqueueing again while a job is pending
+    only bumps ``enqueued_at``, and one worker pass consumes every swipe
+    recorded up to its start. ``available_at`` holds the retry time, or the
+    lease expiry while a worker owns the job. Jobs that exhausted their
+    attempts keep their row with ``failed_at`` set.
+    """
+
+    __tablename__ = "profile_update_jobs"
+
+    user_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    enqueued_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    first_enqueued_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    failed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_profile_update_jobs_available_at",
+            "available_at",
+            postgresql_where=text("failed_at IS NULL"),
+        ),
+    )
@@ -26,4 +26,11 @@ class UserInteraction(Base):
             "action",
             "created_at",
         ),
+        # Keyset order of a user's history (profile rebuild, pending updates)
+        Index(
+            "ix_user_interactions_user_history",
+            "user_id",
+            "created_at",
+            "id",
+        ),
     )
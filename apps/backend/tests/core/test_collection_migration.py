@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from src.core.collection_migration import migrate_collection, resolve_alias
+
+SETTINGS = SimpleNamespace(qdrant_hnsw_m=None, qdrant_hnsw_ef_construct=None)
+
+
+async def make_client() -> AsyncQdrantClient:
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection(
+        collection_name="products",
+        vectors_config=VectorParams(size=3, distance=Distance.COSINE),
+    )
+    await client.upsert(
+        collection_name="products",
+        points=[
+            PointStruct(id=i, vector=[1.0, float(i), 0.5], payload={"n": i})
+            for i in range(7)
+        ],
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_first_migration_replaces_the_collection_with_an_alias() -> None:
+    client = await make_client()
+
+    with pytest.raises(ValueError, match="delete_source"):
+        await migrate_collection(client, "products", "int8", SETTINGS)
+
+    result = await migrate_collection(
+        client,
+        "products",
+        "int8_on_disk",
+        SETTINGS,
+        target="products_v2",
+        batch_size=3,
+        delete_source=True,
+    )
+
+    assert result.points == 7
+    assert result.source == "products"
+    assert await resolve_alias(client, "products") == "products_v2"
+    collections = await client.get_collections()
+    assert [c.name for c in collections.collections] == ["products_v2"]
+    [hit] = await client.search("products", query_vector=[1.0, 6.0, 0.5], limit=1)
+    assert hit.id == 6
+    assert hit.payload == {"n": 6}
+
+
+@pytest.mark.asyncio
+async def test_later_migrations_swap_the_alias_and_keep_the_old_collection() -> None:
+    client = await make_client()
+    await migrate_collection(
+        client,
+        "products",
+        "int8",
+        SETTINGS,
+        target="products_v2",
+        delete_source=True,
+    )
+
+    result = await migrate_collection(
+        client, "products", "float32", SETTINGS, target="products_v3"
+    )
+
+    assert result.source == "products_v2"
+    assert result.source_deleted is False
+    assert await resolve_alias(client, "products") == "products_v3"
+    collections = await client.get_collections()
+    assert sorted(c.name for c in collections.collections) == [
+        "products_v2",
+        "products_v3",
+    ]
+    assert (await client.count("products", exact=True)).count == 7
+
+    with pytest.raises(ValueError, match="already exists"):
+        await migrate_collection(
+            client, "products", "int8", SETTINGS, target="products_v2"
+        )
@@ -0,0 +1,229 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    HasIdCondition,
+    MatchAny,
+    MatchValue,
+    Range,
+    SearchRequest,
+)
+
+from src.core import local_index as local_index_module
+from src.core.local_index import LocalVectorIndex
+
+
+def make_point(point_id: str, vector: list[float], **payload) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=point_id,
+        vector=vector,
+        payload={"product_id": point_id, **payload},
+    )
+
+
+def make_index() -> LocalVectorIndex:
+    index = LocalVectorIndex(dim=2)
+    index.upsert(
+        [
+            make_point("a", [1.0, 0.0], price=20.0, category="tops", cluster_id=1),
+            make_point("b", [0.8, 0.6], price=60.0, category="shoes", cluster_id=2),
+            make_point("c", [0.0, 1.0], price=100.0, category="tops", cluster_id=3),
+            make_point(
+                "d",
+                [0.9, 0.1],
+                price=30.0,
+                category="tops",
+                cluster_id=1,
+                archived=True,
+            ),
+        ]
+    )
+    return index
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_by_cosine_and_returns_payload() -> None:
+    hits = await make_index().search([2.0, 0.0], limit=3)
+
+    assert [hit.id for hit in hits] == ["a", "d", "b"]
+    assert hits[0].score == pytest.approx(1.0)
+    assert hits[2].score == pytest.approx(0.8)
+    assert hits[0].payload == {
+        "product_id": "a",
+        "price": 20.0,
+        "cluster_id": 1,
+        "category": "tops",
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_applies_feed_filters() -> None:
+    index = make_index()
+    query_filter = Filter(
+        must=[
+            FieldCondition(key="price", range=Range(gte=10.0, lte=80.0)),
+            FieldCondition(key="category", match=MatchValue(value="tops")),
+        ],
+        must_not=[
+            FieldCondition(key="archived", match=MatchValue(value=True)),
+            HasIdCondition(has_id=["b"]),
+        ],
+    )
+
+    hits = await index.search([1.0, 0.0], query_filter=query_filter, limit=10)
+
+    assert [hit.id for hit in hits] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_search_batch_supports_should_and_score_threshold() -> None:
+    index = make_index()
+    diversity = Filter(
+        should=[
+            FieldCondition(key="cluster_id", match=MatchValue(value=2)),
+            FieldCondition(key="cluster_id", match=MatchAny(any=[3])),
+        ]
+    )
+
+    results = await index.search_batch(
+        [
+            SearchRequest(vector=[1.0, 0.0], filter=diversity, limit=5),
+            SearchRequest(vector=[1.0, 0.0], limit=5, score_threshold=0.9),
+        ]
+    )
+
+    assert [hit.id for hit in results[0]] == ["b", "c"]
+    assert [hit.id for hit in results[1]] == ["a", "d"]
+
+
+@pytest.mark.asyncio
+async def test_large_searches_are_scored_in_a_worker_thread(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    index = make_index()
+    requests = [SearchRequest(vector=[1.0, 0.0], limit=2)]
+    inline = await index.search_batch(requests)
+    offloaded: list = []
+
+    async def fake_to_thread(function, *args):
+        offloaded.append(args)
+        return function(*args)
+
+    monkeypatch.setattr(local_index_module.asyncio, "to_thread", fake_to_thread)
+    assert await index.search_batch(requests) == inline
+    assert offloaded == []
+
+    monkeypatch.setattr(local_index_module, "OFFLOAD_MIN_ROWS", 1)
+    assert await index.search_batch(requests) == inline
+    assert offloaded == [(requests,)]
+
+
+@pytest.mark.asyncio
+async def test_unsupported_filter_field_raises() -> None:
+    query_filter = Filter(
+        must=[FieldCondition(key="brand", match=MatchValue(value="x"))]
+    )
+
+    with pytest.raises(ValueError):
+        await make_index().search([1.0, 0.0], query_filter=query_filter)
+
+
+@pytest.mark.asyncio
+async def test_ingestion_updates_replace_and_flag_points() -> None:
+    index = make_index()
+
+    index.upsert([make_point("a", [0.0, 1.0], price=25.0, category="tops")])
+    index.set_payload({"archived": True}, ["c"])
+    hits = await index.search(
+        [0.0, 1.0],
+        query_filter=Filter(
+            must_not=[FieldCondition(key="archived", match=MatchValue(value=True))]
+        ),
+        limit=2,
+    )
+
+    assert len(index) == 4
+    assert [hit.id for hit in hits] == ["a", "b"]
+    assert hits[0].payload["price"] == 25.0
+
+
+@pytest.mark.asyncio
+async def test_created_at_ts_is_derived_from_legacy_iso_payloads() -> None:
+    index = LocalVectorIndex(dim=2)
+    index.upsert(
+        [
+            make_point("old", [1.0, 0.0], created_at="2026-01-01T00:00:00+00:00"),
+            make_point("new", [0.9, 0.1], created_at_ts=1_780_000_000.0),
+        ]
+    )
+
+    hits = await index.search(
+        [1.0, 0.0],
+        query_filter=Filter(
+            must=[FieldCondition(key="created_at_ts", range=Range(gte=1.77e9))]
+        ),
+    )
+    (old,) = await index.retrieve(["old"])
+
+    assert [hit.id for hit in hits] == ["new"]
+    assert old.payload["created_at_ts"] == 1_767_225_600.0
+    assert old.payload["created_at"] == "2026-01-01T00:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_retrieve_returns_vectors_for_known_ids() -> None:
+    records = await make_index().retrieve(
+        ["c", "missing"], with_payload=False, with_vectors=True
+    )
+
+    assert [record.id for record in records] == ["c"]
+    assert records[0].vector == [0.0, 1.0]
+    assert records[0].payload is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_round_trip_memory_maps_vectors(tmp_path) -> None:
+    index = make_index()
+    index.upsert([make_point("a", [0.6, 0.8], price=21.0, category="bags")])
+    index.save(tmp_path)
+
+    loaded = LocalVectorIndex.load(tmp_path)
+    loaded.upsert([make_point("e", [1.0, 0.0], price=5.0, category="bags")])
+    hits = await loaded.search([1.0, 0.0], limit=2)
+
+    assert isinstance(loaded._base.vectors, np.memmap)
+    assert len(loaded) == 5
+    assert [hit.id for hit in hits] == ["e", "d"]
+    assert (await loaded.retrieve(["a"]))[0].payload["category"] == "bags"
+
+
+@pytest.mark.asyncio
+async def test_ivf_search_probes_nearest_lists_and_falls_back_to_exact() -> None:
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((400, 8)).astype(np.float32)
+    points = [
+        make_point(f"p{i}", vector.tolist(), price=float(i))
+        for i, vector in enumerate(vectors)
+    ]
+    exact = LocalVectorIndex(dim=8)
+    exact.upsert(points)
+    ivf = LocalVectorIndex(dim=8, nprobe=4)
+    ivf.upsert(points)
+    ivf.build_ivf(n_lists=16)
+    query = vectors[50].tolist()
+
+    exact_hits = await exact.search(query, limit=10)
+    ivf_hits = await ivf.search(query, limit=10)
+    narrow_hits = await ivf.search(
+        query,
+        query_filter=Filter(must=[FieldCondition(key="price", range=Range(lt=3.0))]),
+        limit=5,
+    )
+
+    assert ivf._base.ivf_centroids.shape == (16, 8)
+    assert [hit.id for hit in ivf_hits] == [hit.id for hit in exact_hits]
+    # The probed lists cannot fill the request, so the search falls back to exact
+    assert sorted(hit.id for hit in narrow_hits) == ["p0", "p1", "p2"]
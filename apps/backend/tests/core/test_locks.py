@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from src.core.locks import (
+    LOCK_ACQUISITIONS,
+    LOCK_WAIT_SECONDS,
+    KeyedLocks,
+    advisory_lock_key,
+    advisory_xact_lock,
+    advisory_xact_lock_many,
+)
+
+
+@pytest.mark.asyncio
+async def test_keyed_locks_serialize_per_key_and_evict_when_released() -> None:
+    LOCK_ACQUISITIONS.reset()
+    locks = KeyedLocks("test")
+    events: list[str] = []
+
+    async def worker(key: str, name: str) -> None:
+        async with locks.hold(key):
+            events.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}:end")
+
+    await asyncio.gather(worker("a", "first"), worker("a", "second"), worker("b", "x"))
+
+    assert events.index("first:end") < events.index("second:start")
+    assert events.index("x:start") < events.index("first:end")
+    assert len(locks) == 0
+    assert LOCK_ACQUISITIONS.value(lock="test", scope="local", result="contended") == 1
+    assert (
+        LOCK_ACQUISITIONS.value(lock="test", scope="local", result="uncontended") == 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_keyed_locks_evict_entries_of_cancelled_waiters() -> None:
+    locks = KeyedLocks("test")
+    held = asyncio.Event()
+    release = asyncio.Event()
+
+    async def holder() -> None:
+        async with locks.hold("a"):
+            held.set()
+            await release.wait()
+
+    async def waiter() -> None:
+        async with locks.hold("a"):
+            pass
+
+    holding = asyncio.create_task(holder())
+    await held.wait()
+    waiting = asyncio.create_task(waiter())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    release.set()
+    await holding
+
+    assert len(locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_keyed_locks_hold_many_in_sorted_order_without_deadlock() -> None:
+    locks = KeyedLocks("test")
+    events: list[str] = []
+
+    async def batch(keys: list[str], name: str) -> None:
+        async with locks.hold_many(keys):
+            events.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}:end")
+
+    async def single() -> None:
+        async with locks.hold("b"):
+            events.append("single:start")
+            await asyncio.sleep(0.01)
+            events.append("single:end")
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            single(), batch(["c", "b", "a", "b"], "first"), batch(["a", "c"], "second")
+        ),
+        timeout=1,
+    )
+
+    assert events.index("single:end") < events.index("first:start")
+    assert events.index("first:end") < events.index("second:start")
+    assert len(locks) == 0
+
+
+def test_advisory_lock_key_is_a_stable_signed_64_bit_id() -> None:
+    key = advisory_lock_key("profile_update", "user-1")
+
+    assert key == advisory_lock_key("profile_update", "user-1")
+    assert key != advisory_lock_key("profile_update", "user-2")
+    assert key != advisory_lock_key("other", "user-1")
+    assert -(2**63) <= key < 2**63
+
+
+class FakeLockSession:
+    def __init__(self, available: bool) -> None:
+        self.available = available
+        self.calls: list[str] = []
+
+    async def scalar(self, statement) -> bool:
+        self.calls.append(statement.selected_columns[0].name)
+        return self.available
+
+    async def execute(self, statement) -> None:
+        self.calls.append(statement.selected_columns[0].name)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("available", "expected_calls", "result"),
+    [
+        (True, ["pg_try_advisory_xact_lock"], "uncontended"),
+        (False, ["pg_try_advisory_xact_lock", "pg_advisory_xact_lock"], "contended"),
+    ],
+)
+async def test_advisory_xact_lock_waits_only_when_the_lock_is_taken(
+    available: bool, expected_calls: list[str], result: str
+) -> None:
+    LOCK_ACQUISITIONS.reset()
+    LOCK_WAIT_SECONDS.reset()
+    session = FakeLockSession(available)
+
+    await advisory_xact_lock(session, "profile_update", "user-1")
+
+    assert session.calls == expected_calls
+    assert (
+        LOCK_ACQUISITIONS.value(lock="profile_update", scope="postgres", result=result)
+        == 1
+    )
+    assert LOCK_WAIT_SECONDS.count(lock="profile_update", scope="postgres") == 1
+
+
+class FakeBulkLockSession:
+    def __init__(self, acquired: list[bool]) -> None:
+        self.acquired = acquired
+        self.calls: list[str] = []
+
+    async def scalars(self, statement) -> list[bool]:
+        self.calls.append(statement.selected_columns[0].name)
+        return self
+
+    def all(self) -> list[bool]:
+        return self.acquired
+
+    async def rollback(self) -> None:
+        self.calls.append("rollback")
+
+    async def execute(self, statement) -> None:
+        self.calls.append(statement.selected_columns[0].name)
+
+
+@pytest.mark.asyncio
+async def test_advisory_xact_lock_many_restarts_in_order_when_contended() -> None:
+    LOCK_ACQUISITIONS.reset()
+    free = FakeBulkLockSession([True, True])
+    taken = FakeBulkLockSession([True, False, True])
+
+    await advisory_xact_lock_many(free, "batch", ["a", "b"])
+    await advisory_xact_lock_many(taken, "batch", ["a", "b", "c"])
+    await advisory_xact_lock_many(free, "batch", [])
+
+    assert free.calls == ["pg_try_advisory_xact_lock"]
+    assert taken.calls == [
+        "pg_try_advisory_xact_lock",
+        "rollback",
+        "pg_advisory_xact_lock",
+    ]
+    assert (
+        LOCK_ACQUISITIONS.value(lock="batch", scope="postgres", result="contended") == 1
+    )
+    assert (
+        LOCK_ACQUISITIONS.value(lock="batch", scope="postgres", result="uncontended")
+        == 4
+    )
@@ -0,0 +1,87 @@
+import pytest
+
+from src.core.metrics import Counter, Histogram, counter, gauge, render_prometheus
+
+
+def test_histogram_observations_fill_cumulative_buckets() -> None:
+    histogram = Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    [(labels, cumulative, total, count)] = histogram.samples()
+    assert labels == {}
+    assert cumulative == [2, 3, 4]
+    assert total == pytest.approx(3.65)
+    assert count == 4
+
+
+def test_histogram_time_observes_block_duration() -> None:
+    histogram = Histogram("test_seconds", "Test.", labelnames=("stage",))
+
+    with histogram.time(stage="ranking"):
+        pass
+
+    assert histogram.count(stage="ranking") == 1
+    assert histogram.count(stage="diversity") == 0
+
+
+def test_histogram_rejects_unknown_labels() -> None:
+    histogram = Histogram("test_seconds", "Test.", labelnames=("stage",))
+
+    with pytest.raises(ValueError):
+        histogram.observe(0.1, source="primary")
+
+
+def test_counter_rejects_negative_increments() -> None:
+    counter = Counter("test_total", "Test.")
+
+    with pytest.raises(ValueError):
+        counter.inc(-1)
+
+
+def test_render_prometheus_includes_registered_instruments() -> None:
+    from src.features.feed.service.feed_service import (
+        FEED_GENERATIONS,
+        FEED_STAGE_SECONDS,
+    )
+
+    FEED_GENERATIONS.reset()
+    FEED_STAGE_SECONDS.reset()
+    FEED_GENERATIONS.inc(feed_mode="hybrid")
+    FEED_STAGE_SECONDS.observe(0.004, stage="ranking")
+
+    text = render_prometheus()
+
+    assert "# TYPE feed_generations_total counter" in text
+    assert 'feed_generations_total{feed_mode="hybrid"} 1.0' in text
+    assert "# TYPE feed_stage_duration_seconds histogram" in text
+    assert 'feed_stage_duration_seconds_bucket{stage="ranking",le="0.0025"} 0' in text
+    assert 'feed_stage_duration_seconds_bucket{stage="ranking",le="0.005"} 1' in text
+    assert 'feed_stage_duration_seconds_bucket{stage="ranking",le="+Inf"} 1' in text
+    assert 'feed_stage_duration_seconds_count{stage="ranking"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_render_prometheus_renders_gauges() -> None:
+    from src.core.metrics import gauge
+
+    depth = gauge("test_queue_depth", "Test.", labelnames=("state",))
+    depth.set(3, state="pending")
+    depth.set(1, state="pending")
+
+    text = render_prometheus()
+
+    assert depth.value(state="pending") == 1.0
+    assert "# TYPE test_queue_depth gauge" in text
+    assert 'test_queue_depth{state="pending"} 1.0' in text
+
+
+def test_registry_rejects_mismatched_instrument_types_and_labels() -> None:
+    first = counter("test_registry_collisions_total", "Test.", ("kind",))
+
+    assert counter("test_registry_collisions_total", "Test.", ["kind"]) is first
+    with pytest.raises(ValueError, match="registered as a Counter with"):
+        gauge("test_registry_collisions_total", "Test.", ("kind",))
+    with pytest.raises(ValueError, match=r"labels \('kind',\), not a Counter"):
+        counter("test_registry_collisions_total", "Test.", ("other",))
@@ -0,0 +1,86 @@
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.core.popularity import (
+    POPULARITY_EPOCH,
+    decayed_score,
+    forward_decay_factor,
+    record_popularity,
+    record_popularity_many,
+)
+
+
+def test_forward_decay_halves_after_one_half_life() -> None:
+    now = datetime(2026, 5, 1, tzinfo=UTC)
+    stored = 2.0 * forward_decay_factor(now - timedelta(days=14))
+
+    assert decayed_score(stored, now) == pytest.approx(1.0)
+    assert forward_decay_factor(POPULARITY_EPOCH) == 1.0
+
+
+def test_forward_decay_ordering_is_stable_over_time() -> None:
+    old_popular = 10.0 * forward_decay_factor(datetime(2026, 2, 1, tzinfo=UTC))
+    recent = 4.0 * forward_decay_factor(datetime(2026, 3, 10, tzinfo=UTC))
+
+    for days in (0, 30, 365):
+        now = datetime(2026, 3, 10, tzinfo=UTC) + timedelta(days=days)
+        assert decayed_score(recent, now) > decayed_score(old_popular, now)
+    assert recent > old_popular
+
+
+def test_forward_decay_treats_naive_datetimes_as_utc() -> None:
+    aware = datetime(2026, 4, 1, tzinfo=UTC)
+
+    assert forward_decay_factor(aware.replace(tzinfo=None)) == forward_decay_factor(
+        aware
+    )
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.statements = []
+
+    async def execute(self, statement) -> None:
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio
+async def test_record_popularity_issues_atomic_upsert() -> None:
+    session = RecordingSession()
+    at = POPULARITY_EPOCH + timedelta(days=28)
+
+    await record_popularity(session, uuid4(), "save", at)
+
+    (statement,) = session.statements
+    compiled = statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "ON CONFLICT (product_id) DO UPDATE" in sql
+    assert "product_popularity.score + excluded.score" in sql
+    assert compiled.params["score"] == pytest.approx(3.0 * 4.0)
+
+
+@pytest.mark.asyncio
+async def test_record_popularity_many_sums_per_product_in_one_upsert() -> None:
+    session = RecordingSession()
+    at = POPULARITY_EPOCH + timedelta(days=14)
+    first, second = sorted([uuid4(), uuid4()])
+
+    await record_popularity_many(
+        session, [(second, "like"), (first, "save"), (second, "dislike")], at
+    )
+    await record_popularity_many(session, [], at)
+
+    (statement,) = session.statements
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert "product_popularity.interaction_count + excluded.interaction_count" in str(
+        compiled
+    )
+    assert compiled.params["product_id_m0"] == first
+    assert compiled.params["score_m0"] == pytest.approx(3.0 * 2.0)
+    assert compiled.params["interaction_count_m0"] == 1
+    assert compiled.params["product_id_m1"] == second
+    assert compiled.params["score_m1"] == pytest.approx((2.0 - 1.0) * 2.0)
+    assert compiled.params["interaction_count_m1"] == 2
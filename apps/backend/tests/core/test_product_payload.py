@@ -0,0 +1,165 @@
+from datetime import UTC, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.product_payload import (
+    backfill_product_payloads,
+    build_display_fields,
+    build_product_payload,
+    display_fields,
+    payload_changes,
+    sync_display_payloads,
+)
+
+
+def test_build_product_payload_is_typed() -> None:
+    payload = build_product_payload(
+        product_id="p1",
+        store_id="store-1",
+        category="tops",
+        price=Decimal("19.90"),
+        created_at=datetime(2026, 1, 1),
+    )
+
+    assert payload == {
+        "product_id": "p1",
+        "store_id": "store-1",
+        "price": 19.9,
+        "category": "tops",
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "created_at_ts": datetime(2026, 1, 1, tzinfo=UTC).timestamp(),
+    }
+    assert payload_changes(payload) == {}
+
+
+def test_payload_changes_coerces_legacy_fields() -> None:
+    legacy = {
+        "product_id": "p1",
+        "store_id": 42,
+        "price": "19.90",
+        "category": "tops",
+        "cluster_id": 3.0,
+        "created_at": "2026-01-01T00:00:00",
+    }
+
+    assert payload_changes(legacy) == {
+        "store_id": "42",
+        "price": 19.9,
+        "cluster_id": 3,
+        "created_at_ts": datetime(2026, 1, 1, tzinfo=UTC).timestamp(),
+    }
+    assert payload_changes({"price": 20, "created_at": "garbage"}) == {}
+
+
+class FakeQdrant:
+    def __init__(self, payloads: list[dict], page_size: int) -> None:
+        self.records = [
+            SimpleNamespace(id=index, payload=payload)
+            for index, payload in enumerate(payloads)
+        ]
+        self.page_size = page_size
+        self.batches: list[list] = []
+
+    async def scroll(self, *, collection_name, limit, offset, **kwargs):
+        start = offset or 0
+        stop = start + min(limit, self.page_size)
+        next_offset = stop if stop < len(self.records) else None
+        return self.records[start:stop], next_offset
+
+    async def batch_update_points(self, *, collection_name, update_operations):
+        self.batches.append(update_operations)
+
+
+@pytest.mark.asyncio
+async def test_backfill_sends_one_batch_per_page_for_changed_points() -> None:
+    typed = build_product_payload(
+        product_id="p0",
+        store_id="s",
+        category="tops",
+        price=10.0,
+        created_at=datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    legacy = {**typed, "product_id": "p1"}
+    del legacy["created_at_ts"]
+    client = FakeQdrant([typed, legacy, legacy, typed, legacy], page_size=2)
+
+    result = await backfill_product_payloads(client, "products", batch_size=2)
+
+    assert (result.scanned, result.updated) == (5, 3)
+    assert [len(batch) for batch in client.batches] == [1, 1, 1]
+    operation = client.batches[0][0].set_payload
+    assert operation.points == [1]
+    assert operation.payload == {"created_at_ts": typed["created_at_ts"]}
+
+
+@pytest.mark.asyncio
+async def test_backfill_dry_run_writes_nothing() -> None:
+    client = FakeQdrant([{"price": "5"}], page_size=10)
+
+    result = await backfill_product_payloads(client, "products", dry_run=True)
+
+    assert result.updated == 1
+    assert client.batches == []
+
+
+def test_display_fields_requires_every_field() -> None:
+    fields = build_display_fields(
+        title="Shirt",
+        price=Decimal("10.50"),
+        currency="EUR",
+        image_url="https://img",
+        product_url="https://shop",
+        category=SimpleNamespace(value="tops"),
+    )
+
+    assert display_fields({**fields, "product_id": "p1"}) == fields
+    assert fields["price"] == 10.5 and fields["category"] == "tops"
+    assert display_fields({"title": "Shirt", "price": 10.5}) is None
+    assert display_fields(None) is None
+
+
+class FakeSession:
+    def __init__(self, rows: list) -> None:
+        self.pages = [rows, []]
+
+    async def execute(self, stmt) -> SimpleNamespace:
+        rows = self.pages.pop(0)
+        return SimpleNamespace(all=lambda: rows)
+
+
+@pytest.mark.asyncio
+async def test_sync_display_payloads_repairs_drift_from_postgres() -> None:
+    rows = [
+        SimpleNamespace(
+            id=f"p{index}",
+            title=f"Item {index}",
+            price=Decimal("20.00"),
+            currency="EUR",
+            image_url="https://img",
+            product_url="https://shop",
+            category="tops",
+        )
+        for index in range(3)
+    ]
+    in_sync = build_display_fields(
+        **{k: v for k, v in vars(rows[0]).items() if k != "id"}
+    )
+    client = FakeQdrant([], page_size=10)
+    client.records = [
+        SimpleNamespace(id="p0", payload=in_sync),
+        SimpleNamespace(id="p1", payload={**in_sync, "title": "Old title"}),
+    ]
+
+    async def retrieve(*, collection_name, ids, **kwargs):
+        return [record for record in client.records if record.id in ids]
+
+    client.retrieve = retrieve
+
+    result = await sync_display_payloads(FakeSession(rows), client, "products")
+
+    assert (result.checked, result.drifted, result.missing) == (3, 1, 1)
+    (operation,) = client.batches[0]
+    assert operation.set_payload.points == ["p1"]
+    assert operation.set_payload.payload["title"] == "Item 1"
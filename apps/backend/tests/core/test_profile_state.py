@@ -1,4 +1,10 @@
-from src.core.profile_state import compute_profile_confidence
+import pytest
+from sqlalchemy import create_engine, literal, select
+
+from src.core.profile_state import (
+    compute_profile_confidence,
+    profile_confidence_expression,
+)
 
 
 def test_compute_profile_confidence_is_zero_for_new_users() -> None:
@@ -17,3 +23,16 @@ def test_compute_profile_confidence_matches_brain_formula_examples() -> None:
 
 def test_compute_profile_confidence_clamps_negative_counts() -> None:
     assert compute_profile_confidence(-5) == 0.0
+
+
+@pytest.mark.parametrize("interaction_count", [0, 1, 14, 199, 200, 500])
+def test_profile_confidence_expression_matches_python_formula(
+    interaction_count: int,
+) -> None:
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        confidence = connection.scalar(
+            select(profile_confidence_expression(literal(interaction_count)))
+        )
+
+    assert confidence == pytest.approx(compute_profile_confidence(interaction_count))
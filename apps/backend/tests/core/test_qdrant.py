@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+from qdrant_client.models import Distance, ScalarType
+
+from src.core.qdrant import collection_config, product_search_params
+
+
+def make_settings(**overrides) -> SimpleNamespace:
+    return SimpleNamespace(
+        **{
+            "qdrant_products_profile": "float32",
+            "qdrant_hnsw_m": None,
+            "qdrant_hnsw_ef_construct": None,
+            "qdrant_search_hnsw_ef": None,
+            "qdrant_search_quantization_rescore": True,
+            "qdrant_search_quantization_oversampling": None,
+            **overrides,
+        }
+    )
+
+
+def test_float32_profile_keeps_the_default_storage() -> None:
+    config = collection_config("float32", make_settings())
+
+    assert config["vectors_config"].size == 768
+    assert config["vectors_config"].distance == Distance.COSINE
+    assert not config["vectors_config"].on_disk
+    assert config["quantization_config"] is None
+    assert config["hnsw_config"] is None
+    assert config["on_disk_payload"] is True
+
+
+def test_int8_on_disk_profile_quantizes_in_ram_and_moves_originals_to_disk() -> None:
+    config = collection_config(
+        "int8_on_disk",
+        make_settings(qdrant_hnsw_m=32, qdrant_hnsw_ef_construct=200),
+        size=4,
+        distance=Distance.DOT,
+    )
+
+    assert config["vectors_config"].size == 4
+    assert config["vectors_config"].distance == Distance.DOT
+    assert config["vectors_config"].on_disk is True
+    scalar = config["quantization_config"].scalar
+    assert scalar.type == ScalarType.INT8
+    assert scalar.always_ram is True
+    assert config["hnsw_config"].m == 32
+    assert config["hnsw_config"].ef_construct == 200
+
+
+def test_unknown_profile_is_rejected() -> None:
+    with pytest.raises(ValueError, match="int4"):
+        collection_config("int4", make_settings())
+
+
+def test_product_search_params_only_when_configured() -> None:
+    assert product_search_params(make_settings()) is None
+
+    params = product_search_params(make_settings(qdrant_search_hnsw_ef=128))
+    assert params.hnsw_ef == 128
+    assert params.quantization is None
+
+    params = product_search_params(
+        make_settings(
+            qdrant_products_profile="int8",
+            qdrant_search_quantization_oversampling=2.0,
+        )
+    )
+    assert params.hnsw_ef is None
+    assert params.quantization.rescore is True
+    assert params.quantization.oversampling == pytest.approx(2.0)
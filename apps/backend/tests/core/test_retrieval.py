@@ -0,0 +1,159 @@
+from types import SimpleNamespace
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    PointStruct,
+    Range,
+    SearchParams,
+    SearchRequest,
+    VectorParams,
+)
+
+from src.core import qdrant as qdrant_module
+from src.core.qdrant import parse_server_version, query_api_supported
+from src.core.retrieval import QdrantRetrievalBackend
+
+
+class FakeServer:
+    def __init__(self, version: str | None) -> None:
+        self.version = version
+        self.info_calls = 0
+        self.calls: list[str] = []
+
+    async def info(self) -> SimpleNamespace:
+        self.info_calls += 1
+        if self.version is None:
+            raise ConnectionError("unreachable")
+        return SimpleNamespace(version=self.version)
+
+    async def search_batch(self, **kwargs) -> list:
+        self.calls.append("search_batch")
+        return [[] for _ in kwargs["requests"]]
+
+    async def query_batch_points(self, **kwargs) -> list:
+        self.calls.append("query_batch_points")
+        return [SimpleNamespace(points=[]) for _ in kwargs["requests"]]
+
+
+@pytest.mark.parametrize(
+    ("version", "expected"),
+    [
+        ("1.7.4", (1, 7, 4)),
+        ("v1.10.0", (1, 10, 0)),
+        ("1.12.1-dev", (1, 12, 1)),
+        ("unknown", ()),
+    ],
+)
+def test_parse_server_version(version: str, expected: tuple) -> None:
+    assert parse_server_version(version) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("version", "expected_call"),
+    [
+        ("1.7.4", "search_batch"),
+        ("1.10.0", "query_batch_points"),
+        (None, "search_batch"),
+    ],
+)
+async def test_search_batch_picks_the_api_from_the_server_version(
+    version: str | None, expected_call: str
+) -> None:
+    server = FakeServer(version)
+    backend = QdrantRetrievalBackend(server, "products")
+    requests = [SearchRequest(vector=[1.0, 0.0], limit=3)]
+
+    await backend.search_batch(requests)
+    await QdrantRetrievalBackend(server, "products").search_batch(requests)
+
+    assert server.calls == [expected_call, expected_call]
+    assert server.info_calls == 1
+    assert await query_api_supported(server) is (expected_call != "search_batch")
+
+
+@pytest.mark.asyncio
+async def test_failed_version_lookup_is_retried_after_backoff(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    server = FakeServer(None)
+
+    # Within the backoff the failure is not retried
+    assert await query_api_supported(server) is False
+    server.version = "1.11.0"
+    assert await query_api_supported(server) is False
+    assert server.info_calls == 1
+
+    # Afterwards the lookup is retried, and a success is cached
+    monkeypatch.setattr(qdrant_module, "_QUERY_API_RETRY_SECONDS", 0.0)
+    flaky = FakeServer(None)
+    assert await query_api_supported(flaky) is False
+    flaky.version = "1.11.0"
+    assert await query_api_supported(flaky) is True
+    assert await query_api_supported(flaky) is True
+    assert flaky.info_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_query_api_setting_skips_version_detection() -> None:
+    new_server = FakeServer("1.12.0")
+    old_server = FakeServer("1.7.4")
+
+    await QdrantRetrievalBackend(new_server, "products", "never").search_batch([])
+    await QdrantRetrievalBackend(old_server, "products", "always").search_batch([])
+
+    assert new_server.calls == ["search_batch"]
+    assert old_server.calls == ["query_batch_points"]
+    assert new_server.info_calls == old_server.info_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_query_api_returns_the_same_hits_as_search_batch() -> None:
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection(
+        collection_name="products",
+        vectors_config=VectorParams(size=3, distance=Distance.COSINE),
+    )
+    await client.upsert(
+        collection_name="products",
+        points=[
+            PointStruct(
+                id=i,
+                vector=[1.0, i / 10, (i % 3) / 5],
+                payload={"price": float(10 * i)},
+            )
+            for i in range(20)
+        ],
+    )
+    requests = [
+        SearchRequest(
+            vector=[1.0, 0.5, 0.1],
+            filter=Filter(must=[FieldCondition(key="price", range=Range(lte=120.0))]),
+            limit=5,
+            score_threshold=0.2,
+            with_payload=True,
+            with_vector=True,
+            params=SearchParams(hnsw_ef=64),
+        ),
+        SearchRequest(vector=[0.2, 1.0, 0.0], limit=4, offset=2),
+    ]
+
+    legacy = await QdrantRetrievalBackend(client, "products", "never").search_batch(
+        requests
+    )
+    query_api = await QdrantRetrievalBackend(client, "products", "always").search_batch(
+        requests
+    )
+
+    def summary(results: list) -> list:
+        return [
+            [(hit.id, round(hit.score, 6), hit.payload, hit.vector) for hit in hits]
+            for hits in results
+        ]
+
+    assert summary(query_api) == summary(legacy)
+    assert [len(hits) for hits in query_api] == [5, 4]
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from src.core.user_interests import (
+    INTEREST_KIND,
+    UserInterest,
+    build_interest_points,
+    interest_point_id,
+    interest_point_ids,
+    interest_quotas,
+    load_user_interests,
+)
+
+
+class FakeQdrant:
+    def __init__(self, points: list) -> None:
+        self.points = {str(point.id): point for point in points}
+        self.calls: list[dict] = []
+
+    async def retrieve(self, **kwargs) -> list:
+        self.calls.append(kwargs)
+        # Qdrant does not guarantee the order of retrieved points
+        return [
+            self.points[point_id]
+            for point_id in reversed(kwargs["ids"])
+            if point_id in self.points
+        ]
+
+
+def test_interest_point_ids_are_deterministic_and_distinct() -> None:
+    user_id = uuid4()
+
+    ids = interest_point_ids(user_id, 3)
+
+    assert ids == interest_point_ids(str(user_id), 3)
+    assert ids[1] == interest_point_id(user_id, 1)
+    assert len(set(ids)) == 3
+    assert str(user_id) not in ids
+    assert interest_point_ids(uuid4(), 3) != ids
+
+
+@pytest.mark.parametrize(
+    ("weights", "page_size", "expected"),
+    [
+        ([1.0, 1.0], 20, [10, 10]),
+        ([3.0, 1.0], 20, [15, 5]),
+        ([1.0, 1.0, 1.0], 20, [7, 7, 6]),
+        ([50.0, 1.0, 1.0], 20, [18, 1, 1]),
+        ([0.0, 0.0], 5, [3, 2]),
+        ([1.0, 1.0, 1.0], 2, [1, 1, 0]),
+        ([], 20, []),
+    ],
+)
+def test_interest_quotas_split_the_page_by_weight(
+    weights: list[float], page_size: int, expected: list[int]
+) -> None:
+    assert interest_quotas(weights, page_size) == expected
+
+
+@pytest.mark.asyncio
+async def test_load_user_interests_round_trips_built_points_in_order() -> None:
+    user_id = uuid4()
+    interests = [
+        UserInterest(vector=[1.0, 0.0], weight=3.0),
+        UserInterest(vector=[0.0, 1.0], weight=1.5),
+    ]
+    points = build_interest_points(user_id, interests)
+    qdrant = FakeQdrant(
+        [*points, SimpleNamespace(id=str(user_id), vector=[0.7, 0.7], payload={})]
+    )
+
+    loaded = await load_user_interests(qdrant, "user_profiles", user_id, 4)
+
+    assert loaded == interests
+    assert [point.payload["kind"] for point in points] == [INTEREST_KIND] * 2
+    assert qdrant.calls == [
+        {
+            "collection_name": "user_profiles",
+            "ids": interest_point_ids(user_id, 4),
+            "with_vectors": True,
+            "with_payload": True,
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_load_user_interests_skips_lookup_when_disabled() -> None:
+    qdrant = FakeQdrant([])
+
+    assert await load_user_interests(qdrant, "user_profiles", uuid4(), 1) == []
+    assert qdrant.calls == []
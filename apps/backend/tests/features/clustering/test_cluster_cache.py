@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.features.clustering.service.cluster_cache import ClusterCache
+
+SETTINGS = SimpleNamespace(
+    cluster_collection="style_clusters",
+    cluster_cache_ttl_seconds=600,
+    cluster_cache_version_check_seconds=30,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeQdrant:
+    def __init__(self, points: list[SimpleNamespace]) -> None:
+        self.points = points
+        self.scroll_calls = 0
+        self.retrieve_calls = 0
+
+    async def scroll(self, **kwargs):
+        assert kwargs["collection_name"] == "style_clusters"
+        self.scroll_calls += 1
+        return list(self.points), None
+
+    async def retrieve(self, **kwargs):
+        self.retrieve_calls += 1
+        return [point for point in self.points if point.id in kwargs["ids"]]
+
+
+def make_points(version: str, vectors: list[list[float]]) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=index,
+            vector=vector,
+            payload={
+                "cluster_index": index,
+                "cluster_version": version,
+                "prior_probability": 1.0 / len(vectors),
+            },
+        )
+        for index, vector in enumerate(vectors)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_repeated_reads_from_memory() -> None:
+    qdrant = FakeQdrant(make_points("v1", [[1.0, 0.0], [0.0, 1.0]]))
+    cache = ClusterCache(clock=FakeClock())
+
+    first = await cache.get(qdrant, SETTINGS)
+    second = await cache.get(qdrant, SETTINGS)
+
+    assert first is second
+    assert first.priors == {0: 0.5, 1: 0.5}
+    assert qdrant.scroll_calls == 1
+    assert qdrant.retrieve_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_reloads_when_version_marker_changes() -> None:
+    clock = FakeClock()
+    qdrant = FakeQdrant(make_points("v1", [[1.0, 0.0], [0.0, 1.0]]))
+    cache = ClusterCache(clock=clock)
+    await cache.get(qdrant, SETTINGS)
+
+    # Same version: only the cheap marker lookup happens.
+    clock.now += 31
+    snapshot = await cache.get(qdrant, SETTINGS)
+    assert snapshot.version == "v1"
+    assert qdrant.retrieve_calls == 1
+    assert qdrant.scroll_calls == 1
+
+    # New run published by another process.
+    qdrant.points = make_points("v2", [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]])
+    clock.now += 31
+    snapshot = await cache.get(qdrant, SETTINGS)
+    assert snapshot.version == "v2"
+    assert len(snapshot.priors) == 3
+    assert qdrant.scroll_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_reloads_after_ttl_and_invalidate() -> None:
+    clock = FakeClock()
+    qdrant = FakeQdrant(make_points("v1", [[1.0, 0.0]]))
+    cache = ClusterCache(clock=clock)
+    await cache.get(qdrant, SETTINGS)
+
+    clock.now += 601
+    await cache.get(qdrant, SETTINGS)
+    assert qdrant.scroll_calls == 2
+
+    cache.invalidate()
+    await cache.get(qdrant, SETTINGS)
+    assert qdrant.scroll_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_snapshot_ignores_centroids_from_previous_run() -> None:
+    points = make_points("v2", [[1.0, 0.0], [0.0, 1.0]])
+    points.append(
+        SimpleNamespace(
+            id=2,
+            vector=[0.5, 0.5],
+            payload={
+                "cluster_index": 2,
+                "cluster_version": "v1",
+                "prior_probability": 0.9,
+            },
+        )
+    )
+    cache = ClusterCache(clock=FakeClock())
+
+    snapshot = await cache.get(FakeQdrant(points), SETTINGS)
+
+    assert set(snapshot.priors) == {0, 1}
+    assert snapshot.cluster_indices.tolist() == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_nearest_clusters_orders_by_cosine_similarity() -> None:
+    qdrant = FakeQdrant(
+        make_points(
+            "v1",
+            [[1.0, 0.0], [0.0, 1.0], [0.9, 0.1], [-1.0, 0.0], [0.5, 0.5]],
+        )
+    )
+    snapshot = await ClusterCache(clock=FakeClock()).get(qdrant, SETTINGS)
+
+    assert snapshot.nearest_clusters([2.0, 0.0], limit=5) == [0, 2, 4, 1, 3]
+    assert snapshot.nearest_clusters([2.0, 0.0], limit=2) == [0, 2]
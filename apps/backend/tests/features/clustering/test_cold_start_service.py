@@ -11,6 +11,8 @@ def make_service() -> ColdStartService:
         qdrant_client=None,
         settings=SimpleNamespace(
             qdrant_collection="products",
+            retrieval_backend="qdrant",
+            qdrant_query_api="never",
             cluster_collection="style_clusters",
         ),
     )
@@ -73,6 +75,8 @@ async def test_find_nearest_clusters_uses_legacy_search_when_needed() -> None:
         qdrant_client=FakeQdrantClient(),
         settings=SimpleNamespace(
             qdrant_collection="products",
+            retrieval_backend="qdrant",
+            qdrant_query_api="never",
             cluster_collection="style_clusters",
         ),
     )
@@ -0,0 +1,280 @@
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from src.core.local_index import LocalVectorIndex
+from src.features.clustering.service.cluster_cache import ClusterSnapshot
+from src.features.feed.schemas.schemas import FeedMode
+from src.features.feed.service.batch_feed_service import (
+    FEED_BATCH_GENERATIONS,
+    BatchFeedResult,
+    BatchFeedService,
+)
+from src.features.feed.service.seen_set import SeenSetCache
+
+PRODUCT_IDS = [str(uuid4()) for _ in range(60)]
+
+
+class FakeUserProfiles:
+    def __init__(self, vectors: dict[str, list[float]]) -> None:
+        self.vectors = vectors
+        self.retrieve_calls: list[list] = []
+
+    async def retrieve(self, **kwargs) -> list[SimpleNamespace]:
+        self.retrieve_calls.append(kwargs["ids"])
+        return [
+            SimpleNamespace(id=user_id, vector=self.vectors[user_id])
+            for user_id in kwargs["ids"]
+            if user_id in self.vectors
+        ]
+
+
+class FakeResult:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    def all(self) -> list:
+        return self._rows
+
+
+class FakeSession:
+    def __init__(self, users: list, interactions: list) -> None:
+        self.users = users
+        self.interactions = interactions
+        self.statements: list = []
+
+    async def execute(self, stmt) -> FakeResult:
+        self.statements.append(stmt)
+        if "user_interactions" in str(stmt):
+            return FakeResult(self.interactions)
+        return FakeResult(self.users)
+
+
+class FakeClusterCache:
+    def __init__(self, snapshot: ClusterSnapshot) -> None:
+        self.snapshot = snapshot
+
+    async def get(self, qdrant, settings) -> ClusterSnapshot:
+        return self.snapshot
+
+
+class FakeTrendingCache:
+    size = 500
+
+    def __init__(self, products: list[SimpleNamespace]) -> None:
+        self.products = products
+        self.calls = 0
+
+    async def top(self, session, category) -> list[SimpleNamespace]:
+        self.calls += 1
+        return self.products
+
+
+class CountingIndex(LocalVectorIndex):
+    def __init__(self, dim: int) -> None:
+        super().__init__(dim=dim)
+        self.batches: list[int] = []
+
+    async def search_batch(self, requests):
+        self.batches.append(len(requests))
+        return await super().search_batch(requests)
+
+
+def make_index() -> CountingIndex:
+    rng = np.random.default_rng(3)
+    index = CountingIndex(dim=4)
+    index.upsert(
+        SimpleNamespace(
+            id=product_id,
+            vector=rng.normal(size=4).tolist(),
+            payload={
+                "product_id": product_id,
+                "price": float(rng.uniform(10, 200)),
+                "created_at_ts": float(1_767_225_600 - i * 3600),
+                "cluster_id": i % 6,
+                "archived": False,
+            },
+        )
+        for i, product_id in enumerate(PRODUCT_IDS)
+    )
+    return index
+
+
+def make_service(
+    vectors: dict[str, list[float]],
+    index: CountingIndex,
+    diversity_mode: str = "clusters",
+) -> BatchFeedService:
+    centroids = np.eye(6, 4, dtype=np.float32)
+    centroids[4:] = np.array([[0.5, 0.5, 0.5, 0.5], [-0.5, 0.5, -0.5, 0.5]])
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    snapshot = ClusterSnapshot(
+        version="v1",
+        priors={cid: 0.1 + cid * 0.05 for cid in range(6)},
+        cluster_indices=np.arange(6),
+        centroids=centroids,
+    )
+    trending = [
+        SimpleNamespace(
+            product_id=product_id,
+            popularity=float(100 - i),
+            created_at=1_767_225_600.0,
+        )
+        for i, product_id in enumerate(PRODUCT_IDS[:40])
+    ]
+    return BatchFeedService(
+        qdrant_client=FakeUserProfiles(vectors),
+        settings=SimpleNamespace(
+            user_profiles_collection="user_profiles",
+            feed_hybrid_confidence_threshold=0.6,
+            feed_hybrid_personalized_ratio=0.6,
+            feed_personalized_discovery_count=2,
+            feed_diversity_mode=diversity_mode,
+            feed_mmr_lambda=0.5,
+            qdrant_products_profile="float32",
+            qdrant_search_hnsw_ef=None,
+        ),
+        cluster_cache=FakeClusterCache(snapshot),
+        seen_set_cache=SeenSetCache(),
+        trending_cache=FakeTrendingCache(trending),
+        retrieval=index,
+    )
+
+
+def make_user(user_id: str, confidence: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=user_id,
+        profile_confidence=confidence,
+        price_profile={
+            "price_min": 20.0,
+            "price_max": 90.0,
+            "price_median": 50.0,
+            "price_std": 20.0,
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_feeds_batches_lookups_for_the_whole_chunk() -> None:
+    FEED_BATCH_GENERATIONS.reset()
+    mature, thin, cold = str(uuid4()), str(uuid4()), str(uuid4())
+    index = make_index()
+    service = make_service(
+        {mature: [1.0, 0.2, 0.0, 0.1], thin: [0.0, 1.0, 0.3, 0.0]}, index
+    )
+    session = FakeSession(
+        users=[make_user(mature, 0.9), make_user(thin, 0.3)],
+        interactions=[
+            SimpleNamespace(user_id=mature, product_id=product_id)
+            for product_id in PRODUCT_IDS[:5]
+        ],
+    )
+
+    results = await service.generate_feeds([mature, thin, cold], session, page_size=10)
+
+    assert service._qdrant.retrieve_calls == [[mature, thin, cold]]
+    assert len(session.statements) == 2
+    assert len(index.batches) == 1
+    assert service._trending_cache.calls == 1
+
+    assert [result.user_id for result in results] == [mature, thin, cold]
+    assert [result.feed_mode for result in results] == [
+        FeedMode.PERSONALIZED,
+        FeedMode.HYBRID,
+        FeedMode.TRENDING,
+    ]
+    for result in results:
+        ids = [candidate.product_id for candidate in result.candidates]
+        assert len(ids) == 10
+        assert len(set(ids)) == 10
+    assert not set(PRODUCT_IDS[:5]) & {
+        candidate.product_id for candidate in results[0].candidates
+    }
+    assert {c.source for c in results[2].candidates} == {"trending"}
+    assert FEED_BATCH_GENERATIONS.value(feed_mode="hybrid") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("diversity_mode", ["clusters", "mmr"])
+async def test_generate_feeds_matches_single_user_personalized_feed(
+    diversity_mode: str,
+) -> None:
+    user_id = str(uuid4())
+    vector = [0.3, 1.0, -0.2, 0.4]
+    index = make_index()
+    service = make_service({user_id: vector}, index, diversity_mode)
+    seen_ids = PRODUCT_IDS[10:14]
+    session = FakeSession(
+        users=[make_user(user_id, 0.9)],
+        interactions=[
+            SimpleNamespace(user_id=user_id, product_id=product_id)
+            for product_id in seen_ids
+        ],
+    )
+
+    [batch] = await service.generate_feeds([user_id], session, page_size=12)
+
+    single = await service._generate_personalized_feed(
+        user_vector=vector,
+        price_profile=make_user(user_id, 0.9).price_profile,
+        seen=service._seen_sets.empty().union(seen_ids),
+        category=None,
+        page_size=12,
+    )
+    _, primary_target = service._blend_targets(FeedMode.PERSONALIZED, 12)
+    trending = service._rank_trending_candidates(service._trending_cache.products)
+    expected = service._blend_ranked_candidates(
+        single,
+        [c for c in trending if c.product_id not in seen_ids],
+        page_size=12,
+        primary_target=primary_target,
+    )
+
+    assert [c.product_id for c in batch.candidates] == [c.product_id for c in expected]
+
+
+@pytest.mark.asyncio
+async def test_run_bounds_in_flight_chunks_and_counts_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = make_service({}, make_index())
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate_feeds(user_ids, session, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if "bad" in user_ids:
+            raise RuntimeError("boom")
+        return [BatchFeedResult(user_id, FeedMode.TRENDING, []) for user_id in user_ids]
+
+    monkeypatch.setattr(service, "generate_feeds", fake_generate_feeds)
+
+    class FakeSessionContext:
+        async def __aenter__(self):
+            return object()
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+    async def chunks():
+        for chunk in (["a", "b"], ["c"], ["bad", "d"], ["e"], ["f", "g"]):
+            yield chunk
+
+    written: list[str] = []
+
+    async def write(results):
+        written.extend(result.user_id for result in results)
+
+    stats = await service.run(chunks(), FakeSessionContext, write, concurrency=2)
+
+    assert peak == 2
+    assert sorted(written) == ["a", "b", "c", "e", "f", "g"]
+    assert stats.users == 6
+    assert stats.failed_users == 2
@@ -0,0 +1,117 @@
+import pytest
+
+from src.features.feed.schemas.schemas import FeedMode
+from src.features.feed.service.batch_store import (
+    FEED_BATCH_LOOKUPS,
+    FeedBatchSnapshot,
+    InMemoryFeedBatchStore,
+    RedisFeedBatchStore,
+)
+from src.features.feed.service.feed_service import FeedService
+from src.features.feed.service.ranking_service import RankedCandidate
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_snapshot(user_id: str = "user-1") -> FeedBatchSnapshot:
+    return FeedBatchSnapshot(
+        user_id=user_id,
+        category=None,
+        feed_mode=FeedMode.PERSONALIZED,
+        candidates=[
+            RankedCandidate(
+                product_id=f"p{index}",
+                score=1.0 - index / 10,
+                cosine_score=0.5,
+                cluster_prior_score=0.5,
+                price_score=0.5,
+                freshness_score=0.5,
+            )
+            for index in range(5)
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_returns_snapshot_and_counts_hits() -> None:
+    FEED_BATCH_LOOKUPS.reset()
+    store = InMemoryFeedBatchStore(max_entries=4, ttl_seconds=60)
+    snapshot = make_snapshot()
+
+    await store.put("batch-1", snapshot)
+
+    assert await store.get("batch-1") is snapshot
+    assert await store.get("missing") is None
+    assert FEED_BATCH_LOOKUPS.value(result="hit") == 1
+    assert FEED_BATCH_LOOKUPS.value(result="miss") == 1
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_expires_entries_after_ttl() -> None:
+    clock = FakeClock()
+    store = InMemoryFeedBatchStore(max_entries=4, ttl_seconds=30, clock=clock)
+    await store.put("batch-1", make_snapshot())
+
+    clock.now = 29.0
+    assert await store.get("batch-1") is not None
+
+    clock.now = 31.0
+    assert await store.get("batch-1") is None
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_evicts_least_recently_used() -> None:
+    store = InMemoryFeedBatchStore(max_entries=2, ttl_seconds=60)
+    await store.put("a", make_snapshot())
+    await store.put("b", make_snapshot())
+
+    # Touch "a" so "b" becomes the eviction candidate.
+    assert await store.get("a") is not None
+    await store.put("c", make_snapshot())
+
+    assert await store.get("a") is not None
+    assert await store.get("b") is None
+    assert await store.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_round_trips_snapshot_and_survives_errors() -> None:
+    class FakeRedis:
+        def __init__(self) -> None:
+            self.data: dict[str, str] = {}
+            self.fail = False
+
+        async def get(self, key: str):
+            if self.fail:
+                raise ConnectionError("redis down")
+            return self.data.get(key)
+
+        async def set(self, key: str, value: str, ex: int) -> None:
+            assert ex == 120
+            self.data[key] = value
+
+    redis = FakeRedis()
+    store = RedisFeedBatchStore(redis, ttl_seconds=120)
+    snapshot = make_snapshot()
+
+    await store.put("batch-1", snapshot)
+    loaded = await store.get("batch-1")
+
+    assert loaded == snapshot
+
+    redis.fail = True
+    assert await store.get("batch-1") is None
+
+
+def test_scale_quota_keeps_per_page_ratio_for_deep_batches() -> None:
+    assert FeedService._scale_quota(3, 10) == 3
+    assert FeedService._scale_quota(3, 20) == 3
+    assert FeedService._scale_quota(3, 100) == 15
+    assert FeedService._scale_quota(2, 100) == 10
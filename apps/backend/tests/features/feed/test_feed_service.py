@@ -1,10 +1,20 @@
+import asyncio
 from datetime import datetime, timezone
 from types import SimpleNamespace
 
 import pytest
 
+from src.core.local_index import LocalVectorIndex
+from src.core.user_interests import UserInterest
 from src.features.feed.schemas.schemas import FeedMode
-from src.features.feed.service.feed_service import FeedService
+from src.features.feed.service.feed_service import (
+    FEED_DROPPED_CANDIDATES,
+    FEED_GENERATIONS,
+    FEED_STAGE_SECONDS,
+    FeedService,
+)
+from src.features.feed.service.seen_set import SeenSetCache
+from src.features.feed.service.trending_cache import TrendingCache
 
 
 def make_service() -> FeedService:
@@ -14,7 +24,14 @@ def make_service() -> FeedService:
             feed_hybrid_confidence_threshold=0.6,
             feed_hybrid_personalized_ratio=0.6,
             feed_personalized_discovery_count=2,
+            profile_interest_count=1,
+            retrieval_backend="qdrant",
+            qdrant_query_api="never",
+            qdrant_products_profile="float32",
+            qdrant_search_hnsw_ef=None,
         ),
+        seen_set_cache=SeenSetCache(),
+        trending_cache=TrendingCache(),
     )
 
 
@@ -40,6 +57,7 @@ def test_prepare_candidates_defaults_missing_cluster_id() -> None:
 
 
 def test_prepare_candidates_drops_missing_required_payload_fields() -> None:
+    FEED_DROPPED_CANDIDATES.reset()
     candidates = [
         SimpleNamespace(
             score=0.75,
@@ -56,6 +74,7 @@ def test_prepare_candidates_drops_missing_required_payload_fields() -> None:
     )
 
     assert prepared == []
+    assert FEED_DROPPED_CANDIDATES.value(source="test") == 1
 
 
 def test_select_feed_mode_returns_trending_without_vector() -> None:
@@ -144,6 +163,8 @@ def test_blend_ranked_candidates_deduplicates_and_fills_page() -> None:
 async def test_generate_feed_without_vector_uses_trending(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
+    FEED_GENERATIONS.reset()
+    FEED_STAGE_SECONDS.reset()
     service = make_service()
     expected_candidates = [
         SimpleNamespace(product_id="t1", score=0.9, source="trending"),
@@ -162,7 +183,7 @@ async def test_generate_feed_without_vector_uses_trending(
         return set()
 
     async def fake_generate_trending_feed(**kwargs) -> list[SimpleNamespace]:
-        assert kwargs["seen_ids"] == []
+        assert len(kwargs["seen"]) == 0
         assert kwargs["category"] is None
         assert kwargs["page_size"] == 20
         return expected_candidates
@@ -189,3 +210,605 @@ async def test_generate_feed_without_vector_uses_trending(
 
     assert result.feed_mode is FeedMode.TRENDING
     assert result.candidates == expected_candidates
+    assert FEED_GENERATIONS.value(feed_mode="trending") == 1
+    assert FEED_STAGE_SECONDS.count(stage="total") == 1
+    assert FEED_STAGE_SECONDS.count(stage="trending") == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_feed_overlaps_stages_and_skips_unneeded_trending(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = make_service()
+    service._settings.feed_personalized_discovery_count = 0
+    vector_started = asyncio.Event()
+    personalized = [SimpleNamespace(product_id="p1", score=0.9, source="primary")]
+
+    async def fake_load_user_vector(user_id: str) -> list[float]:
+        vector_started.set()
+        return [1.0, 0.0]
+
+    async def fake_load_user_profile_state(user_id: str, session: object) -> object:
+        # Only completes if the vector lookup is running concurrently.
+        await asyncio.wait_for(vector_started.wait(), timeout=1)
+        return SimpleNamespace(profile_confidence=0.9, price_profile=None)
+
+    async def fake_get_interacted_product_ids(
+        user_id: str, session: object
+    ) -> set[str]:
+        return {"seen-1"}
+
+    async def fake_generate_personalized_feed(**kwargs) -> list[SimpleNamespace]:
+        assert "seen-1" in kwargs["seen"]
+        assert kwargs["price_profile"]["price_median"] == 0.0
+        return personalized
+
+    async def fail_generate_trending_feed(**kwargs) -> list[SimpleNamespace]:
+        raise AssertionError("trending should not run without discovery slots")
+
+    monkeypatch.setattr(service, "_load_user_vector", fake_load_user_vector)
+    monkeypatch.setattr(
+        service, "_load_user_profile_state", fake_load_user_profile_state
+    )
+    monkeypatch.setattr(
+        service, "_get_interacted_product_ids", fake_get_interacted_product_ids
+    )
+    monkeypatch.setattr(
+        service, "_generate_personalized_feed", fake_generate_personalized_feed
+    )
+    monkeypatch.setattr(service, "_generate_trending_feed", fail_generate_trending_feed)
+
+    result = await service.generate_feed(
+        user_id="user-1",
+        seen_ids=[],
+        session=object(),
+        page_size=20,
+    )
+
+    assert result.feed_mode is FeedMode.PERSONALIZED
+    assert result.candidates == personalized
+    assert set(result.stage_timings) == {
+        "user_vector",
+        "profile_state",
+        "seen_ids",
+        "personalized",
+    }
+
+
+@pytest.mark.asyncio
+async def test_deep_batch_is_filled_from_unseen_candidates_without_revisits(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # 100 matches, of which the 40 best were already swiped
+    index = make_interest_index([(f"p{i}", [1.0, 0.01 * i, 0.0]) for i in range(100)])
+    service, batches = make_interest_service(index)
+    service._settings.feed_hybrid_confidence_threshold = 0.6
+    service._settings.feed_personalized_discovery_count = 0
+    service._settings.profile_interest_count = 1
+    seen_ids = {f"p{i}" for i in range(40)}
+
+    async def fake_load_user_vector(user_id: str) -> list[float]:
+        return [1.0, 0.0, 0.0]
+
+    async def fake_load_user_profile_state(user_id: str, session: object) -> object:
+        return SimpleNamespace(profile_confidence=0.9, price_profile=None)
+
+    async def fake_get_interacted_product_ids(
+        user_id: str, session: object
+    ) -> set[str]:
+        return seen_ids
+
+    monkeypatch.setattr(service, "_load_user_vector", fake_load_user_vector)
+    monkeypatch.setattr(
+        service, "_load_user_profile_state", fake_load_user_profile_state
+    )
+    monkeypatch.setattr(
+        service, "_get_interacted_product_ids", fake_get_interacted_product_ids
+    )
+
+    result = await service.generate_feed(
+        user_id="user-1",
+        seen_ids=[],
+        session=object(),
+        page_size=20,
+        batch_size=100,
+    )
+
+    ids = [candidate.product_id for candidate in result.candidates]
+    # Fewer unseen matches than the batch depth: the batch is shorter, the
+    # first page (and the rest of the batch) has no seen items, and no
+    # server-side fallback search was sent
+    assert len(ids) == 60
+    assert not seen_ids & set(ids[:20])
+    assert not seen_ids & set(ids)
+    assert len(batches) == 1
+    assert batches[0][0].limit == 140
+
+
+@pytest.mark.parametrize("primary_count", [0, 1, 5, 17, 30])
+@pytest.mark.parametrize("secondary_count", [0, 1, 3, 12])
+@pytest.mark.parametrize(("page_size", "primary_target"), [(20, 18), (20, 12), (5, 5)])
+def test_stable_blend_prefix_leads_every_blend(
+    primary_count: int, secondary_count: int, page_size: int, primary_target: int
+) -> None:
+    primary = [SimpleNamespace(product_id=f"p{i}") for i in range(primary_count)]
+    secondary = [SimpleNamespace(product_id=f"t{i}") for i in range(secondary_count)]
+
+    prefix = FeedService._stable_blend_prefix(
+        primary, page_size=page_size, primary_target=primary_target
+    )
+    blended = FeedService._blend_ranked_candidates(
+        primary, secondary, page_size=page_size, primary_target=primary_target
+    )
+
+    assert blended[: len(prefix)] == prefix
+    assert bool(prefix) == bool(primary)
+
+
+@pytest.mark.asyncio
+async def test_generate_feed_announces_prefix_before_trending_finishes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = make_service()
+    prefix_seen = asyncio.Event()
+    announced: list[list] = []
+    personalized = [
+        SimpleNamespace(product_id=f"p{i}", score=1.0, source="primary")
+        for i in range(20)
+    ]
+    trending = [
+        SimpleNamespace(product_id=f"t{i}", score=0.5, source="trending")
+        for i in range(5)
+    ]
+
+    async def fake_load_user_vector(user_id: str) -> list[float]:
+        return [1.0, 0.0]
+
+    async def fake_load_user_profile_state(user_id: str, session: object) -> object:
+        return SimpleNamespace(profile_confidence=0.9, price_profile=None)
+
+    async def fake_get_interacted_product_ids(
+        user_id: str, session: object
+    ) -> set[str]:
+        return set()
+
+    async def fake_generate_personalized_feed(**kwargs) -> list[SimpleNamespace]:
+        return personalized
+
+    async def slow_generate_trending_feed(**kwargs) -> list[SimpleNamespace]:
+        # Only completes once the prefix was handed out.
+        await asyncio.wait_for(prefix_seen.wait(), timeout=1)
+        return trending
+
+    async def on_prefix(prefix: list) -> None:
+        announced.append(prefix)
+        prefix_seen.set()
+
+    monkeypatch.setattr(service, "_load_user_vector", fake_load_user_vector)
+    monkeypatch.setattr(
+        service, "_load_user_profile_state", fake_load_user_profile_state
+    )
+    monkeypatch.setattr(
+        service, "_get_interacted_product_ids", fake_get_interacted_product_ids
+    )
+    monkeypatch.setattr(
+        service, "_generate_personalized_feed", fake_generate_personalized_feed
+    )
+    monkeypatch.setattr(service, "_generate_trending_feed", slow_generate_trending_feed)
+
+    result = await service.generate_feed(
+        user_id="user-1",
+        seen_ids=[],
+        session=object(),
+        page_size=20,
+        on_prefix=on_prefix,
+    )
+
+    assert result.feed_mode is FeedMode.PERSONALIZED
+    assert len(announced) == 1
+    assert [c.product_id for c in announced[0]] == [f"p{i}" for i in range(9)]
+    assert result.candidates[:9] == announced[0]
+    assert result.candidates[9].product_id == "t0"
+
+
+class FakeBatchQdrant:
+    def __init__(self, results: list[list[SimpleNamespace]]) -> None:
+        self.results = results
+        self.calls: list[list] = []
+
+    async def search_batch(self, **kwargs) -> list[list[SimpleNamespace]]:
+        self.calls.append(kwargs["requests"])
+        return self.results[: len(kwargs["requests"])]
+
+
+def make_hits(*product_ids: str) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=product_id,
+            score=0.9 - index * 0.01,
+            payload={
+                "product_id": product_id,
+                "price": 40.0,
+                "created_at": "2026-01-01T00:00:00+00:00",
+                "cluster_id": 0,
+            },
+        )
+        for index, product_id in enumerate(product_ids)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_shortfall_retrieval_sends_all_variants_in_one_batch() -> None:
+    service = make_service()
+    service._settings.qdrant_collection = "products"
+    qdrant = FakeBatchQdrant(
+        [
+            make_hits("p1"),
+            make_hits("p1", "p2"),
+            make_hits("d1"),
+        ]
+    )
+    service._qdrant = qdrant
+
+    candidates, diversity = await service._retrieve_with_shortfall_handling(
+        user_vector=[1.0, 0.0],
+        seen=service._seen_sets.empty(),
+        price_min=10.0,
+        price_max=50.0,
+        category=None,
+        page_size=2,
+        diversity_filter=FeedService._build_diversity_filter([3, 4]),
+    )
+
+    assert len(qdrant.calls) == 1
+    assert len(qdrant.calls[0]) == 3
+    # Precedence is unchanged: the first variant that fills the page wins.
+    assert [c.payload["product_id"] for c in candidates] == ["p1", "p2"]
+    assert [c.payload["product_id"] for c in diversity] == ["d1"]
+
+
+@pytest.mark.asyncio
+async def test_shortfall_retrieval_skips_duplicate_filter_variants() -> None:
+    service = make_service()
+    service._settings.qdrant_collection = "products"
+    qdrant = FakeBatchQdrant([make_hits("p1")])
+    service._qdrant = qdrant
+
+    # No price band: both widening variants share one filter.
+    candidates, diversity = await service._retrieve_with_shortfall_handling(
+        user_vector=[1.0, 0.0],
+        seen=service._seen_sets.empty(),
+        price_min=0.0,
+        price_max=0.0,
+        category=None,
+        page_size=20,
+    )
+
+    assert len(qdrant.calls[0]) == 1
+    assert [c.payload["product_id"] for c in candidates] == ["p1"]
+    assert diversity == []
+
+
+@pytest.mark.asyncio
+async def test_shortfall_retrieval_post_filters_seen_items_locally() -> None:
+    service = make_service()
+    service._settings.qdrant_collection = "products"
+    qdrant = FakeBatchQdrant([make_hits("s1", "p1", "p2", "s2", "p3")])
+    service._qdrant = qdrant
+    seen = service._seen_sets.empty().union(["s1", "s2"])
+
+    candidates, _ = await service._retrieve_with_shortfall_handling(
+        user_vector=[1.0, 0.0],
+        seen=seen,
+        price_min=0.0,
+        price_max=0.0,
+        category=None,
+        page_size=3,
+    )
+
+    request = qdrant.calls[0][0]
+    assert request.filter.must_not[-1].match is not None  # archived only
+    assert request.limit == 102
+    assert [c.payload["product_id"] for c in candidates] == ["p1", "p2", "p3"]
+
+
+@pytest.mark.asyncio
+async def test_shortfall_retrieval_falls_back_to_server_side_filter(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = make_service()
+    service._settings.qdrant_collection = "products"
+    monkeypatch.setattr("src.features.feed.service.feed_service._OVERRETRIEVE_LIMIT", 2)
+    monkeypatch.setattr(
+        "src.features.feed.service.feed_service._SEEN_OVERSAMPLE_LIMIT", 2
+    )
+    # More seen items than the oversample absorbs: the saturated result is all
+    # seen, but more unseen candidates may exist further down.
+    seen_ids = [f"s{index}" for index in range(6)]
+    qdrant = FakeBatchQdrant([])
+    service._qdrant = qdrant
+
+    async def fallback_batch(**kwargs) -> list[list[SimpleNamespace]]:
+        qdrant.calls.append(kwargs["requests"])
+        if len(qdrant.calls) == 1:
+            return [make_hits(*seen_ids[:4])]
+        return [make_hits("p1", "p2")]
+
+    qdrant.search_batch = fallback_batch
+    seen = service._seen_sets.empty().union(seen_ids)
+
+    candidates, _ = await service._retrieve_with_shortfall_handling(
+        user_vector=[1.0, 0.0],
+        seen=seen,
+        price_min=0.0,
+        price_max=0.0,
+        category=None,
+        page_size=2,
+    )
+
+    assert len(qdrant.calls) == 2
+    has_id = qdrant.calls[1][0].filter.must_not[-1].has_id
+    assert sorted(has_id) == seen_ids
+    assert [c.payload["product_id"] for c in candidates] == ["p1", "p2"]
+
+
+def test_inject_diversity_excludes_primary_ids_locally() -> None:
+    service = make_service()
+    primary = [
+        SimpleNamespace(product_id=f"p{i}", score=1.0 - i * 0.01) for i in range(20)
+    ]
+
+    feed = service._inject_diversity(
+        cluster_priors={},
+        user_price_profile={"median": 40.0, "std": 10.0},
+        primary_ranked=primary,
+        diversity_candidates=make_hits("p0", "d1", "p1", "d2", "d3", "d4"),
+        page_size=20,
+    )
+
+    ids = [candidate.product_id for candidate in feed]
+    assert len(ids) == 20
+    assert {"d1", "d2", "d3"} <= set(ids)
+    assert "d4" not in ids
+    assert len(set(ids)) == 20
+
+
+@pytest.mark.asyncio
+async def test_shortfall_retrieval_runs_on_local_index() -> None:
+    index = LocalVectorIndex(dim=2)
+    index.upsert(
+        SimpleNamespace(
+            id=product_id,
+            vector=vector,
+            payload={
+                "product_id": product_id,
+                "price": price,
+                "created_at": "2026-01-01T00:00:00+00:00",
+                "cluster_id": 0,
+                "archived": product_id == "archived",
+            },
+        )
+        for product_id, vector, price in [
+            ("near", [1.0, 0.1], 40.0),
+            ("far", [0.6, 0.8], 45.0),
+            ("pricey", [1.0, 0.0], 900.0),
+            ("archived", [1.0, 0.0], 40.0),
+            ("seen", [1.0, 0.05], 40.0),
+        ]
+    )
+    service = FeedService(
+        qdrant_client=None,
+        settings=SimpleNamespace(
+            qdrant_products_profile="float32", qdrant_search_hnsw_ef=None
+        ),
+        seen_set_cache=SeenSetCache(),
+        trending_cache=TrendingCache(),
+        retrieval=index,
+    )
+
+    candidates, _ = await service._retrieve_with_shortfall_handling(
+        user_vector=[1.0, 0.0],
+        seen=service._seen_sets.empty().union(["seen"]),
+        price_min=30.0,
+        price_max=50.0,
+        category=None,
+        page_size=2,
+    )
+
+    assert [c.payload["product_id"] for c in candidates] == ["near", "far"]
+
+
+@pytest.mark.asyncio
+async def test_personalized_feed_in_mmr_mode_skips_diversity_query() -> None:
+    index = LocalVectorIndex(dim=3)
+    index.upsert(
+        SimpleNamespace(
+            id=product_id,
+            vector=vector,
+            payload={
+                "product_id": product_id,
+                "price": 40.0,
+                "created_at": "2026-01-01T00:00:00+00:00",
+                "cluster_id": 0,
+            },
+        )
+        for product_id, vector in [
+            ("top", [1.0, 0.0, 0.0]),
+            ("twin", [1.0, 0.02, 0.0]),
+            ("other", [0.6, 0.8, 0.0]),
+        ]
+    )
+    requests: list = []
+    search_batch = index.search_batch
+
+    async def recording_search_batch(batch):
+        requests.extend(batch)
+        return await search_batch(batch)
+
+    index.search_batch = recording_search_batch
+    service = FeedService(
+        qdrant_client=None,
+        settings=SimpleNamespace(
+            feed_diversity_mode="mmr",
+            feed_mmr_lambda=0.3,
+            qdrant_products_profile="float32",
+            qdrant_search_hnsw_ef=None,
+        ),
+        seen_set_cache=SeenSetCache(),
+        trending_cache=TrendingCache(),
+        retrieval=index,
+    )
+
+    async def no_priors() -> dict:
+        return {}
+
+    async def no_clusters(user_vector: list[float]) -> list[int]:
+        raise AssertionError("MMR mode must not look up diversity clusters")
+
+    service._load_cluster_priors = no_priors
+    service._identify_diversity_clusters = no_clusters
+
+    feed = await service._generate_personalized_feed(
+        user_vector=[1.0, 0.05, 0.0],
+        price_profile={},
+        seen=service._seen_sets.empty(),
+        category=None,
+        page_size=3,
+    )
+
+    assert len(requests) == 1
+    assert requests[0].with_vector is True
+    # The near-duplicate of the best match drops behind the distinct item
+    assert [candidate.product_id for candidate in feed] == ["twin", "other", "top"]
+
+
+def make_interest_index(products: list[tuple[str, list[float]]]) -> LocalVectorIndex:
+    index = LocalVectorIndex(dim=3)
+    index.upsert(
+        SimpleNamespace(
+            id=product_id,
+            vector=vector,
+            payload={
+                "product_id": product_id,
+                "price": 40.0,
+                "created_at": "2026-01-01T00:00:00+00:00",
+                "cluster_id": 0,
+            },
+        )
+        for product_id, vector in products
+    )
+    return index
+
+
+def make_interest_service(index: LocalVectorIndex) -> tuple[FeedService, list]:
+    batches: list = []
+    search_batch = index.search_batch
+
+    async def recording_search_batch(batch):
+        batches.append(batch)
+        return await search_batch(batch)
+
+    index.search_batch = recording_search_batch
+    service = FeedService(
+        qdrant_client=None,
+        settings=SimpleNamespace(
+            feed_diversity_mode="clusters",
+            qdrant_products_profile="float32",
+            qdrant_search_hnsw_ef=None,
+        ),
+        seen_set_cache=SeenSetCache(),
+        trending_cache=TrendingCache(),
+        retrieval=index,
+    )
+
+    async def no_priors() -> dict:
+        return {}
+
+    async def no_clusters(user_vector: list[float]) -> list[int]:
+        return []
+
+    service._load_cluster_priors = no_priors
+    service._identify_diversity_clusters = no_clusters
+    return service, batches
+
+
+@pytest.mark.asyncio
+async def test_personalized_feed_merges_interests_from_one_search_batch() -> None:
+    index = make_interest_index(
+        [(f"a{i}", [1.0, 0.05 * i, 0.0]) for i in range(5)]
+        + [(f"b{i}", [0.05 * i, 1.0, 0.0]) for i in range(5)]
+    )
+    service, batches = make_interest_service(index)
+
+    feed = await service._generate_personalized_feed(
+        user_vector=[0.7, 0.7, 0.0],
+        price_profile={},
+        seen=service._seen_sets.empty().union(["a0"]),
+        category=None,
+        page_size=4,
+        interests=[
+            UserInterest(vector=[1.0, 0.0, 0.0], weight=3.0),
+            UserInterest(vector=[0.0, 1.0, 0.0], weight=1.0),
+        ],
+    )
+
+    assert len(batches) == 1
+    assert [request.vector for request in batches[0]] == [
+        [1.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0],
+    ]
+    ids = [candidate.product_id for candidate in feed]
+    # Quotas 3:1, taken round-robin from each interest's best unseen items
+    assert ids == ["a1", "b0", "a2", "a3"]
+
+
+@pytest.mark.asyncio
+async def test_personalized_feed_falls_back_to_main_vector_on_interest_shortfall() -> (
+    None
+):
+    index = make_interest_index(
+        [("a0", [1.0, 0.0, 0.0]), ("b0", [0.0, 1.0, 0.0]), ("c0", [0.6, 0.6, 0.5])]
+    )
+    service, batches = make_interest_service(index)
+
+    feed = await service._generate_personalized_feed(
+        user_vector=[0.6, 0.6, 0.5],
+        price_profile={},
+        seen=service._seen_sets.empty(),
+        category=None,
+        page_size=3,
+        interests=[
+            UserInterest(vector=[1.0, 0.0, 0.0]),
+            UserInterest(vector=[0.0, 0.0, 1.0]),
+        ],
+    )
+
+    assert len(batches) == 2
+    assert batches[1][0].vector == [0.6, 0.6, 0.5]
+    assert {candidate.product_id for candidate in feed} == {"a0", "b0", "c0"}
+
+
+def test_merge_interest_rankings_dedups_and_fills_by_score() -> None:
+    def ranked(*items: tuple[str, float]) -> list[SimpleNamespace]:
+        return [
+            SimpleNamespace(product_id=product_id, score=score)
+            for product_id, score in items
+        ]
+
+    merged = FeedService._merge_interest_rankings(
+        [
+            ranked(("shared", 0.9), ("a1", 0.8), ("a2", 0.7), ("a3", 0.2)),
+            ranked(("shared", 0.95), ("b1", 0.6)),
+        ],
+        quotas=[2, 3],
+        page_size=5,
+    )
+
+    # The second interest runs dry after b1, so its slot goes to the best rest
+    assert [candidate.product_id for candidate in merged] == [
+        "shared",
+        "b1",
+        "a1",
+        "a2",
+        "a3",
+    ]
@@ -0,0 +1,154 @@
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.dependencies import get_current_user
+from src.features.feed.router import router as feed_router
+from src.features.feed.schemas.schemas import FeedMode
+from src.features.feed.service.batch_store import InMemoryFeedBatchStore
+from src.features.feed.service.feed_service import FeedGenerationResult
+from src.features.feed.service.ranking_service import RankedCandidate
+from src.features.products.service.product_card_cache import ProductCard
+
+
+def make_candidate(product_id: str) -> RankedCandidate:
+    return RankedCandidate(
+        product_id=product_id,
+        score=0.5,
+        cosine_score=0.5,
+        cluster_prior_score=0.2,
+        price_score=0.1,
+        freshness_score=0.1,
+    )
+
+
+class FakeSession:
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class FakeCardCache:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def get_many(self, session, product_ids) -> dict:
+        product_ids = list(product_ids)
+        self.calls.append(product_ids)
+        return {
+            product_id: ProductCard(
+                product_id, f"Item {product_id}", 10.0, "EUR", "i", "u", "tops"
+            )
+            for product_id in product_ids
+            if product_id != "gone"
+        }
+
+
+@pytest.fixture
+def stream_client(monkeypatch: pytest.MonkeyPatch):
+    final = [make_candidate(f"p{i}") for i in range(3)]
+    final.insert(2, make_candidate("gone"))
+    final += [make_candidate(f"x{i}") for i in range(30)]
+    state = {"store": InMemoryFeedBatchStore(max_entries=8, ttl_seconds=60)}
+    cards = FakeCardCache()
+
+    class FakeFeedService:
+        def __init__(self, **kwargs) -> None:
+            pass
+
+        async def generate_feed(self, *, on_prefix=None, **kwargs):
+            if on_prefix is not None:
+                await on_prefix(final[:2])
+            return FeedGenerationResult(
+                feed_mode=FeedMode.PERSONALIZED, candidates=final
+            )
+
+    async def fake_qdrant():
+        return None
+
+    async def no_warm_batch(*args):
+        return None
+
+    monkeypatch.setattr(feed_router, "FeedService", FakeFeedService)
+    monkeypatch.setattr(feed_router, "get_qdrant_client", fake_qdrant)
+    monkeypatch.setattr(
+        feed_router, "get_feed_batch_store", lambda settings: state["store"]
+    )
+    monkeypatch.setattr(
+        feed_router,
+        "get_feed_warmer",
+        lambda settings: SimpleNamespace(take=no_warm_batch),
+    )
+    monkeypatch.setattr(feed_router, "get_product_card_cache", lambda s: cards)
+    monkeypatch.setattr(feed_router, "_get_session_factory", lambda: FakeSession)
+
+    app = FastAPI()
+    app.include_router(feed_router.router)
+    app.dependency_overrides[get_current_user] = lambda: uuid4()
+    state["cards"] = cards
+    return TestClient(app), state
+
+
+def test_stream_sends_prefix_items_first_then_page_info(stream_client) -> None:
+    feed_router.FEED_STREAM_EARLY_ITEMS.reset()
+    client, state = stream_client
+
+    response = client.get("/feed/stream", params={"page_size": 5})
+    events = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [event["type"] for event in events] == ["item"] * 4 + ["page"]
+    assert [event["data"]["product_id"] for event in events[:4]] == [
+        "p0",
+        "p1",
+        "p2",
+        "x0",
+    ]
+    assert state["cards"].calls == [["p0", "p1"], ["gone", "p2", "x0"]]
+    assert feed_router.FEED_STREAM_EARLY_ITEMS.value() == 2
+
+    page = events[-1]["data"]
+    assert page["has_more"] is True
+    assert page["total_in_batch"] == 34
+    assert page["feed_mode"] == "personalized"
+
+    # The next page slices the stored batch, like GET /feed
+    response = client.get(
+        "/feed/stream", params={"page_size": 5, "cursor": page["next_cursor"]}
+    )
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["data"].get("product_id") for event in events[:5]] == [
+        f"x{i}" for i in range(1, 6)
+    ]
+
+
+def test_stream_uses_sse_framing_when_requested(stream_client) -> None:
+    client, _ = stream_client
+
+    response = client.get(
+        "/feed/stream",
+        params={"page_size": 2},
+        headers={"Accept": "text/event-stream"},
+    )
+    messages = response.text.strip().split("\n\n")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [message.split("\n")[0] for message in messages] == [
+        "event: item",
+        "event: item",
+        "event: page",
+    ]
+
+
+def test_stream_rejects_invalid_cursor(stream_client) -> None:
+    client, _ = stream_client
+
+    response = client.get("/feed/stream", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
@@ -0,0 +1,160 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.features.feed.schemas.schemas import FeedMode
+from src.features.feed.service import feed_warmer as warmer_module
+from src.features.feed.service.batch_store import FeedBatchSnapshot
+from src.features.feed.service.feed_warmer import FeedWarmer
+from src.features.feed.service.seen_set import SeenSetCache
+
+USER_ID = "5f0c2c1e-8d2a-4c43-9d4e-0d6c6f4d1a11"
+
+
+def make_settings(**overrides) -> SimpleNamespace:
+    values = {
+        "feed_warm_enabled": True,
+        "feed_warm_max_concurrency": 1,
+        "feed_warm_max_entries": 2,
+        "feed_warm_ttl_seconds": 600,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def make_snapshot(user_id: str, *product_ids: str) -> FeedBatchSnapshot:
+    return FeedBatchSnapshot(
+        user_id=user_id,
+        category=None,
+        feed_mode=FeedMode.PERSONALIZED,
+        candidates=[SimpleNamespace(product_id=pid) for pid in product_ids],
+    )
+
+
+def make_warmer(versions: dict[str, int], **overrides) -> FeedWarmer:
+    warmer = FeedWarmer(make_settings(**overrides))
+
+    async def fake_generate(user_id: str):
+        return versions[user_id], make_snapshot(user_id, "p1", "p2", "p3")
+
+    warmer._generate = fake_generate
+    return warmer
+
+
+@pytest.fixture
+def profile_versions(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    versions: dict[str, int] = {}
+
+    async def fake_load_profile_version(session, user_id: str) -> int | None:
+        return versions.get(user_id)
+
+    monkeypatch.setattr(
+        warmer_module, "_load_profile_version", fake_load_profile_version
+    )
+    return versions
+
+
+@pytest.mark.asyncio
+async def test_warmed_batch_is_served_once_for_matching_version(
+    profile_versions: dict[str, int],
+) -> None:
+    profile_versions[USER_ID] = 3
+    warmer = make_warmer(profile_versions)
+
+    assert await warmer.warm(USER_ID)
+    assert await warmer.take(USER_ID, "tops", session=None, page_size=2) is None
+
+    snapshot = await warmer.take(USER_ID, None, session=None, page_size=2)
+    assert [c.product_id for c in snapshot.candidates] == ["p1", "p2", "p3"]
+    assert await warmer.take(USER_ID, None, session=None, page_size=2) is None
+
+
+@pytest.mark.asyncio
+async def test_warmed_batch_is_dropped_after_profile_changes(
+    profile_versions: dict[str, int],
+) -> None:
+    profile_versions[USER_ID] = 3
+    warmer = make_warmer(profile_versions)
+    await warmer.warm(USER_ID)
+
+    profile_versions[USER_ID] = 4
+
+    assert await warmer.take(USER_ID, None, session=None, page_size=2) is None
+    assert len(warmer) == 0
+
+
+@pytest.mark.asyncio
+async def test_warmed_batch_drops_items_seen_since_warming(
+    profile_versions: dict[str, int], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    profile_versions[USER_ID] = 1
+    seen_sets = SeenSetCache()
+    monkeypatch.setattr(warmer_module, "get_seen_set_cache", lambda: seen_sets)
+    warmer = make_warmer(profile_versions)
+    await warmer.warm(USER_ID)
+
+    async def loader() -> list[str]:
+        return ["p2"]
+
+    await seen_sets.get_or_load(USER_ID, loader)
+
+    snapshot = await warmer.take(USER_ID, None, session=None, page_size=2)
+    assert [c.product_id for c in snapshot.candidates] == ["p1", "p3"]
+
+
+@pytest.mark.asyncio
+async def test_warmed_batch_too_short_for_a_page_is_stale(
+    profile_versions: dict[str, int], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    profile_versions[USER_ID] = 1
+    seen_sets = SeenSetCache()
+    monkeypatch.setattr(warmer_module, "get_seen_set_cache", lambda: seen_sets)
+    warmer = make_warmer(profile_versions)
+    await warmer.warm(USER_ID)
+
+    async def loader() -> list[str]:
+        return ["p1", "p2"]
+
+    await seen_sets.get_or_load(USER_ID, loader)
+
+    assert await warmer.take(USER_ID, None, session=None, page_size=2) is None
+    assert len(warmer) == 0
+
+
+@pytest.mark.asyncio
+async def test_warming_skips_when_busy_and_caps_entries(
+    profile_versions: dict[str, int],
+) -> None:
+    users = [f"user-{index}" for index in range(3)]
+    profile_versions.update({user: 1 for user in users})
+    warmer = make_warmer(profile_versions)
+    release = asyncio.Event()
+
+    async def slow_generate(user_id: str):
+        await release.wait()
+        return 1, make_snapshot(user_id, "p1")
+
+    warmer._generate = slow_generate
+    first = asyncio.create_task(warmer.warm(users[0]))
+    await asyncio.sleep(0)
+
+    # The single slot is taken: further warms are skipped, not queued.
+    assert not await warmer.warm(users[1])
+    release.set()
+    assert await first
+
+    for user in users:
+        await warmer.warm(user)
+    assert len(warmer) == 2
+
+
+@pytest.mark.asyncio
+async def test_warming_disabled_by_default_setting(
+    profile_versions: dict[str, int],
+) -> None:
+    profile_versions[USER_ID] = 1
+    warmer = make_warmer(profile_versions, feed_warm_enabled=False)
+
+    assert not await warmer.warm(USER_ID)
+    assert len(warmer) == 0
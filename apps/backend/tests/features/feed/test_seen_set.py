@@ -0,0 +1,173 @@
+import pytest
+
+from src.features.feed.service.seen_set import ProductOrdinals, SeenSet, SeenSetCache
+
+
+class FakeRedis:
+    """Generation counters shared by several caches, like separate workers."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, int] = {}
+
+    async def get(self, key: str):
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    def pipeline(self, transaction: bool):
+        redis = self
+
+        class Pipeline:
+            def __init__(self) -> None:
+                self.results: list = []
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc) -> None:
+                return None
+
+            def incr(self, key: str) -> None:
+                redis.data[key] = redis.data.get(key, 0) + 1
+                self.results.append(redis.data[key])
+
+            def expire(self, key: str, seconds: int) -> None:
+                self.results.append(True)
+
+            async def execute(self) -> list:
+                return self.results
+
+        return Pipeline()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_ordinals(count: int) -> ProductOrdinals:
+    ordinals = ProductOrdinals()
+    for index in range(count):
+        ordinals.ordinal(f"p{index}")
+    return ordinals
+
+
+def test_sparse_set_uses_sorted_array() -> None:
+    seen = SeenSet(make_ordinals(10_000), ["p5", "p9000", "p5"])
+
+    assert not seen.is_bitmap
+    assert len(seen) == 2
+    assert seen.contains_many(["p5", "p6", "p9000", "unknown"]).tolist() == [
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+def test_dense_set_switches_to_bitmap_and_keeps_members() -> None:
+    ordinals = make_ordinals(1000)
+    members = [f"p{index}" for index in range(0, 1000, 3)]
+    seen = SeenSet(ordinals, members)
+
+    assert seen.is_bitmap
+    assert len(seen) == len(members)
+    assert seen.nbytes <= 125
+    assert sorted(seen.product_ids()) == sorted(members)
+
+    seen.add_many(["p1", "p3", "p2000"])
+    assert len(seen) == len(members) + 2
+    assert "p1" in seen and "p2000" in seen
+    assert "p2" not in seen
+
+
+def test_union_returns_copy() -> None:
+    seen = SeenSet(make_ordinals(10), ["p1"])
+
+    merged = seen.union(["p2"])
+
+    assert "p2" in merged
+    assert "p2" not in seen
+
+
+@pytest.mark.asyncio
+async def test_cache_loads_once_and_records_new_items() -> None:
+    cache = SeenSetCache()
+    loads = 0
+
+    async def loader() -> set[str]:
+        nonlocal loads
+        loads += 1
+        return {"p1"}
+
+    seen = await cache.get_or_load("user-1", loader)
+    await cache.record("user-1", ["p2"])
+    await cache.record("user-2", ["p3"])
+
+    assert await cache.get_or_load("user-1", loader) is seen
+    assert loads == 1
+    assert "p2" in seen
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_expires_and_evicts_least_recently_used() -> None:
+    clock = FakeClock()
+    cache = SeenSetCache(max_users=2, ttl_seconds=60, clock=clock)
+
+    async def loader() -> list[str]:
+        return []
+
+    first = await cache.get_or_load("user-1", loader)
+    await cache.get_or_load("user-2", loader)
+    await cache.get_or_load("user-1", loader)
+    await cache.get_or_load("user-3", loader)
+
+    assert len(cache) == 2
+    assert await cache.get_or_load("user-1", loader) is first
+
+    clock.now += 61
+    assert await cache.get_or_load("user-1", loader) is not first
+
+
+@pytest.mark.asyncio
+async def test_records_on_another_worker_invalidate_through_redis() -> None:
+    redis = FakeRedis()
+    worker_a = SeenSetCache(redis_client=redis)
+    worker_b = SeenSetCache(redis_client=redis)
+    history = {"p1"}
+
+    async def loader() -> set[str]:
+        return set(history)
+
+    seen_a = await worker_a.get_or_load("user-1", loader)
+    seen_b = await worker_b.get_or_load("user-1", loader)
+
+    # Worker B records a swipe: its own copy stays current, A's is stale
+    history.add("p2")
+    await worker_b.record("user-1", ["p2"])
+
+    assert await worker_b.get_or_load("user-1", loader) is seen_b
+    assert await worker_a.get_current("user-1") is None
+    reloaded = await worker_a.get_or_load("user-1", loader)
+    assert reloaded is not seen_a
+    assert "p2" in reloaded
+
+
+@pytest.mark.asyncio
+async def test_ordinal_registry_resets_past_max_products() -> None:
+    cache = SeenSetCache(max_products=3)
+
+    async def loader() -> list[str]:
+        return ["p1", "p2", "p3", "p4"]
+
+    first = await cache.get_or_load("user-1", loader)
+    assert "p4" in first
+
+    # The registry now holds 4 ids; the next load starts a fresh one
+    second = await cache.get_or_load("user-2", loader)
+    assert len(cache) == 1
+    assert await cache.get_current("user-1") is None
+    assert "p1" in second and "p1" in first
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.features.feed.service import trending_cache as trending_module
+from src.features.feed.service.feed_service import FeedService
+from src.features.feed.service.seen_set import SeenSetCache
+from src.features.feed.service.trending_cache import TrendingCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_products(*product_ids: str) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(product_id=product_id, popularity=10.0 - index)
+        for index, product_id in enumerate(product_ids)
+    ]
+
+
+@pytest.fixture
+def loads(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    calls: list[dict] = []
+
+    async def fake_load(session, **kwargs) -> list[SimpleNamespace]:
+        calls.append(kwargs)
+        if kwargs.get("exclude_ids"):
+            return make_products("t9", "t10")
+        return make_products(*(f"t{index}" for index in range(kwargs["limit"])))
+
+    monkeypatch.setattr(trending_module, "load_trending_products", fake_load)
+    monkeypatch.setattr(
+        "src.features.feed.service.feed_service.load_trending_products", fake_load
+    )
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_trending_cache_serves_per_category_lists_until_ttl(
+    loads: list[dict],
+) -> None:
+    clock = FakeClock()
+    cache = TrendingCache(size=3, ttl_seconds=60, clock=clock)
+
+    first = await cache.top(object(), None)
+    assert await cache.top(object(), None) is first
+    await cache.top(object(), "tops")
+    assert [call["category"] for call in loads] == [None, "tops"]
+
+    clock.now += 61
+    await cache.top(object(), None)
+    assert len(loads) == 3
+
+
+def make_service(cache: TrendingCache) -> tuple[FeedService, SeenSetCache]:
+    seen_sets = SeenSetCache()
+    service = FeedService(
+        qdrant_client=None,
+        settings=SimpleNamespace(),
+        seen_set_cache=seen_sets,
+        trending_cache=cache,
+    )
+    return service, seen_sets
+
+
+@pytest.mark.asyncio
+async def test_trending_filters_seen_items_locally(loads: list[dict]) -> None:
+    service, seen_sets = make_service(TrendingCache(size=5))
+    seen = seen_sets.empty().union(["t0", "t2"])
+
+    candidates = await service._retrieve_trending_with_shortfall_handling(
+        session=object(), seen=seen, category=None, page_size=3
+    )
+
+    assert [c.product_id for c in candidates] == ["t1", "t3", "t4"]
+    assert len(loads) == 1
+
+
+@pytest.mark.asyncio
+async def test_trending_falls_back_to_sql_exclusion_then_revisits(
+    loads: list[dict],
+) -> None:
+    service, seen_sets = make_service(TrendingCache(size=3))
+    seen = seen_sets.empty().union(["t0", "t1", "t2"])
+
+    candidates = await service._retrieve_trending_with_shortfall_handling(
+        session=object(), seen=seen, category=None, page_size=2
+    )
+    assert [c.product_id for c in candidates] == ["t9", "t10"]
+    assert sorted(loads[-1]["exclude_ids"]) == ["t0", "t1", "t2"]
+
+    revisits = await service._retrieve_trending_with_shortfall_handling(
+        session=object(), seen=seen, category=None, page_size=5
+    )
+    assert [c.product_id for c in revisits] == ["t0", "t1", "t2"]
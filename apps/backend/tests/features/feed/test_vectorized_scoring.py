@@ -0,0 +1,269 @@
+"""Parity tests between the vectorized ranking path and the scalar scoring functions."""
+
+import random
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.features.feed.service.ranking_service import (
+    W_CLUSTER_PRIOR,
+    W_COSINE,
+    W_FRESHNESS,
+    W_PRICE,
+    rank_candidate_groups,
+    rank_candidates,
+)
+from src.features.feed.utils.scoring import (
+    compute_freshness_score,
+    compute_price_affinity,
+    normalize_scores,
+)
+from src.features.feed.utils.vectorized_scoring import (
+    freshness_scores,
+    mmr_order,
+    normalize_array,
+    normalize_segments,
+    price_affinities,
+    price_affinities_per_row,
+    to_epoch_seconds,
+)
+
+
+def _random_candidates(count: int, seed: int = 7) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    now = datetime.now(UTC)
+    candidates = []
+    for index in range(count):
+        created_at = now - timedelta(days=rng.uniform(-3, 120))
+        if index % 3 == 0:
+            created_at = created_at.replace(tzinfo=None)
+        candidates.append(
+            SimpleNamespace(
+                score=rng.uniform(0.2, 0.99),
+                payload={
+                    "product_id": f"p{index}",
+                    "price": rng.choice([0.0, rng.uniform(5, 400)]),
+                    "created_at": created_at.isoformat(),
+                    "cluster_id": rng.randrange(6),
+                },
+            )
+        )
+    return candidates
+
+
+def _scalar_rank(
+    candidates: list[SimpleNamespace],
+    user_price_profile: dict,
+    cluster_priors: dict,
+) -> dict[str, float]:
+    freshness = []
+    for candidate in candidates:
+        created_at = datetime.fromisoformat(candidate.payload["created_at"])
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=UTC)
+        freshness.append(compute_freshness_score(created_at))
+
+    cosine = normalize_scores([candidate.score for candidate in candidates])
+    cluster = normalize_scores(
+        [cluster_priors.get(c.payload["cluster_id"], 0.0) for c in candidates]
+    )
+    price = normalize_scores(
+        [
+            compute_price_affinity(
+                c.payload["price"],
+                user_price_profile["median"],
+                user_price_profile["std"],
+            )
+            for c in candidates
+        ]
+    )
+    fresh = normalize_scores(freshness)
+    return {
+        c.payload["product_id"]: W_COSINE * cosine[i]
+        + W_CLUSTER_PRIOR * cluster[i]
+        + W_PRICE * price[i]
+        + W_FRESHNESS * fresh[i]
+        for i, c in enumerate(candidates)
+    }
+
+
+def test_price_affinities_match_scalar_function() -> None:
+    prices = np.array([-5.0, 0.0, 1.0, 25.0, 50.0, 100.0, 1000.0])
+    for median, std in [(50.0, 15.0), (50.0, 0.01), (0.0, 10.0), (2.0, 0.5)]:
+        expected = [compute_price_affinity(p, median, std) for p in prices]
+        assert price_affinities(prices, median, std) == pytest.approx(expected)
+
+
+def test_freshness_scores_match_scalar_function() -> None:
+    now = datetime.now(UTC)
+    created = [now - timedelta(days=days) for days in (-7, 0, 1, 14, 28, 365)]
+    timestamps = np.array([value.timestamp() for value in created])
+
+    vectorized = freshness_scores(timestamps, now.timestamp())
+
+    expected = [compute_freshness_score(value) for value in created]
+    assert vectorized == pytest.approx(expected, abs=1e-6)
+
+
+def test_normalize_array_matches_scalar_function() -> None:
+    for values in ([0.2, 0.5, 0.8], [0.5, 0.5, 0.5], [0.7], [], [-1.0, 0.0, 1.0]):
+        result = normalize_array(np.array(values, dtype=np.float64))
+        assert result.tolist() == pytest.approx(normalize_scores(values))
+
+
+def test_to_epoch_seconds_accepts_iso_naive_datetime_and_numbers() -> None:
+    aware = datetime(2026, 1, 1, tzinfo=UTC)
+
+    assert to_epoch_seconds(aware.isoformat(), 0.0) == aware.timestamp()
+    assert to_epoch_seconds(aware.replace(tzinfo=None), 0.0) == aware.timestamp()
+    assert to_epoch_seconds(1234.5, 0.0) == 1234.5
+    assert to_epoch_seconds(None, 99.0) == 99.0
+
+
+@pytest.mark.parametrize("count", [1, 2, 25, 500])
+def test_rank_candidates_matches_scalar_reference(count: int) -> None:
+    candidates = _random_candidates(count)
+    user_price_profile = {"median": 60.0, "std": 20.0}
+    cluster_priors = {0: 0.4, 1: 0.1, 2: 0.25, 3: 0.05, 4: 0.2}
+
+    ranked = rank_candidates(candidates, user_price_profile, cluster_priors)
+    expected = _scalar_rank(candidates, user_price_profile, cluster_priors)
+
+    assert len(ranked) == count
+    assert [rc.score for rc in ranked] == sorted(
+        (rc.score for rc in ranked), reverse=True
+    )
+    for rc in ranked:
+        assert rc.score == pytest.approx(expected[rc.product_id], abs=1e-6)
+
+
+def test_rank_candidates_prefers_typed_created_at_ts() -> None:
+    legacy = _random_candidates(25)
+    typed = [
+        SimpleNamespace(
+            score=candidate.score,
+            payload={
+                **candidate.payload,
+                "created_at": "not-parsed",
+                "created_at_ts": to_epoch_seconds(candidate.payload["created_at"], 0.0),
+            },
+        )
+        for candidate in legacy
+    ]
+    user_price_profile = {"median": 60.0, "std": 20.0}
+    cluster_priors = {0: 0.4, 1: 0.1, 2: 0.25}
+
+    from_legacy = rank_candidates(legacy, user_price_profile, cluster_priors)
+    from_typed = rank_candidates(typed, user_price_profile, cluster_priors)
+
+    assert [rc.product_id for rc in from_typed] == [rc.product_id for rc in from_legacy]
+    for typed_rc, legacy_rc in zip(from_typed, from_legacy):
+        assert typed_rc.score == pytest.approx(legacy_rc.score, abs=1e-9)
+
+
+def test_rank_candidates_carries_display_fields_from_payload() -> None:
+    display = {
+        "title": "Shirt",
+        "price": 30.0,
+        "currency": "EUR",
+        "image_url": "https://img",
+        "product_url": "https://shop",
+        "category": "tops",
+    }
+    candidates = _random_candidates(2)
+    candidates[0].payload.update(display)
+
+    ranked = {
+        rc.product_id: rc
+        for rc in rank_candidates(candidates, {"median": 0.0, "std": 0.0}, {})
+    }
+
+    assert ranked["p0"].display == {**display, "price": candidates[0].payload["price"]}
+    assert ranked["p1"].display is None
+
+
+def test_price_affinities_per_row_matches_scalar_profiles() -> None:
+    prices = np.array([-5.0, 0.0, 1.0, 25.0, 50.0, 100.0, 1000.0])
+    profiles = [(50.0, 15.0), (50.0, 0.01), (0.0, 10.0), (2.0, 0.5), (-1.0, 3.0)]
+    rows = np.tile(prices, len(profiles))
+    medians = np.repeat([median for median, _ in profiles], len(prices))
+    stds = np.repeat([std for _, std in profiles], len(prices))
+
+    per_row = price_affinities_per_row(rows, medians, stds)
+
+    expected = np.concatenate(
+        [price_affinities(prices, median, std) for median, std in profiles]
+    )
+    assert per_row == pytest.approx(expected.tolist())
+
+
+def test_normalize_segments_matches_per_segment_normalization() -> None:
+    segments = [[0.2, 0.5, 0.8], [0.5, 0.5, 0.5], [0.7], [-1.0, 0.0, 1.0]]
+    scores = np.array([value for segment in segments for value in segment])
+    starts = np.cumsum([0] + [len(segment) for segment in segments[:-1]])
+
+    result = normalize_segments(scores, starts)
+
+    expected = [
+        value
+        for segment in segments
+        for value in normalize_array(np.array(segment)).tolist()
+    ]
+    assert result.tolist() == pytest.approx(expected)
+    assert normalize_segments(np.empty(0), np.empty(0, dtype=np.int64)).size == 0
+
+
+def test_rank_candidate_groups_matches_rank_candidates_per_group() -> None:
+    groups = [
+        _random_candidates(25, seed=1),
+        [],
+        _random_candidates(1, seed=2),
+        _random_candidates(60, seed=3),
+        [],
+    ]
+    profiles = [
+        {"median": 60.0, "std": 20.0},
+        {"median": 10.0, "std": 1.0},
+        {"median": 0.0, "std": 0.0},
+        {"median": 120.0, "std": 5.0},
+        {},
+    ]
+    cluster_priors = {0: 0.4, 1: 0.1, 2: 0.25, 3: 0.05, 4: 0.2}
+
+    grouped = rank_candidate_groups(groups, profiles, cluster_priors)
+
+    assert len(grouped) == len(groups)
+    for ranked, group, profile in zip(grouped, groups, profiles):
+        expected = rank_candidates(group, profile, cluster_priors)
+        assert [rc.product_id for rc in ranked] == [rc.product_id for rc in expected]
+        for rc, expected_rc in zip(ranked, expected):
+            assert rc.score == pytest.approx(expected_rc.score, abs=1e-9)
+            assert rc.price_score == pytest.approx(expected_rc.price_score, abs=1e-9)
+
+
+def test_rank_candidate_groups_handles_only_empty_groups() -> None:
+    assert rank_candidate_groups([[], []], [{}, {}], {}) == [[], []]
+    assert rank_candidate_groups([], [], {}) == []
+
+
+def test_mmr_order_with_lambda_one_keeps_relevance_order() -> None:
+    rng = np.random.default_rng(0)
+    relevance = np.sort(rng.uniform(size=30))[::-1]
+    vectors = rng.normal(size=(30, 8))
+
+    assert mmr_order(relevance, vectors, 10, 1.0).tolist() == list(range(10))
+
+
+def test_mmr_order_demotes_near_duplicates() -> None:
+    relevance = np.array([1.0, 0.98, 0.9, 0.2])
+    vectors = np.array(
+        [[1.0, 0.0, 0.0], [0.99, 0.01, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+    )
+
+    order = mmr_order(relevance, vectors, 3, 0.5)
+
+    assert order.tolist() == [0, 2, 3]
+    assert mmr_order(relevance, vectors, 10, 0.5).tolist() == [0, 2, 3, 1]
+    assert mmr_order(relevance[:0], vectors[:0], 5, 0.5).size == 0
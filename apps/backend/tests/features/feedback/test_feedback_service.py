@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert, Update
+
+from src.features.feedback.service.service import FeedbackService
+
+
+class FakeResult:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeBatchSession:
+    """Answers the batch path's statements and records their SQL."""
+
+    def __init__(self, known_products) -> None:
+        self.known_products = known_products
+        self.statements: list[str] = []
+        self.commits = 0
+
+    async def execute(self, statement) -> FakeResult:
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.statements.append(str(compiled))
+        if isinstance(statement, Update):
+            return FakeResult([12])
+        if (
+            isinstance(statement, Insert)
+            and statement.table.name == "user_interactions"
+        ):
+            created = datetime(2026, 4, 26, tzinfo=UTC)
+            params = compiled.params
+            rows = [
+                SimpleNamespace(
+                    id=params[f"id_m{position}"],
+                    product_id=params[f"product_id_m{position}"],
+                    action=params[f"action_m{position}"],
+                    created_at=created + timedelta(microseconds=position),
+                )
+                for position in range(sum(name.startswith("id_m") for name in params))
+            ]
+            return FakeResult(list(reversed(rows)))
+        if isinstance(statement, Insert):
+            return FakeResult([])
+        return FakeResult(list(self.known_products))
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+class RecordingQueue:
+    def __init__(self) -> None:
+        self.enqueued = []
+
+    async def enqueue(self, session, user_id) -> None:
+        self.enqueued.append(user_id)
+
+
+@pytest.mark.asyncio
+async def test_record_feedback_batch_uses_fixed_statements_and_one_update() -> None:
+    first, second, unknown = uuid4(), uuid4(), uuid4()
+    user_id = uuid4()
+    session = FakeBatchSession({first, second})
+    queue = RecordingQueue()
+
+    result = await FeedbackService().record_feedback_batch(
+        user_id=user_id,
+        interactions=[
+            (str(second), "like"),
+            ("not-a-uuid", "like"),
+            (str(first), "dislike"),
+            (str(unknown), "save"),
+            (str(second), "save"),
+        ],
+        session=session,
+        profile_update_queue=queue,
+    )
+
+    select_sql, insert_sql, popularity_sql, update_sql = session.statements
+    assert "products.id IN" in select_sql
+    assert insert_sql.startswith("INSERT INTO user_interactions")
+    assert "RETURNING" in insert_sql
+    assert "ON CONFLICT (product_id) DO UPDATE" in popularity_sql
+    assert "interaction_count=(users.interaction_count +" in update_sql
+    assert "RETURNING users.interaction_count" in update_sql
+    assert session.commits == 1
+    assert queue.enqueued == [user_id]
+    # Rows come back in submission order; unknown ids are reported
+    assert [(row.product_id, row.action) for row in result.interactions] == [
+        (second, "like"),
+        (first, "dislike"),
+        (second, "save"),
+    ]
+    assert result.skipped_product_ids == ["not-a-uuid", str(unknown)]
+
+
+@pytest.mark.asyncio
+async def test_record_feedback_batch_without_known_products_writes_nothing() -> None:
+    session = FakeBatchSession(set())
+    queue = RecordingQueue()
+
+    result = await FeedbackService().record_feedback_batch(
+        user_id=uuid4(),
+        interactions=[("not-a-uuid", "like"), (str(uuid4()), "save")],
+        session=session,
+        profile_update_queue=queue,
+    )
+
+    assert len(session.statements) == 1
+    assert session.commits == 0
+    assert queue.enqueued == []
+    assert result.interactions == []
+    assert len(result.skipped_product_ids) == 2
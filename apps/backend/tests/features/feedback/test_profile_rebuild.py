@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from src.features.feedback.service import profile_rebuild as profile_rebuild_module
+from src.features.feedback.service.profile_rebuild import (
+    DecayedInteractionSums,
+    ProfileRebuildService,
+    RebuildCheckpoint,
+)
+
+NOW = datetime(2026, 5, 1, tzinfo=UTC)
+SIGNALS = {"like": 1.0, "save": 1.5, "dislike": -1.0}
+
+
+def make_service() -> ProfileRebuildService:
+    return ProfileRebuildService(
+        settings=SimpleNamespace(
+            qdrant_collection="products",
+            retrieval_backend="qdrant",
+            qdrant_query_api="never",
+            user_profiles_collection="user_profiles",
+            profile_update_lock_backend="local",
+            profile_rebuild_half_life_days=30.0,
+            profile_rebuild_dislike_weight=0.25,
+            profile_rebuild_min_interactions=1,
+            profile_rebuild_user_chunk_size=2,
+            profile_rebuild_interaction_page_size=3,
+        )
+    )
+
+
+def expected_vector(interactions, product_vectors) -> np.ndarray:
+    """Straightforward per-user reference of the rebuilt vector."""
+    sums = {"positive": 0.0, "negative": 0.0}
+    weights = {"positive": 0.0, "negative": 0.0}
+    for interaction in interactions:
+        vector = np.array(product_vectors[interaction.product_id])
+        age_days = (NOW - interaction.created_at).total_seconds() / 86400
+        weight = SIGNALS[interaction.action] * 0.5 ** (age_days / 30.0)
+        side = "positive" if weight > 0 else "negative"
+        sums[side] = sums[side] + abs(weight) * vector / np.linalg.norm(vector)
+        weights[side] += abs(weight)
+    vector = sums["positive"] / weights["positive"]
+    if weights["negative"]:
+        vector = vector - 0.25 * sums["negative"] / weights["negative"]
+    return vector / np.linalg.norm(vector)
+
+
+def test_decayed_sums_match_across_page_boundaries() -> None:
+    rng = np.random.default_rng(0)
+    rows = np.array([0, 0, 0, 1, 1, 3, 3, 3])
+    vectors = rng.normal(size=(8, 4))
+    weights = np.array([1.0, -0.5, 1.5, -1.0, -0.2, 0.7, 0.1, -0.3])
+
+    whole = DecayedInteractionSums(4)
+    whole.add(rows, vectors, weights)
+    paged = DecayedInteractionSums(4)
+    for page in (slice(0, 2), slice(2, 5), slice(5, 8)):
+        paged.add(rows[page], vectors[page], weights[page])
+
+    whole_vectors, whole_valid = whole.vectors(0.25)
+    paged_vectors, paged_valid = paged.vectors(0.25)
+    # User 1 only disliked and user 2 has no interactions
+    assert whole_valid.tolist() == [True, False, False, True]
+    assert paged_valid.tolist() == whole_valid.tolist()
+    np.testing.assert_allclose(paged_vectors, whole_vectors, rtol=0, atol=1e-12)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    positive = (1.0 * unit[0] + 1.5 * unit[2]) / 2.5
+    expected = positive - 0.25 * unit[1]
+    np.testing.assert_allclose(
+        whole_vectors[0], expected / np.linalg.norm(expected), atol=1e-12
+    )
+
+
+def test_checkpoint_round_trips_through_json() -> None:
+    checkpoint = RebuildCheckpoint(
+        started_at=NOW,
+        after_user_id=uuid4(),
+        users_rebuilt=3,
+        users_skipped=1,
+        completed_at=NOW + timedelta(minutes=5),
+    )
+
+    assert RebuildCheckpoint.from_json(checkpoint.to_json()) == checkpoint
+    assert RebuildCheckpoint.from_json(
+        RebuildCheckpoint.start(NOW).to_json()
+    ) == RebuildCheckpoint(started_at=NOW)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_profiles_streams_chunks_and_skips_stale_users(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    rng = np.random.default_rng(1)
+    product_vectors = {f"p{index}": rng.normal(size=4).tolist() for index in range(6)}
+    actions = ["like", "dislike", "save", "like", "dislike"]
+    user_ids = sorted(uuid4() for _ in range(5))
+    users = [
+        SimpleNamespace(
+            id=user_id,
+            profile_version=1,
+            profile_source="onboarding",
+            interaction_count=10,
+            last_profile_update_at=NOW - timedelta(days=1),
+        )
+        for user_id in user_ids
+    ]
+    interactions = sorted(
+        (
+            SimpleNamespace(
+                id=uuid4(),
+                user_id=user_id,
+                product_id=f"p{(index + step) % 6}",
+                action=actions[(index + step) % len(actions)],
+                created_at=NOW - timedelta(days=10 * step + index),
+            )
+            for index, user_id in enumerate(user_ids)
+            for step in range(index + 2)
+        ),
+        key=lambda row: (row.user_id, row.created_at, row.id),
+    )
+    # user 3 only disliked; user 2 has no profile point; user 1 went stale
+    interactions = [
+        row
+        for row in interactions
+        if row.user_id != user_ids[3] or row.action == "dislike"
+    ]
+    profile_points = {
+        user_id: ([0.0] * 4, {"photo_count": 2})
+        for user_id in user_ids
+        if user_id != user_ids[2]
+    }
+    stale = user_ids[1]
+    upserts: list = []
+    page_sizes: list[int] = []
+
+    class FakeSessionContext:
+        async def __aenter__(self):
+            return SimpleNamespace(commit=fake_commit)
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    async def fake_commit():
+        return None
+
+    class FakeQdrant:
+        async def upsert(self, **kwargs):
+            upserts.append(kwargs)
+
+    async def fake_qdrant():
+        return FakeQdrant()
+
+    async def fake_load_users(after_user_id):
+        remaining = [
+            user for user in users if after_user_id is None or user.id > after_user_id
+        ]
+        return remaining[:2]
+
+    async def fake_page(chunk_ids, cursor):
+        rows = [
+            row
+            for row in interactions
+            if row.user_id in chunk_ids
+            and (cursor is None or (row.user_id, row.created_at, row.id) > cursor)
+        ][:3]
+        page_sizes.append(len(rows))
+        return rows
+
+    async def fake_product_vectors(retrieval, product_ids):
+        assert len(product_ids) <= 3
+        return {product_id: product_vectors[product_id] for product_id in product_ids}
+
+    async def fake_profile_points(qdrant, ids):
+        return {
+            user_id: profile_points[user_id]
+            for user_id in ids
+            if user_id in profile_points
+        }
+
+    async def fake_update(session, candidates):
+        # The chunk write holds every candidate's in-process lock
+        assert len(profile_rebuild_module._USER_PROFILE_LOCKS) == len(candidates)
+        return {user.id for user in candidates} - {stale}
+
+    service = make_service()
+    service._retrieval = object()
+    monkeypatch.setattr(
+        profile_rebuild_module,
+        "_get_session_factory",
+        lambda: lambda: FakeSessionContext(),
+    )
+    monkeypatch.setattr(profile_rebuild_module, "_get_qdrant", fake_qdrant)
+    for name, fake in {
+        "_load_rebuild_users": fake_load_users,
+        "_load_interaction_page": fake_page,
+        "_load_product_vectors": fake_product_vectors,
+        "_load_user_profile_points": fake_profile_points,
+        "_update_rebuilt_users": fake_update,
+    }.items():
+        monkeypatch.setattr(service, name, fake)
+
+    saved: list[RebuildCheckpoint] = []
+    checkpoint = await service.rebuild_profiles(
+        RebuildCheckpoint.start(NOW),
+        on_checkpoint=lambda state: saved.append(RebuildCheckpoint(**vars(state))),
+    )
+
+    assert [state.after_user_id for state in saved] == [
+        user_ids[1],
+        user_ids[3],
+        user_ids[4],
+        user_ids[4],
+    ]
+    assert saved[-1].completed_at is not None
+    assert checkpoint.users_rebuilt == 2
+    assert checkpoint.users_skipped == 3
+    assert max(page_sizes) == 3
+    points = {point.id: point for call in upserts for point in call["points"]}
+    assert set(points) == {str(user_ids[0]), str(user_ids[4])}
+    for user_id in (user_ids[0], user_ids[4]):
+        point = points[str(user_id)]
+        np.testing.assert_allclose(
+            point.vector,
+            expected_vector(
+                [row for row in interactions if row.user_id == user_id],
+                product_vectors,
+            ),
+            atol=1e-12,
+        )
+        assert point.payload["photo_count"] == 2
+        assert point.payload["profile_version"] == 2
+        assert point.payload["profile_source"] == "learning"
+
+    # Resuming after the first chunk only visits the remaining users
+    upserts.clear()
+    resumed = await service.rebuild_profiles(
+        RebuildCheckpoint(started_at=NOW, after_user_id=user_ids[1])
+    )
+    assert resumed.users_rebuilt == 1
+    assert [point.id for call in upserts for point in call["points"]] == [
+        str(user_ids[4])
+    ]
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.features.feedback.service.profile_update_kernel import (
+    apply_interactions,
+    normalize_rows,
+)
+from src.features.feedback.service.profile_update_service import (
+    ProfileUpdateService,
+)
+
+SETTINGS = SimpleNamespace(
+    profile_update_lr_new=0.15,
+    profile_update_lr_mid=0.08,
+    profile_update_lr_mature=0.03,
+    profile_update_lr_mid_confidence=0.3,
+    profile_update_lr_mature_confidence=0.7,
+    profile_update_dislike_gamma=0.05,
+    profile_update_dislike_burst_gamma_scale=0.5,
+    profile_update_max_delta=0.15,
+)
+ACTIONS = ["like", "save", "dislike", "view"]
+
+
+# 0.01 makes the max-delta guardrail clip most updates
+@pytest.mark.parametrize("max_delta", [0.15, 0.01])
+def test_kernel_matches_the_per_user_update(max_delta: float) -> None:
+    rng = np.random.default_rng(7)
+    service = ProfileUpdateService(
+        settings=SimpleNamespace(
+            **{**vars(SETTINGS), "profile_update_max_delta": max_delta}
+        )
+    )
+    users, products, steps, dim = 200, 60, 12, 16
+    user_vectors = normalize_rows(rng.normal(size=(users, dim)))
+    product_vectors = rng.normal(size=(products, dim)) * rng.uniform(
+        0.5, 2.0, (products, 1)
+    )
+    lengths = rng.integers(0, steps + 1, size=users)
+    product_index = np.full((users, steps), -1, dtype=np.intp)
+    actions = np.full((users, steps), "", dtype=object)
+    for row, length in enumerate(lengths):
+        # -1 marks interactions whose product has no vector
+        product_index[row, :length] = rng.integers(-1, products, size=length)
+        actions[row, :length] = rng.choice(ACTIONS, size=length)
+    signal_weights = np.vectorize(service._get_signal_weight, otypes=[float])(actions)
+    confidences = rng.uniform(0.0, 1.0, size=users)
+    bursts = rng.random(users) < 0.2
+
+    result = apply_interactions(
+        user_vectors,
+        product_vectors,
+        product_index,
+        signal_weights,
+        np.array([service._get_learning_rate(c) for c in confidences]),
+        np.where(bursts, 0.05 * 0.5, 0.05),
+        max_delta,
+    )
+
+    for row in range(users):
+        expected = user_vectors[row]
+        for step in range(lengths[row]):
+            if product_index[row, step] < 0:
+                continue
+            expected = service._apply_interaction_update(
+                user_vector=expected,
+                product_vector=product_vectors[product_index[row, step]],
+                action=actions[row, step],
+                profile_confidence=confidences[row],
+                burst_active=bool(bursts[row]),
+            )
+        np.testing.assert_allclose(result[row], expected, rtol=0, atol=1e-12)
+
+
+def test_kernel_leaves_inputs_and_idle_users_untouched() -> None:
+    user_vectors = np.array([[1.0, 0.0], [0.0, 1.0]])
+    original = user_vectors.copy()
+
+    result = apply_interactions(
+        user_vectors,
+        np.array([[0.0, 1.0]]),
+        np.array([[0], [-1]]),
+        np.array([[1.0], [0.0]]),
+        np.array([0.15, 0.15]),
+        np.array([0.05, 0.05]),
+        0.15,
+    )
+
+    np.testing.assert_array_equal(user_vectors, original)
+    np.testing.assert_array_equal(result[1], original[1])
+    assert result[0][1] > 0
+    assert np.linalg.norm(result[0]) == pytest.approx(1.0)
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.features.feedback.service.profile_update_queue import (
+    PROFILE_UPDATE_QUEUE_DEPTH,
+    PROFILE_UPDATE_QUEUE_LAG,
+    InMemoryProfileUpdateQueue,
+    PostgresProfileUpdateQueue,
+)
+from src.features.feedback.service.profile_update_worker import (
+    PROFILE_UPDATE_JOBS,
+    ProfileUpdateWorker,
+)
+
+START = datetime(2026, 4, 24, 12, 0, tzinfo=UTC)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = START
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+class FakeUpdateService:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls: list = []
+
+    async def process_pending_updates(self, user_id) -> int:
+        self.calls.append(user_id)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("qdrant unavailable")
+        return 1
+
+    async def process_pending_updates_batch(self, user_ids) -> dict:
+        self.calls.append(list(user_ids))
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("qdrant unavailable")
+        return dict.fromkeys(user_ids, 1)
+
+
+def make_queue(clock: FakeClock) -> InMemoryProfileUpdateQueue:
+    return InMemoryProfileUpdateQueue(
+        max_attempts=3, retry_base_seconds=5.0, lease_seconds=60.0, clock=clock
+    )
+
+
+def make_worker(queue, service, batch_size: int = 1) -> ProfileUpdateWorker:
+    return ProfileUpdateWorker(
+        queue,
+        service,
+        SimpleNamespace(
+            profile_update_worker_concurrency=4,
+            profile_update_worker_batch_size=batch_size,
+            profile_update_poll_seconds=0.01,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_enqueue_coalesces_swipes_into_one_job_per_user() -> None:
+    clock = FakeClock()
+    queue = make_queue(clock)
+    user_id, other_id = uuid4(), uuid4()
+
+    for _ in range(10):
+        await queue.enqueue(None, user_id)
+        clock.advance(1)
+    await queue.enqueue(None, other_id)
+
+    jobs = await queue.claim(10)
+
+    assert [job.user_id for job in jobs] == [user_id, other_id]
+    assert jobs[0].enqueued_at == START + timedelta(seconds=9)
+    assert await queue.claim(10) == []
+
+
+@pytest.mark.asyncio
+async def test_claimed_job_is_leased_until_it_expires() -> None:
+    clock = FakeClock()
+    queue = make_queue(clock)
+    user_id = uuid4()
+    await queue.enqueue(None, user_id)
+
+    (job,) = await queue.claim(1)
+    clock.advance(59)
+    assert await queue.claim(1) == []
+    clock.advance(1)
+    (reclaimed,) = await queue.claim(1)
+
+    assert reclaimed.user_id == job.user_id
+    assert reclaimed.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_complete_requeues_a_job_enqueued_while_running() -> None:
+    clock = FakeClock()
+    queue = make_queue(clock)
+    user_id = uuid4()
+    await queue.enqueue(None, user_id)
+    (job,) = await queue.claim(1)
+
+    clock.advance(2)
+    await queue.enqueue(None, user_id)
+    await queue.complete(job)
+    (again,) = await queue.claim(1)
+    await queue.complete(again)
+
+    assert again.attempts == 1
+    assert again.enqueued_at == START + timedelta(seconds=2)
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_back_off_then_mark_the_job_failed() -> None:
+    clock = FakeClock()
+    queue = make_queue(clock)
+    user_id = uuid4()
+    await queue.enqueue(None, user_id)
+
+    for delay in (5, 10):
+        (job,) = await queue.claim(1)
+        assert await queue.fail(job, "boom") is False
+        clock.advance(delay - 1)
+        assert await queue.claim(1) == []
+        clock.advance(1)
+    (job,) = await queue.claim(1)
+
+    assert job.attempts == 3
+    assert await queue.fail(job, "boom") is True
+    clock.advance(3600)
+    assert await queue.claim(1) == []
+    stats = await queue.stats()
+    assert (stats.pending, stats.failed) == (0, 1)
+
+    await queue.enqueue(None, user_id)
+    (revived,) = await queue.claim(1)
+    assert revived.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_metrics_reports_depth_and_lag() -> None:
+    queue = InMemoryProfileUpdateQueue(
+        clock=lambda: datetime.now(UTC) - timedelta(seconds=30)
+    )
+    await queue.enqueue(None, uuid4())
+    await queue.enqueue(None, uuid4())
+
+    await queue.refresh_metrics()
+
+    assert PROFILE_UPDATE_QUEUE_DEPTH.value(state="pending") == 2
+    assert PROFILE_UPDATE_QUEUE_DEPTH.value(state="failed") == 0
+    assert PROFILE_UPDATE_QUEUE_LAG.value() == pytest.approx(30, abs=5)
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_each_user_once_and_retries_failures() -> None:
+    PROFILE_UPDATE_JOBS.reset()
+    clock = FakeClock()
+    queue = make_queue(clock)
+    service = FakeUpdateService(failures=1)
+    user_id = uuid4()
+    for _ in range(5):
+        await queue.enqueue(None, user_id)
+
+    assert await make_worker(queue, service).run_once() == 1
+    clock.advance(5)
+    assert await make_worker(queue, service).run_once() == 1
+
+    assert service.calls == [user_id, user_id]
+    assert len(queue) == 0
+    assert PROFILE_UPDATE_JOBS.value(result="retried") == 1
+    assert PROFILE_UPDATE_JOBS.value(result="completed") == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_worker_falls_back_to_per_user_passes_on_failure() -> None:
+    PROFILE_UPDATE_JOBS.reset()
+    clock = FakeClock()
+    queue = make_queue(clock)
+    service = FakeUpdateService(failures=1)
+    users = [uuid4() for _ in range(3)]
+    for user_id in users:
+        await queue.enqueue(None, user_id)
+        clock.advance(1)
+    worker = make_worker(queue, service, batch_size=2)
+
+    assert await worker.run_once() == 2
+    assert await worker.run_once() == 1
+
+    assert service.calls == [users[:2], users[0], users[1], [users[2]]]
+    assert len(queue) == 0
+    assert PROFILE_UPDATE_JOBS.value(result="completed") == 3
+
+
+@pytest.mark.asyncio
+async def test_worker_run_drains_the_queue_until_stopped() -> None:
+    queue = InMemoryProfileUpdateQueue()
+    service = FakeUpdateService()
+    users = [uuid4() for _ in range(6)]
+    for user_id in users:
+        await queue.enqueue(None, user_id)
+    stop = asyncio.Event()
+
+    task = asyncio.create_task(make_worker(queue, service).run(stop))
+    while len(queue):
+        await asyncio.sleep(0.01)
+    stop.set()
+    await asyncio.wait_for(task, timeout=1)
+
+    assert sorted(map(str, service.calls)) == sorted(map(str, users))
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.statements = []
+
+    async def execute(self, statement) -> None:
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio
+async def test_postgres_enqueue_is_a_coalescing_upsert() -> None:
+    session = RecordingSession()
+
+    await PostgresProfileUpdateQueue().enqueue(session, uuid4())
+
+    (statement,) = session.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+    assert "enqueued_at = excluded.enqueued_at" in sql
+    assert "failed_at = " in sql
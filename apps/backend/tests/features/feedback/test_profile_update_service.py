@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from datetime import UTC, datetime, timedelta, timezone
 from types import SimpleNamespace
 from uuid import uuid4
 
 import numpy as np
 import pytest
 
+from src.core.user_interests import interest_point_ids
 from src.features.feedback.service import (
     profile_update_service as profile_update_module,
 )
@@ -16,10 +17,12 @@ from src.features.feedback.service.profile_update_service import (
 )
 
 
-def make_service() -> ProfileUpdateService:
+def make_service(interest_count: int = 1) -> ProfileUpdateService:
     return ProfileUpdateService(
         settings=SimpleNamespace(
             qdrant_collection="products",
+            retrieval_backend="qdrant",
+            qdrant_query_api="never",
             user_profiles_collection="user_profiles",
             profile_update_lr_new=0.15,
             profile_update_lr_mid=0.08,
@@ -32,6 +35,10 @@ def make_service() -> ProfileUpdateService:
             profile_update_save_price_alpha=0.15,
             profile_update_dislike_burst_count=10,
             profile_update_dislike_burst_gamma_scale=0.5,
+            profile_interest_count=interest_count,
+            profile_interest_spawn_similarity=0.5,
+            profile_update_lock_backend="local",
+            profile_update_batch_size=500,
         )
     )
 
@@ -105,6 +112,61 @@ def test_update_price_profile_uses_stronger_alpha_for_save() -> None:
     assert saved["price_median"] > liked["price_median"]
 
 
+def test_apply_interest_update_spawns_interest_for_unlike_positive_signal() -> None:
+    service = make_service(interest_count=3)
+    interests = [(np.array([1.0, 0.0, 0.0]), 2.0)]
+
+    service._apply_interest_update(
+        interests=interests,
+        product_vector=np.array([0.0, 2.0, 0.0]),
+        action="save",
+        profile_confidence=0.1,
+        burst_active=False,
+    )
+
+    assert len(interests) == 2
+    np.testing.assert_allclose(interests[1][0], [0.0, 1.0, 0.0])
+    assert interests[1][1] == pytest.approx(1.5)
+
+
+def test_apply_interest_update_moves_only_the_nearest_interest() -> None:
+    service = make_service(interest_count=2)
+    first = np.array([1.0, 0.0, 0.0])
+    second = np.array([0.0, 1.0, 0.0])
+    interests = [(first, 1.0), (second, 1.0)]
+
+    # Already at the interest limit, so even an unlike product moves the nearest
+    service._apply_interest_update(
+        interests=interests,
+        product_vector=np.array([0.2, 0.0, 1.0]),
+        action="like",
+        profile_confidence=0.1,
+        burst_active=False,
+    )
+
+    assert interests[0][0][2] > 0.0
+    assert interests[0][1] == pytest.approx(2.0)
+    np.testing.assert_allclose(interests[1][0], second)
+    assert interests[1][1] == pytest.approx(1.0)
+
+
+def test_apply_interest_update_never_spawns_on_dislike() -> None:
+    service = make_service(interest_count=3)
+    interests = [(np.array([1.0, 0.0]), 1.0)]
+
+    service._apply_interest_update(
+        interests=interests,
+        product_vector=np.array([0.0, 1.0]),
+        action="dislike",
+        profile_confidence=0.1,
+        burst_active=False,
+    )
+
+    assert len(interests) == 1
+    assert interests[0][0][1] < 0.0
+    assert interests[0][1] == pytest.approx(1.0)
+
+
 @pytest.mark.asyncio
 async def test_process_pending_updates_skips_when_user_vector_missing(
     monkeypatch: pytest.MonkeyPatch,
@@ -355,3 +417,266 @@ async def test_process_pending_updates_discards_stale_commit(
     processed = await service.process_pending_updates(user_id)
 
     assert processed == 0
+
+
+@pytest.mark.asyncio
+async def test_process_pending_updates_writes_interests_with_the_main_point(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = make_service(interest_count=3)
+    user_id = uuid4()
+    now = datetime.now(UTC)
+    user = SimpleNamespace(
+        id=user_id,
+        profile_version=1,
+        interaction_count=12,
+        profile_confidence=0.2,
+        profile_source="learning",
+        price_profile={},
+        last_profile_update_at=None,
+    )
+    upserts: list[dict] = []
+
+    class FakeSessionContext:
+        async def __aenter__(self):
+            return object()
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    class FakeQdrant:
+        async def retrieve(self, **kwargs):
+            # No interests stored yet: the first one is seeded from the main vector
+            assert kwargs["ids"] == interest_point_ids(user_id, 3)
+            return []
+
+        async def upsert(self, **kwargs):
+            upserts.append(kwargs)
+
+    async def fake_qdrant():
+        return FakeQdrant()
+
+    async def fake_load_user(session, requested_user_id):
+        return user
+
+    async def fake_pending(session, loaded_user):
+        return [
+            PendingInteraction(
+                product_id="product-1",
+                action="like",
+                price=40.0,
+                created_at=now - timedelta(minutes=1),
+            ),
+            PendingInteraction(
+                product_id="product-2",
+                action="like",
+                price=60.0,
+                created_at=now,
+            ),
+        ]
+
+    async def fake_profile_point(qdrant, requested_user_id):
+        return [1.0, 0.0], {}
+
+    async def fake_recent_dislike_burst(session, requested_user_id):
+        return False
+
+    async def fake_product_vectors(qdrant, product_ids):
+        return {"product-1": [0.9, 0.1], "product-2": [0.0, 1.0]}
+
+    async def fake_commit(**kwargs):
+        return True
+
+    monkeypatch.setattr(
+        profile_update_module,
+        "_get_session_factory",
+        lambda: lambda: FakeSessionContext(),
+    )
+    monkeypatch.setattr(profile_update_module, "_get_qdrant", fake_qdrant)
+    monkeypatch.setattr(service, "_load_user", fake_load_user)
+    monkeypatch.setattr(service, "_load_pending_interactions", fake_pending)
+    monkeypatch.setattr(service, "_load_user_profile_point", fake_profile_point)
+    monkeypatch.setattr(service, "_has_recent_dislike_burst", fake_recent_dislike_burst)
+    monkeypatch.setattr(service, "_load_product_vectors", fake_product_vectors)
+    monkeypatch.setattr(service, "_commit_user_profile_update", fake_commit)
+
+    processed = await service.process_pending_updates(user_id)
+
+    assert processed == 2
+    [upsert] = upserts
+    main, *interests = upsert["points"]
+    assert main.id == str(user_id)
+    assert [point.id for point in interests] == interest_point_ids(user_id, 2)
+    assert [point.payload["interest_index"] for point in interests] == [0, 1]
+    assert interests[0].payload["weight"] == pytest.approx(2.0)
+    assert interests[1].vector == pytest.approx([0.0, 1.0])
+
+
+@pytest.mark.asyncio
+async def test_process_pending_updates_batch_matches_per_user_passes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    rng = np.random.default_rng(3)
+    now = datetime.now(UTC)
+    product_vectors = {
+        f"product-{index}": rng.normal(size=4).tolist() for index in range(8)
+    }
+    # Interactions on product-missing have no vector and are skipped
+    actions = ["like", "save", "dislike", "dislike", "like"]
+    users = {}
+    pending = {}
+    for index in range(6):
+        user_id = uuid4()
+        users[user_id] = SimpleNamespace(
+            id=user_id,
+            profile_version=index,
+            interaction_count=10 + index,
+            profile_confidence=index / 6,
+            profile_source="onboarding",
+            price_profile={} if index % 2 else {"price_median": 40.0},
+            last_profile_update_at=None,
+        )
+        pending[user_id] = [
+            PendingInteraction(
+                product_id=(
+                    "product-missing" if step == 1 else f"product-{(index + step) % 8}"
+                ),
+                action=actions[(index + step) % len(actions)],
+                price=20.0 + 10 * step,
+                created_at=now + timedelta(seconds=step),
+            )
+            for step in range(index)
+        ]
+    ids = list(users)
+    profile_points = {
+        user_id: (rng.normal(size=4).tolist(), {"photo_count": 1})
+        for user_id in ids[:-1]
+    }
+    bursts = {ids[2]}
+    stale = ids[4]
+
+    class FakeSessionContext:
+        async def __aenter__(self):
+            return object()
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    def fake_stack(service: ProfileUpdateService) -> tuple[list, dict]:
+        upserts: list = []
+        persisted: dict = {}
+
+        class FakeQdrant:
+            async def upsert(self, **kwargs):
+                upserts.append(kwargs)
+
+        async def fake_qdrant():
+            return FakeQdrant()
+
+        async def fake_product_vectors(retrieval, product_ids):
+            return {
+                product_id: product_vectors[product_id]
+                for product_id in product_ids
+                if product_id in product_vectors
+            }
+
+        async def fake_commit(*, session, user, **kwargs):
+            if user.id == stale:
+                return False
+            persisted[user.id] = kwargs
+            return True
+
+        async def fake_commit_many(session, updates):
+            # The chunk holds the in-process lock of every user it writes
+            assert len(profile_update_module._USER_PROFILE_LOCKS) >= len(updates)
+            for state in updates:
+                if state.user_id != stale:
+                    persisted[state.user_id] = {
+                        "next_price_profile": state.price_profile,
+                        "next_profile_version": state.next_version,
+                        "next_profile_confidence": state.profile_confidence,
+                        "next_profile_source": state.profile_source,
+                        "last_processed_at": state.last_processed_at,
+                    }
+            return {state.user_id for state in updates} - {stale}
+
+        async def fake_load_user(session, user_id):
+            return users[user_id]
+
+        async def fake_load_users(session, user_ids):
+            return {user_id: users[user_id] for user_id in user_ids}
+
+        async def fake_pending(session, user):
+            return pending[user.id]
+
+        async def fake_pending_batch(session, loaded):
+            return {user_id: pending[user_id] for user_id in loaded if pending[user_id]}
+
+        async def fake_profile_point(qdrant, user_id):
+            return profile_points.get(user_id, (None, {}))
+
+        async def fake_profile_points(qdrant, user_ids):
+            return {
+                user_id: profile_points[user_id]
+                for user_id in user_ids
+                if user_id in profile_points
+            }
+
+        async def fake_burst(session, user_id):
+            return user_id in bursts
+
+        async def fake_bursts(session, user_ids):
+            return bursts & set(user_ids)
+
+        monkeypatch.setattr(
+            profile_update_module,
+            "_get_session_factory",
+            lambda: lambda: FakeSessionContext(),
+        )
+        monkeypatch.setattr(profile_update_module, "_get_qdrant", fake_qdrant)
+        for name, fake in {
+            "_load_user": fake_load_user,
+            "_load_users": fake_load_users,
+            "_load_pending_interactions": fake_pending,
+            "_load_pending_interactions_batch": fake_pending_batch,
+            "_load_user_profile_point": fake_profile_point,
+            "_load_user_profile_points": fake_profile_points,
+            "_has_recent_dislike_burst": fake_burst,
+            "_load_dislike_bursts": fake_bursts,
+            "_load_product_vectors": fake_product_vectors,
+            "_commit_user_profile_update": fake_commit,
+            "_commit_user_profile_updates": fake_commit_many,
+        }.items():
+            monkeypatch.setattr(service, name, fake)
+        return upserts, persisted
+
+    single = make_service()
+    single._retrieval = object()
+    single_upserts, single_persisted = fake_stack(single)
+    single_consumed = {
+        user_id: await single.process_pending_updates(user_id) for user_id in ids
+    }
+
+    batch = make_service()
+    batch._retrieval = object()
+    batch._settings.profile_update_batch_size = 4
+    batch_upserts, batch_persisted = fake_stack(batch)
+    batch_consumed = await batch.process_pending_updates_batch(ids)
+
+    assert batch_consumed == single_consumed
+    assert list(batch_consumed.values()) == [0, 1, 2, 3, 0, 0]
+    # Two chunks of at most four users: one upsert each
+    assert len(batch_upserts) == 2
+    single_points = {
+        point.id: point for call in single_upserts for point in call["points"]
+    }
+    batch_points = {
+        point.id: point for call in batch_upserts for point in call["points"]
+    }
+    assert batch_points.keys() == single_points.keys()
+    for point_id, point in batch_points.items():
+        np.testing.assert_allclose(
+            point.vector, single_points[point_id].vector, rtol=0, atol=1e-12
+        )
+        assert point.payload == single_points[point_id].payload
+    assert batch_persisted == single_persisted
@@ -0,0 +1,65 @@
+"""The local product index mirrors ingestion writes to Qdrant."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from src.core.local_index import LocalVectorIndex
+from src.features.products.service.ingestion_service import IngestionService
+
+
+class FakeQdrant:
+    def __init__(self) -> None:
+        self.set_payload_calls: list[dict] = []
+
+    async def set_payload(self, **kwargs) -> None:
+        self.set_payload_calls.append(kwargs)
+
+
+class FakeSession:
+    def __init__(self, products: list) -> None:
+        self.products = products
+
+    async def execute(self, stmt) -> SimpleNamespace:
+        return SimpleNamespace(
+            scalars=lambda: SimpleNamespace(all=lambda: self.products)
+        )
+
+
+@pytest.mark.asyncio
+async def test_archive_products_flags_points_in_local_index() -> None:
+    product = SimpleNamespace(id=uuid4(), external_id="ext-1", archived_at=None)
+    index = LocalVectorIndex(dim=2)
+    index.upsert(
+        [
+            SimpleNamespace(
+                id=str(product.id),
+                vector=[1.0, 0.0],
+                payload={"product_id": str(product.id), "price": 10.0},
+            )
+        ]
+    )
+    qdrant = FakeQdrant()
+    service = IngestionService(
+        repository=None,
+        embedding_service=None,
+        quality_gate=None,
+        qdrant_client=qdrant,
+        local_index=index,
+    )
+
+    archived = await service.archive_products(
+        ["ext-1"], "store", session=FakeSession([product])
+    )
+    hits = await index.search(
+        [1.0, 0.0],
+        query_filter=Filter(
+            must_not=[FieldCondition(key="archived", match=MatchValue(value=True))]
+        ),
+    )
+
+    assert archived == ["ext-1"]
+    assert qdrant.set_payload_calls[0]["payload"] == {"archived": True}
+    assert hits == []
@@ -0,0 +1,185 @@
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from src.features.products.service import product_card_cache
+from src.features.products.service.ingestion_service import IngestionService
+from src.features.products.service.product_card_cache import (
+    PRODUCT_CARD_LOOKUPS,
+    ProductCard,
+    ProductCardCache,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def mget(self, keys: list[str]) -> list:
+        return [self.data.get(key) for key in keys]
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction: bool):
+        redis = self
+
+        class Pipeline:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc) -> None:
+                return None
+
+            def set(self, key: str, value: str, ex: int) -> None:
+                redis.data[key] = value
+
+            async def execute(self) -> None:
+                return None
+
+        return Pipeline()
+
+
+def make_row(product_id: str, title: str = "Shirt") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=product_id,
+        title=title,
+        price=Decimal("19.90"),
+        currency="EUR",
+        image_url="https://img",
+        product_url="https://shop",
+        category="tops",
+    )
+
+
+@pytest.fixture
+def db(monkeypatch) -> dict:
+    """Product rows served by the patched PostgreSQL loader."""
+    rows: dict = {}
+    calls: list[list] = []
+
+    async def fake_load(session, product_ids):
+        product_ids = list(product_ids)
+        calls.append(product_ids)
+        return [
+            ProductCard.from_row(rows[str(pid)])
+            for pid in product_ids
+            if str(pid) in rows
+        ]
+
+    monkeypatch.setattr(product_card_cache, "load_product_cards", fake_load)
+    return {"rows": rows, "calls": calls}
+
+
+@pytest.mark.asyncio
+async def test_get_many_reads_through_and_serves_repeats_from_memory(db) -> None:
+    PRODUCT_CARD_LOOKUPS.reset()
+    known, unknown = str(uuid4()), str(uuid4())
+    db["rows"][known] = make_row(known)
+    cache = ProductCardCache(max_entries=10, ttl_seconds=60)
+
+    first = await cache.get_many(None, [known, unknown, "not-a-uuid"])
+    second = await cache.get_many(None, [known])
+
+    assert list(first) == [known]
+    assert second[known] is first[known]
+    assert first[known].display()["price"] == 19.9
+    assert len(db["calls"]) == 1
+    assert PRODUCT_CARD_LOOKUPS.value(result="db") == 1
+    assert PRODUCT_CARD_LOOKUPS.value(result="memory") == 1
+    assert PRODUCT_CARD_LOOKUPS.value(result="missing") == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_and_ttl_expires_entries(db) -> None:
+    clock = FakeClock()
+    ids = [str(uuid4()) for _ in range(3)]
+    for product_id in ids:
+        db["rows"][product_id] = make_row(product_id)
+    cache = ProductCardCache(max_entries=2, ttl_seconds=30, clock=clock)
+
+    await cache.get_many(None, ids)
+    await cache.get_many(None, ids[1:])
+    assert len(cache) == 2
+    assert len(db["calls"]) == 1
+
+    await cache.get_many(None, ids[:1])
+    assert [str(pid) for pid in db["calls"][-1]] == ids[:1]
+
+    clock.now = 31.0
+    await cache.get_many(None, ids[:1])
+    assert len(db["calls"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_invalidated(db) -> None:
+    PRODUCT_CARD_LOOKUPS.reset()
+    product_id = str(uuid4())
+    db["rows"][product_id] = make_row(product_id)
+    redis = FakeRedis()
+    writer = ProductCardCache(max_entries=10, ttl_seconds=60, redis_client=redis)
+    reader = ProductCardCache(max_entries=10, ttl_seconds=60, redis_client=redis)
+
+    await writer.get_many(None, [product_id])
+    cards = await reader.get_many(None, [product_id])
+
+    assert cards[product_id].title == "Shirt"
+    assert PRODUCT_CARD_LOOKUPS.value(result="redis") == 1
+
+    db["rows"][product_id] = make_row(product_id, title="Renamed")
+    await writer.invalidate([product_id])
+    cards = await writer.get_many(None, [product_id])
+
+    assert cards[product_id].title == "Renamed"
+    assert len(db["calls"]) == 2
+
+
+def test_card_json_keeps_the_pinned_field_order() -> None:
+    card = ProductCard.from_row(make_row("p-1"))
+
+    assert json.loads(card.to_json())[:2] == ["p-1", "Shirt"]
+    assert ProductCard.from_json(card.to_json()).display() == card.display()
+
+
+@pytest.mark.asyncio
+async def test_archive_products_invalidates_cards(db) -> None:
+    product = SimpleNamespace(id=uuid4(), external_id="ext-1", archived_at=None)
+    db["rows"][str(product.id)] = make_row(str(product.id))
+    cache = ProductCardCache(max_entries=10, ttl_seconds=60)
+    await cache.get_many(None, [str(product.id)])
+
+    class FakeQdrant:
+        async def set_payload(self, **kwargs) -> None:
+            return None
+
+    class FakeSession:
+        async def execute(self, stmt) -> SimpleNamespace:
+            return SimpleNamespace(
+                scalars=lambda: SimpleNamespace(all=lambda: [product])
+            )
+
+    service = IngestionService(
+        repository=None,
+        embedding_service=None,
+        quality_gate=None,
+        qdrant_client=FakeQdrant(),
+        card_cache=cache,
+    )
+    await service.archive_products(["ext-1"], "store", session=FakeSession())
+
+    # Nothing is dropped until the caller has committed
+    assert len(cache) == 1
+    await service.invalidate_committed_cards()
+    assert len(cache) == 0